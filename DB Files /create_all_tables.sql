@@ -1,4 +1,11 @@
 -- Drop tables if they exist (for clean slate)
+DROP TABLE IF EXISTS notification_counts CASCADE;
+DROP TABLE IF EXISTS task_reminders CASCADE;
+DROP TABLE IF EXISTS permission_versions CASCADE;
+DROP TABLE IF EXISTS email_threads CASCADE;
+DROP TABLE IF EXISTS analytics_rollup_watermarks CASCADE;
+DROP TABLE IF EXISTS analytics_daily_rollups CASCADE;
+DROP TABLE IF EXISTS parent_search_documents CASCADE;
 DROP TABLE IF EXISTS audit_log CASCADE;
 DROP TABLE IF EXISTS notifications CASCADE;
 DROP TABLE IF EXISTS role_permissions CASCADE;
@@ -7,6 +14,7 @@ DROP TABLE IF EXISTS scraping_jobs CASCADE;
 DROP TABLE IF EXISTS personalized_content CASCADE;
 DROP TABLE IF EXISTS chatbot_messages CASCADE;
 DROP TABLE IF EXISTS chatbot_conversations CASCADE;
+DROP TABLE IF EXISTS webhook_outbox CASCADE;
 DROP TABLE IF EXISTS webhook_logs CASCADE;
 DROP TABLE IF EXISTS webhook_configs CASCADE;
 DROP TABLE IF EXISTS form_submissions CASCADE;
@@ -31,6 +39,9 @@ DROP TABLE IF EXISTS parents CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 DROP TABLE IF EXISTS customers CASCADE;
 
+-- Extensions
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create tables
 CREATE TABLE customers (
     id SERIAL PRIMARY KEY,
@@ -158,8 +169,9 @@ CREATE TABLE email_templates (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Partitioned by month of event_date (see create_monthly_partition below)
 CREATE TABLE journey_events (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     customer_id VARCHAR(50) REFERENCES customers(customer_id),
     parent_id INTEGER REFERENCES parents(id),
     event_type VARCHAR(50),
@@ -172,8 +184,9 @@ CREATE TABLE journey_events (
     impact_score INTEGER,
     created_by VARCHAR(50),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    event_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    event_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, event_date)
+) PARTITION BY RANGE (event_date);
 
 CREATE TABLE tasks (
     id SERIAL PRIMARY KEY,
@@ -235,8 +248,9 @@ CREATE TABLE url_mappings (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Partitioned by month of created_at
 CREATE TABLE analytics_events (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     customer_id VARCHAR(50) REFERENCES customers(customer_id),
     parent_id INTEGER REFERENCES parents(id),
     user_id VARCHAR(50),
@@ -244,8 +258,9 @@ CREATE TABLE analytics_events (
     event_category VARCHAR(50),
     event_data JSONB DEFAULT '{}',
     session_id VARCHAR(100),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
 CREATE TABLE ab_tests (
     id SERIAL PRIMARY KEY,
@@ -417,6 +432,8 @@ CREATE TABLE webhook_configs (
     headers JSONB DEFAULT '{}',
     retry_config JSONB DEFAULT '{"max_retries": 3, "backoff_multiplier": 
 2}',
+    -- Outbound event types delivered to this endpoint (e.g. parent.created)
+    events TEXT[] DEFAULT '{}',
     last_triggered TIMESTAMP,
     success_count INTEGER DEFAULT 0,
     failure_count INTEGER DEFAULT 0,
@@ -424,8 +441,9 @@ CREATE TABLE webhook_configs (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Partitioned by month of created_at
 CREATE TABLE webhook_logs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     webhook_id INTEGER REFERENCES webhook_configs(id),
     request_id VARCHAR(100),
     payload JSONB,
@@ -433,8 +451,9 @@ CREATE TABLE webhook_logs (
     response_body TEXT,
     error_message TEXT,
     retry_count INTEGER DEFAULT 0,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
 CREATE TABLE chatbot_conversations (
     id SERIAL PRIMARY KEY,
@@ -514,8 +533,9 @@ CREATE TABLE role_permissions (
     UNIQUE(customer_id, role, resource)
 );
 
+-- Partitioned by month of created_at
 CREATE TABLE audit_log (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     customer_id VARCHAR(50) REFERENCES customers(customer_id),
     user_id VARCHAR(50),
     action VARCHAR(100),
@@ -524,8 +544,9 @@ CREATE TABLE audit_log (
     changes JSONB,
     ip_address INET,
     user_agent TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
 CREATE TABLE notifications (
     id SERIAL PRIMARY KEY,
@@ -542,6 +563,227 @@ CREATE TABLE notifications (
     expires_at TIMESTAMP
 );
 
+-- Denormalised per-parent search text, maintained by triggers below
+CREATE TABLE parent_search_documents (
+    parent_id INTEGER PRIMARY KEY REFERENCES parents(id) ON DELETE CASCADE,
+    customer_id VARCHAR(50) REFERENCES customers(customer_id),
+    document TEXT NOT NULL,
+    search_vector TSVECTOR,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per email thread with its inbox summary, maintained by the triggers on emails
+-- below. thread_id is email_thread_key(): emails without a thread are threads of their own.
+CREATE TABLE email_threads (
+    id SERIAL PRIMARY KEY,
+    customer_id VARCHAR(50) NOT NULL REFERENCES customers(customer_id),
+    thread_id VARCHAR(255) NOT NULL,
+    parent_id INTEGER REFERENCES parents(id) ON DELETE SET NULL,
+    parent_linked_at TIMESTAMP,
+    subject VARCHAR(500),
+    message_count INTEGER NOT NULL DEFAULT 0,
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    participants TEXT[] NOT NULL DEFAULT '{}',
+    first_message_at TIMESTAMP,
+    last_message_at TIMESTAMP NOT NULL,
+    last_email_id INTEGER,
+    last_direction VARCHAR(10),
+    last_status VARCHAR(20),
+    last_from VARCHAR(255),
+    last_snippet VARCHAR(200),
+    last_inbound_at TIMESTAMP,
+    last_outbound_at TIMESTAMP,
+    latest_sentiment DECIMAL(3,2),
+    latest_sentiment_label VARCHAR(20),
+    latest_sentiment_at TIMESTAMP,
+    -- Inbox filters, each backed by a partial index
+    has_unread BOOLEAN GENERATED ALWAYS AS (unread_count > 0) STORED,
+    awaiting_reply BOOLEAN GENERATED ALWAYS AS (
+        coalesce(last_direction = 'inbound' AND coalesce(last_status, 'unread') <> 'replied', FALSE)
+    ) STORED,
+    is_negative BOOLEAN GENERATED ALWAYS AS (coalesce(latest_sentiment < -0.3, FALSE)) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(customer_id, thread_id)
+);
+
+-- Pre-aggregated per-tenant daily counters, refreshed incrementally from watermarks
+CREATE TABLE analytics_daily_rollups (
+    customer_id VARCHAR(50) REFERENCES customers(customer_id),
+    metric VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    dimension VARCHAR(100) NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (customer_id, metric, day, dimension)
+);
+
+-- Last source row id folded into analytics_daily_rollups, per source table
+CREATE TABLE analytics_rollup_watermarks (
+    source VARCHAR(50) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP
+);
+
+-- Durable queue of outbound webhook deliveries, written in the same transaction as
+-- the change it reports. next_attempt_at doubles as the lease expiry while delivering.
+CREATE TABLE webhook_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    customer_id VARCHAR(50) REFERENCES customers(customer_id),
+    webhook_id INTEGER NOT NULL REFERENCES webhook_configs(id) ON DELETE CASCADE,
+    event_type VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-tenant version of the RBAC inputs (role_permissions and users), bumped by the
+-- triggers below. API processes compare it with the version of their compiled policy.
+CREATE TABLE permission_versions (
+    customer_id VARCHAR(50) PRIMARY KEY REFERENCES customers(customer_id) ON DELETE CASCADE,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Unread notifications per user, kept by the statement-level triggers below so a
+-- bell count is a primary-key read rather than a COUNT(*) over notifications
+CREATE TABLE notification_counts (
+    user_id VARCHAR(50) PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    customer_id VARCHAR(50) REFERENCES customers(customer_id) ON DELETE CASCADE,
+    unread INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Due-date reminders sent for tasks: one per task and due date, however many
+-- processes sweep (a moved due date is reminded again)
+CREATE TABLE task_reminders (
+    task_id INTEGER PRIMARY KEY REFERENCES tasks(id) ON DELETE CASCADE,
+    due_date TIMESTAMP,
+    reminded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Phone key used to match enquiries to existing parents: digits only, UK +44 / 0044
+-- folded to a leading 0 (mirrored by normalize_phone in the form intake worker)
+CREATE OR REPLACE FUNCTION normalize_phone(phone TEXT)
+RETURNS TEXT AS $$
+    SELECT NULLIF(regexp_replace(regexp_replace(phone, '\D', '', 'g'), '^(00)?44', '0'), '')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Inbox thread of an email: its thread_id, or a thread of its own when it has none
+CREATE OR REPLACE FUNCTION email_thread_key(p_thread_id VARCHAR, p_email_id INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT coalesce(p_thread_id, 'email-' || p_email_id::text)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Monthly partitions for the append-only tables, named <table>_pYYYYMM.
+-- Rows outside every monthly partition land in <table>_default; creating the
+-- month later moves them across. Retention drops whole partitions.
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent_table TEXT, month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month)::date;
+    upper_bound DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    partition_name TEXT := parent_table || '_p' || to_char(month, 'YYYYMM');
+    default_name TEXT := parent_table || '_default';
+    key_column TEXT;
+BEGIN
+    -- Serialise maintenance per table across app workers
+    PERFORM pg_advisory_xact_lock(hashtext('partition:' || parent_table));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT a.attname INTO key_column
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = parent_table::regclass;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                   partition_name, parent_table);
+    IF to_regclass(default_name) IS NOT NULL THEN
+        -- The attach fails while the default partition holds rows for this month
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            default_name, key_column, lower_bound, key_column, upper_bound, partition_name
+        );
+    END IF;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   parent_table, partition_name, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from months_back before to months_ahead after the current month
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent_table TEXT, months_back INTEGER, months_ahead INTEGER)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    month DATE;
+    created TEXT;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', LOCALTIMESTAMP) - make_interval(months => months_back),
+            date_trunc('month', LOCALTIMESTAMP) + make_interval(months => months_ahead),
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        created := create_monthly_partition(parent_table, month);
+        IF created IS NOT NULL THEN
+            RETURN NEXT created;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention: drop monthly partitions that end before the start of the month keep_months
+-- months ago (so at least keep_months full months are kept), and purge the same range
+-- from the default partition
+CREATE OR REPLACE FUNCTION drop_monthly_partitions(parent_table TEXT, keep_months INTEGER)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', LOCALTIMESTAMP) - make_interval(months => keep_months))::date;
+    child TEXT;
+    key_column TEXT;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('partition:' || parent_table));
+    FOR child IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent_table::regclass
+          AND c.relname ~ ('^' || parent_table || '_p[0-9]{6}$')
+          AND to_date(right(c.relname, 6), 'YYYYMM') + INTERVAL '1 month' <= cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE %I', child);
+        RETURN NEXT child;
+    END LOOP;
+
+    IF to_regclass(parent_table || '_default') IS NOT NULL THEN
+        SELECT a.attname INTO key_column
+        FROM pg_partitioned_table pt
+        JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+        WHERE pt.partrelid = parent_table::regclass;
+        EXECUTE format('DELETE FROM %I WHERE %I < %L', parent_table || '_default', key_column, cutoff);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Default partitions catch back-dated and far-future rows
+CREATE TABLE journey_events_default PARTITION OF journey_events DEFAULT;
+CREATE TABLE analytics_events_default PARTITION OF analytics_events DEFAULT;
+CREATE TABLE webhook_logs_default PARTITION OF webhook_logs DEFAULT;
+CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT;
+
+-- A year of history and three months ahead; the app's maintenance loop keeps extending it
+SELECT ensure_monthly_partitions('journey_events', 12, 3);
+SELECT ensure_monthly_partitions('analytics_events', 12, 3);
+SELECT ensure_monthly_partitions('webhook_logs', 12, 3);
+SELECT ensure_monthly_partitions('audit_log', 12, 3);
+
 -- Create indexes
 CREATE INDEX idx_users_customer ON users(customer_id);
 CREATE INDEX idx_users_email ON users(email);
@@ -557,11 +799,15 @@ CREATE INDEX idx_emails_parent ON emails(parent_id);
 CREATE INDEX idx_emails_thread ON emails(thread_id);
 CREATE INDEX idx_emails_date ON emails(date_received);
 CREATE INDEX idx_emails_sentiment ON emails(sentiment_score);
+-- Messages of an inbox thread, newest first (thread refreshes and GET /api/inbox/threads/{id}/messages)
+CREATE INDEX idx_emails_thread_key ON emails(
+    customer_id, email_thread_key(thread_id, id), coalesce(date_received, date_sent, created_at) DESC, id DESC
+);
 CREATE INDEX idx_templates_customer ON email_templates(customer_id);
 CREATE INDEX idx_templates_category ON email_templates(category);
 CREATE INDEX idx_journey_customer ON journey_events(customer_id);
 CREATE INDEX idx_journey_parent ON journey_events(parent_id);
-CREATE INDEX idx_journey_date ON journey_events(event_date);
+CREATE INDEX idx_journey_date ON journey_events USING BRIN(event_date);
 CREATE INDEX idx_journey_type ON journey_events(event_type);
 CREATE INDEX idx_tasks_customer ON tasks(customer_id);
 CREATE INDEX idx_tasks_parent ON tasks(parent_id);
@@ -572,12 +818,16 @@ CREATE INDEX idx_notes_parent ON notes(parent_id);
 CREATE INDEX idx_kb_customer ON knowledge_base(customer_id);
 CREATE INDEX idx_kb_category ON knowledge_base(category);
 CREATE INDEX idx_kb_current ON knowledge_base(is_current);
+-- One current version per crawled page; history lookups by page
+CREATE UNIQUE INDEX idx_kb_current_source ON knowledge_base(customer_id, source_url)
+    WHERE is_current AND source_url IS NOT NULL;
+CREATE INDEX idx_kb_customer_source ON knowledge_base(customer_id, source_url, version);
 CREATE INDEX idx_url_customer ON url_mappings(customer_id);
 CREATE INDEX idx_url_phrase ON url_mappings(phrase);
-CREATE INDEX idx_analytics_customer ON analytics_events(customer_id);
+CREATE INDEX idx_analytics_customer ON analytics_events(customer_id, created_at);
 CREATE INDEX idx_analytics_parent ON analytics_events(parent_id);
 CREATE INDEX idx_analytics_event ON analytics_events(event_name);
-CREATE INDEX idx_analytics_date ON analytics_events(created_at);
+CREATE INDEX idx_analytics_date ON analytics_events USING BRIN(created_at);
 CREATE INDEX idx_ab_customer ON ab_tests(customer_id);
 CREATE INDEX idx_ab_status ON ab_tests(status);
 CREATE INDEX idx_anon_school_type ON anonymous_interactions(school_type);
@@ -601,10 +851,16 @@ CREATE INDEX idx_registrations_parent ON event_registrations(parent_id);
 CREATE INDEX idx_forms_customer ON form_submissions(customer_id);
 CREATE INDEX idx_forms_status ON form_submissions(processing_status);
 CREATE INDEX idx_forms_date ON form_submissions(submitted_at);
+-- Intake queue: workers claim pending rows in id order, throughput counts recent processed_at
+CREATE INDEX idx_forms_pending ON form_submissions(id) WHERE processing_status = 'pending';
+CREATE INDEX idx_forms_processed ON form_submissions(processed_at);
 CREATE INDEX idx_webhooks_customer ON webhook_configs(customer_id);
 CREATE INDEX idx_webhooks_type ON webhook_configs(type);
-CREATE INDEX idx_webhook_logs_webhook ON webhook_logs(webhook_id);
-CREATE INDEX idx_webhook_logs_date ON webhook_logs(created_at);
+CREATE INDEX idx_webhook_logs_webhook ON webhook_logs(webhook_id, created_at);
+CREATE INDEX idx_webhook_logs_date ON webhook_logs USING BRIN(created_at);
+CREATE INDEX idx_webhook_outbox_due ON webhook_outbox(next_attempt_at)
+    WHERE status IN ('pending', 'delivering');
+CREATE INDEX idx_webhook_outbox_customer_status ON webhook_outbox(customer_id, status);
 CREATE INDEX idx_chatbot_customer ON chatbot_conversations(customer_id);
 CREATE INDEX idx_chatbot_parent ON chatbot_conversations(parent_id);
 CREATE INDEX idx_chatbot_msg_conversation ON 
@@ -617,15 +873,35 @@ CREATE INDEX idx_scraping_customer ON scraping_jobs(customer_id);
 CREATE INDEX idx_scraping_status ON scraping_jobs(status);
 CREATE INDEX idx_scraped_job ON scraped_content(job_id);
 CREATE INDEX idx_scraped_processed ON scraped_content(processed);
-CREATE INDEX idx_audit_customer ON audit_log(customer_id);
+CREATE INDEX idx_audit_customer ON audit_log(customer_id, created_at);
 CREATE INDEX idx_audit_user ON audit_log(user_id);
-CREATE INDEX idx_audit_date ON audit_log(created_at);
-CREATE INDEX idx_notifications_user ON notifications(user_id);
-CREATE INDEX idx_notifications_read ON notifications(read);
+-- Trail of one record, newest first (GET /api/audit/entries)
+CREATE INDEX idx_audit_resource ON audit_log(customer_id, resource_type, resource_id, created_at DESC);
+CREATE INDEX idx_audit_date ON audit_log USING BRIN(created_at);
+-- A user's notifications newest first (the bell list and its keyset pages)
+CREATE INDEX idx_notifications_user ON notifications(user_id, id DESC);
 CREATE INDEX idx_notifications_created ON notifications(created_at);
+-- Batched purge of expired rows
+CREATE INDEX idx_notifications_expires ON notifications(expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX idx_search_customer ON parent_search_documents(customer_id);
+CREATE INDEX idx_search_vector ON parent_search_documents USING GIN(search_vector);
+CREATE INDEX idx_search_document_trgm ON parent_search_documents USING GIN(document gin_trgm_ops);
+
+-- Inbox listing: newest threads first, one partial index per filter
+CREATE INDEX idx_email_threads_recent ON email_threads(customer_id, last_message_at DESC, id DESC);
+CREATE INDEX idx_email_threads_unread ON email_threads(customer_id, last_message_at DESC, id DESC)
+    WHERE has_unread;
+CREATE INDEX idx_email_threads_awaiting ON email_threads(customer_id, last_message_at DESC, id DESC)
+    WHERE awaiting_reply;
+CREATE INDEX idx_email_threads_negative ON email_threads(customer_id, last_message_at DESC, id DESC)
+    WHERE is_negative;
+CREATE INDEX idx_email_threads_parent ON email_threads(parent_id, last_message_at DESC);
 
 -- Composite indexes
 CREATE INDEX idx_parents_customer_status ON parents(customer_id, status);
+-- Enquiry dedupe lookups by normalised email and phone
+CREATE INDEX idx_parents_customer_email_lower ON parents(customer_id, lower(email));
+CREATE INDEX idx_parents_customer_phone_norm ON parents(customer_id, normalize_phone(phone));
 CREATE INDEX idx_emails_parent_date ON emails(parent_id, date_received 
 DESC);
 CREATE INDEX idx_journey_parent_date ON journey_events(parent_id, 
@@ -667,6 +943,440 @@ CREATE TRIGGER update_webhook_configs_updated_at BEFORE UPDATE ON
 webhook_configs
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Parent search documents (statement-level triggers so bulk writes refresh in one pass)
+CREATE OR REPLACE FUNCTION refresh_parent_search_documents(p_parent_ids INTEGER[])
+RETURNS void AS $$
+BEGIN
+    IF p_parent_ids IS NULL OR cardinality(p_parent_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO parent_search_documents (parent_id, customer_id, document, search_vector, updated_at)
+    SELECT p.id,
+           p.customer_id,
+           concat_ws(' ', p.name, p.email, p.phone, p.partner_name, c.names),
+           setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') ||
+           setweight(to_tsvector('simple', concat_ws(' ', p.partner_name, c.names)), 'B') ||
+           setweight(to_tsvector('simple', regexp_replace(concat_ws(' ', p.email, p.phone), '[^[:alnum:]]+', ' ', 'g')), 'C'),
+           CURRENT_TIMESTAMP
+    FROM parents p
+    LEFT JOIN LATERAL (
+        SELECT string_agg(ch.name, ' ' ORDER BY ch.id) AS names
+        FROM children ch
+        WHERE ch.parent_id = p.id
+    ) c ON TRUE
+    WHERE p.id = ANY(p_parent_ids)
+    ON CONFLICT (parent_id) DO UPDATE SET
+        customer_id = EXCLUDED.customer_id,
+        document = EXCLUDED.document,
+        search_vector = EXCLUDED.search_vector,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION parents_search_document_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_parent_search_documents(ARRAY(SELECT id FROM new_rows));
+    ELSE
+        -- Only rows whose searchable fields changed
+        PERFORM refresh_parent_search_documents(ARRAY(
+            SELECT n.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE (n.name, n.email, n.phone, n.partner_name, n.customer_id)
+                  IS DISTINCT FROM (o.name, o.email, o.phone, o.partner_name, o.customer_id)
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION children_search_document_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_parent_search_documents(ARRAY(
+            SELECT DISTINCT parent_id FROM new_rows WHERE parent_id IS NOT NULL
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_parent_search_documents(ARRAY(
+            SELECT DISTINCT parent_id FROM old_rows WHERE parent_id IS NOT NULL
+        ));
+    ELSE
+        PERFORM refresh_parent_search_documents(ARRAY(
+            SELECT n.parent_id FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.parent_id IS NOT NULL
+              AND (n.name, n.parent_id) IS DISTINCT FROM (o.name, o.parent_id)
+            UNION
+            SELECT o.parent_id FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE o.parent_id IS NOT NULL
+              AND n.parent_id IS DISTINCT FROM o.parent_id
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Transition tables allow only one event per trigger
+CREATE TRIGGER parents_search_document_insert AFTER INSERT ON parents
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION parents_search_document_trigger();
+CREATE TRIGGER parents_search_document_update AFTER UPDATE ON parents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION parents_search_document_trigger();
+CREATE TRIGGER children_search_document_insert AFTER INSERT ON children
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION children_search_document_trigger();
+CREATE TRIGGER children_search_document_update AFTER UPDATE ON children
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION children_search_document_trigger();
+CREATE TRIGGER children_search_document_delete AFTER DELETE ON children
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION children_search_document_trigger();
+
+-- Inbox thread summaries. New emails are folded in additively (so bulk ingest and
+-- concurrent inserts into one thread only lock the thread rows they touch); updates
+-- and deletes recompute the affected threads from their emails.
+CREATE OR REPLACE FUNCTION merge_email_threads(p_email_ids INTEGER[])
+RETURNS void AS $$
+BEGIN
+    IF p_email_ids IS NULL OR cardinality(p_email_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    WITH batch AS (
+        SELECT e.*,
+               email_thread_key(e.thread_id, e.id) AS thread_key,
+               coalesce(e.date_received, e.date_sent, e.created_at) AS message_at,
+               e.direction = 'inbound' AND coalesce(e.status, 'unread') = 'unread' AS is_unread
+        FROM emails e
+        WHERE e.id = ANY(p_email_ids)
+          AND e.customer_id IS NOT NULL
+          AND coalesce(e.date_received, e.date_sent, e.created_at) IS NOT NULL
+    ),
+    addresses AS (
+        SELECT b.customer_id, b.thread_key, array_agg(DISTINCT lower(btrim(a))) AS participants
+        FROM batch b
+        CROSS JOIN LATERAL unnest(ARRAY[b.from_address, b.to_address] || coalesce(b.cc_addresses, '{}')) a
+        WHERE coalesce(btrim(a), '') <> ''
+        GROUP BY b.customer_id, b.thread_key
+    ),
+    summary AS (
+        SELECT b.customer_id,
+               b.thread_key,
+               (array_agg(b.parent_id ORDER BY b.message_at DESC, b.id DESC) FILTER (WHERE b.parent_id IS NOT NULL))[1],
+               max(b.message_at) FILTER (WHERE b.parent_id IS NOT NULL),
+               (array_agg(b.subject ORDER BY b.message_at, b.id))[1],
+               count(*),
+               count(*) FILTER (WHERE b.is_unread),
+               min(b.message_at),
+               max(b.message_at),
+               (array_agg(b.id ORDER BY b.message_at DESC, b.id DESC))[1],
+               (array_agg(b.direction ORDER BY b.message_at DESC, b.id DESC))[1],
+               (array_agg(b.status ORDER BY b.message_at DESC, b.id DESC))[1],
+               (array_agg(b.from_address ORDER BY b.message_at DESC, b.id DESC))[1],
+               (array_agg(left(btrim(regexp_replace(coalesce(b.body_plain, b.body, ''), '\s+', ' ', 'g')), 200)
+                          ORDER BY b.message_at DESC, b.id DESC))[1],
+               max(b.message_at) FILTER (WHERE b.direction = 'inbound'),
+               max(b.message_at) FILTER (WHERE b.direction = 'outbound'),
+               (array_agg(b.sentiment_score ORDER BY b.message_at DESC, b.id DESC)
+                    FILTER (WHERE b.direction = 'inbound' AND b.sentiment_score IS NOT NULL))[1],
+               (array_agg(b.sentiment_label ORDER BY b.message_at DESC, b.id DESC)
+                    FILTER (WHERE b.direction = 'inbound' AND b.sentiment_score IS NOT NULL))[1],
+               max(b.message_at) FILTER (WHERE b.direction = 'inbound' AND b.sentiment_score IS NOT NULL)
+        FROM batch b
+        GROUP BY b.customer_id, b.thread_key
+    )
+    INSERT INTO email_threads AS t (
+        customer_id, thread_id, parent_id, parent_linked_at, subject, message_count, unread_count,
+        first_message_at, last_message_at, last_email_id, last_direction, last_status,
+        last_from, last_snippet, last_inbound_at, last_outbound_at,
+        latest_sentiment, latest_sentiment_label, latest_sentiment_at, participants
+    )
+    SELECT s.*, coalesce(a.participants[1:50], '{}')
+    FROM summary s
+    LEFT JOIN addresses a ON a.customer_id = s.customer_id AND a.thread_key = s.thread_key
+    -- Same lock order in every statement
+    ORDER BY s.customer_id, s.thread_key
+    ON CONFLICT (customer_id, thread_id) DO UPDATE SET
+        parent_id = CASE
+            WHEN EXCLUDED.parent_linked_at >= t.parent_linked_at OR t.parent_linked_at IS NULL
+                THEN coalesce(EXCLUDED.parent_id, t.parent_id)
+            ELSE t.parent_id END,
+        parent_linked_at = greatest(t.parent_linked_at, EXCLUDED.parent_linked_at),
+        subject = CASE
+            WHEN t.first_message_at IS NULL OR EXCLUDED.first_message_at < t.first_message_at
+                THEN EXCLUDED.subject
+            ELSE t.subject END,
+        message_count = t.message_count + EXCLUDED.message_count,
+        unread_count = t.unread_count + EXCLUDED.unread_count,
+        participants = ARRAY(
+            SELECT p FROM unnest(t.participants || EXCLUDED.participants) WITH ORDINALITY u(p, n)
+            GROUP BY p ORDER BY min(n) LIMIT 50
+        ),
+        first_message_at = least(t.first_message_at, EXCLUDED.first_message_at),
+        last_message_at = greatest(t.last_message_at, EXCLUDED.last_message_at),
+        last_email_id = CASE WHEN (EXCLUDED.last_message_at, EXCLUDED.last_email_id) > (t.last_message_at, t.last_email_id)
+            OR t.last_email_id IS NULL THEN EXCLUDED.last_email_id ELSE t.last_email_id END,
+        last_direction = CASE WHEN (EXCLUDED.last_message_at, EXCLUDED.last_email_id) > (t.last_message_at, t.last_email_id)
+            OR t.last_email_id IS NULL THEN EXCLUDED.last_direction ELSE t.last_direction END,
+        last_status = CASE WHEN (EXCLUDED.last_message_at, EXCLUDED.last_email_id) > (t.last_message_at, t.last_email_id)
+            OR t.last_email_id IS NULL THEN EXCLUDED.last_status ELSE t.last_status END,
+        last_from = CASE WHEN (EXCLUDED.last_message_at, EXCLUDED.last_email_id) > (t.last_message_at, t.last_email_id)
+            OR t.last_email_id IS NULL THEN EXCLUDED.last_from ELSE t.last_from END,
+        last_snippet = CASE WHEN (EXCLUDED.last_message_at, EXCLUDED.last_email_id) > (t.last_message_at, t.last_email_id)
+            OR t.last_email_id IS NULL THEN EXCLUDED.last_snippet ELSE t.last_snippet END,
+        last_inbound_at = greatest(t.last_inbound_at, EXCLUDED.last_inbound_at),
+        last_outbound_at = greatest(t.last_outbound_at, EXCLUDED.last_outbound_at),
+        latest_sentiment = CASE WHEN EXCLUDED.latest_sentiment_at >= t.latest_sentiment_at OR t.latest_sentiment_at IS NULL
+            THEN coalesce(EXCLUDED.latest_sentiment, t.latest_sentiment) ELSE t.latest_sentiment END,
+        latest_sentiment_label = CASE WHEN EXCLUDED.latest_sentiment_at >= t.latest_sentiment_at OR t.latest_sentiment_at IS NULL
+            THEN coalesce(EXCLUDED.latest_sentiment_label, t.latest_sentiment_label) ELSE t.latest_sentiment_label END,
+        latest_sentiment_at = greatest(t.latest_sentiment_at, EXCLUDED.latest_sentiment_at),
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION refresh_email_threads(p_customer_ids VARCHAR[], p_thread_ids VARCHAR[])
+RETURNS void AS $$
+BEGIN
+    IF p_thread_ids IS NULL OR cardinality(p_thread_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    PERFORM 1 FROM email_threads t
+    JOIN unnest(p_customer_ids, p_thread_ids) k(customer_id, thread_id)
+      ON t.customer_id = k.customer_id AND t.thread_id = k.thread_id
+    ORDER BY t.customer_id, t.thread_id
+    FOR UPDATE OF t;
+
+    -- Back to empty, then fold every remaining email of the threads in again
+    UPDATE email_threads t SET
+        parent_id = NULL, parent_linked_at = NULL, subject = NULL,
+        message_count = 0, unread_count = 0, participants = '{}',
+        first_message_at = NULL, last_message_at = '-infinity', last_email_id = NULL,
+        last_direction = NULL, last_status = NULL, last_from = NULL, last_snippet = NULL,
+        last_inbound_at = NULL, last_outbound_at = NULL,
+        latest_sentiment = NULL, latest_sentiment_label = NULL, latest_sentiment_at = NULL
+    FROM (SELECT DISTINCT * FROM unnest(p_customer_ids, p_thread_ids)) k(customer_id, thread_id)
+    WHERE t.customer_id = k.customer_id AND t.thread_id = k.thread_id;
+
+    PERFORM merge_email_threads(ARRAY(
+        SELECT e.id
+        FROM (SELECT DISTINCT * FROM unnest(p_customer_ids, p_thread_ids)) k(customer_id, thread_id)
+        JOIN emails e ON e.customer_id = k.customer_id AND email_thread_key(e.thread_id, e.id) = k.thread_id
+    ));
+
+    DELETE FROM email_threads t
+    USING unnest(p_customer_ids, p_thread_ids) k(customer_id, thread_id)
+    WHERE t.customer_id = k.customer_id AND t.thread_id = k.thread_id AND t.message_count = 0;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION emails_thread_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    customer_ids VARCHAR[];
+    thread_ids VARCHAR[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM merge_email_threads(ARRAY(SELECT id FROM new_rows));
+        RETURN NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(customer_id), array_agg(thread_key) INTO customer_ids, thread_ids
+        FROM (
+            SELECT DISTINCT customer_id, email_thread_key(thread_id, id) AS thread_key
+            FROM old_rows WHERE customer_id IS NOT NULL
+        ) k;
+    ELSE
+        -- Both the old and the new thread of rows whose summarised fields changed
+        SELECT array_agg(customer_id), array_agg(thread_key) INTO customer_ids, thread_ids
+        FROM (
+            SELECT DISTINCT k.customer_id, k.thread_key
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            CROSS JOIN LATERAL (VALUES
+                (o.customer_id, email_thread_key(o.thread_id, o.id)),
+                (n.customer_id, email_thread_key(n.thread_id, n.id))
+            ) k(customer_id, thread_key)
+            WHERE k.customer_id IS NOT NULL
+              AND (n.customer_id, n.thread_id, n.parent_id, n.direction, n.status, n.subject,
+                   n.from_address, n.to_address, n.cc_addresses, n.body, n.body_plain,
+                   n.sentiment_score, n.sentiment_label, n.date_received, n.date_sent, n.created_at)
+                  IS DISTINCT FROM
+                  (o.customer_id, o.thread_id, o.parent_id, o.direction, o.status, o.subject,
+                   o.from_address, o.to_address, o.cc_addresses, o.body, o.body_plain,
+                   o.sentiment_score, o.sentiment_label, o.date_received, o.date_sent, o.created_at)
+        ) k;
+    END IF;
+    PERFORM refresh_email_threads(customer_ids, thread_ids);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER emails_thread_insert AFTER INSERT ON emails
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION emails_thread_trigger();
+CREATE TRIGGER emails_thread_update AFTER UPDATE ON emails
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION emails_thread_trigger();
+CREATE TRIGGER emails_thread_delete AFTER DELETE ON emails
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION emails_thread_trigger();
+
+-- RBAC policy versions (statement-level on role_permissions so bulk edits bump once)
+CREATE OR REPLACE FUNCTION bump_permission_versions(p_customer_ids VARCHAR[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO permission_versions (customer_id)
+    SELECT DISTINCT c FROM unnest(p_customer_ids) c
+    WHERE c IS NOT NULL AND EXISTS (SELECT 1 FROM customers WHERE customer_id = c)
+    ORDER BY c
+    ON CONFLICT (customer_id) DO UPDATE
+    SET version = permission_versions.version + 1, updated_at = CURRENT_TIMESTAMP;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION role_permissions_version_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_permission_versions(ARRAY(SELECT customer_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_permission_versions(ARRAY(SELECT customer_id FROM old_rows));
+    ELSE
+        PERFORM bump_permission_versions(ARRAY(
+            SELECT customer_id FROM old_rows UNION SELECT customer_id FROM new_rows
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION users_permission_version_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_permission_versions(ARRAY[OLD.customer_id, CASE WHEN TG_OP = 'UPDATE' THEN NEW.customer_id END]);
+    ELSE
+        PERFORM bump_permission_versions(ARRAY[NEW.customer_id]);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER role_permissions_version_insert AFTER INSERT ON role_permissions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION role_permissions_version_trigger();
+CREATE TRIGGER role_permissions_version_update AFTER UPDATE ON role_permissions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION role_permissions_version_trigger();
+CREATE TRIGGER role_permissions_version_delete AFTER DELETE ON role_permissions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION role_permissions_version_trigger();
+-- Only the columns a policy reads; last_login updates don't invalidate anything
+CREATE TRIGGER users_permission_version_insert_delete AFTER INSERT OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION users_permission_version_trigger();
+CREATE TRIGGER users_permission_version_update AFTER UPDATE OF user_id, customer_id, role, status ON users
+    FOR EACH ROW
+    WHEN ((OLD.user_id, OLD.customer_id, OLD.role, OLD.status) IS DISTINCT FROM
+          (NEW.user_id, NEW.customer_id, NEW.role, NEW.status))
+    EXECUTE FUNCTION users_permission_version_trigger();
+
+-- Unread notification counts (statement-level, so a fan-out or purge of many rows
+-- changes each user's count once). Counts are locked in user_id order before they
+-- change, so concurrent fan-outs, reads and purges queue instead of deadlocking.
+CREATE OR REPLACE FUNCTION add_notification_counts(p_user_ids VARCHAR[], p_customer_ids VARCHAR[], p_deltas INTEGER[])
+RETURNS VOID AS $$
+BEGIN
+    WITH deltas AS (
+        SELECT * FROM unnest(p_user_ids, p_customer_ids, p_deltas) AS d(user_id, customer_id, delta)
+    ), locked AS (
+        SELECT c.user_id FROM notification_counts c
+        WHERE c.user_id IN (SELECT user_id FROM deltas)
+        ORDER BY c.user_id
+        FOR UPDATE
+    ), changed AS (
+        UPDATE notification_counts c
+        SET unread = greatest(c.unread + d.delta, 0), updated_at = CURRENT_TIMESTAMP
+        FROM deltas d
+        WHERE c.user_id = d.user_id AND c.user_id IN (SELECT user_id FROM locked)
+        RETURNING c.user_id
+    )
+    INSERT INTO notification_counts (user_id, customer_id, unread)
+    SELECT user_id, customer_id, delta FROM deltas
+    WHERE delta > 0 AND user_id NOT IN (SELECT user_id FROM changed)
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET unread = notification_counts.unread + EXCLUDED.unread, updated_at = CURRENT_TIMESTAMP;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION notification_counts_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    user_ids VARCHAR[];
+    customer_ids VARCHAR[];
+    deltas INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(user_id), array_agg(customer_id), array_agg(delta)
+        INTO user_ids, customer_ids, deltas
+        FROM (
+            SELECT user_id, max(customer_id) AS customer_id, count(*)::INTEGER AS delta FROM new_rows
+            WHERE user_id IS NOT NULL AND NOT coalesce(read, FALSE)
+            GROUP BY user_id
+        ) changes;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(user_id), array_agg(customer_id), array_agg(delta)
+        INTO user_ids, customer_ids, deltas
+        FROM (
+            SELECT user_id, max(customer_id) AS customer_id, -count(*)::INTEGER AS delta FROM old_rows
+            WHERE user_id IS NOT NULL AND NOT coalesce(read, FALSE)
+            GROUP BY user_id
+        ) changes;
+    ELSE
+        SELECT array_agg(user_id), array_agg(customer_id), array_agg(delta)
+        INTO user_ids, customer_ids, deltas
+        FROM (
+            SELECT user_id, max(customer_id) AS customer_id, sum(delta)::INTEGER AS delta FROM (
+                SELECT user_id, customer_id, -1 AS delta FROM old_rows
+                WHERE user_id IS NOT NULL AND NOT coalesce(read, FALSE)
+                UNION ALL
+                SELECT user_id, customer_id, 1 FROM new_rows
+                WHERE user_id IS NOT NULL AND NOT coalesce(read, FALSE)
+            ) rows
+            GROUP BY user_id HAVING sum(delta) <> 0
+        ) changes;
+    END IF;
+    IF user_ids IS NOT NULL THEN
+        PERFORM add_notification_counts(user_ids, customer_ids, deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER notification_counts_insert AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counts_trigger();
+CREATE TRIGGER notification_counts_update AFTER UPDATE ON notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counts_trigger();
+CREATE TRIGGER notification_counts_delete AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counts_trigger();
+
+-- Backfill documents for existing parents
+SELECT refresh_parent_search_documents(ARRAY(SELECT id FROM parents));
+SELECT merge_email_threads(ARRAY(SELECT id FROM emails));
+
+-- Analytics rollups start from the beginning of each source table
+INSERT INTO analytics_rollup_watermarks (source, last_id) VALUES
+('journey_events', 0),
+('emails', 0);
+
 -- Success message
 DO $$
 BEGIN
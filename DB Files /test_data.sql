@@ -71,6 +71,24 @@ last_login) VALUES
 ('USER-100', 'SCHOOL-005', 'demo@smarteducation.com', 'Demo User', 
 'admin', 'active', CURRENT_TIMESTAMP);
 
+-- Role permissions: admins may do anything; staff work the admissions pipeline.
+-- Actions follow the HTTP method (read, create, update, delete); '*' matches any.
+INSERT INTO role_permissions (customer_id, role, resource, actions, conditions)
+SELECT c.customer_id, p.role, p.resource, p.actions, p.conditions::jsonb
+FROM customers c
+CROSS JOIN (VALUES
+    ('admin', '*', ARRAY['*'], '{}'),
+    ('staff', 'parents', ARRAY['read', 'create', 'update'], '{}'),
+    ('staff', 'emails', ARRAY['read', 'create', 'update'], '{}'),
+    ('staff', 'smart_reply', ARRAY['read', 'create'], '{}'),
+    ('staff', 'knowledge_base', ARRAY['read'], '{}'),
+    ('staff', 'scoring', ARRAY['read'], '{}'),
+    ('staff', 'analytics', ARRAY['read'], '{}'),
+    ('staff', 'forms', ARRAY['read'], '{}'),
+    ('staff', 'chatbot', ARRAY['read'], '{}'),
+    ('staff', 'notifications', ARRAY['read', 'update'], '{}')
+) p(role, resource, actions, conditions);
+
 -- Insert test parents (mix of stages and statuses)
 INSERT INTO parents (customer_id, parent_id, name, email, phone, 
 partner_name, status, stage, source, lead_score, engagement_score, 
@@ -1,12 +1,17 @@
 # backend/api/core/database.py
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, QueuePool, AsyncAdaptedQueuePool
 import os
+import time
+from uuid import uuid4
 from dotenv import load_dotenv
 from pathlib import Path
 
+from .metrics import PoolStats
+
 # Load .env file from backend directory
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(env_path)
@@ -16,18 +21,127 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment variables. Please check your .env file.")
 
+# Async driver URL (asyncpg) derived from the same DSN unless set explicitly
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+
+# Pool configuration
+#
+# DB_MAX_CONNECTIONS is the connection budget for the whole deployment (keep it
+# below Postgres max_connections minus admin/migration headroom, or at the
+# pgbouncer pool size). It is split across WEB_CONCURRENCY worker processes, so
+# adding workers shrinks each pool instead of multiplying past the server limit.
+#
+# DB_POOL_MODE=transaction makes the app safe behind pgbouncer transaction
+# pooling: asyncpg statement caches are off and prepared statements get unique
+# names, so a server connection shared between clients never sees a clash.
+# Code must not rely on session state (SET, session advisory locks, LISTEN,
+# temp tables surviving a commit) in either mode.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "session").lower()
+if DB_POOL_MODE not in ("session", "transaction"):
+    raise ValueError(f"DB_POOL_MODE must be 'session' or 'transaction', got {DB_POOL_MODE!r}")
+
+def pool_settings():
+    """Per-process pool sizes derived from the deployment budget, overridable one by one"""
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+    budget = int(os.getenv("DB_MAX_CONNECTIONS", 80))
+    per_worker = max(3, budget // workers)
+
+    # The sync engine only serves scripts and legacy code paths
+    sync_pool_size = int(os.getenv("DB_SYNC_POOL_SIZE", 1))
+    async_share = max(2, per_worker - sync_pool_size)
+
+    return {
+        "workers": workers,
+        "budget": budget,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", max(1, async_share // 2))),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", async_share - max(1, async_share // 2))),
+        "sync_pool_size": sync_pool_size,
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        # Off by default: it costs a round trip per checkout, and disconnects are
+        # already detected on use and the pool invalidated
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes"),
+    }
+
+POOL_SETTINGS = pool_settings()
+
+def _instrumented_pool(pool_class, name):
+    """Pool subclass that records checkout wait, checkouts, timeouts and new connections"""
+    stats = PoolStats(name)
+
+    class InstrumentedPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                stats.timeouts += 1
+                raise
+            stats.observe_checkout(time.perf_counter() - started, self.overflow())
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool, stats
+
+def _track_engine(stats, sync_engine):
+    """Attach the engine so pool gauges are read live, and count new connections"""
+    stats.engine = sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+SyncPool, sync_pool_stats = _instrumented_pool(QueuePool, "sync")
+AsyncPool, async_pool_stats = _instrumented_pool(AsyncAdaptedQueuePool, "async")
+
+def _async_connect_args():
+    if DB_POOL_MODE != "transaction":
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
 # Create engine with connection pooling
 engine = create_engine(
     DATABASE_URL,
-    pool_size=20,
-    max_overflow=40,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,   # Recycle connections after 1 hour
+    poolclass=SyncPool,
+    pool_size=POOL_SETTINGS["sync_pool_size"],
+    max_overflow=0,
+    pool_timeout=POOL_SETTINGS["pool_timeout"],
+    pool_pre_ping=POOL_SETTINGS["pool_pre_ping"],
+    pool_recycle=POOL_SETTINGS["pool_recycle"],
 )
+_track_engine(sync_pool_stats, engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers - queries no longer block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=AsyncPool,
+    pool_size=POOL_SETTINGS["pool_size"],
+    max_overflow=POOL_SETTINGS["max_overflow"],
+    pool_timeout=POOL_SETTINGS["pool_timeout"],
+    pool_pre_ping=POOL_SETTINGS["pool_pre_ping"],
+    pool_recycle=POOL_SETTINGS["pool_recycle"],
+    connect_args=_async_connect_args(),
+)
+_track_engine(async_pool_stats, async_engine.sync_engine)
+
+# Async session factory (objects stay usable after commit for response serialisation)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -43,13 +157,21 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an async DB session
+async def get_async_db():
+    """
+    Async database dependency for FastAPI routes.
+    Automatically closes the session after the request.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Database health check
 async def check_database_connection():
     """Check if database is accessible"""
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"Database connection error: {e}")
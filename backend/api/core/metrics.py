@@ -0,0 +1,284 @@
+# backend/api/core/metrics.py
+import bisect
+import contextvars
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Thresholds (per process)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+slow_query_log = logging.getLogger("api.slow_query")
+n_plus_one_log = logging.getLogger("api.n_plus_one")
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus model"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+class MetricsRegistry:
+    """In-process request and database metrics, rendered as Prometheus text"""
+
+    def __init__(self):
+        self.request_latency: Dict[Tuple[str, str, int], Histogram] = {}
+        self.request_queries: Dict[str, Histogram] = {}
+        self.request_db_time: Dict[str, Histogram] = {}
+        self.slow_queries: Counter = Counter()
+        self.n_plus_one: Counter = Counter()
+        self.queries_outside_requests = 0
+        self.pools: Dict[str, "PoolStats"] = {}
+
+    def observe_request(self, method: str, route: str, status: int, elapsed: float, stats: "RequestStats"):
+        key = (method, route, status)
+        if key not in self.request_latency:
+            self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+        self.request_latency[key].observe(elapsed)
+
+        if route not in self.request_queries:
+            self.request_queries[route] = Histogram(QUERY_COUNT_BUCKETS)
+            self.request_db_time[route] = Histogram(LATENCY_BUCKETS)
+        self.request_queries[route].observe(stats.queries)
+        self.request_db_time[route].observe(stats.db_time)
+
+    def _render_histogram(self, lines, name, histogram, **labels):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_bucket{{{_labels(**labels, le="+Inf")}}} {histogram.count}')
+        lines.append(f'{name}_sum{{{_labels(**labels)}}} {histogram.sum}')
+        lines.append(f'{name}_count{{{_labels(**labels)}}} {histogram.count}')
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.request_latency.items()):
+            self._render_histogram(lines, "http_request_duration_seconds", histogram,
+                                   method=method, route=route, status=status)
+
+        lines += [
+            "# HELP db_queries_per_request SQL statements executed per request",
+            "# TYPE db_queries_per_request histogram",
+        ]
+        for route, histogram in sorted(self.request_queries.items()):
+            self._render_histogram(lines, "db_queries_per_request", histogram, route=route)
+
+        lines += [
+            "# HELP db_time_per_request_seconds Time spent in SQL per request",
+            "# TYPE db_time_per_request_seconds histogram",
+        ]
+        for route, histogram in sorted(self.request_db_time.items()):
+            self._render_histogram(lines, "db_time_per_request_seconds", histogram, route=route)
+
+        lines += [
+            f"# HELP db_slow_queries_total Statements slower than {SLOW_QUERY_MS:g}ms",
+            "# TYPE db_slow_queries_total counter",
+        ]
+        lines += [f'db_slow_queries_total{{{_labels(route=route)}}} {count}'
+                  for route, count in sorted(self.slow_queries.items())]
+
+        lines += [
+            "# HELP db_n_plus_one_total Requests repeating one statement at least "
+            f"{N_PLUS_ONE_THRESHOLD} times",
+            "# TYPE db_n_plus_one_total counter",
+        ]
+        lines += [f'db_n_plus_one_total{{{_labels(route=route)}}} {count}'
+                  for route, count in sorted(self.n_plus_one.items())]
+
+        lines += [
+            "# HELP db_queries_outside_requests_total Statements run by startup and background tasks",
+            "# TYPE db_queries_outside_requests_total counter",
+            f"db_queries_outside_requests_total {self.queries_outside_requests}",
+        ]
+
+        if self.pools:
+            self._render_pools(lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_pools(self, lines):
+        pools = sorted(self.pools.items())
+        lines += [
+            "# HELP db_pool_checkout_wait_seconds Time to get a connection from the pool (includes connecting on overflow)",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        for name, stats in pools:
+            self._render_histogram(lines, "db_pool_checkout_wait_seconds", stats.wait, pool=name)
+
+        counters = [
+            ("db_pool_checkouts_total", "Connections handed out by the pool", "checkouts"),
+            ("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", "timeouts"),
+            ("db_pool_connects_total", "New database connections opened", "connects"),
+        ]
+        for metric, help_text, attr in counters:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{{_labels(pool=name)}}} {getattr(stats, attr)}' for name, stats in pools]
+
+        gauges = [
+            ("db_pool_size", "Configured pool_size", lambda pool: pool.size()),
+            ("db_pool_max_overflow", "Configured max_overflow", lambda pool: pool._max_overflow),
+            ("db_pool_checked_out", "Connections currently in use", lambda pool: pool.checkedout()),
+            ("db_pool_overflow", "Overflow connections currently open", lambda pool: max(0, pool.overflow())),
+        ]
+        for metric, help_text, read in gauges:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{{_labels(pool=name)}}} {read(stats.engine.pool)}'
+                      for name, stats in pools if stats.engine is not None]
+
+        lines += [
+            "# HELP db_pool_overflow_peak Most overflow connections open at once since start",
+            "# TYPE db_pool_overflow_peak gauge",
+        ]
+        lines += [f'db_pool_overflow_peak{{{_labels(pool=name)}}} {stats.overflow_peak}' for name, stats in pools]
+
+registry = MetricsRegistry()
+
+class PoolStats:
+    """Checkout telemetry for one engine's pool, fed by the instrumented pool classes in database.py"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self.wait = Histogram(POOL_WAIT_BUCKETS)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.overflow_peak = 0
+        registry.pools[name] = self
+
+    def observe_checkout(self, elapsed: float, overflow: int):
+        self.wait.observe(elapsed)
+        self.checkouts += 1
+        self.overflow_peak = max(self.overflow_peak, overflow)
+
+class RequestStats:
+    """Per-request counters, reachable from SQLAlchemy events through a context variable"""
+    __slots__ = ("scope", "customer_id", "queries", "db_time", "statements")
+
+    def __init__(self, scope, customer_id: Optional[str]):
+        self.scope = scope
+        self.customer_id = customer_id
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        """Route template (not the raw path) so label cardinality stays bounded"""
+        route = self.scope.get("route")
+        return route.path if route is not None else "unmatched"
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+_request_stats: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+# SQLAlchemy hooks
+def instrument_engine(sync_engine):
+    """Count statements and DB time per request and log slow statements (use async_engine.sync_engine for async)"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - getattr(context, "_query_started", time.perf_counter())
+        stats = _request_stats.get()
+        if stats is None:
+            registry.queries_outside_requests += 1
+        else:
+            stats.queries += 1
+            stats.db_time += elapsed
+            stats.statements[statement] += 1
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            route = stats.route if stats else "-"
+            registry.slow_queries[route] += 1
+            slow_query_log.warning(
+                "slow query %.1fms tenant=%s route=%s\n%s\nparams=%.500r",
+                elapsed * 1000,
+                stats.customer_id if stats else None,
+                route,
+                statement,
+                parameters,
+            )
+
+# ASGI middleware
+class MetricsMiddleware:
+    """
+    Records per-route latency histograms and query counts, flags N+1 patterns,
+    and adds a Server-Timing header to every HTTP response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        stats = RequestStats(scope, query.get("customer_id", [None])[0])
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = stats.route
+            registry.observe_request(scope["method"], route, status, elapsed, stats)
+
+            repeated = {sql: n for sql, n in stats.statements.items() if n >= N_PLUS_ONE_THRESHOLD}
+            if repeated:
+                registry.n_plus_one[route] += 1
+                sql, n = max(repeated.items(), key=lambda item: item[1])
+                n_plus_one_log.warning(
+                    "possible N+1 on %s %s tenant=%s: statement ran %d times\n%s",
+                    scope["method"], route, stats.customer_id, n, sql
+                )
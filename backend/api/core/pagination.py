@@ -0,0 +1,86 @@
+# backend/api/core/pagination.py
+import base64
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Date, DateTime, and_, or_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+pagination_log = logging.getLogger("api.pagination")
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or does not match the request"""
+
+# Cursor encoding
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: int) -> str:
+    """Encode (sort column value, id) of the last row into an opaque token"""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_order, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, column, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Decode a cursor back into (value, id), checking it belongs to this sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+    if cursor_sort_by != sort_by or cursor_order != sort_order:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+
+    if value is not None:
+        column_type = column.type
+        if isinstance(column_type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif isinstance(column_type, Date):
+            value = date.fromisoformat(value)
+    return value, int(row_id)
+
+# Keyset predicate
+def keyset_filter(column, id_column, value: Any, row_id: int, descending: bool):
+    """
+    Rows strictly after (value, id) in ORDER BY column, id.
+    Follows PostgreSQL NULL placement: NULLS FIRST for DESC, NULLS LAST for ASC.
+    """
+    if descending:
+        if value is None:
+            return or_(and_(column.is_(None), id_column < row_id), column.isnot(None))
+        # The redundant plain bound is what the planner can use as an index range
+        # and to prune time partitions; it cannot see through the OR
+        return and_(column <= value, or_(column < value, and_(column == value, id_column < row_id)))
+
+    if value is None:
+        return and_(column.is_(None), id_column > row_id)
+    return or_(column > value, and_(column == value, id_column > row_id), column.is_(None))
+
+# Planner row estimate
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper that keeps the statement's bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+async def estimate_row_count(db: AsyncSession, statement) -> Optional[int]:
+    """Row count estimate from planner statistics - no scan of the result set; None if EXPLAIN fails"""
+    try:
+        # Savepoint so a failed EXPLAIN does not poison the request's transaction
+        async with db.begin_nested():
+            plan = (await db.execute(Explain(statement))).scalar()
+    except DBAPIError as e:
+        pagination_log.warning("Row estimate failed, counting instead: %s", e.orig)
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
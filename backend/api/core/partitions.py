@@ -0,0 +1,61 @@
+# backend/api/core/partitions.py
+import asyncio
+import os
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal
+
+# Monthly partitions are created this many months ahead of the current one
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+PARTITION_MAINTENANCE_SECONDS = int(os.getenv("PARTITION_MAINTENANCE_SECONDS", 6 * 3600))
+
+# Full months of history kept per partitioned table; 0 keeps everything
+RETENTION_MONTHS: Dict[str, int] = {
+    "analytics_events": int(os.getenv("ANALYTICS_EVENTS_RETENTION_MONTHS", 13)),
+    "audit_log": int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", 84)),
+    "webhook_logs": int(os.getenv("WEBHOOK_LOGS_RETENTION_MONTHS", 3)),
+    "journey_events": int(os.getenv("JOURNEY_EVENTS_RETENTION_MONTHS", 0)),
+}
+
+async def maintain_partitions(
+    db: AsyncSession,
+    months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Create upcoming monthly partitions and drop the ones past retention, one
+    transaction per table. Retention is a DROP TABLE per month: no row-by-row
+    DELETE, no dead tuples and nothing for vacuum to do.
+    """
+    changes: Dict[str, Dict[str, List[str]]] = {}
+    for table, keep_months in RETENTION_MONTHS.items():
+        created = (await db.execute(
+            text("SELECT ensure_monthly_partitions(:table, 0, :ahead)"),
+            {"table": table, "ahead": months_ahead}
+        )).scalars().all()
+        dropped = []
+        if keep_months > 0:
+            dropped = (await db.execute(
+                text("SELECT drop_monthly_partitions(:table, :keep)"),
+                {"table": table, "keep": keep_months}
+            )).scalars().all()
+        await db.commit()
+        changes[table] = {"created": list(created), "dropped": list(dropped)}
+    return changes
+
+async def run_partition_maintenance_loop(interval: int = PARTITION_MAINTENANCE_SECONDS):
+    """Background partition maintenance started from the app lifespan (runs once at startup)"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                changes = await maintain_partitions(db)
+            for table, change in changes.items():
+                if change["created"] or change["dropped"]:
+                    print(f"🗂️  {table}: created {change['created']}, dropped {change['dropped']}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,19 @@
+# backend/api/core/serialization.py
+from typing import Any, Dict, Iterable, List
+
+from fastapi.responses import ORJSONResponse
+
+# Read endpoints return ORJSONResponse directly, which skips FastAPI's
+# response_model re-validation; response_model is still declared for the docs.
+__all__ = ["ORJSONResponse", "schema_columns", "rows_to_dicts"]
+
+def schema_columns(model, schema) -> List[Any]:
+    """
+    Model columns for exactly the fields a response schema exposes.
+    Selecting these instead of whole entities skips ORM object construction.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+def rows_to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Plain dicts from projected result rows, ready for orjson"""
+    return [row._asdict() for row in rows]
@@ -0,0 +1,239 @@
+# backend/api/modules/analytics/ingest.py
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import orjson
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from sqlalchemy import text
+
+from ...core.database import async_engine
+
+# Events held in memory before producers are made to wait (per process)
+INGEST_QUEUE_CAPACITY = int(os.getenv("ANALYTICS_INGEST_QUEUE_CAPACITY", 100_000))
+# A flush starts once this many events are buffered, or after the interval, whichever comes first
+INGEST_FLUSH_ROWS = int(os.getenv("ANALYTICS_INGEST_FLUSH_ROWS", 5_000))
+INGEST_FLUSH_SECONDS = float(os.getenv("ANALYTICS_INGEST_FLUSH_SECONDS", 1.0))
+# How long a request waits for buffer space before it is turned away with 503
+INGEST_ENQUEUE_TIMEOUT = float(os.getenv("ANALYTICS_INGEST_ENQUEUE_TIMEOUT", 2.0))
+# Failed writes are retried with backoff before the batch is given up
+INGEST_MAX_RETRIES = int(os.getenv("ANALYTICS_INGEST_MAX_RETRIES", 5))
+# Longest the lifespan shutdown waits for the buffer to drain
+INGEST_DRAIN_SECONDS = float(os.getenv("ANALYTICS_INGEST_DRAIN_SECONDS", 10.0))
+
+EVENT_COPY_COLUMNS = [
+    "customer_id", "parent_id", "user_id", "event_name", "event_category",
+    "event_data", "session_id", "created_at",
+]
+
+EventRow = Tuple[str, Optional[int], Optional[str], str, Optional[str], str, Optional[str], datetime]
+
+# Slow path for a batch COPY rejected (unknown tenant or parent): unknown tenants are
+# dropped, and parent references that don't exist for that tenant are cleared
+INSERT_CHECKED = text("""
+    INSERT INTO analytics_events
+        (customer_id, parent_id, user_id, event_name, event_category, event_data, session_id, created_at)
+    SELECT e.customer_id, p.id, e.user_id, e.event_name, e.event_category,
+           CAST(e.event_data AS JSONB), e.session_id, e.created_at
+    FROM unnest(
+        CAST(:customer_ids AS VARCHAR[]),
+        CAST(:parent_ids AS INTEGER[]),
+        CAST(:user_ids AS VARCHAR[]),
+        CAST(:event_names AS VARCHAR[]),
+        CAST(:event_categories AS VARCHAR[]),
+        CAST(:event_data AS TEXT[]),
+        CAST(:session_ids AS VARCHAR[]),
+        CAST(:created_ats AS TIMESTAMP[])
+    ) AS e(customer_id, parent_id, user_id, event_name, event_category, event_data, session_id, created_at)
+    JOIN customers c ON c.customer_id = e.customer_id
+    LEFT JOIN parents p ON p.id = e.parent_id AND p.customer_id = e.customer_id
+""")
+
+class IngestBusy(Exception):
+    """The buffer stayed full for the whole enqueue timeout, or the ingestor is shutting down"""
+
+def event_row(customer_id: str, event, received_at: datetime) -> EventRow:
+    """Flatten a validated event into the COPY column order (timestamps as naive UTC)"""
+    occurred_at = event.occurred_at or received_at
+    if occurred_at.tzinfo is not None:
+        occurred_at = occurred_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return (
+        customer_id, event.parent_id, event.user_id, event.event_name, event.event_category,
+        orjson.dumps(event.event_data).decode(), event.session_id, occurred_at,
+    )
+
+async def _copy_rows(rows: Sequence[EventRow]):
+    async with async_engine.begin() as connection:
+        raw = (await connection.get_raw_connection()).driver_connection
+        await raw.copy_records_to_table("analytics_events", records=rows, columns=EVENT_COPY_COLUMNS)
+
+async def _insert_checked(rows: Sequence[EventRow]) -> int:
+    columns = list(zip(*rows))
+    async with async_engine.begin() as connection:
+        result = await connection.execute(INSERT_CHECKED, {
+            "customer_ids": list(columns[0]),
+            "parent_ids": list(columns[1]),
+            "user_ids": list(columns[2]),
+            "event_names": list(columns[3]),
+            "event_categories": list(columns[4]),
+            "event_data": list(columns[5]),
+            "session_ids": list(columns[6]),
+            "created_ats": list(columns[7]),
+        })
+        return result.rowcount
+
+class EventIngestor:
+    """
+    Bounded in-process buffer in front of analytics_events.
+    Requests append validated rows and return; one background writer swaps the
+    buffer out and COPYs it in a single round trip. Capacity counts the batch
+    being written too, so when the database falls behind producers wait for the
+    writer (backpressure) and give up after a timeout.
+    """
+
+    def __init__(
+        self,
+        capacity: int = INGEST_QUEUE_CAPACITY,
+        flush_rows: int = INGEST_FLUSH_ROWS,
+        flush_seconds: float = INGEST_FLUSH_SECONDS,
+        max_retries: int = INGEST_MAX_RETRIES,
+    ):
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self._buffer: List[EventRow] = []
+        self._in_flight = 0
+        self._space = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        # Counters, reported by stats()
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Events accepted but not yet written (buffered plus the batch being written)"""
+        return len(self._buffer) + self._in_flight
+
+    def start(self):
+        if self._writer is None or self._writer.done():
+            self._closing = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def submit(self, rows: List[EventRow], timeout: float = INGEST_ENQUEUE_TIMEOUT) -> int:
+        """Buffer rows for the writer, waiting up to timeout seconds for space"""
+        if not rows:
+            return 0
+        if len(rows) > self.capacity:
+            raise ValueError(f"batch of {len(rows)} events exceeds the buffer capacity ({self.capacity})")
+        if self._closing or self._writer is None or self._writer.done():
+            raise IngestBusy("event ingestion is not running")
+
+        async with self._space:
+            if self.depth + len(rows) > self.capacity:
+                self._flush_requested.set()
+                try:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: self.depth + len(rows) <= self.capacity),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.rejected += len(rows)
+                    raise IngestBusy("event buffer is full")
+            self._buffer.extend(rows)
+
+        self.accepted += len(rows)
+        if len(self._buffer) >= self.flush_rows:
+            self._flush_requested.set()
+        return len(rows)
+
+    async def _take(self) -> List[EventRow]:
+        async with self._space:
+            batch, self._buffer = self._buffer, []
+            self._in_flight = len(batch)
+        return batch
+
+    async def _release(self):
+        """The batch in flight is done with: its space goes back to waiting producers"""
+        async with self._space:
+            self._in_flight = 0
+            self._space.notify_all()
+
+    async def _write(self, batch: List[EventRow]):
+        """COPY the batch; a constraint failure falls back to the checked insert"""
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                try:
+                    await _copy_rows(batch)
+                    written = len(batch)
+                except IntegrityConstraintViolationError:
+                    written = await _insert_checked(batch)
+                self.written += written
+                self.dropped += len(batch) - written
+                self.flushes += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                    print(f"Analytics event flush failed, dropping {len(batch)} events: {e}")
+                    return
+                print(f"Analytics event flush failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(min(0.5 * 2 ** attempt, 10))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if not self._closing:
+                self._flush_requested.clear()
+
+            batch = await self._take()
+            if batch:
+                # Not cancelled mid-batch: stop() waits for the drain instead
+                await self._write(batch)
+                await self._release()
+            elif self._closing:
+                return
+
+    async def stop(self, timeout: float = INGEST_DRAIN_SECONDS):
+        """Stop accepting events, write out what is buffered, then stop the writer"""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._flush_requested.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._writer), timeout)
+        except asyncio.TimeoutError:
+            lost = self.depth
+            self._writer.cancel()
+            print(f"Analytics event drain timed out, {lost} events not written")
+        self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.depth,
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+# Process-wide ingestor, started and drained by the app lifespan
+event_ingestor = EventIngestor()
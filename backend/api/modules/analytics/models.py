@@ -0,0 +1,42 @@
+# backend/api/modules/analytics/models.py
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, BigInteger, Float
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class DailyRollup(Base):
+    """
+    One counter per tenant, metric, day and dimension (e.g. event type, email direction).
+    total carries a summable value next to count (sentiment), so means stay exact over any range.
+    """
+    __tablename__ = "analytics_daily_rollups"
+    
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"), primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)
+    dimension = Column(String(100), primary_key=True, default='')
+    count = Column(BigInteger, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)
+
+class RollupWatermark(Base):
+    """Highest source row id already folded into the rollups"""
+    __tablename__ = "analytics_rollup_watermarks"
+    
+    source = Column(String(50), primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    refreshed_at = Column(DateTime)
+
+class AnalyticsEvent(Base):
+    """Raw tracking event (page views, clicks, widget interactions), written in batches by the ingestor"""
+    __tablename__ = "analytics_events"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    parent_id = Column(Integer, ForeignKey("parents.id"))
+    user_id = Column(String(50))
+    event_name = Column(String(100))
+    event_category = Column(String(50))
+    event_data = Column(JSONB, default=dict)
+    session_id = Column(String(100))
+    # Partition key (monthly ranges), hence part of the primary key
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=func.now())
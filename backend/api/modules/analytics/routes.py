@@ -0,0 +1,169 @@
+# backend/api/modules/analytics/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast, Date
+from typing import Optional
+from datetime import date, datetime, timedelta
+
+from ...core.database import get_async_db
+from ..rbac.dependencies import authorize
+from . import models, schemas
+from .service import (
+    FUNNEL_STEPS, rollup_totals, rollup_range, refresh_rollups, rebuild_tenant_rollups
+)
+from .ingest import IngestBusy, event_ingestor, event_row
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+# Default reporting window when no dates are given
+DEFAULT_RANGE_DAYS = 30
+
+def resolve_range(start: Optional[date], end: Optional[date]):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return start, end
+
+def rate(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+@router.get("/funnel", response_model=schemas.FunnelResponse, dependencies=[Depends(authorize("analytics"))])
+async def get_funnel(
+    customer_id: str = Query(..., description="Customer ID"),
+    start: Optional[date] = Query(None, description="First day (inclusive), defaults to 30 days before end"),
+    end: Optional[date] = Query(None, description="Last day (inclusive), defaults to today"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Admissions funnel (enquiry → enrollment) from the daily rollups"""
+    start, end = resolve_range(start, end)
+    totals = (await rollup_totals(db, customer_id, ["journey_event"], start, end))["journey_event"]
+    
+    steps = []
+    first = previous = None
+    for step in FUNNEL_STEPS:
+        count = totals.get(step, (0, 0.0))[0]
+        steps.append(schemas.FunnelStep(
+            step=step,
+            count=count,
+            rate_from_previous=rate(count, previous) if previous is not None else None,
+            rate_from_first=rate(count, first) if first is not None else None
+        ))
+        first = count if first is None else first
+        previous = count
+    
+    return schemas.FunnelResponse(customer_id=customer_id, start=start, end=end, steps=steps)
+
+@router.get("/trends", response_model=schemas.TrendResponse, dependencies=[Depends(authorize("analytics"))])
+async def get_trends(
+    customer_id: str = Query(..., description="Customer ID"),
+    metric: schemas.RollupMetric = Query(..., description="Rollup metric"),
+    interval: schemas.TrendInterval = Query(schemas.TrendInterval.day),
+    dimension: Optional[str] = Query(None, description="Only this dimension (e.g. event type, email direction)"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Time series of one metric per day, week or month, split by dimension"""
+    start, end = resolve_range(start, end)
+    rollup = models.DailyRollup
+    period = cast(func.date_trunc(interval.value, rollup.day), Date).label("period")
+    
+    query = select(
+        period,
+        rollup.dimension,
+        func.sum(rollup.count).label("count"),
+        func.sum(rollup.total).label("total")
+    ).where(*rollup_range(customer_id, metric.value, start, end))
+    
+    if dimension is not None:
+        query = query.where(rollup.dimension == dimension)
+    
+    rows = await db.execute(
+        query.group_by(period, rollup.dimension).order_by(period, rollup.dimension)
+    )
+    
+    # Only sentiment carries values; other metrics are plain counts
+    with_mean = metric == schemas.RollupMetric.sentiment
+    points = [
+        schemas.TrendPoint(
+            period=row.period,
+            dimension=row.dimension,
+            count=int(row.count),
+            mean=round(row.total / int(row.count), 4) if with_mean and row.count else None
+        )
+        for row in rows
+    ]
+    
+    return schemas.TrendResponse(
+        customer_id=customer_id, metric=metric, interval=interval,
+        start=start, end=end, points=points
+    )
+
+@router.get("/summary", response_model=schemas.AnalyticsSummary, dependencies=[Depends(authorize("analytics"))])
+async def get_summary(
+    customer_id: str = Query(..., description="Customer ID"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Headline numbers for a date range"""
+    start, end = resolve_range(start, end)
+    
+    totals = await rollup_totals(
+        db, customer_id, ["enquiries", "conversions", "stage_transitions", "emails", "sentiment"], start, end
+    )
+    enquiries, conversions = totals["enquiries"], totals["conversions"]
+    transitions, emails, sentiment = totals["stage_transitions"], totals["emails"], totals["sentiment"]
+    
+    enquiry_count = sum(count for count, _ in enquiries.values())
+    conversion_count = sum(count for count, _ in conversions.values())
+    scored = sum(count for count, _ in sentiment.values())
+    sentiment_total = sum(total for _, total in sentiment.values())
+    
+    return schemas.AnalyticsSummary(
+        customer_id=customer_id,
+        start=start,
+        end=end,
+        enquiries=enquiry_count,
+        conversions=conversion_count,
+        conversion_rate=rate(conversion_count, enquiry_count),
+        stage_transitions={stage: count for stage, (count, _) in transitions.items()},
+        emails={direction: count for direction, (count, _) in emails.items()},
+        average_sentiment=round(sentiment_total / scored, 4) if scored else None
+    )
+
+@router.post("/rollups/refresh", response_model=schemas.RollupRefreshResult, dependencies=[Depends(authorize("analytics"))])
+async def refresh(db: AsyncSession = Depends(get_async_db)):
+    """Fold new journey events and emails into the rollups now (normally done in the background)"""
+    return schemas.RollupRefreshResult(advanced=await refresh_rollups(db))
+
+@router.post("/rollups/rebuild", response_model=schemas.RollupRebuildResult, dependencies=[Depends(authorize("analytics"))])
+async def rebuild(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recompute a tenant's rollups from scratch, e.g. after back-dated edits or deletes"""
+    watermarks = await rebuild_tenant_rollups(db, customer_id)
+    return schemas.RollupRebuildResult(customer_id=customer_id, watermarks=watermarks)
+
+@router.post("/events", response_model=schemas.EventIngestResult, status_code=202)
+async def ingest_events(batch: schemas.AnalyticsEventBatch):
+    """
+    Accept a batch of tracking events. They are buffered in memory and written
+    in bulk by the background writer, so 202 means queued, not yet stored.
+    """
+    received_at = datetime.utcnow()
+    rows = [event_row(batch.customer_id, event, received_at) for event in batch.events]
+    try:
+        accepted = await event_ingestor.submit(rows)
+    except IngestBusy as e:
+        # Backpressure: tell the client to retry rather than buffering without bound
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    
+    return schemas.EventIngestResult(accepted=accepted, queued=event_ingestor.depth)
+
+@router.get("/events/ingest-stats", response_model=schemas.EventIngestStats, dependencies=[Depends(authorize("analytics"))])
+async def ingest_stats():
+    """Buffer depth and write counters for this worker process"""
+    return schemas.EventIngestStats(**event_ingestor.stats())
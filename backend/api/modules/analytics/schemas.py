@@ -0,0 +1,92 @@
+# backend/api/modules/analytics/schemas.py
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import date, datetime
+from enum import Enum
+
+class RollupMetric(str, Enum):
+    journey_event = "journey_event"
+    enquiries = "enquiries"
+    stage_transitions = "stage_transitions"
+    conversions = "conversions"
+    emails = "emails"
+    sentiment = "sentiment"
+
+class TrendInterval(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+class FunnelStep(BaseModel):
+    step: str
+    count: int
+    rate_from_previous: Optional[float] = None
+    rate_from_first: Optional[float] = None
+
+class FunnelResponse(BaseModel):
+    customer_id: str
+    start: date
+    end: date
+    steps: List[FunnelStep]
+
+class TrendPoint(BaseModel):
+    period: date
+    dimension: str
+    count: int
+    mean: Optional[float] = None
+
+class TrendResponse(BaseModel):
+    customer_id: str
+    metric: RollupMetric
+    interval: TrendInterval
+    start: date
+    end: date
+    points: List[TrendPoint]
+
+class AnalyticsSummary(BaseModel):
+    customer_id: str
+    start: date
+    end: date
+    enquiries: int
+    conversions: int
+    conversion_rate: Optional[float] = None
+    stage_transitions: Dict[str, int]
+    emails: Dict[str, int]
+    average_sentiment: Optional[float] = None
+
+class RollupRefreshResult(BaseModel):
+    advanced: Dict[str, int]
+
+class RollupRebuildResult(BaseModel):
+    customer_id: str
+    watermarks: Dict[str, int]
+
+# Event ingestion
+MAX_EVENTS_PER_BATCH = 1000
+
+class AnalyticsEventIn(BaseModel):
+    event_name: str = Field(..., min_length=1, max_length=100)
+    event_category: Optional[str] = Field(None, max_length=50)
+    event_data: Dict[str, Any] = Field(default_factory=dict)
+    session_id: Optional[str] = Field(None, max_length=100)
+    user_id: Optional[str] = Field(None, max_length=50)
+    parent_id: Optional[int] = None
+    occurred_at: Optional[datetime] = None
+
+class AnalyticsEventBatch(BaseModel):
+    customer_id: str
+    events: List[AnalyticsEventIn] = Field(..., min_length=1, max_length=MAX_EVENTS_PER_BATCH)
+
+class EventIngestResult(BaseModel):
+    accepted: int
+    queued: int
+
+class EventIngestStats(BaseModel):
+    queued: int
+    capacity: int
+    accepted: int
+    written: int
+    dropped: int
+    rejected: int
+    flushes: int
+    last_flush_ms: float
@@ -0,0 +1,191 @@
+# backend/api/modules/analytics/service.py
+import asyncio
+import os
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import AsyncSessionLocal
+from . import models
+
+# Journey event types that make up the admissions funnel, in order
+FUNNEL_STEPS = ["enquiry", "visit", "application", "offer", "enrollment"]
+CONVERSION_EVENT_TYPES = ["enrollment"]
+
+# Source rows younger than this are left for the next run, so rows from
+# transactions still in flight (lower id, later commit) are not skipped
+REFRESH_LAG_SECONDS = int(os.getenv("ANALYTICS_REFRESH_LAG_SECONDS", 60))
+REFRESH_BATCH_ROWS = int(os.getenv("ANALYTICS_REFRESH_BATCH_ROWS", 50_000))
+REFRESH_INTERVAL_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", 300))
+
+# Each statement folds source rows (low, high] into the daily counters, optionally for one tenant.
+# metric / dimension pairs come from a VALUES list so one scan feeds every metric.
+UPSERT_ROLLUPS = """
+    INSERT INTO analytics_daily_rollups AS r (customer_id, metric, day, dimension, count, total)
+    SELECT customer_id, metric, day, dimension, count(*), coalesce(sum(value), 0)
+    FROM (
+        {select}
+    ) AS facts
+    WHERE metric IS NOT NULL
+    GROUP BY customer_id, metric, day, dimension
+    ON CONFLICT (customer_id, metric, day, dimension) DO UPDATE SET
+        count = r.count + EXCLUDED.count,
+        total = r.total + EXCLUDED.total
+"""
+
+SOURCE_FILTER = """
+    s.id > :low AND s.id <= :high
+    AND s.customer_id IS NOT NULL
+    AND (CAST(:customer_id AS VARCHAR) IS NULL OR s.customer_id = :customer_id)
+"""
+
+ROLLUP_STATEMENTS = {
+    "journey_events": text(UPSERT_ROLLUPS.format(select=f"""
+        SELECT s.customer_id, m.metric, CAST(coalesce(s.event_date, s.created_at) AS DATE) AS day,
+               m.dimension, CAST(NULL AS DOUBLE PRECISION) AS value
+        FROM journey_events s
+        CROSS JOIN LATERAL (VALUES
+            ('journey_event', coalesce(s.event_type, '')),
+            (CASE WHEN s.event_type = 'enquiry' THEN 'enquiries' END, coalesce(s.event_subtype, '')),
+            (CASE WHEN s.event_type = 'stage_change' THEN 'stage_transitions' END, coalesce(s.event_subtype, '')),
+            (CASE WHEN s.event_type = ANY(CAST(:conversion_types AS VARCHAR[])) THEN 'conversions' END, '')
+        ) AS m(metric, dimension)
+        WHERE {SOURCE_FILTER}
+    """)),
+    "emails": text(UPSERT_ROLLUPS.format(select=f"""
+        SELECT s.customer_id, m.metric, CAST(coalesce(s.date_received, s.created_at) AS DATE) AS day,
+               m.dimension, m.value
+        FROM emails s
+        CROSS JOIN LATERAL (VALUES
+            ('emails', coalesce(s.direction, ''), CAST(NULL AS DOUBLE PRECISION)),
+            (CASE WHEN s.sentiment_score IS NOT NULL THEN 'sentiment' END,
+             coalesce(s.direction, ''), CAST(s.sentiment_score AS DOUBLE PRECISION))
+        ) AS m(metric, dimension, value)
+        WHERE {SOURCE_FILTER}
+    """)),
+}
+
+def _next_high_water(source: str):
+    """Last id of the next batch, stopping before the first row that is still too fresh"""
+    return text(f"""
+        SELECT coalesce(max(id), :low) FROM (
+            SELECT id FROM {source} WHERE id > :low ORDER BY id LIMIT :batch
+        ) AS batch
+        WHERE id < coalesce(
+            (SELECT min(id) FROM {source}
+             WHERE id > :low AND created_at >= LOCALTIMESTAMP - make_interval(secs => :lag)),
+            9223372036854775807
+        )
+    """)
+
+async def _lock_watermark(db: AsyncSession, source: str, skip_locked: bool) -> Optional[int]:
+    """Lock the source's watermark row for this transaction; None if another refresher holds it"""
+    await db.execute(
+        insert(models.RollupWatermark)
+        .values(source=source, last_id=0)
+        .on_conflict_do_nothing(index_elements=["source"])
+    )
+    return await db.scalar(
+        select(models.RollupWatermark.last_id)
+        .where(models.RollupWatermark.source == source)
+        .with_for_update(skip_locked=skip_locked)
+    )
+
+async def refresh_rollups(db: AsyncSession, batch_rows: int = REFRESH_BATCH_ROWS) -> Dict[str, int]:
+    """
+    Fold source rows added since each watermark into the daily rollups, for all tenants.
+    Every batch and its watermark move commit together, so a crash never double counts.
+    Returns how far each watermark (source row id) advanced.
+    """
+    advanced: Dict[str, int] = {}
+    for source, statement in ROLLUP_STATEMENTS.items():
+        advanced[source] = 0
+        while True:
+            low = await _lock_watermark(db, source, skip_locked=True)
+            if low is None:
+                # Another worker is refreshing this source
+                await db.rollback()
+                break
+
+            high = await db.scalar(_next_high_water(source), {
+                "low": low, "batch": batch_rows, "lag": REFRESH_LAG_SECONDS
+            })
+            if high <= low:
+                await db.rollback()
+                break
+
+            await db.execute(statement, {
+                "low": low, "high": high, "customer_id": None,
+                "conversion_types": CONVERSION_EVENT_TYPES,
+            })
+            await db.execute(
+                models.RollupWatermark.__table__.update()
+                .where(models.RollupWatermark.source == source)
+                .values(last_id=high, refreshed_at=func.localtimestamp())
+            )
+            await db.commit()
+            advanced[source] += high - low
+    return advanced
+
+async def rebuild_tenant_rollups(db: AsyncSession, customer_id: str) -> Dict[str, int]:
+    """
+    Recompute one tenant's rollups from the base tables up to the current watermarks,
+    picking up edits and deletes the incremental refresh cannot see.
+    """
+    watermarks = {
+        source: await _lock_watermark(db, source, skip_locked=False)
+        for source in ROLLUP_STATEMENTS
+    }
+    await db.execute(
+        models.DailyRollup.__table__.delete().where(models.DailyRollup.customer_id == customer_id)
+    )
+    for source, statement in ROLLUP_STATEMENTS.items():
+        await db.execute(statement, {
+            "low": 0, "high": watermarks[source], "customer_id": customer_id,
+            "conversion_types": CONVERSION_EVENT_TYPES,
+        })
+    await db.commit()
+    return watermarks
+
+async def run_refresh_loop(interval: int = REFRESH_INTERVAL_SECONDS):
+    """Background refresher started from the app lifespan"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await refresh_rollups(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Analytics rollup refresh failed: {e}")
+        await asyncio.sleep(interval)
+
+# Queries (rollups only - base tables are never read here)
+def rollup_range(customer_id: str, metric: str, start: date, end: date):
+    rollup = models.DailyRollup
+    return (
+        rollup.customer_id == customer_id,
+        rollup.metric == metric,
+        rollup.day >= start,
+        rollup.day <= end,
+    )
+
+async def rollup_totals(db: AsyncSession, customer_id: str, metrics, start: date, end: date) -> Dict[str, Dict[str, tuple]]:
+    """{metric: {dimension: (count, total)}} for the given metrics over a date range, in one query"""
+    rollup = models.DailyRollup
+    rows = await db.execute(
+        select(rollup.metric, rollup.dimension, func.sum(rollup.count), func.sum(rollup.total))
+        .where(
+            rollup.customer_id == customer_id,
+            rollup.metric.in_(metrics),
+            rollup.day >= start,
+            rollup.day <= end,
+        )
+        .group_by(rollup.metric, rollup.dimension)
+    )
+    totals: Dict[str, Dict[str, tuple]] = {metric: {} for metric in metrics}
+    for metric, dimension, count, total in rows:
+        totals[metric][dimension] = (int(count), float(total))
+    return totals
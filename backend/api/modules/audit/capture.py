@@ -0,0 +1,201 @@
+# backend/api/modules/audit/capture.py
+"""
+Audit capture as a session hook. Models registered with audit_model() are diffed
+from their attribute history at each flush (no extra queries: history holds the old
+values of loaded attributes), collected on the session until the transaction ends,
+and handed to the audit writer on commit. Each change is tagged with the transaction
+or SAVEPOINT it was flushed in; rolling one back discards its changes and those of
+the savepoints inside it, so the log only records changes that happened.
+"""
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+
+import orjson
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, SessionTransaction
+
+from ...core.metrics import current_request_stats
+from ..rbac.dependencies import RBAC_USER_HEADER
+from .writer import AuditEntry, audit_writer, valid_ip
+
+# Key on session.info for the open transaction's changes, in flush order
+PENDING_KEY = "audit_pending"
+# Columns every change touches; a diff of only these isn't recorded
+ALWAYS_EXCLUDED = frozenset({"updated_at"})
+USER_AGENT_LIMIT = 500
+
+class AuditedModel(NamedTuple):
+    resource_type: str
+    exclude: FrozenSet[str]
+
+AUDITED: Dict[type, AuditedModel] = {}
+
+def audit_model(model: type, resource_type: str, exclude: Iterable[str] = ()):
+    """Record inserts, updates and deletes of model under resource_type"""
+    AUDITED[model] = AuditedModel(resource_type, ALWAYS_EXCLUDED | frozenset(exclude))
+
+def _json(value: Any) -> Any:
+    """orjson fallback for column values it has no native type for (Decimal, UUID...)"""
+    return str(value)
+
+def _columns(state, exclude: FrozenSet[str]) -> Iterable[str]:
+    return (attr.key for attr in state.mapper.column_attrs if attr.key not in exclude)
+
+def _snapshot(state, exclude: FrozenSet[str], side: str) -> Dict[str, Dict[str, Any]]:
+    """Loaded column values of a new or deleted row (unloaded ones aren't fetched)"""
+    return {
+        key: {side: state.dict[key]}
+        for key in _columns(state, exclude)
+        if key in state.dict and state.dict[key] is not None
+    }
+
+def _diff(state, exclude: FrozenSet[str]) -> Dict[str, Dict[str, Any]]:
+    changes = {}
+    for key in _columns(state, exclude):
+        history = state.attrs[key].history
+        if not history.added and not history.deleted:
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        if old != new:
+            changes[key] = {"old": old, "new": new}
+    return changes
+
+def _request_context() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(user_id, ip_address, user_agent) of the request being served, if any"""
+    stats = current_request_stats()
+    if stats is None:
+        return None, None, None
+    scope = stats.scope
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", ())}
+    user_id = headers.get(RBAC_USER_HEADER.lower())
+    if not user_id:
+        # Endpoints that take the acting user as a parameter (notes)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        user_id = query.get("user_id", [None])[0]
+    client = scope.get("client")
+    user_agent = headers.get("user-agent")
+    return (
+        user_id[:50] if user_id else None,
+        valid_ip(client[0]) if client else None,
+        user_agent[:USER_AGENT_LIMIT] if user_agent else None,
+    )
+
+class Change(NamedTuple):
+    # The innermost transaction or SAVEPOINT open when the change was flushed
+    transaction: SessionTransaction
+    key: Tuple[str, str]
+    customer_id: Optional[str]
+    action: str
+    changes: Dict[str, Dict[str, Any]]
+
+def _record(session: Session, pending: List[Change], audited: AuditedModel, state, action: str,
+            changes: Dict[str, Dict[str, Any]]):
+    # New rows get their identity key only after the flush; their primary key is set by now
+    identity = state.identity or state.mapper.primary_key_from_instance(state.obj())
+    if identity is None or None in identity:
+        return
+    pending.append(Change(
+        session.get_nested_transaction() or session.get_transaction(),
+        (audited.resource_type, ",".join(map(str, identity))),
+        state.dict.get("customer_id"), action, changes,
+    ))
+
+def _fold(pending: List[Change]) -> Dict[Tuple[str, str], list]:
+    """Several flushes in one transaction fold into one [customer_id, action, changes] per row"""
+    folded = {}
+    for change in pending:
+        entry = folded.get(change.key)
+        if entry is None:
+            folded[change.key] = [change.customer_id, change.action, dict(change.changes)]
+            continue
+        _, previous_action, previous_changes = entry
+        if change.action == "delete":
+            entry[1] = "delete" if previous_action != "create" else None
+            entry[2] = change.changes if previous_action != "create" else {}
+            continue
+        for field, value in change.changes.items():
+            if field in previous_changes:
+                merged = dict(previous_changes[field])
+                merged["new"] = value.get("new")
+                previous_changes[field] = merged
+            else:
+                previous_changes[field] = value
+    return folded
+
+def _after_flush(session: Session, flush_context):
+    if not AUDITED:
+        return
+    pending = session.info.setdefault(PENDING_KEY, [])
+    for obj in session.new:
+        audited = AUDITED.get(type(obj))
+        if audited is not None:
+            state = inspect(obj)
+            _record(session, pending, audited, state, "create", _snapshot(state, audited.exclude, "new"))
+    for obj in session.dirty:
+        audited = AUDITED.get(type(obj))
+        if audited is not None:
+            state = inspect(obj)
+            changes = _diff(state, audited.exclude)
+            if changes:
+                _record(session, pending, audited, state, "update", changes)
+    for obj in session.deleted:
+        audited = AUDITED.get(type(obj))
+        if audited is not None:
+            state = inspect(obj)
+            _record(session, pending, audited, state, "delete", _snapshot(state, audited.exclude, "old"))
+    if not pending:
+        session.info.pop(PENDING_KEY, None)
+
+def _after_commit(session: Session):
+    if session.in_nested_transaction():
+        # A released SAVEPOINT: its changes now stand or fall with the enclosing transaction
+        return
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    user_id, ip_address, user_agent = _request_context()
+    committed_at = datetime.utcnow()
+    entries = []
+    for (resource_type, resource_id), (customer_id, action, changes) in _fold(pending).items():
+        if action is None or customer_id is None:
+            continue  # Created and deleted in the same transaction, or not a tenant's row
+        entries.append(AuditEntry(
+            customer_id, user_id, action, resource_type, resource_id,
+            orjson.dumps(changes, default=_json, option=orjson.OPT_NON_STR_KEYS).decode(),
+            ip_address, user_agent, committed_at,
+        ))
+    audit_writer.add(entries)
+
+def _within(transaction: Optional[SessionTransaction], boundary: SessionTransaction) -> bool:
+    while transaction is not None:
+        if transaction is boundary:
+            return True
+        transaction = transaction.parent
+    return False
+
+def _after_soft_rollback(session: Session, previous_transaction: SessionTransaction):
+    pending = session.info.get(PENDING_KEY)
+    if not pending:
+        return
+    # What the database rolled back: the innermost SAVEPOINT or the whole transaction
+    boundary = previous_transaction
+    while boundary.parent is not None and not boundary.nested:
+        boundary = boundary.parent
+    pending[:] = [change for change in pending if not _within(change.transaction, boundary)]
+    if not pending:
+        session.info.pop(PENDING_KEY, None)
+
+def _after_transaction_end(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        # Closed without a commit (session.close()): nothing was written
+        session.info.pop(PENDING_KEY, None)
+
+def install(session_class=Session):
+    """Register the hooks on a session class (Session covers AsyncSession too)"""
+    if not event.contains(session_class, "after_flush", _after_flush):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "after_commit", _after_commit)
+        event.listen(session_class, "after_soft_rollback", _after_soft_rollback)
+        event.listen(session_class, "after_transaction_end", _after_transaction_end)
@@ -0,0 +1,20 @@
+# backend/api/modules/audit/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import INET, JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class AuditLog(Base):
+    """Written in batches by the audit writer (monthly partitions on created_at)"""
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    user_id = Column(String(50))
+    action = Column(String(100))
+    resource_type = Column(String(50))
+    resource_id = Column(String(100))
+    changes = Column(JSONB)
+    ip_address = Column(INET)
+    user_agent = Column(Text)
+    created_at = Column(DateTime, primary_key=True, default=func.now())
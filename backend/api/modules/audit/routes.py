@@ -0,0 +1,71 @@
+# backend/api/modules/audit/routes.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_async_db
+from ...core.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter
+from . import models, schemas
+from .writer import audit_writer
+
+router = APIRouter(prefix="/api/audit", tags=["audit"])
+
+@router.get("/entries", response_model=schemas.AuditPage)
+async def list_entries(
+    customer_id: str = Query(..., description="Customer ID"),
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A tenant's audit trail, newest first, optionally for one record or user"""
+    log = models.AuditLog
+    query = select(log).where(log.customer_id == customer_id)
+    if resource_type:
+        query = query.where(log.resource_type == resource_type)
+    if resource_id:
+        query = query.where(log.resource_id == resource_id)
+    if user_id:
+        query = query.where(log.user_id == user_id)
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, log.created_at, "created_at", "desc")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(log.created_at, log.id, value, row_id, True))
+
+    rows = (await db.execute(
+        query.order_by(log.created_at.desc(), log.id.desc()).limit(limit + 1)
+    )).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("created_at", "desc", rows[-1].created_at, rows[-1].id)
+
+    return schemas.AuditPage(
+        items=[
+            schemas.AuditEntry(
+                id=row.id,
+                user_id=row.user_id,
+                action=row.action,
+                resource_type=row.resource_type,
+                resource_id=row.resource_id,
+                changes=row.changes or {},
+                ip_address=str(row.ip_address) if row.ip_address is not None else None,
+                user_agent=row.user_agent,
+                created_at=row.created_at
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+@router.get("/writer", response_model=schemas.AuditWriterStats)
+async def writer_stats():
+    """Buffer, spill and write counters for this worker process"""
+    return schemas.AuditWriterStats(**audit_writer.stats())
@@ -0,0 +1,33 @@
+# backend/api/modules/audit/schemas.py
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class AuditEntry(BaseModel):
+    id: int
+    user_id: Optional[str] = None
+    action: str
+    resource_type: str
+    resource_id: str
+    # {field: {"old": ..., "new": ...}}; creates carry only "new", deletes only "old"
+    changes: Dict[str, Any]
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    created_at: datetime
+
+class AuditPage(BaseModel):
+    items: List[AuditEntry]
+    next_cursor: Optional[str] = None
+
+class AuditWriterStats(BaseModel):
+    durability: str
+    buffered: int
+    accepted: int
+    written: int
+    dropped: int
+    spilled: int
+    replayed: int
+    spill_files: int
+    failures: int
+    flushes: int
+    last_flush_ms: float
@@ -0,0 +1,329 @@
+# backend/api/modules/audit/writer.py
+import asyncio
+import ipaddress
+import itertools
+import os
+import time
+from contextlib import suppress
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ...core.database import async_engine
+
+# memory: a batch the database won't take is retried, then dropped.
+# spill: it goes to AUDIT_SPILL_DIR and is replayed once the database is back.
+AUDIT_DURABILITY = os.getenv("AUDIT_DURABILITY", "spill").lower()
+AUDIT_SPILL_DIR = os.getenv("AUDIT_SPILL_DIR", "data/audit_spill")
+# Entries held in memory per process; past this they are spilled (or dropped in memory mode)
+AUDIT_BUFFER_CAPACITY = int(os.getenv("AUDIT_BUFFER_CAPACITY", 50_000))
+AUDIT_FLUSH_ROWS = int(os.getenv("AUDIT_FLUSH_ROWS", 1_000))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 1.0))
+# Attempts at a batch before it is spilled or dropped, with backoff between them
+AUDIT_MAX_RETRIES = int(os.getenv("AUDIT_MAX_RETRIES", 2))
+AUDIT_DRAIN_SECONDS = float(os.getenv("AUDIT_DRAIN_SECONDS", 10.0))
+
+SPILL_SUFFIX = ".ndjson"
+
+# Entries for tenants that no longer exist are dropped by the join
+INSERT_ENTRIES = text("""
+    INSERT INTO audit_log
+        (customer_id, user_id, action, resource_type, resource_id, changes, ip_address, user_agent, created_at)
+    SELECT e.customer_id, e.user_id, e.action, e.resource_type, e.resource_id,
+           CAST(e.changes AS JSONB), CAST(e.ip_address AS INET), e.user_agent, e.created_at
+    FROM unnest(
+        CAST(:customer_ids AS VARCHAR[]),
+        CAST(:user_ids AS VARCHAR[]),
+        CAST(:actions AS VARCHAR[]),
+        CAST(:resource_types AS VARCHAR[]),
+        CAST(:resource_ids AS VARCHAR[]),
+        CAST(:changes AS TEXT[]),
+        CAST(:ip_addresses AS TEXT[]),
+        CAST(:user_agents AS TEXT[]),
+        CAST(:created_ats AS TIMESTAMP[])
+    ) AS e(customer_id, user_id, action, resource_type, resource_id, changes, ip_address, user_agent, created_at)
+    JOIN customers c ON c.customer_id = e.customer_id
+""")
+
+class AuditEntry(NamedTuple):
+    customer_id: str
+    user_id: Optional[str]
+    action: str
+    resource_type: str
+    resource_id: str
+    # Already JSON: values are captured at flush time, not when the batch is written
+    changes: str
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    created_at: datetime
+
+def valid_ip(value: Optional[str]) -> Optional[str]:
+    """The address if INET will take it (a bad one would fail the whole batch)"""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+async def _insert(engine: AsyncEngine, entries: List[AuditEntry]) -> int:
+    columns = list(zip(*entries))
+    async with engine.begin() as connection:
+        result = await connection.execute(INSERT_ENTRIES, {
+            "customer_ids": list(columns[0]),
+            "user_ids": list(columns[1]),
+            "actions": list(columns[2]),
+            "resource_types": list(columns[3]),
+            "resource_ids": list(columns[4]),
+            "changes": list(columns[5]),
+            "ip_addresses": list(columns[6]),
+            "user_agents": list(columns[7]),
+            "created_ats": list(columns[8]),
+        })
+        return result.rowcount
+
+def _dump(entries: List[AuditEntry]) -> bytes:
+    return b"".join(orjson.dumps(entry._asdict()) + b"\n" for entry in entries)
+
+def _load(data: bytes) -> List[AuditEntry]:
+    entries = []
+    for line in data.splitlines():
+        if line.strip():
+            values = orjson.loads(line)
+            values["created_at"] = datetime.fromisoformat(values["created_at"])
+            entries.append(AuditEntry(**values))
+    return entries
+
+class AuditWriter:
+    """
+    Write-behind for audit_log. Commits hand their entries to add(), which never
+    blocks or touches the database; a background task writes them in bulk. In spill
+    mode a batch the database can't take (it is down, or the buffer overflowed) is
+    written to a local NDJSON file instead, and spill files are replayed, oldest
+    first, as soon as a write succeeds again. Several processes can share the spill
+    directory: a file is claimed by renaming it before it is replayed.
+    """
+
+    def __init__(
+        self,
+        durability: str = AUDIT_DURABILITY,
+        spill_dir: str = AUDIT_SPILL_DIR,
+        capacity: int = AUDIT_BUFFER_CAPACITY,
+        flush_rows: int = AUDIT_FLUSH_ROWS,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        max_retries: int = AUDIT_MAX_RETRIES,
+        engine: AsyncEngine = async_engine,
+    ):
+        self.engine = engine
+        self.durability = durability
+        self.spill_dir = spill_dir
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self._buffer: List[AuditEntry] = []
+        self._flush_requested = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        self._sequence = itertools.count()
+        # Counters, reported by stats()
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.failures = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def add(self, entries: List[AuditEntry]):
+        """Queue entries of a committed transaction (called from the session's after_commit hook)"""
+        if not entries:
+            return
+        self.accepted += len(entries)
+        if len(self._buffer) + len(entries) > self.capacity:
+            if self.durability == "spill":
+                # The writer is behind (database slow or down): move the backlog to disk now
+                self._spill(self._buffer + entries)
+                self._buffer = []
+                return
+            self.dropped += len(entries)
+            print(f"Audit buffer full, dropping {len(entries)} entries")
+            return
+        self._buffer.extend(entries)
+        if len(self._buffer) >= self.flush_rows:
+            self._flush_requested.set()
+
+    def _spill(self, entries: List[AuditEntry]):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        name = f"audit-{time.time_ns()}-{os.getpid()}-{next(self._sequence)}"
+        partial = os.path.join(self.spill_dir, name + ".tmp")
+        with open(partial, "wb") as f:
+            f.write(_dump(entries))
+            f.flush()
+            os.fsync(f.fileno())
+        # Renamed into place so a replaying process never sees a partial file
+        os.replace(partial, os.path.join(self.spill_dir, name + SPILL_SUFFIX))
+        self.spilled += len(entries)
+
+    def spill_files(self) -> List[str]:
+        try:
+            names = os.listdir(self.spill_dir)
+        except FileNotFoundError:
+            return []
+        # Names start with a timestamp, so this is oldest first
+        return sorted(name for name in names if name.endswith(SPILL_SUFFIX))
+
+    async def _write(self, batch: List[AuditEntry]) -> bool:
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = await _insert(self.engine, batch)
+                self.written += written
+                self.dropped += len(batch) - written
+                self.flushes += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                if attempt == self.max_retries:
+                    print(f"Audit flush failed, {'spilling' if self.durability == 'spill' else 'dropping'} "
+                          f"{len(batch)} entries: {e}")
+                    break
+                await asyncio.sleep(min(0.2 * 2 ** attempt, 5))
+
+        if self.durability == "spill":
+            await asyncio.to_thread(self._spill, batch)
+        else:
+            self.dropped += len(batch)
+        return False
+
+    async def replay(self, limit: Optional[int] = None) -> int:
+        """Write spill files back to the database, oldest first; returns entries replayed"""
+        replayed = 0
+        for name in self.spill_files()[:limit]:
+            path = os.path.join(self.spill_dir, name)
+            claimed = f"{path}.{os.getpid()}.replaying"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue  # Another process has it
+            with open(claimed, "rb") as f:
+                entries = _load(f.read())
+            try:
+                written = await _insert(self.engine, entries) if entries else 0
+            except asyncio.CancelledError:
+                os.rename(claimed, path)
+                raise
+            except Exception as e:
+                os.rename(claimed, path)
+                print(f"Audit spill replay failed, keeping {name}: {e}")
+                break
+            os.remove(claimed)
+            self.replayed += written
+            self.dropped += len(entries) - written
+            replayed += len(entries)
+        return replayed
+
+    async def flush(self):
+        """Write out what is buffered now, then any spill files unless that write just failed"""
+        batch, self._buffer = self._buffer, []
+        written = True
+        if batch:
+            try:
+                written = await self._write(batch)
+            except asyncio.CancelledError:
+                # stop() gave up waiting: keep the batch on disk rather than lose it
+                if self.durability == "spill":
+                    self._spill(batch)
+                else:
+                    self.dropped += len(batch)
+                raise
+        # Replaying doubles as the probe for a database that was down: it stops at the first failure
+        if self.durability == "spill" and written:
+            await self.replay()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            # Not cancelled mid-batch: stop() waits for the drain instead
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Audit writer error: {e}")
+            if self._closing:
+                return
+
+    def _recover_claims(self):
+        """Put back spill files claimed by a process that died while replaying them"""
+        try:
+            names = os.listdir(self.spill_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(".replaying"):
+                continue
+            original, pid, _ = name.rsplit(".", 2)
+            try:
+                os.kill(int(pid), 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except (ValueError, PermissionError):
+                continue
+            with suppress(FileNotFoundError):
+                os.rename(os.path.join(self.spill_dir, name), os.path.join(self.spill_dir, original))
+
+    def start(self):
+        if self._writer is None or self._writer.done():
+            self._recover_claims()
+            self._closing = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = AUDIT_DRAIN_SECONDS):
+        """Write out the buffer, then stop; what can't be written by the deadline is spilled"""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._flush_requested.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._writer), timeout)
+        except asyncio.TimeoutError:
+            self._writer.cancel()
+            print("Audit writer did not drain in time")
+        except Exception:
+            pass
+        self._writer = None
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            if self.durability == "spill":
+                self._spill(batch)
+            else:
+                self.dropped += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "durability": self.durability,
+            "buffered": len(self._buffer),
+            "accepted": self.accepted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "spill_files": len(self.spill_files()),
+            "failures": self.failures,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+# Process-wide writer, started and drained by the app lifespan
+audit_writer = AuditWriter()
@@ -0,0 +1,185 @@
+# backend/api/modules/chatbot/intents.py
+"""
+Intent classification for the chatbot, served from an in-process model.
+
+The model is nearest-neighbour over labelled example utterances, vectorised with the
+same feature hashing as the Smart Reply retrieval index. Examples are built in, or
+read from CHATBOT_INTENT_MODEL (JSON: {"intent": ["example", ...]}) so a school can
+extend them. The example matrix is built once when the app starts; a prediction is
+one hashed vector and a sparse dot product, with no network or database involved.
+"""
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from ..smart_reply.retrieval import vectorize
+
+# Optional JSON file of examples replacing the built-in ones
+CHATBOT_INTENT_MODEL = os.getenv("CHATBOT_INTENT_MODEL")
+# Below this similarity to the nearest example the intent is "unknown"
+CHATBOT_INTENT_MIN_CONFIDENCE = float(os.getenv("CHATBOT_INTENT_MIN_CONFIDENCE", 0.25))
+
+UNKNOWN_INTENT = "unknown"
+
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "greeting": [
+        "hello", "hi there", "good morning", "good afternoon", "hey", "hello can you help me",
+    ],
+    "thanks": [
+        "thank you", "thanks so much", "that's helpful thanks", "great thank you", "cheers",
+    ],
+    "goodbye": [
+        "bye", "goodbye", "that's all for now", "see you", "no more questions",
+    ],
+    "fees": [
+        "how much are the fees", "what are the school fees", "fees per term", "cost of tuition",
+        "how much does it cost", "are there extra charges", "fee schedule", "termly fees for year 7",
+        "is there a deposit", "sibling discount",
+    ],
+    "financial_aid": [
+        "do you offer bursaries", "are scholarships available", "financial help with fees",
+        "means tested bursary", "how do I apply for a scholarship", "music scholarship", "fee assistance",
+        "bursary", "scholarships",
+    ],
+    "admissions": [
+        "how do I apply", "what is the admissions process", "application deadline", "entrance exam",
+        "is there a waiting list", "assessment day", "registration form", "when should we register",
+        "are there places available", "how do we enrol our child", "entry requirements",
+        "can my child join in september", "starting school next year", "join reception",
+    ],
+    "visit": [
+        "can we visit the school", "when is the next open day", "book a tour", "open morning",
+        "can I come and look around", "arrange a visit", "private tour", "taster day",
+    ],
+    "term_dates": [
+        "what are the term dates", "when does term start", "half term dates", "when are the holidays",
+        "school year calendar", "when does the autumn term begin", "inset days",
+    ],
+    "transport": [
+        "is there a school bus", "bus routes", "transport to school", "parking at school",
+        "how do children get to school", "minibus service", "nearest train station",
+    ],
+    "uniform": [
+        "what is the uniform", "where do we buy uniform", "uniform shop", "uniform list", "sports kit",
+        "second hand uniform",
+    ],
+    "catering": [
+        "what are school lunches like", "school meals", "lunch menu", "food allergies",
+        "vegetarian options", "is lunch included",
+    ],
+    "childcare": [
+        "breakfast club", "after school club", "wraparound care", "what time does school finish",
+        "late stay", "holiday club", "early drop off", "childcare",
+    ],
+    "learning_support": [
+        "learning support", "special educational needs", "support for dyslexia", "SEN provision",
+        "my child has ADHD", "does my child get extra help", "EAL support", "autism support",
+    ],
+    "curriculum": [
+        "what subjects do you teach", "GCSE options", "A level subjects", "curriculum", "exam results",
+        "class sizes", "sports and clubs", "music lessons", "languages taught",
+    ],
+    "contact_human": [
+        "can I speak to someone", "talk to a person", "call me back", "I want to speak to admissions",
+        "phone number for the office", "contact the registrar", "speak to a human", "email the admissions team",
+        "talk to someone", "I'd like someone to call me",
+    ],
+    "complaint": [
+        "I want to make a complaint", "this is unacceptable", "nobody has replied to me", "very disappointed",
+        "I'm unhappy with the response", "terrible service", "still waiting for an answer",
+    ],
+}
+
+# Entities pulled out of a message, stored with it in chatbot_messages.entities
+ENTITY_PATTERNS = {
+    "year_group": re.compile(
+        r"\b(nursery|reception|pre-?prep|year\s?(?:[1-9]|1[0-3])|lower sixth|upper sixth|sixth form)\b", re.I
+    ),
+    "age": re.compile(r"\b(?:aged?\s+(\d{1,2})|(\d{1,2})\s*(?:years?|yrs?)\s+old)\b", re.I),
+    "email": re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+    "phone": re.compile(r"(?:\+44\s?|\b0)\d(?:[\s-]?\d){8,9}\b"),
+}
+
+class IntentPrediction(NamedTuple):
+    intent: str
+    confidence: float
+    # Example the prediction came from, for debugging a misclassification
+    example: Optional[str]
+
+def extract_entities(message: str) -> Dict[str, List[str]]:
+    found: Dict[str, List[str]] = {}
+    for name, pattern in ENTITY_PATTERNS.items():
+        values = []
+        for match in pattern.finditer(message):
+            groups = [group for group in match.groups() if group] if pattern.groups else []
+            value = " ".join((groups[0] if groups else match.group(0)).split())
+            value = value.lower() if name in ("year_group", "email") else value
+            if value not in values:
+                values.append(value)
+        if values:
+            found[name] = values
+    return found
+
+class IntentModel:
+    """
+    Example utterances as one sparse matrix: sorted feature hashes (rows) by examples
+    (columns). A message's nearest example is its intent; the cosine similarity is
+    the confidence.
+    """
+
+    def __init__(self, min_confidence: float = CHATBOT_INTENT_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._keys = np.zeros(0, np.uint32)
+        self._matrix = np.zeros((0, 0), np.float32)
+        self._examples: List[Tuple[str, str]] = []
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._examples)
+
+    @property
+    def intents(self) -> List[str]:
+        return sorted({intent for intent, _ in self._examples})
+
+    def fit(self, examples: Dict[str, List[str]]):
+        pairs = [(intent, example) for intent, values in examples.items() for example in values]
+        vectors = [vectorize(example) for _, example in pairs]
+        keys = np.unique(np.concatenate([k for k, _ in vectors])) if vectors else np.zeros(0, np.uint32)
+        matrix = np.zeros((len(keys), len(pairs)), np.float32)
+        for column, (example_keys, weights) in enumerate(vectors):
+            matrix[np.searchsorted(keys, example_keys), column] = weights
+        # Swap in whole, so predictions running meanwhile see the old or the new model
+        self._keys, self._matrix, self._examples = keys, matrix, pairs
+
+    def load(self, path: Optional[str] = CHATBOT_INTENT_MODEL):
+        """Fit on the examples file if one is configured, else on the built-in examples"""
+        if path:
+            with open(path, "rb") as f:
+                self.fit(orjson.loads(f.read()))
+        else:
+            self.fit(INTENT_EXAMPLES)
+
+    def predict(self, message: str) -> IntentPrediction:
+        if not self.loaded:
+            self.load()
+        keys, weights = vectorize(message)
+        if not len(keys) or not len(self._keys):
+            return IntentPrediction(UNKNOWN_INTENT, 0.0, None)
+        rows = np.searchsorted(self._keys, keys)
+        rows[rows == len(self._keys)] = 0
+        known = self._keys[rows] == keys
+        if not known.any():
+            return IntentPrediction(UNKNOWN_INTENT, 0.0, None)
+        scores = weights[known] @ self._matrix[rows[known]]
+        best = int(np.argmax(scores))
+        confidence = round(float(scores[best]), 2)
+        intent, example = self._examples[best]
+        if confidence < self.min_confidence:
+            return IntentPrediction(UNKNOWN_INTENT, confidence, example)
+        return IntentPrediction(intent, confidence, example)
+
+# Process-wide model, loaded by the app lifespan
+intent_model = IntentModel()
@@ -0,0 +1,34 @@
+# backend/api/modules/chatbot/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class ChatbotConversation(Base):
+    __tablename__ = "chatbot_conversations"
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    conversation_id = Column(String(100), unique=True, nullable=False)
+    parent_id = Column(Integer, ForeignKey("parents.id"))
+    session_id = Column(String(255))
+    started_at = Column(DateTime)
+    ended_at = Column(DateTime)
+    escalated = Column(Boolean, default=False)
+    escalation_reason = Column(String(255))
+    sentiment_score = Column(Float)
+    meta_data = Column("metadata", JSONB, default=dict)
+    created_at = Column(DateTime, default=func.now())
+
+class ChatbotMessage(Base):
+    """Written behind the conversation by the chatbot writer, in batches"""
+    __tablename__ = "chatbot_messages"
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("chatbot_conversations.id"))
+    message_type = Column(String(20))
+    message = Column(Text)
+    intent = Column(String(100))
+    entities = Column(JSONB)
+    confidence = Column(Float)
+    created_at = Column(DateTime, default=func.now())
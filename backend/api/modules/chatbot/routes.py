@@ -0,0 +1,170 @@
+# backend/api/modules/chatbot/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import AsyncSessionLocal, get_async_db
+from ..rbac.dependencies import authorize
+from . import schemas
+from .intents import intent_model
+from .service import end_conversation, load_conversation, reply_events, respond, sse_event, start_conversation
+from .sessions import session_cache
+from .writer import ChatbotBusy, chatbot_writer
+
+router = APIRouter(prefix="/api/chatbot", tags=["chatbot"])
+
+# Close code for a conversation that doesn't exist (4000-4999 are free for applications)
+CLOSE_NOT_FOUND = 4404
+
+def conversation_out(conversation) -> schemas.ConversationOut:
+    return schemas.ConversationOut(
+        conversation_id=conversation.conversation_id,
+        parent_id=conversation.parent_id,
+        started_at=conversation.started_at,
+        ended_at=conversation.ended_at,
+        escalated=conversation.escalated,
+        escalation_reason=conversation.escalation_reason,
+        sentiment_score=conversation.sentiment_score,
+        messages=[schemas.ChatMessageOut(**message._asdict()) for message in conversation.history]
+    )
+
+async def get_conversation(db: AsyncSession, customer_id: str, conversation_id: str):
+    conversation = await load_conversation(db, customer_id, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return conversation
+
+async def turn(db: AsyncSession, customer_id: str, conversation_id: str, message: str):
+    conversation = await get_conversation(db, customer_id, conversation_id)
+    try:
+        return await respond(db, conversation, message)
+    except ChatbotBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+@router.post("/conversations", response_model=schemas.ConversationOut)
+async def create_conversation(
+    start: schemas.ConversationStart,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a conversation; the reply carries the conversation_id and the greeting"""
+    try:
+        conversation = await start_conversation(db, customer_id, start.session_id, start.parent_id, start.metadata)
+    except ChatbotBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return conversation_out(conversation)
+
+@router.get("/conversations/{conversation_id}", response_model=schemas.ConversationOut)
+async def get_conversation_history(
+    conversation_id: str,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The conversation and its recent messages, including ones not yet written"""
+    return conversation_out(await get_conversation(db, customer_id, conversation_id))
+
+@router.post("/conversations/{conversation_id}/messages", response_model=schemas.ChatReply)
+async def send_message(
+    conversation_id: str,
+    chat: schemas.ChatInput,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One turn, answered as a whole"""
+    reply = await turn(db, customer_id, conversation_id, chat.message)
+    return schemas.ChatReply(
+        intent=reply.intent,
+        confidence=reply.confidence,
+        entities=reply.entities,
+        reply=reply.text,
+        sources=reply.sources,
+        escalated=reply.escalated
+    )
+
+@router.post("/conversations/{conversation_id}/stream")
+async def stream_message(
+    conversation_id: str,
+    chat: schemas.ChatInput,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    One turn as server-sent events: `meta` (intent, entities, escalation), the reply
+    in `delta` chunks, then `done` with the sources.
+    """
+    reply = await turn(db, customer_id, conversation_id, chat.message)
+
+    async def events():
+        for event, data in reply_events(reply):
+            yield sse_event(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # No caching or proxy buffering of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/conversations/{conversation_id}/ws")
+async def conversation_socket(
+    websocket: WebSocket,
+    conversation_id: str,
+    customer_id: str = Query(..., description="Customer ID")
+):
+    """
+    The conversation over a WebSocket: send {"message": "..."}, receive the same
+    meta / delta / done events as the SSE stream, as {"event": ..., ...data} frames.
+    A database session is opened per turn, not held for the life of the socket.
+    """
+    async with AsyncSessionLocal() as db:
+        conversation = await load_conversation(db, customer_id, conversation_id)
+    if conversation is None:
+        await websocket.close(code=CLOSE_NOT_FOUND)
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                chat = schemas.ChatInput(**await websocket.receive_json())
+            except (ValidationError, ValueError, TypeError) as e:
+                await websocket.send_json({"event": "error", "detail": str(e)})
+                continue
+
+            async with AsyncSessionLocal() as db:
+                # Reloaded if it was evicted since the last turn
+                conversation = await load_conversation(db, customer_id, conversation_id)
+                if conversation is None:
+                    await websocket.close(code=CLOSE_NOT_FOUND)
+                    return
+                try:
+                    reply = await respond(db, conversation, chat.message)
+                except ChatbotBusy as e:
+                    await websocket.send_json({"event": "error", "detail": str(e)})
+                    continue
+
+            for event, data in reply_events(reply):
+                await websocket.send_json({"event": event, **data})
+    except WebSocketDisconnect:
+        pass
+
+@router.post("/conversations/{conversation_id}/end", response_model=schemas.ConversationOut)
+async def close_conversation(
+    conversation_id: str,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark the conversation ended and drop it from the session cache"""
+    conversation = await get_conversation(db, customer_id, conversation_id)
+    end_conversation(conversation)
+    return conversation_out(conversation)
+
+@router.get("/stats", response_model=schemas.ChatbotStats, dependencies=[Depends(authorize("chatbot"))])
+async def chatbot_stats():
+    """Session cache and write-behind counters for this process"""
+    return schemas.ChatbotStats(
+        sessions=session_cache.stats(),
+        writer=chatbot_writer.stats(),
+        intents=intent_model.intents
+    )
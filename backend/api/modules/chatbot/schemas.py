@@ -0,0 +1,47 @@
+# backend/api/modules/chatbot/schemas.py
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+# Longest message a visitor can send in one turn
+MAX_MESSAGE_CHARS = 2000
+
+class ConversationStart(BaseModel):
+    session_id: Optional[str] = Field(None, max_length=255)
+    parent_id: Optional[int] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+class ChatInput(BaseModel):
+    message: str = Field(..., min_length=1, max_length=MAX_MESSAGE_CHARS)
+
+class ChatMessageOut(BaseModel):
+    message_type: str
+    message: str
+    intent: Optional[str] = None
+    entities: Optional[Dict[str, Any]] = None
+    confidence: Optional[float] = None
+    created_at: datetime
+
+class ConversationOut(BaseModel):
+    conversation_id: str
+    parent_id: Optional[int]
+    started_at: datetime
+    ended_at: Optional[datetime]
+    escalated: bool
+    escalation_reason: Optional[str]
+    sentiment_score: Optional[float]
+    # The most recent messages (as many as the session cache keeps), oldest first
+    messages: List[ChatMessageOut]
+
+class ChatReply(BaseModel):
+    intent: str
+    confidence: float
+    entities: Dict[str, List[str]]
+    reply: str
+    sources: List[Dict[str, Any]]
+    escalated: bool
+
+class ChatbotStats(BaseModel):
+    sessions: Dict[str, int]
+    writer: Dict[str, float]
+    intents: List[str]
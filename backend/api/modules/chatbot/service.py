@@ -0,0 +1,239 @@
+# backend/api/modules/chatbot/service.py
+"""
+Chatbot turns: intent from the local model, an answer from the tenant's knowledge
+base through the Smart Reply retrieval index, and escalation to the admissions team
+on request, complaint or negative sentiment. Hot conversations live in the session
+cache and their messages are written behind by the chatbot writer, so a turn on a
+cached conversation makes no database round trip of its own.
+"""
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..inbox import sentiment
+from ..scoring.engine import NEGATIVE_SENTIMENT
+from ..smart_reply.retrieval import retrieval_index, tokenize
+from .intents import UNKNOWN_INTENT, IntentPrediction, extract_entities, intent_model
+from .models import ChatbotConversation, ChatbotMessage
+from .sessions import CHATBOT_HISTORY_MESSAGES, Conversation, session_cache
+from .writer import ChatMessage, chatbot_writer
+
+# Passages scoring below this are not used as an answer
+CHATBOT_MIN_PASSAGE_SCORE = float(os.getenv("CHATBOT_MIN_PASSAGE_SCORE", 0.1))
+# Sentences of the best passage in a reply
+CHATBOT_REPLY_SENTENCES = int(os.getenv("CHATBOT_REPLY_SENTENCES", 3))
+# Words per streamed chunk
+CHATBOT_STREAM_WORDS = int(os.getenv("CHATBOT_STREAM_WORDS", 4))
+
+GREETING = "Hello! I can help with admissions, fees, visits and school life. What would you like to know?"
+NO_ANSWER = ("I'm not sure about that one. Our admissions team will know - "
+             "would you like them to get in touch?")
+LINKS_ONLY = "You'll find the details here:"
+CANNED_REPLIES = {
+    "greeting": "Hello! What would you like to know about the school?",
+    "thanks": "You're welcome. Is there anything else I can help with?",
+    "goodbye": "Thank you for chatting with us. Goodbye!",
+}
+ESCALATION_REPLY = ("I've passed this conversation to our admissions team, "
+                    "who will get back to you as soon as possible.")
+ESCALATION_REASONS = {
+    "contact_human": "Asked to speak to someone",
+    "complaint": "Complaint",
+}
+NEGATIVE_SENTIMENT_REASON = "Negative sentiment"
+
+# A message this short is read as a follow-up to the previous question, and classified
+# with it unless its own intent is at least this clear
+FOLLOW_UP_WORDS = 4
+FOLLOW_UP_CONFIDENCE = 0.5
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+class Reply(NamedTuple):
+    intent: str
+    confidence: float
+    entities: Dict[str, List[str]]
+    text: str
+    sources: List[Dict[str, Any]]
+    escalated: bool
+
+def new_conversation_id() -> str:
+    # The id is all a widget needs to continue a conversation, so it isn't guessable
+    return f"CHAT-{uuid.uuid4().hex.upper()}"
+
+async def start_conversation(
+    db: AsyncSession,
+    customer_id: str,
+    session_id: Optional[str] = None,
+    parent_id: Optional[int] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Conversation:
+    """Create the conversation row (the one synchronous write) and cache it with its greeting"""
+    started_at = datetime.utcnow()
+    conversation_id = new_conversation_id()
+    row_id = (await db.execute(
+        insert(ChatbotConversation).values(
+            customer_id=customer_id,
+            conversation_id=conversation_id,
+            parent_id=parent_id,
+            session_id=session_id,
+            started_at=started_at,
+            meta_data=metadata or {},
+        ).returning(ChatbotConversation.id)
+    )).scalar_one()
+    await db.commit()
+
+    conversation = session_cache.put(Conversation(row_id, conversation_id, customer_id, parent_id, started_at))
+    greeting = ChatMessage(row_id, "bot", GREETING, None, None, None, started_at)
+    conversation.history.append(greeting)
+    await chatbot_writer.add([greeting])
+    return conversation
+
+async def load_conversation(db: AsyncSession, customer_id: str, conversation_id: str) -> Optional[Conversation]:
+    """The tenant's conversation from the cache, else from the database plus its unwritten messages"""
+    conversation = session_cache.get(conversation_id)
+    if conversation is not None:
+        return conversation if conversation.customer_id == customer_id else None
+
+    row = (await db.execute(
+        select(ChatbotConversation).where(
+            ChatbotConversation.conversation_id == conversation_id,
+            ChatbotConversation.customer_id == customer_id
+        )
+    )).scalar_one_or_none()
+    if row is None:
+        return None
+
+    # Pending first: a flush committing between the two reads then shows up in both, not neither
+    pending = chatbot_writer.pending(row.id)
+    stored = (await db.execute(
+        select(
+            ChatbotMessage.conversation_id, ChatbotMessage.message_type, ChatbotMessage.message,
+            ChatbotMessage.intent, ChatbotMessage.entities, ChatbotMessage.confidence, ChatbotMessage.created_at
+        )
+        .where(ChatbotMessage.conversation_id == row.id)
+        .order_by(ChatbotMessage.created_at.desc(), ChatbotMessage.id.desc())
+        .limit(CHATBOT_HISTORY_MESSAGES)
+    )).all()
+    seen = {(message.created_at, message.message_type, message.message) for message in pending}
+    history = [
+        ChatMessage(*message) for message in reversed(stored)
+        if (message.created_at, message.message_type, message.message) not in seen
+    ] + pending
+
+    return session_cache.put(Conversation(
+        row.id, row.conversation_id, row.customer_id, row.parent_id, row.started_at or row.created_at,
+        history=history,
+        escalated=bool(row.escalated),
+        escalation_reason=row.escalation_reason,
+        sentiment_score=row.sentiment_score,
+        ended_at=row.ended_at,
+    ))
+
+def _answer(passage_text: str, sentences: int = CHATBOT_REPLY_SENTENCES) -> str:
+    return " ".join(SENTENCE_END.split(passage_text.strip())[:sentences])
+
+def _classify(conversation: Conversation, message: str) -> Tuple[IntentPrediction, str]:
+    """
+    (intent, text to answer). A short message with no clear intent of its own is read
+    with the question before it: "and for year 9?" means nothing alone.
+    """
+    prediction = intent_model.predict(message)
+    previous = conversation.last_user_message()
+    if (previous is not None and prediction.confidence < FOLLOW_UP_CONFIDENCE
+            and len(tokenize(message)) <= FOLLOW_UP_WORDS):
+        follow_up = f"{previous.message} {message}"
+        combined = intent_model.predict(follow_up)
+        if combined.confidence > prediction.confidence:
+            return combined, follow_up
+    return prediction, message
+
+async def _knowledge_reply(
+    db: AsyncSession, conversation: Conversation, query: str, intent: str
+) -> Tuple[str, List[Dict[str, Any]]]:
+    passages = []
+    if intent != UNKNOWN_INTENT:
+        # Knowledge base entries filed under the intent's name answer it first
+        retrieval = await retrieval_index.retrieve(db, conversation.customer_id, query, k=1, category=intent, url_limit=2)
+        passages = [passage for passage in retrieval.passages if passage.score >= CHATBOT_MIN_PASSAGE_SCORE]
+    if not passages:
+        retrieval = await retrieval_index.retrieve(db, conversation.customer_id, query, k=1, url_limit=2)
+        passages = [passage for passage in retrieval.passages if passage.score >= CHATBOT_MIN_PASSAGE_SCORE]
+
+    links = [mapping.url for mapping in retrieval.url_mappings]
+    if not passages:
+        # No passage, but the wording triggers a mapped page
+        return (f"{LINKS_ONLY} {' '.join(links)}" if links else NO_ANSWER), []
+
+    best = passages[0]
+    text = _answer(best.text)
+    sources = [{"kb_id": best.kb_id, "title": best.title, "url": best.source_url, "score": round(best.score, 3)}]
+    if best.source_url:
+        links = [best.source_url] + [link for link in links if link != best.source_url]
+    if links:
+        text += "\n\nMore information: " + " ".join(links)
+    return text, sources
+
+async def respond(db: AsyncSession, conversation: Conversation, message: str) -> Reply:
+    """One turn: classify, answer or escalate, then hand both messages to the writer"""
+    async with conversation.lock:
+        received_at = datetime.utcnow()
+        prediction, query = _classify(conversation, message)
+        entities = extract_entities(message)
+        value = sentiment.score(message)
+        conversation.record_sentiment(value)
+
+        sources: List[Dict[str, Any]] = []
+        if prediction.intent in ESCALATION_REASONS:
+            conversation.escalate(ESCALATION_REASONS[prediction.intent])
+            text = ESCALATION_REPLY
+        elif value < NEGATIVE_SENTIMENT:
+            conversation.escalate(NEGATIVE_SENTIMENT_REASON)
+            text = ESCALATION_REPLY
+        elif prediction.intent in CANNED_REPLIES:
+            text = CANNED_REPLIES[prediction.intent]
+        else:
+            text, sources = await _knowledge_reply(db, conversation, query, prediction.intent)
+
+        asked = ChatMessage(
+            conversation.id, "user", message, prediction.intent, entities or None, prediction.confidence, received_at
+        )
+        answered = ChatMessage(conversation.id, "bot", text, prediction.intent, None, None, datetime.utcnow())
+        conversation.history.extend((asked, answered))
+        # A turn after the conversation ended (or was swept as idle) reopens it
+        conversation.ended_at = None
+        await chatbot_writer.add([asked, answered], conversation.state())
+
+        return Reply(prediction.intent, prediction.confidence, entities, text, sources, conversation.escalated)
+
+def end_conversation(conversation: Conversation):
+    conversation.ended_at = datetime.utcnow()
+    chatbot_writer.update(conversation.state())
+    session_cache.discard(conversation.conversation_id)
+
+def reply_chunks(text: str, words: int = CHATBOT_STREAM_WORDS) -> Iterator[str]:
+    """The reply in pieces of a few words, whitespace kept, for streaming"""
+    tokens = re.findall(r"\S+\s*", text)
+    for start in range(0, len(tokens), words):
+        yield "".join(tokens[start:start + words])
+
+def reply_events(reply: Reply) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(event, data) of a streamed reply: meta first, the text in deltas, then done"""
+    yield "meta", {
+        "intent": reply.intent,
+        "confidence": reply.confidence,
+        "entities": reply.entities,
+        "escalated": reply.escalated,
+    }
+    for chunk in reply_chunks(reply.text):
+        yield "delta", {"text": chunk}
+    yield "done", {"sources": reply.sources}
+
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
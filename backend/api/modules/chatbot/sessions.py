@@ -0,0 +1,186 @@
+# backend/api/modules/chatbot/sessions.py
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import suppress
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from .writer import ChatMessage, ConversationUpdate, chatbot_writer
+
+# Conversations kept in memory per process; the least recently active is dropped first
+CHATBOT_MAX_SESSIONS = int(os.getenv("CHATBOT_MAX_SESSIONS", 10_000))
+# A conversation idle this long is dropped from memory and marked ended
+CHATBOT_SESSION_IDLE_SECONDS = float(os.getenv("CHATBOT_SESSION_IDLE_SECONDS", 900))
+CHATBOT_SWEEP_SECONDS = float(os.getenv("CHATBOT_SWEEP_SECONDS", 30))
+# Messages of history kept per conversation (context for follow-up questions)
+CHATBOT_HISTORY_MESSAGES = int(os.getenv("CHATBOT_HISTORY_MESSAGES", 20))
+# Weight of the latest message in the conversation's running sentiment
+SENTIMENT_SMOOTHING = 0.5
+
+class Conversation:
+    """Hot state of one conversation; turns on it are serialised by its lock"""
+
+    __slots__ = (
+        "id", "conversation_id", "customer_id", "parent_id", "started_at", "history",
+        "escalated", "escalation_reason", "sentiment_score", "ended_at", "last_active", "lock",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        conversation_id: str,
+        customer_id: str,
+        parent_id: Optional[int],
+        started_at: datetime,
+        history: Iterable[ChatMessage] = (),
+        escalated: bool = False,
+        escalation_reason: Optional[str] = None,
+        sentiment_score: Optional[float] = None,
+        ended_at: Optional[datetime] = None,
+    ):
+        self.id = id
+        self.conversation_id = conversation_id
+        self.customer_id = customer_id
+        self.parent_id = parent_id
+        self.started_at = started_at
+        self.history = deque(history, maxlen=CHATBOT_HISTORY_MESSAGES)
+        self.escalated = escalated
+        self.escalation_reason = escalation_reason
+        self.sentiment_score = sentiment_score
+        self.ended_at = ended_at
+        self.last_active = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @property
+    def last_message_at(self) -> datetime:
+        return self.history[-1].created_at if self.history else self.started_at
+
+    def record_sentiment(self, value: float):
+        if self.sentiment_score is None:
+            self.sentiment_score = value
+        else:
+            self.sentiment_score = round(
+                SENTIMENT_SMOOTHING * value + (1 - SENTIMENT_SMOOTHING) * self.sentiment_score, 2
+            )
+
+    def escalate(self, reason: str):
+        if not self.escalated:
+            self.escalated = True
+            self.escalation_reason = reason
+
+    def last_user_message(self) -> Optional[ChatMessage]:
+        for message in reversed(self.history):
+            if message.message_type == "user":
+                return message
+        return None
+
+    def state(self) -> ConversationUpdate:
+        return ConversationUpdate(
+            self.id, self.parent_id, self.escalated, self.escalation_reason, self.sentiment_score, self.ended_at
+        )
+
+class SessionCache:
+    """
+    LRU of hot conversations by conversation_id. A turn on a cached conversation needs
+    no database read; a miss is loaded by the caller and put() here. Conversations idle
+    past idle_seconds are swept out and marked ended (a later turn reopens them).
+    """
+
+    def __init__(
+        self,
+        capacity: int = CHATBOT_MAX_SESSIONS,
+        idle_seconds: float = CHATBOT_SESSION_IDLE_SECONDS,
+        sweep_seconds: float = CHATBOT_SWEEP_SECONDS,
+    ):
+        self.capacity = capacity
+        self.idle_seconds = idle_seconds
+        self.sweep_seconds = sweep_seconds
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        conversation = self._sessions.get(conversation_id)
+        if conversation is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._sessions.move_to_end(conversation_id)
+        conversation.last_active = time.monotonic()
+        return conversation
+
+    def put(self, conversation: Conversation) -> Conversation:
+        """Cache a loaded conversation; if a concurrent load got there first, that one wins"""
+        existing = self._sessions.get(conversation.conversation_id)
+        if existing is not None:
+            return existing
+        self._sessions[conversation.conversation_id] = conversation
+        while len(self._sessions) > self.capacity:
+            self._sessions.popitem(last=False)
+            self.evicted_lru += 1
+        return conversation
+
+    def discard(self, conversation_id: str):
+        self._sessions.pop(conversation_id, None)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[Conversation]:
+        """Drop conversations idle past the limit; the LRU order means the oldest are first"""
+        now = time.monotonic() if now is None else now
+        evicted = []
+        while self._sessions:
+            conversation = next(iter(self._sessions.values()))
+            if now - conversation.last_active < self.idle_seconds or conversation.lock.locked():
+                break
+            self._sessions.popitem(last=False)
+            evicted.append(conversation)
+        self.evicted_idle += len(evicted)
+        return evicted
+
+    def sweep(self) -> int:
+        """Evict idle conversations and queue them as ended at their last message"""
+        evicted = self.evict_idle()
+        for conversation in evicted:
+            if conversation.ended_at is None:
+                conversation.ended_at = conversation.last_message_at
+                chatbot_writer.update(conversation.state())
+        return len(evicted)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Chatbot session sweep failed: {e}")
+
+    def start(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+        }
+
+# Process-wide cache; with several workers a conversation is hot in whichever process last served it
+session_cache = SessionCache()
@@ -0,0 +1,257 @@
+# backend/api/modules/chatbot/writer.py
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import text
+
+from ...core.database import async_engine
+
+# Messages held in memory before a turn is made to wait (per process)
+CHATBOT_WRITE_CAPACITY = int(os.getenv("CHATBOT_WRITE_CAPACITY", 50_000))
+# A flush starts once this many messages are buffered, or after the interval
+CHATBOT_FLUSH_ROWS = int(os.getenv("CHATBOT_FLUSH_ROWS", 500))
+CHATBOT_FLUSH_SECONDS = float(os.getenv("CHATBOT_FLUSH_SECONDS", 0.5))
+# How long a turn waits for buffer space before it is turned away with 503
+CHATBOT_ENQUEUE_TIMEOUT = float(os.getenv("CHATBOT_ENQUEUE_TIMEOUT", 2.0))
+CHATBOT_WRITE_MAX_RETRIES = int(os.getenv("CHATBOT_WRITE_MAX_RETRIES", 5))
+# Longest the lifespan shutdown waits for the buffer to drain
+CHATBOT_DRAIN_SECONDS = float(os.getenv("CHATBOT_DRAIN_SECONDS", 10.0))
+
+# Messages of conversations deleted meanwhile are dropped by the join; ordinality keeps
+# ids in the order the messages were said
+INSERT_MESSAGES = text("""
+    INSERT INTO chatbot_messages (conversation_id, message_type, message, intent, entities, confidence, created_at)
+    SELECT m.conversation_id, m.message_type, m.message, m.intent, CAST(m.entities AS JSONB),
+           m.confidence, m.created_at
+    FROM unnest(
+        CAST(:conversation_ids AS INTEGER[]),
+        CAST(:message_types AS VARCHAR[]),
+        CAST(:messages AS TEXT[]),
+        CAST(:intents AS VARCHAR[]),
+        CAST(:entities AS TEXT[]),
+        CAST(:confidences AS NUMERIC[]),
+        CAST(:created_ats AS TIMESTAMP[])
+    ) WITH ORDINALITY AS m(conversation_id, message_type, message, intent, entities, confidence, created_at, position)
+    JOIN chatbot_conversations c ON c.id = m.conversation_id
+    ORDER BY m.position
+""")
+
+UPDATE_CONVERSATIONS = text("""
+    UPDATE chatbot_conversations c
+    SET parent_id = coalesce(u.parent_id, c.parent_id),
+        escalated = u.escalated,
+        escalation_reason = u.escalation_reason,
+        sentiment_score = u.sentiment_score,
+        ended_at = u.ended_at
+    FROM unnest(
+        CAST(:ids AS INTEGER[]),
+        CAST(:parent_ids AS INTEGER[]),
+        CAST(:escalated AS BOOLEAN[]),
+        CAST(:escalation_reasons AS VARCHAR[]),
+        CAST(:sentiment_scores AS NUMERIC[]),
+        CAST(:ended_ats AS TIMESTAMP[])
+    ) AS u(id, parent_id, escalated, escalation_reason, sentiment_score, ended_at)
+    WHERE c.id = u.id
+""")
+
+class ChatMessage(NamedTuple):
+    """One chatbot_messages row; also what a hot conversation keeps as history"""
+    conversation_id: int
+    message_type: str
+    message: str
+    intent: Optional[str]
+    entities: Optional[Dict[str, Any]]
+    confidence: Optional[float]
+    created_at: datetime
+
+class ConversationUpdate(NamedTuple):
+    """Latest state of a conversation's mutable columns; a newer one replaces a queued one"""
+    id: int
+    parent_id: Optional[int]
+    escalated: bool
+    escalation_reason: Optional[str]
+    sentiment_score: Optional[float]
+    ended_at: Optional[datetime]
+
+class ChatbotBusy(Exception):
+    """The buffer stayed full for the whole enqueue timeout, or the writer isn't running"""
+
+class ChatbotWriter:
+    """
+    Write-behind buffer for chatbot_messages and conversation state.
+    A turn appends its messages and returns; one background task writes everything
+    buffered in a single transaction (one insert, one update). Until then the
+    messages are visible through pending(), so a conversation loaded from the
+    database in the meantime still sees them.
+    """
+
+    def __init__(
+        self,
+        capacity: int = CHATBOT_WRITE_CAPACITY,
+        flush_rows: int = CHATBOT_FLUSH_ROWS,
+        flush_seconds: float = CHATBOT_FLUSH_SECONDS,
+        max_retries: int = CHATBOT_WRITE_MAX_RETRIES,
+    ):
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self._buffer: List[ChatMessage] = []
+        self._in_flight: List[ChatMessage] = []
+        self._updates: Dict[int, ConversationUpdate] = {}
+        self._space = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        # Counters, reported by stats()
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer) + len(self._in_flight)
+
+    @property
+    def running(self) -> bool:
+        return not self._closing and self._writer is not None and not self._writer.done()
+
+    def start(self):
+        if self._writer is None or self._writer.done():
+            self._closing = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def add(self, messages: List[ChatMessage], update: Optional[ConversationUpdate] = None,
+                  timeout: float = CHATBOT_ENQUEUE_TIMEOUT):
+        """Buffer a turn's messages (and the conversation's new state), waiting up to timeout for space"""
+        if not self.running:
+            raise ChatbotBusy("chatbot writer is not running")
+        if self.depth + len(messages) > self.capacity:
+            async with self._space:
+                self._flush_requested.set()
+                try:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: self.depth + len(messages) <= self.capacity), timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.rejected += len(messages)
+                    raise ChatbotBusy("chatbot message buffer is full")
+        self._buffer.extend(messages)
+        if update is not None:
+            self._updates[update.id] = update
+        self.accepted += len(messages)
+        if len(self._buffer) >= self.flush_rows:
+            self._flush_requested.set()
+
+    def update(self, update: ConversationUpdate):
+        """Queue conversation state on its own (an ended or evicted conversation)"""
+        self._updates[update.id] = update
+
+    def pending(self, conversation_id: int) -> List[ChatMessage]:
+        """Messages of a conversation not yet committed, oldest first"""
+        return [
+            message for message in self._in_flight + self._buffer
+            if message.conversation_id == conversation_id
+        ]
+
+    async def _write(self, messages: List[ChatMessage], updates: List[ConversationUpdate]):
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with async_engine.begin() as connection:
+                    if messages:
+                        columns = list(zip(*messages))
+                        result = await connection.execute(INSERT_MESSAGES, {
+                            "conversation_ids": list(columns[0]),
+                            "message_types": list(columns[1]),
+                            "messages": list(columns[2]),
+                            "intents": list(columns[3]),
+                            "entities": [orjson.dumps(value).decode() if value else None for value in columns[4]],
+                            "confidences": list(columns[5]),
+                            "created_ats": list(columns[6]),
+                        })
+                        written = result.rowcount
+                    else:
+                        written = 0
+                    if updates:
+                        columns = list(zip(*updates))
+                        await connection.execute(UPDATE_CONVERSATIONS, {
+                            "ids": list(columns[0]),
+                            "parent_ids": list(columns[1]),
+                            "escalated": list(columns[2]),
+                            "escalation_reasons": list(columns[3]),
+                            "sentiment_scores": list(columns[4]),
+                            "ended_ats": list(columns[5]),
+                        })
+                self.written += written
+                self.dropped += len(messages) - written
+                self.flushes += 1
+                self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(messages)
+                    print(f"Chatbot message flush failed, dropping {len(messages)} messages: {e}")
+                    return
+                print(f"Chatbot message flush failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(min(0.5 * 2 ** attempt, 10))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if not self._closing:
+                self._flush_requested.clear()
+
+            messages, self._buffer = self._buffer, []
+            updates, self._updates = list(self._updates.values()), {}
+            if messages or updates:
+                self._in_flight = messages
+                # Not cancelled mid-batch: stop() waits for the drain instead
+                await self._write(messages, updates)
+                async with self._space:
+                    self._in_flight = []
+                    self._space.notify_all()
+            elif self._closing:
+                return
+
+    async def stop(self, timeout: float = CHATBOT_DRAIN_SECONDS):
+        """Stop accepting messages, write out what is buffered, then stop the writer"""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._flush_requested.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._writer), timeout)
+        except asyncio.TimeoutError:
+            lost = self.depth
+            self._writer.cancel()
+            print(f"Chatbot message drain timed out, {lost} messages not written")
+        self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.depth,
+            "capacity": self.capacity,
+            "pending_updates": len(self._updates),
+            "accepted": self.accepted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+# Process-wide writer, started and drained by the app lifespan
+chatbot_writer = ChatbotWriter()
@@ -0,0 +1,334 @@
+# backend/api/modules/forms/intake.py
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..parents import schemas as parent_schemas
+from ..parents.importer import EVENT_COPY_COLUMNS, insert_parents
+from ..parents.service import generate_parent_id
+from ..scoring.service import rescore_parents
+
+# Oldest pending submissions first; row locks are held until the batch commits, so a
+# worker that dies mid-batch just releases its rows back to the queue
+CLAIM_SUBMISSIONS = text("""
+    SELECT id, customer_id, submission_id, form_source, form_data,
+           EXTRACT(EPOCH FROM LOCALTIMESTAMP - created_at) AS age_seconds
+    FROM form_submissions
+    WHERE processing_status = 'pending'
+    ORDER BY id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+""")
+
+CLAIM_SUBMISSIONS_BY_ID = text("""
+    SELECT id, customer_id, submission_id, form_source, form_data,
+           EXTRACT(EPOCH FROM LOCALTIMESTAMP - created_at) AS age_seconds
+    FROM form_submissions
+    WHERE id = ANY(CAST(:ids AS INTEGER[])) AND processing_status = 'pending'
+    ORDER BY id
+    FOR UPDATE SKIP LOCKED
+""")
+
+# Serialises intake of the same email/phone across workers, so two concurrent batches can't
+# both miss the match and create the same family twice. Taken in sorted order (no deadlocks),
+# held until commit; the match query that follows sees whatever the previous holder committed.
+LOCK_CONTACT_KEYS = text("""
+    SELECT pg_advisory_xact_lock(h)
+    FROM (SELECT DISTINCT hashtextextended(k, 0) AS h FROM unnest(CAST(:keys AS TEXT[])) AS k) s
+    ORDER BY h
+""")
+
+# One lookup per submission through idx_parents_customer_email_lower / _phone_norm,
+# preferring an email match over a phone match
+MATCH_PARENTS = text("""
+    SELECT k.position, m.id
+    FROM unnest(CAST(:customer_ids AS VARCHAR[]), CAST(:emails AS TEXT[]), CAST(:phones AS TEXT[]))
+         WITH ORDINALITY AS k(customer_id, email, phone, position)
+    CROSS JOIN LATERAL (
+        SELECT p.id FROM parents p
+        WHERE p.customer_id = k.customer_id
+          AND (lower(p.email) = k.email OR normalize_phone(p.phone) = k.phone)
+        ORDER BY lower(p.email) IS NOT DISTINCT FROM k.email DESC, p.id
+        LIMIT 1
+    ) m
+""")
+
+TOUCH_PARENTS = text("""
+    UPDATE parents SET last_contact_date = :today
+    WHERE id = ANY(CAST(:ids AS INTEGER[])) AND last_contact_date IS DISTINCT FROM :today
+""")
+
+SETTLE_SUBMISSIONS = text("""
+    UPDATE form_submissions f
+    SET processing_status = u.status,
+        parent_id = u.parent_id,
+        extracted_data = CAST(u.extracted AS JSONB),
+        processing_error = u.error,
+        processed_at = LOCALTIMESTAMP
+    FROM unnest(CAST(:ids AS INTEGER[]), CAST(:statuses AS VARCHAR[]), CAST(:parent_ids AS INTEGER[]),
+                CAST(:extracted AS TEXT[]), CAST(:errors AS TEXT[])) AS u(id, status, parent_id, extracted, error)
+    WHERE f.id = u.id
+""")
+
+# SQLSTATE classes of errors that say nothing about the submission: connection exceptions,
+# transaction rollbacks (serialization failure, deadlock) and operator intervention (server shutdown)
+TRANSIENT_SQLSTATE_PREFIXES = ("08", "40", "57P")
+
+# Form field names vary between website, event and callback forms
+NAME_FIELDS = ("name", "parent_name", "full_name")
+EMAIL_FIELDS = ("email", "email_address")
+PHONE_FIELDS = ("phone", "telephone", "mobile")
+YEAR_GROUP_FIELDS = ("year_group", "target_year_group", "entry_year")
+MESSAGE_FIELDS = ("message", "topic", "enquiry")
+
+class BatchResult(NamedTuple):
+    claimed: int = 0
+    created: int = 0
+    matched: int = 0
+    failed: int = 0
+    # Age of the oldest claimed submission, i.e. how far behind the queue was
+    lag_seconds: Optional[float] = None
+
+    def __add__(self, other):
+        lags = [lag for lag in (self.lag_seconds, other.lag_seconds) if lag is not None]
+        return BatchResult(
+            self.claimed + other.claimed, self.created + other.created,
+            self.matched + other.matched, self.failed + other.failed,
+            max(lags) if lags else None
+        )
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Python twin of the normalize_phone() SQL function behind idx_parents_customer_phone_norm"""
+    digits = re.sub(r"^(00)?44", "0", re.sub(r"\D", "", phone or ""))
+    return digits or None
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email or None
+
+def extract(form_data: Any) -> Dict[str, Any]:
+    """Normalised enquiry fields from a raw form payload; ValueError if it can't identify a parent"""
+    if not isinstance(form_data, dict):
+        raise ValueError("form_data must be an object")
+
+    def first(fields):
+        return next((form_data[field] for field in fields if form_data.get(field)), None)
+
+    name = first(NAME_FIELDS)
+    if not name:
+        name = " ".join(str(form_data[f]) for f in ("first_name", "last_name") if form_data.get(f)) or None
+
+    children = form_data.get("children") or []
+    if not isinstance(children, list):
+        children = [children]
+    if form_data.get("child_name"):
+        children = [form_data["child_name"], *children]
+    year_group = first(YEAR_GROUP_FIELDS)
+
+    extracted = {
+        "name": str(name).strip() if name else None,
+        "email": normalize_email(str(first(EMAIL_FIELDS) or "")),
+        "phone": str(first(PHONE_FIELDS)).strip() if first(PHONE_FIELDS) else None,
+        "children": [
+            child if isinstance(child, dict) else {"name": str(child), "target_year_group": year_group}
+            for child in children if child
+        ],
+        "message": first(MESSAGE_FIELDS),
+    }
+    if not extracted["email"] and not normalize_phone(extracted["phone"]):
+        raise ValueError("No email or phone to identify the parent")
+    return extracted
+
+def _parent_create(extracted: Dict[str, Any], row) -> parent_schemas.ParentCreate:
+    return parent_schemas.ParentCreate(
+        name=extracted["name"],
+        email=extracted["email"],
+        phone=extracted["phone"],
+        source=row.form_source or "enquiry_form",
+        source_detail=row.submission_id,
+        children=extracted["children"],
+    )
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in error.errors())
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed batch may succeed as-is on a retry, rather than one of its rows being bad"""
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    sqlstate = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None) or ""
+    return sqlstate.startswith(TRANSIENT_SQLSTATE_PREFIXES)
+
+async def _claim(db: AsyncSession, limit: int, ids: Optional[Sequence[int]]):
+    if ids is None:
+        return (await db.execute(CLAIM_SUBMISSIONS, {"limit": limit})).all()
+    return (await db.execute(CLAIM_SUBMISSIONS_BY_ID, {"ids": list(ids)})).all()
+
+async def _process(db: AsyncSession, rows) -> BatchResult:
+    """Extract, dedupe, create or match parents and settle every claimed row, without committing"""
+    settled: Dict[int, Dict[str, Any]] = {}
+    candidates = []
+    for row in rows:
+        try:
+            if not row.customer_id:
+                raise ValueError("Submission has no customer_id")
+            candidates.append((row, extract(row.form_data)))
+        except ValueError as e:
+            settled[row.id] = {"status": "failed", "error": str(e)}
+
+    # Existing parents, one index lookup each
+    matches = {}
+    if candidates:
+        await db.execute(LOCK_CONTACT_KEYS, {"keys": [
+            f"{row.customer_id}|{kind}|{value}"
+            for row, extracted in candidates
+            for kind, value in (("email", extracted["email"]), ("phone", normalize_phone(extracted["phone"])))
+            if value
+        ]})
+        found = (await db.execute(MATCH_PARENTS, {
+            "customer_ids": [row.customer_id for row, _ in candidates],
+            "emails": [extracted["email"] for _, extracted in candidates],
+            "phones": [normalize_phone(extracted["phone"]) for _, extracted in candidates],
+        })).all()
+        matches = {position - 1: parent_id for position, parent_id in found}
+
+    # The rest are new parents - unless an earlier submission in this batch shares the email or phone
+    groups: List[List[int]] = []
+    group_by_key: Dict[tuple, int] = {}
+    for position, (row, extracted) in enumerate(candidates):
+        if position in matches:
+            continue
+        keys = [
+            (row.customer_id, kind, value)
+            for kind, value in (("email", extracted["email"]), ("phone", normalize_phone(extracted["phone"])))
+            if value
+        ]
+        group = next((group_by_key[key] for key in keys if key in group_by_key), None)
+        if group is None:
+            group = len(groups)
+            groups.append([])
+        groups[group].append(position)
+        for key in keys:
+            group_by_key.setdefault(key, group)
+
+    # First submission of each group creates the parent, per tenant in one insert_parents call
+    creators = defaultdict(list)
+    for group in groups:
+        row, extracted = candidates[group[0]]
+        try:
+            creators[row.customer_id].append((group, _parent_create(extracted, row)))
+        except ValidationError as e:
+            for position in group:
+                settled[candidates[position][0].id] = {"status": "failed", "error": _validation_message(e)}
+
+    # Follow-up enquiry: a journey event and the last contact date for each matched parent
+    today = datetime.utcnow().date()
+
+    async def record_follow_ups(follow_ups: Dict[int, int]) -> Dict[str, set]:
+        touched = defaultdict(set)
+        events = []
+        for position, parent_id in follow_ups.items():
+            row, extracted = candidates[position]
+            settled[row.id] = {"status": "processed", "parent_id": parent_id, "match": "existing"}
+            touched[row.customer_id].add(parent_id)
+            events.append((
+                row.customer_id, parent_id, 'enquiry', 'enquiry_form', 'Enquiry form received',
+                extracted["message"] or f"Form submission {row.submission_id}", 5, 'SYSTEM'
+            ))
+        if events:
+            connection = await db.connection()
+            raw = (await connection.get_raw_connection()).driver_connection
+            await raw.copy_records_to_table("journey_events", records=events, columns=EVENT_COPY_COLUMNS)
+            await db.execute(TOUCH_PARENTS, {"ids": sorted({p for ids in touched.values() for p in ids}), "today": today})
+        return touched
+
+    # Known parents first, so each tenant's rescore covers them and its new parents in one pass
+    touched = await record_follow_ups(matches)
+    created = 0
+    repeats: Dict[int, int] = {}
+    for customer_id in set(creators) | set(touched):
+        entries = creators.get(customer_id)
+        if not entries:
+            await rescore_parents(db, customer_id, touched[customer_id])
+            continue
+        ids = await insert_parents(
+            db, customer_id, [parent for _, parent in entries], generate_parent_id,
+            event_subtype="enquiry_form", description="Parent record created from an enquiry form",
+            rescore_ids=touched.get(customer_id, ())
+        )
+        created += len(ids)
+        for (group, _), parent_id in zip(entries, ids):
+            settled[candidates[group[0]][0].id] = {"status": "processed", "parent_id": parent_id, "match": "created"}
+            for position in group[1:]:
+                repeats[position] = parent_id
+
+    # Repeat enquiries from a family first seen in this same batch
+    for customer_id, parent_ids in (await record_follow_ups(repeats)).items():
+        await rescore_parents(db, customer_id, parent_ids)
+
+    extracted_by_id = {row.id: extracted for row, extracted in candidates}
+    ids = [row.id for row in rows]
+    await db.execute(SETTLE_SUBMISSIONS, {
+        "ids": ids,
+        "statuses": [settled[i]["status"] for i in ids],
+        "parent_ids": [settled[i].get("parent_id") for i in ids],
+        "extracted": [
+            orjson.dumps({**extracted_by_id[i], "match": settled[i].get("match")}).decode()
+            if i in extracted_by_id else None
+            for i in ids
+        ],
+        "errors": [settled[i].get("error") for i in ids],
+    })
+
+    return BatchResult(
+        claimed=len(rows),
+        created=created,
+        matched=len(matches) + len(repeats),
+        failed=sum(1 for outcome in settled.values() if outcome["status"] == "failed"),
+        lag_seconds=max(float(row.age_seconds) for row in rows),
+    )
+
+async def process_batch(db: AsyncSession, limit: int, ids: Optional[Sequence[int]] = None) -> BatchResult:
+    """
+    Claim up to `limit` pending submissions with FOR UPDATE SKIP LOCKED and process them
+    in one transaction. If the batch fails as a whole it is retried row by row, so one bad
+    submission is marked failed instead of blocking the queue. Transient database errors
+    (dropped connection, serialization failure, deadlock) are raised instead: the rollback
+    leaves the rows pending for the next claim rather than failing them.
+    """
+    rows = await _claim(db, limit, ids)
+    if not rows:
+        await db.rollback()
+        return BatchResult()
+    try:
+        result = await _process(db, rows)
+        await db.commit()
+        return result
+    except Exception as e:
+        await db.rollback()
+        if is_transient(e):
+            raise
+        if len(rows) > 1:
+            result = BatchResult()
+            for row in rows:
+                result += await process_batch(db, 1, [row.id])
+            return result
+        # Re-claim before marking it: the rollback released the lock
+        if not await _claim(db, 1, [rows[0].id]):
+            await db.rollback()
+            return BatchResult()
+        await db.execute(SETTLE_SUBMISSIONS, {
+            "ids": [rows[0].id], "statuses": ["failed"], "parent_ids": [None],
+            "extracted": [None], "errors": [f"Processing failed: {e}"],
+        })
+        await db.commit()
+        return BatchResult(claimed=1, failed=1, lag_seconds=float(rows[0].age_seconds))
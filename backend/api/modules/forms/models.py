@@ -0,0 +1,22 @@
+# backend/api/modules/forms/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class FormSubmission(Base):
+    """Raw enquiry form payload, queued as 'pending' until the intake worker links it to a parent"""
+    __tablename__ = "form_submissions"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    submission_id = Column(String(100), unique=True, nullable=False)
+    form_source = Column(String(100))
+    form_data = Column(JSONB)
+    extracted_data = Column(JSONB)
+    parent_id = Column(Integer, ForeignKey("parents.id"))
+    processing_status = Column(String(20), default="pending")
+    processing_error = Column(Text)
+    submitted_at = Column(DateTime)
+    processed_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,100 @@
+# backend/api/modules/forms/routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import select, func, update, case
+from typing import Optional
+import uuid
+
+from ...core.database import get_async_db
+from ..rbac.dependencies import authorize
+from . import models, schemas
+from .worker import form_intake_worker, RATE_WINDOW_SECONDS
+
+router = APIRouter(prefix="/api/forms", tags=["forms"])
+
+@router.post("/submissions", response_model=schemas.FormSubmissionAccepted, status_code=202)
+async def submit_form(
+    submission: schemas.FormSubmissionIn,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue an enquiry form for intake; resubmitting the same submission_id is a no-op"""
+    submission_id = submission.submission_id or f"FORM-{uuid.uuid4().hex[:12].upper()}"
+    queued = (await db.execute(
+        insert(models.FormSubmission)
+        .values(
+            customer_id=customer_id,
+            submission_id=submission_id,
+            form_source=submission.form_source,
+            form_data=submission.form_data,
+            submitted_at=submission.submitted_at or func.localtimestamp(),
+        )
+        .on_conflict_do_nothing(index_elements=[models.FormSubmission.submission_id])
+        .returning(models.FormSubmission.id)
+    )).scalar()
+    await db.commit()
+
+    if queued:
+        form_intake_worker.notify()
+    return schemas.FormSubmissionAccepted(submission_id=submission_id, queued=queued is not None)
+
+@router.get("/queue", response_model=schemas.IntakeQueueStatus, dependencies=[Depends(authorize("forms"))])
+async def queue_status(
+    customer_id: Optional[str] = Query(None, description="Customer ID (whole queue if omitted)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Backlog, queue lag and throughput across all intake workers"""
+    forms = models.FormSubmission
+    tenant = [forms.customer_id == customer_id] if customer_id else []
+
+    pending, failed, oldest, now = (await db.execute(
+        select(
+            func.count().filter(forms.processing_status == 'pending'),
+            func.count().filter(forms.processing_status == 'failed'),
+            func.min(case((forms.processing_status == 'pending', forms.created_at))),
+            func.localtimestamp(),
+        ).where(forms.processing_status.in_(['pending', 'failed']), *tenant)
+    )).one()
+
+    # Recently processed rows, through idx_forms_processed
+    processed, latency = (await db.execute(
+        select(
+            func.count(),
+            func.avg(func.extract('epoch', forms.processed_at - forms.created_at)),
+        ).where(
+            forms.processed_at >= func.localtimestamp() - func.make_interval(0, 0, 0, 0, 0, 0, RATE_WINDOW_SECONDS),
+            *tenant
+        )
+    )).one()
+
+    return schemas.IntakeQueueStatus(
+        customer_id=customer_id,
+        pending=pending,
+        failed=failed,
+        oldest_pending_seconds=round((now - oldest).total_seconds(), 1) if oldest else None,
+        processed_last_minute=processed,
+        throughput_per_second=round(processed / RATE_WINDOW_SECONDS, 2),
+        average_latency_seconds=round(float(latency), 2) if latency is not None else None
+    )
+
+@router.post("/retry-failed", response_model=schemas.RetryFailedResult, dependencies=[Depends(authorize("forms"))])
+async def retry_failed(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Put a tenant's failed submissions back in the queue (e.g. after fixing a form mapping)"""
+    forms = models.FormSubmission
+    result = await db.execute(
+        update(forms)
+        .where(forms.customer_id == customer_id, forms.processing_status == 'failed')
+        .values(processing_status='pending', processing_error=None, processed_at=None)
+    )
+    await db.commit()
+    form_intake_worker.notify()
+    return schemas.RetryFailedResult(customer_id=customer_id, requeued=result.rowcount)
+
+@router.get("/worker", response_model=schemas.IntakeWorkerStats, dependencies=[Depends(authorize("forms"))])
+async def worker_stats():
+    """Intake counters for this process's worker loops"""
+    return schemas.IntakeWorkerStats(**form_intake_worker.stats())
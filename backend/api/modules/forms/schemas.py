@@ -0,0 +1,37 @@
+# backend/api/modules/forms/schemas.py
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class FormSubmissionIn(BaseModel):
+    submission_id: Optional[str] = Field(None, max_length=100, description="Idempotency key, generated if omitted")
+    form_source: Optional[str] = Field(None, max_length=100)
+    form_data: Dict[str, Any]
+    submitted_at: Optional[datetime] = None
+
+class FormSubmissionAccepted(BaseModel):
+    submission_id: str
+    queued: bool
+
+class IntakeQueueStatus(BaseModel):
+    customer_id: Optional[str] = None
+    pending: int
+    failed: int
+    oldest_pending_seconds: Optional[float] = None
+    processed_last_minute: int
+    throughput_per_second: float
+    average_latency_seconds: Optional[float] = None
+
+class IntakeWorkerStats(BaseModel):
+    loops: int
+    batches: int
+    processed: int
+    created: int
+    matched: int
+    failed: int
+    rows_per_second: float
+    last_lag_seconds: Optional[float] = None
+
+class RetryFailedResult(BaseModel):
+    customer_id: str
+    requeued: int
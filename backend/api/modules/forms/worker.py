@@ -0,0 +1,192 @@
+# backend/api/modules/forms/worker.py
+"""
+Form intake worker: drains pending form_submissions into parents.
+
+Runs inside the API process (FORM_INTAKE_CONCURRENCY loops, started by the app
+lifespan) and/or as dedicated processes for admissions peaks:
+
+    python -m api.modules.forms.worker --processes 4 --concurrency 2
+
+Every loop claims its own batch with FOR UPDATE SKIP LOCKED, so any number of
+loops and processes share the queue without handing out a submission twice.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
+
+from ...core.database import AsyncSessionLocal, async_engine
+from ..webhooks.dispatcher import webhook_dispatcher
+from .intake import BatchResult, process_batch
+
+# Concurrent claim loops in this process (0 disables intake here)
+FORM_INTAKE_CONCURRENCY = int(os.getenv("FORM_INTAKE_CONCURRENCY", 1))
+FORM_INTAKE_BATCH_SIZE = int(os.getenv("FORM_INTAKE_BATCH_SIZE", 200))
+# Idle loops look for new submissions this often (or at once after notify())
+FORM_INTAKE_POLL_SECONDS = float(os.getenv("FORM_INTAKE_POLL_SECONDS", 1.0))
+FORM_INTAKE_DRAIN_SECONDS = float(os.getenv("FORM_INTAKE_DRAIN_SECONDS", 10))
+# Window for the moving rows-per-second figure
+RATE_WINDOW_SECONDS = 60
+
+class FormIntakeWorker:
+    """
+    A few claim loops over the form_submissions queue. A loop that gets a full
+    batch goes straight back for more; otherwise it sleeps until the next poll.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = FORM_INTAKE_CONCURRENCY,
+        batch_size: int = FORM_INTAKE_BATCH_SIZE,
+        poll_seconds: float = FORM_INTAKE_POLL_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._loops: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._recent: deque = deque()
+        # Counters, reported by stats()
+        self.batches = 0
+        self.processed = 0
+        self.created = 0
+        self.matched = 0
+        self.failed = 0
+        self.last_lag_seconds: Optional[float] = None
+
+    def _record(self, result: BatchResult):
+        self.batches += 1
+        self.processed += result.claimed
+        self.created += result.created
+        self.matched += result.matched
+        self.failed += result.failed
+        self.last_lag_seconds = result.lag_seconds
+        now = time.monotonic()
+        self._recent.append((now, result.claimed))
+        while self._recent and self._recent[0][0] < now - RATE_WINDOW_SECONDS:
+            self._recent.popleft()
+
+    async def _run(self):
+        while not self._closing:
+            self._wake.clear()
+            result = BatchResult()
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await process_batch(db, self.batch_size)
+                if result.claimed:
+                    self._record(result)
+                    if result.created:
+                        # New parents queued parent.created webhooks
+                        webhook_dispatcher.notify()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Form intake batch failed: {e}")
+            if result.claimed >= self.batch_size:
+                continue
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+
+    def start(self):
+        if not self._loops and self.concurrency > 0:
+            self._closing = False
+            self._loops = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    def notify(self):
+        """Look for work now instead of at the next poll (e.g. right after a submission)"""
+        self._wake.set()
+
+    async def stop(self, timeout: float = FORM_INTAKE_DRAIN_SECONDS):
+        """Finish the batches in progress; a cancelled batch rolls back and stays pending"""
+        if not self._loops:
+            return
+        self._closing = True
+        self._wake.set()
+        _, pending = await asyncio.wait(self._loops, timeout=timeout)
+        for task in pending:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._loops = []
+
+    def stats(self) -> Dict[str, Any]:
+        window = time.monotonic() - self._recent[0][0] if self._recent else 0
+        recent = sum(count for _, count in self._recent)
+        return {
+            "loops": len(self._loops),
+            "batches": self.batches,
+            "processed": self.processed,
+            "created": self.created,
+            "matched": self.matched,
+            "failed": self.failed,
+            "rows_per_second": round(recent / window, 1) if window > 0 else 0.0,
+            "last_lag_seconds": round(self.last_lag_seconds, 1) if self.last_lag_seconds is not None else None,
+        }
+
+# Process-wide worker, started and drained by the app lifespan
+form_intake_worker = FormIntakeWorker()
+
+# Dedicated worker processes
+async def serve(concurrency: int, batch_size: int, report_seconds: float):
+    """Run one worker until SIGTERM/SIGINT, printing its stats periodically"""
+    worker = FormIntakeWorker(concurrency=concurrency, batch_size=batch_size)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    worker.start()
+    while not stopping.is_set():
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stopping.wait(), report_seconds)
+        if report_seconds > 0:
+            print(f"📨 form intake [{os.getpid()}] {worker.stats()}")
+    await worker.stop()
+    await async_engine.dispose()
+
+def _serve_process(concurrency: int, batch_size: int, report_seconds: float):
+    asyncio.run(serve(concurrency, batch_size, report_seconds))
+
+def start_processes(processes: int, concurrency: int, batch_size: int, report_seconds: float = 30):
+    """Spawn worker processes; each gets a pool sized to its loops so the fleet stays in the connection budget"""
+    os.environ["DB_POOL_SIZE"] = str(concurrency)
+    os.environ["DB_MAX_OVERFLOW"] = "1"
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_serve_process, args=(concurrency, batch_size, report_seconds), daemon=True)
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    return workers
+
+def stop_processes(workers):
+    for process in workers:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+    for process in workers:
+        process.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Form submission intake workers")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=2, help="claim loops per process")
+    parser.add_argument("--batch-size", type=int, default=FORM_INTAKE_BATCH_SIZE)
+    parser.add_argument("--report-seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    workers = start_processes(args.processes, args.concurrency, args.batch_size, args.report_seconds)
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        stop_processes(workers)
+
+if __name__ == "__main__":
+    main()
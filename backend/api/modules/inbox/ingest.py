@@ -0,0 +1,307 @@
+# backend/api/modules/inbox/ingest.py
+"""
+Bulk email ingest: an mbox or MIME stream into emails.
+
+The body is split into raw messages in the event loop; MIME parsing and sentiment
+scoring run in a process pool a few batches ahead of the writer, so neither blocks
+the loop. Senders and recipients are matched to parents through an in-memory index
+of the tenant's email and secondary_email addresses. Each batch is one transaction:
+a multi-row insert (messages already imported are skipped by email_id), the
+last_contact_date of the parents it touched, and their rescore. A batch that fails
+is written again message by message, so only the messages at fault are reported.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..licensing.meter import EMAILS, usage_meter
+from ..parents.importer import MAX_REPORTED_ERRORS, describe_error
+from ..parents.models import Parent
+from ..scoring.service import rescore_parents
+from . import schemas
+from .mime import MessageTooLarge, parse_messages
+
+# Parser processes (0 parses in the event loop - only for small imports and debugging)
+EMAIL_INGEST_PROCESSES = int(os.getenv("EMAIL_INGEST_PROCESSES", os.cpu_count() or 1))
+EMAIL_INGEST_BATCH_SIZE = int(os.getenv("EMAIL_INGEST_BATCH_SIZE", 200))
+# Larger messages are reported as failures without being buffered
+EMAIL_INGEST_MAX_MESSAGE_BYTES = int(os.getenv("EMAIL_INGEST_MAX_MESSAGE_BYTES", 25_000_000))
+
+INSERT_EMAILS = text("""
+    INSERT INTO emails (customer_id, parent_id, email_id, thread_id, direction, from_address, to_address,
+                        cc_addresses, subject, body, body_plain, sentiment_score, sentiment_label, status,
+                        date_sent, date_received, attachments, created_by)
+    SELECT CAST(:customer_id AS VARCHAR), u.parent_id, u.email_id, u.thread_id, u.direction, u.from_address,
+           u.to_address, string_to_array(u.cc_addresses, E'\\n'), u.subject, u.body, u.body_plain,
+           u.sentiment_score, u.sentiment_label, u.status, u.date_sent, u.date_received,
+           CAST(u.attachments AS JSONB), 'SYSTEM'
+    FROM unnest(
+        CAST(:parent_ids AS INTEGER[]), CAST(:email_ids AS VARCHAR[]), CAST(:thread_ids AS VARCHAR[]),
+        CAST(:directions AS VARCHAR[]), CAST(:from_addresses AS VARCHAR[]), CAST(:to_addresses AS VARCHAR[]),
+        CAST(:cc_addresses AS TEXT[]), CAST(:subjects AS VARCHAR[]), CAST(:bodies AS TEXT[]),
+        CAST(:plain_bodies AS TEXT[]), CAST(:sentiment_scores AS NUMERIC[]), CAST(:sentiment_labels AS VARCHAR[]),
+        CAST(:statuses AS VARCHAR[]), CAST(:dates_sent AS TIMESTAMP[]), CAST(:dates_received AS TIMESTAMP[]),
+        CAST(:attachments AS TEXT[])
+    ) AS u(parent_id, email_id, thread_id, direction, from_address, to_address, cc_addresses, subject, body,
+           body_plain, sentiment_score, sentiment_label, status, date_sent, date_received, attachments)
+    ON CONFLICT (email_id) DO NOTHING
+    RETURNING parent_id, coalesce(date_received, date_sent, created_at) AS contact_at
+""")
+
+# Only ever moves last_contact_date forward
+TOUCH_PARENTS = text("""
+    UPDATE parents p SET last_contact_date = u.day
+    FROM unnest(CAST(:ids AS INTEGER[]), CAST(:days AS DATE[])) AS u(id, day)
+    WHERE p.id = u.id AND (p.last_contact_date IS NULL OR p.last_contact_date < u.day)
+""")
+
+class ParsePool:
+    """Process pool for parse_messages, started on first use and shut down by the app lifespan"""
+
+    def __init__(self, processes: int = EMAIL_INGEST_PROCESSES):
+        self.processes = processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def lookahead(self) -> int:
+        """Batches parsed ahead of the writer: enough to keep every process busy"""
+        return self.processes + 1
+
+    async def parse(self, raws: List[bytes]) -> List[Dict[str, Any]]:
+        if self.processes <= 0:
+            return parse_messages(raws)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, parse_messages, raws)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+# Process-wide pool
+parse_pool = ParsePool()
+
+class ParentEmailIndex:
+    """Lowercased email and secondary_email -> parent id for one tenant, loaded once per ingest"""
+
+    def __init__(self, by_address: Dict[str, int]):
+        self._by_address = by_address
+
+    @classmethod
+    async def load(cls, db: AsyncSession, customer_id: str) -> "ParentEmailIndex":
+        primary, secondary = {}, {}
+        # Highest id first, so the oldest parent ends up owning a shared address
+        result = await db.stream(
+            select(Parent.id, Parent.email, Parent.secondary_email)
+            .where(Parent.customer_id == customer_id)
+            .order_by(Parent.id.desc())
+            .execution_options(yield_per=10000)
+        )
+        async for rows in result.partitions():
+            for parent_id, email, secondary_email in rows:
+                if email and email.strip():
+                    primary[email.strip().lower()] = parent_id
+                if secondary_email and secondary_email.strip():
+                    secondary[secondary_email.strip().lower()] = parent_id
+        # A parent's own email beats another parent's secondary one
+        return cls({**secondary, **primary})
+
+    def match(self, addresses: Iterable[str]) -> Optional[int]:
+        for address in addresses:
+            parent_id = self._by_address.get(address)
+            if parent_id is not None:
+                return parent_id
+        return None
+
+    def __len__(self):
+        return len(self._by_address)
+
+def email_id_for(customer_id: str, message_id: str) -> str:
+    """Deterministic per tenant, so re-importing a mailbox skips what is already there"""
+    return "MSG-" + hashlib.sha256(f"{customer_id}|{message_id}".encode()).hexdigest()[:40]
+
+def resolve(record: Dict[str, Any], index: ParentEmailIndex, mailbox: frozenset) -> Tuple[str, Optional[int]]:
+    """
+    (direction, parent id). With a mailbox given, mail from it is outbound; otherwise a
+    message is outbound when its sender isn't a parent but one of its recipients is.
+    """
+    sender = [record["from_address"]] if record["from_address"] else []
+    recipients = record["to_addresses"] + record["cc_addresses"]
+    if mailbox:
+        if record["from_address"] in mailbox:
+            return "outbound", index.match(recipients)
+        return "inbound", index.match(sender)
+    parent_id = index.match(sender)
+    if parent_id is None:
+        recipient_parent = index.match(recipients)
+        if recipient_parent is not None:
+            return "outbound", recipient_parent
+    return "inbound", parent_id
+
+async def write_batch(
+    db: AsyncSession,
+    customer_id: str,
+    rows: List[Tuple[int, Dict[str, Any], str, Optional[int]]],
+) -> List[Tuple[Optional[int], datetime]]:
+    """Insert one batch, move last_contact_date and rescore; returns (parent id, contact time) of new rows"""
+    inserted = (await db.execute(INSERT_EMAILS, {
+        "customer_id": customer_id,
+        "parent_ids": [parent_id for _, _, _, parent_id in rows],
+        "email_ids": [email_id_for(customer_id, record["message_id"]) for _, record, _, _ in rows],
+        "thread_ids": [record["thread_id"] for _, record, _, _ in rows],
+        "directions": [direction for _, _, direction, _ in rows],
+        "from_addresses": [record["from_address"] for _, record, _, _ in rows],
+        "to_addresses": [(record["to_addresses"] or [None])[0] for _, record, _, _ in rows],
+        # The first To address has its own column; the rest of To and Cc share cc_addresses
+        "cc_addresses": [
+            "\n".join(record["to_addresses"][1:] + record["cc_addresses"]) or None for _, record, _, _ in rows
+        ],
+        "subjects": [record["subject"] for _, record, _, _ in rows],
+        "bodies": [record["body"] for _, record, _, _ in rows],
+        "plain_bodies": [record["body_plain"] for _, record, _, _ in rows],
+        "sentiment_scores": [record["sentiment_score"] for _, record, _, _ in rows],
+        "sentiment_labels": [record["sentiment_label"] for _, record, _, _ in rows],
+        # Outbound mail was written by the school, so there is nothing to read
+        "statuses": ["read" if direction == "outbound" else "unread" for _, _, direction, _ in rows],
+        "dates_sent": [record["date"] for _, record, _, _ in rows],
+        "dates_received": [record["date"] if direction == "inbound" else None for _, record, direction, _ in rows],
+        "attachments": [record["attachments"] for _, record, _, _ in rows],
+    })).all()
+
+    # Latest contact per parent; a Date header in the future counts as today
+    today = datetime.utcnow().date()
+    days: Dict[int, Any] = {}
+    for parent_id, contact_at in inserted:
+        if parent_id is not None and contact_at is not None:
+            day = min(contact_at.date(), today)
+            days[parent_id] = max(days.get(parent_id, day), day)
+    if days:
+        ids = sorted(days)
+        await db.execute(TOUCH_PARENTS, {"ids": ids, "days": [days[parent_id] for parent_id in ids]})
+        await rescore_parents(db, customer_id, ids)
+    return inserted
+
+async def ingest_emails(
+    db: AsyncSession,
+    customer_id: str,
+    messages: AsyncIterator[Tuple[int, Any]],
+    mailbox: Iterable[str] = (),
+    batch_size: int = EMAIL_INGEST_BATCH_SIZE,
+    pool: ParsePool = parse_pool,
+) -> schemas.EmailImportResult:
+    """Parse, match and load a raw message stream batch by batch, collecting per-message errors"""
+    started = time.perf_counter()
+    mailbox = frozenset(address.strip().lower() for address in mailbox if address.strip())
+    index = await ParentEmailIndex.load(db, customer_id)
+    total = imported = duplicates = matched = failed = 0
+    errors: List[Dict[str, Any]] = []
+
+    def fail(number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"message": number, "error": message})
+
+    async def write(rows) -> Tuple[List[Any], int]:
+        """Write and commit rows; returns the inserted rows and how many rows were written"""
+        try:
+            inserted = await write_batch(db, customer_id, rows)
+            await db.commit()
+            return inserted, len(rows)
+        except Exception as e:
+            await db.rollback()
+            if len(rows) == 1:
+                fail(rows[0][0], f"Insert failed: {describe_error(e)}")
+                return [], 0
+        # Then message by message, so only the ones that fail on their own are reported
+        inserted, written = [], 0
+        for row in rows:
+            row_inserted, row_written = await write([row])
+            inserted += row_inserted
+            written += row_written
+        return inserted, written
+
+    # (batch, parse future) in stream order; the bound is the parse look-ahead
+    pending: asyncio.Queue = asyncio.Queue(maxsize=pool.lookahead)
+
+    def submit(batch):
+        raws = [raw for _, raw in batch if not isinstance(raw, MessageTooLarge)]
+        return batch, asyncio.ensure_future(pool.parse(raws))
+
+    async def read():
+        nonlocal total
+        try:
+            batch = []
+            async for record in messages:
+                batch.append(record)
+                total += 1
+                if len(batch) >= batch_size:
+                    await pending.put(submit(batch))
+                    batch = []
+            if batch:
+                await pending.put(submit(batch))
+        finally:
+            await pending.put(None)
+
+    reader = asyncio.create_task(read())
+    try:
+        while (item := await pending.get()) is not None:
+            batch, parsing = item
+            parsed = iter(await parsing)
+            rows = []
+            for number, raw in batch:
+                if isinstance(raw, MessageTooLarge):
+                    fail(number, str(raw))
+                    continue
+                record = next(parsed)
+                if "error" in record:
+                    fail(number, record["error"])
+                    continue
+                if not record["from_address"] and not record["to_addresses"]:
+                    fail(number, "No From or To address")
+                    continue
+                rows.append((number, record, *resolve(record, index, mailbox)))
+            if not rows:
+                continue
+            inserted, written = await write(rows)
+            if not written:
+                continue
+            imported += len(inserted)
+            usage_meter.record(customer_id, EMAILS, len(inserted))
+            duplicates += written - len(inserted)
+            matched += sum(1 for parent_id, _ in inserted if parent_id is not None)
+        await reader
+    finally:
+        if not reader.done():
+            reader.cancel()
+            # Make room for the reader's end marker, dropping batches nobody will write
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+            with suppress(asyncio.CancelledError):
+                await reader
+
+    elapsed = time.perf_counter() - started
+    return schemas.EmailImportResult(
+        total=total,
+        imported=imported,
+        duplicates=duplicates,
+        matched=matched,
+        failed=failed,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        messages_per_second=round(total / elapsed, 1) if elapsed > 0 else 0.0
+    )
@@ -0,0 +1,229 @@
+# backend/api/modules/inbox/mime.py
+"""
+Streaming mbox / MIME reading and message parsing for the email ingest.
+
+The readers run in the event loop and only split the byte stream into raw
+messages; parse_messages() does the MIME parsing and sentiment scoring and is
+meant for the ingest worker processes (standard library only).
+"""
+import hashlib
+import html
+import re
+from datetime import timezone
+from email import policy
+from email.header import decode_header, make_header
+from email.parser import BytesParser
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+
+from . import sentiment
+
+# emails.email_id / thread_id / from_address / to_address are VARCHAR(255), subject VARCHAR(500)
+MAX_ID_LENGTH = 255
+MAX_ADDRESS_LENGTH = 255
+MAX_SUBJECT_LENGTH = 500
+
+MBOX_SEPARATOR = b"\nFrom "
+MBOX_ESCAPED_FROM = re.compile(rb"^>(>*From )", re.MULTILINE)
+MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+HTML_DROPPED = re.compile(r"<(script|style|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+HTML_BREAKS = re.compile(r"<\s*(br|/p|/div|/li|/tr|/h[1-6])\b[^>]*>", re.IGNORECASE)
+HTML_TAG = re.compile(r"<[^>]+>")
+BLANK_RUNS = re.compile(r"\n\s*\n\s*\n+")
+
+# compat32 keeps headers as raw strings; the default policy's header objects cost several
+# times the rest of the parse, and only a handful of headers are needed
+PARSER = BytesParser(policy=policy.compat32)
+
+class MessageTooLarge(str):
+    """Stands in for a message that exceeded the size limit (the reader skips its bytes)"""
+
+# Streaming readers: yield (message number, raw bytes or MessageTooLarge)
+async def iter_mbox_messages(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split an mbox stream on "From " lines without holding more than one message"""
+    buffer = b""
+    number = 0
+    oversized = False
+    # No separator starts before this offset of buffer (it was searched already)
+    scanned = 0
+
+    def finish(raw: bytes):
+        nonlocal number
+        number += 1
+        if oversized:
+            return number, MessageTooLarge(f"Message larger than {max_bytes} bytes")
+        return number, raw
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            position = buffer.find(MBOX_SEPARATOR, max(start, scanned))
+            if position < 0:
+                break
+            raw, start = buffer[start:position + 1], position + 1
+            if oversized or raw.strip():
+                yield finish(raw)
+            oversized = False
+        buffer = buffer[start:]
+        if len(buffer) > max_bytes:
+            # Drop the message, keeping only a tail that could hold the start of the next separator
+            oversized = True
+            buffer = buffer[-len(MBOX_SEPARATOR):]
+        scanned = max(0, len(buffer) - len(MBOX_SEPARATOR) + 1)
+    if oversized or buffer.strip():
+        yield finish(buffer)
+
+async def iter_single_message(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """One RFC 822 message (.eml) as the whole body"""
+    parts, size = [], 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size <= max_bytes:
+            parts.append(chunk)
+    if size > max_bytes:
+        yield 1, MessageTooLarge(f"Message larger than {max_bytes} bytes")
+    elif size:
+        yield 1, b"".join(parts)
+
+# Parsing (worker processes)
+def _strip_envelope(raw: bytes) -> bytes:
+    """Drop the mbox "From sender date" line and undo >From quoting"""
+    if raw.startswith(b"From "):
+        newline = raw.find(b"\n")
+        raw = raw[newline + 1:] if newline >= 0 else b""
+    return MBOX_ESCAPED_FROM.sub(rb"\1", raw)
+
+def _bounded_id(value: str) -> str:
+    """Message-IDs longer than the column are replaced by a stable digest"""
+    if len(value) <= MAX_ID_LENGTH:
+        return value
+    return f"<{hashlib.sha256(value.encode()).hexdigest()}@digest>"
+
+def _decoded(value) -> str:
+    """RFC 2047 encoded words decoded, or the value as it is if they can't be"""
+    try:
+        return str(make_header(decode_header(str(value))))
+    except (LookupError, ValueError, UnicodeError):
+        return str(value)
+
+def _header(message, name: str) -> str:
+    value = message.get(name)
+    return "" if value is None else _decoded(value)
+
+def _addresses(message, *headers: str) -> List[str]:
+    values = [str(value) for header in headers for value in message.get_all(header, [])]
+    found = []
+    for _, address in getaddresses(values):
+        address = address.strip().lower()
+        if address and "@" in address and len(address) <= MAX_ADDRESS_LENGTH and address not in found:
+            found.append(address)
+    return found
+
+def _html_to_text(markup: str) -> str:
+    text = HTML_TAG.sub("", HTML_BREAKS.sub("\n", HTML_DROPPED.sub("", markup)))
+    lines = (" ".join(line.split()) for line in html.unescape(text).splitlines())
+    return BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+def _is_attachment(part) -> bool:
+    return part.get_content_disposition() == "attachment" or (
+        part.get_filename() is not None and part.get_content_maintype() != "text"
+    )
+
+def _text(part) -> str:
+    payload = part.get_payload(decode=True) or b""
+    try:
+        return payload.decode(part.get_content_charset() or "utf-8", "replace")
+    except LookupError:
+        return payload.decode("utf-8", "replace")
+
+def _body(message) -> Tuple[Optional[str], Optional[str]]:
+    """(body as sent, plain text) - the first text/plain part, else the first HTML part flattened"""
+    found = {}
+    for part in message.walk():
+        if part.is_multipart() or _is_attachment(part):
+            continue
+        content_type = part.get_content_type()
+        if content_type in ("text/plain", "text/html") and content_type not in found:
+            found[content_type] = part
+    if "text/plain" in found:
+        content = _text(found["text/plain"]).replace("\x00", "")
+        return content, content.strip()
+    if "text/html" in found:
+        content = _text(found["text/html"]).replace("\x00", "")
+        return content, _html_to_text(content)
+    return None, None
+
+def _attachments(message) -> List[Dict[str, Any]]:
+    found = []
+    for part in message.walk():
+        if part.is_multipart() or part is message or not _is_attachment(part):
+            continue
+        filename = part.get_filename()
+        found.append({
+            "filename": _decoded(filename) if filename else None,
+            "content_type": part.get_content_type(),
+            "size": len(part.get_payload(decode=True) or b""),
+        })
+    return found
+
+def _date(message):
+    """Date header as naive UTC, like the rest of the schema; None if missing or unparseable"""
+    value = message.get("date")
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_message(raw: bytes) -> Dict[str, Any]:
+    """Fields of one raw message for the emails table, with its sentiment"""
+    raw = _strip_envelope(raw)
+    message = PARSER.parsebytes(raw)
+
+    message_id = MESSAGE_ID.search(_header(message, "message-id"))
+    # Without a Message-ID the content identifies the message, so re-imports still dedupe
+    message_id = _bounded_id(message_id.group(0) if message_id else
+                             f"<{hashlib.sha256(raw).hexdigest()}@content>")
+    # Thread root: first of References, else In-Reply-To, else the message itself
+    references = MESSAGE_ID.findall(_header(message, "references")) or \
+        MESSAGE_ID.findall(_header(message, "in-reply-to"))
+    thread_id = _bounded_id(references[0]) if references else message_id
+
+    senders = _addresses(message, "from")
+    recipients = _addresses(message, "to")
+    copied = [address for address in _addresses(message, "cc") if address not in recipients]
+    subject = " ".join(_header(message, "subject").split())[:MAX_SUBJECT_LENGTH] or None
+    body, body_plain = _body(message)
+
+    value = sentiment.score(sentiment.scored_text(subject, body_plain))
+    return {
+        "message_id": message_id,
+        "thread_id": thread_id,
+        "from_address": senders[0] if senders else None,
+        "to_addresses": recipients,
+        "cc_addresses": copied,
+        "subject": subject,
+        "body": body,
+        "body_plain": body_plain,
+        "date": _date(message),
+        "attachments": orjson.dumps(_attachments(message)).decode(),
+        "sentiment_score": value,
+        "sentiment_label": sentiment.label(value),
+    }
+
+def parse_messages(raws: List[bytes]) -> List[Dict[str, Any]]:
+    """Parse a batch; a message that can't be parsed comes back as {"error": ...}"""
+    parsed = []
+    for raw in raws:
+        try:
+            parsed.append(parse_message(raw))
+        except Exception as e:
+            parsed.append({"error": f"Unparseable message: {type(e).__name__}: {e}"})
+    return parsed
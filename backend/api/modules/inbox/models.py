@@ -0,0 +1,35 @@
+# backend/api/modules/inbox/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean, ARRAY, Text, Computed
+from api.core.database import Base
+
+class EmailThread(Base):
+    """Inbox summary of one email thread; written only by the triggers on emails"""
+    __tablename__ = "email_threads"
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"), nullable=False)
+    thread_id = Column(String(255), nullable=False)
+    parent_id = Column(Integer, ForeignKey("parents.id"))
+    parent_linked_at = Column(DateTime)
+    subject = Column(String(500))
+    message_count = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+    participants = Column(ARRAY(Text), nullable=False, default=list)
+    first_message_at = Column(DateTime)
+    last_message_at = Column(DateTime, nullable=False)
+    last_email_id = Column(Integer)
+    last_direction = Column(String(10))
+    last_status = Column(String(20))
+    last_from = Column(String(255))
+    last_snippet = Column(String(200))
+    last_inbound_at = Column(DateTime)
+    last_outbound_at = Column(DateTime)
+    latest_sentiment = Column(Float)
+    latest_sentiment_label = Column(String(20))
+    latest_sentiment_at = Column(DateTime)
+    has_unread = Column(Boolean, Computed("unread_count > 0"))
+    awaiting_reply = Column(Boolean, Computed(
+        "coalesce(last_direction = 'inbound' AND coalesce(last_status, 'unread') <> 'replied', FALSE)"
+    ))
+    is_negative = Column(Boolean, Computed("coalesce(latest_sentiment < -0.3, FALSE)"))
+    updated_at = Column(DateTime)
@@ -0,0 +1,181 @@
+# backend/api/modules/inbox/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_
+from typing import List, Optional
+
+from ...core.database import get_async_db
+from ...core.serialization import ORJSONResponse, rows_to_dicts, schema_columns
+from ...core.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter
+from ..parents.cache import stats_cache
+from ..licensing.dependencies import within_quota
+from ..licensing.meter import EMAILS
+from ..parents.models import Email
+from . import models, schemas
+from .ingest import EMAIL_INGEST_BATCH_SIZE, EMAIL_INGEST_MAX_MESSAGE_BYTES, ingest_emails
+from .mime import iter_mbox_messages, iter_single_message
+
+router = APIRouter(prefix="/api/inbox", tags=["inbox"])
+
+Thread = models.EmailThread
+
+# Same expressions as idx_emails_thread_key, so a thread's messages are one index range
+THREAD_KEY = func.email_thread_key(Email.thread_id, Email.id)
+MESSAGE_AT = func.coalesce(Email.date_received, Email.date_sent, Email.created_at)
+
+async def get_thread(db: AsyncSession, thread_id: int, customer_id: str):
+    thread = (await db.execute(
+        select(Thread).where(Thread.id == thread_id, Thread.customer_id == customer_id)
+    )).scalar_one_or_none()
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    return thread
+
+@router.get("/threads", response_model=schemas.ThreadPage)
+async def list_threads(
+    customer_id: str = Query(..., description="Customer ID"),
+    unread: bool = Query(False, description="Only threads with unread inbound messages"),
+    negative: bool = Query(False, description="Only threads whose latest inbound sentiment is negative"),
+    awaiting_reply: bool = Query(False, description="Only threads whose last message is an unanswered inbound one"),
+    parent_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Inbox threads, most recent activity first. Reads the precomputed summaries through
+    one of the (customer_id, last_message_at DESC, id DESC) indexes, so a page costs
+    the same however large the mailbox is.
+    """
+    query = select(*schema_columns(Thread, schemas.ThreadSummary)).where(Thread.customer_id == customer_id)
+
+    # Bare boolean columns so the planner matches the partial indexes
+    if unread:
+        query = query.where(Thread.has_unread)
+    if negative:
+        query = query.where(Thread.is_negative)
+    if awaiting_reply:
+        query = query.where(Thread.awaiting_reply)
+    if parent_id is not None:
+        query = query.where(Thread.parent_id == parent_id)
+
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, Thread.last_message_at, "last_message_at", "desc")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(Thread.last_message_at, Thread.id, value, row_id, True))
+
+    rows = rows_to_dicts((await db.execute(
+        query.order_by(Thread.last_message_at.desc(), Thread.id.desc()).limit(limit + 1)
+    )).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor("last_message_at", "desc", last["last_message_at"], last["id"])
+
+    return ORJSONResponse({"items": rows, "next_cursor": next_cursor})
+
+@router.get("/threads/{thread_id}", response_model=schemas.ThreadSummary)
+async def get_thread_summary(
+    thread_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One thread's summary"""
+    return await get_thread(db, thread_id, customer_id)
+
+@router.get("/threads/{thread_id}/messages", response_model=schemas.ThreadMessagePage)
+async def list_thread_messages(
+    thread_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through the messages of a thread, newest first"""
+    thread = await get_thread(db, thread_id, customer_id)
+
+    columns = [getattr(Email, name) for name in schemas.ThreadMessage.model_fields if name != "sent_at"]
+    query = select(*columns, MESSAGE_AT.label("sent_at")).where(
+        Email.customer_id == customer_id, THREAD_KEY == thread.thread_id
+    )
+
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, MESSAGE_AT, "sent_at", "desc")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(MESSAGE_AT, Email.id, value, row_id, True))
+
+    rows = rows_to_dicts((await db.execute(
+        query.order_by(MESSAGE_AT.desc(), Email.id.desc()).limit(limit + 1)
+    )).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor("sent_at", "desc", last["sent_at"], last["id"])
+
+    return ORJSONResponse({"items": rows, "next_cursor": next_cursor})
+
+@router.post("/threads/{thread_id}/read", response_model=schemas.ThreadReadResult)
+async def mark_thread_read(
+    thread_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark the thread's unread inbound messages read; the summary is updated by trigger"""
+    thread = await get_thread(db, thread_id, customer_id)
+
+    result = await db.execute(
+        update(Email)
+        .where(
+            Email.customer_id == customer_id,
+            THREAD_KEY == thread.thread_id,
+            Email.direction == "inbound",
+            or_(Email.status == "unread", Email.status.is_(None))
+        )
+        .values(status="read")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(thread)
+
+    return {"marked_read": result.rowcount, "thread": thread}
+
+@router.post("/import", response_model=schemas.EmailImportResult, dependencies=[Depends(within_quota(EMAILS))])
+async def import_emails(
+    request: Request,
+    customer_id: str = Query(..., description="Customer ID"),
+    format: Optional[str] = Query(None, pattern="^(mbox|eml)$", description="Defaults from Content-Type"),
+    mailbox: List[str] = Query([], description="The school's own addresses; mail from them is outbound"),
+    batch_size: int = Query(EMAIL_INGEST_BATCH_SIZE, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk import emails from a streamed mbox file or a single MIME message (.eml).
+    Messages are linked to parents by email or secondary_email, scored for sentiment,
+    and already imported messages are skipped. The monthly email limit is checked
+    before the import starts, not between batches.
+    """
+    if format is None:
+        format = "eml" if "rfc822" in request.headers.get("content-type", "") else "mbox"
+
+    reader = iter_single_message if format == "eml" else iter_mbox_messages
+    result = await ingest_emails(
+        db,
+        customer_id,
+        reader(request.stream(), EMAIL_INGEST_MAX_MESSAGE_BYTES),
+        mailbox=mailbox,
+        batch_size=batch_size
+    )
+
+    if result.imported:
+        # Risk scores moved with the new sentiment
+        stats_cache.invalidate(customer_id)
+
+    return result
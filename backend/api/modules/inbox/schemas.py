@@ -0,0 +1,79 @@
+# backend/api/modules/inbox/schemas.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ThreadSummary(BaseModel):
+    id: int
+    thread_id: str
+    parent_id: Optional[int]
+    subject: Optional[str]
+    message_count: int
+    unread_count: int
+    participants: List[str]
+    first_message_at: Optional[datetime]
+    last_message_at: datetime
+    last_email_id: Optional[int]
+    last_direction: Optional[str]
+    last_status: Optional[str]
+    last_from: Optional[str]
+    last_snippet: Optional[str]
+    last_inbound_at: Optional[datetime]
+    last_outbound_at: Optional[datetime]
+    latest_sentiment: Optional[float]
+    latest_sentiment_label: Optional[str]
+    has_unread: bool
+    awaiting_reply: bool
+    is_negative: bool
+
+    class Config:
+        from_attributes = True
+
+class ThreadPage(BaseModel):
+    items: List[ThreadSummary]
+    next_cursor: Optional[str] = None
+
+class ThreadMessage(BaseModel):
+    id: int
+    email_id: Optional[str]
+    parent_id: Optional[int]
+    direction: Optional[str]
+    from_address: Optional[str]
+    to_address: Optional[str]
+    subject: Optional[str]
+    body_plain: Optional[str]
+    sentiment_score: Optional[float]
+    sentiment_label: Optional[str]
+    status: Optional[str]
+    date_sent: Optional[datetime]
+    date_received: Optional[datetime]
+    # What the thread is ordered by: date_received, else date_sent, else created_at
+    sent_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ThreadMessagePage(BaseModel):
+    items: List[ThreadMessage]
+    next_cursor: Optional[str] = None
+
+class ThreadReadResult(BaseModel):
+    marked_read: int
+    thread: ThreadSummary
+
+# Bulk email ingest
+class EmailImportError(BaseModel):
+    message: int
+    error: str
+
+class EmailImportResult(BaseModel):
+    total: int
+    imported: int
+    # Already imported (same Message-ID for this tenant)
+    duplicates: int
+    # Imported and linked to a parent
+    matched: int
+    failed: int
+    errors: List[EmailImportError] = []
+    elapsed_seconds: float
+    messages_per_second: float
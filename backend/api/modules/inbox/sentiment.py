@@ -0,0 +1,100 @@
+# backend/api/modules/inbox/sentiment.py
+"""
+Lexicon sentiment for parent emails, in [-1, 1].
+
+Word valences are summed with negation ("not happy") and intensifiers ("very
+disappointed") applied, then squashed like VADER's compound score. Quoted replies
+and signatures are left out so a reply isn't scored on the message it quotes.
+Pure standard library: it runs in the ingest worker processes.
+"""
+import math
+import re
+from typing import Optional
+
+from ..scoring.engine import NEGATIVE_SENTIMENT
+
+# Labels match the seed data: 0.6 is still neutral, 0.7 positive; negative is the
+# same threshold the risk score and the inbox's negative filter use
+POSITIVE_LABEL_THRESHOLD = 0.65
+
+# Characters of a message that are scored
+MAX_SCORED_CHARS = 5000
+
+VALENCE = {
+    # Positive
+    "thank": 1.5, "thanks": 1.5, "thankful": 1.8, "grateful": 2.0, "appreciate": 1.8, "appreciated": 1.8,
+    "great": 2.0, "wonderful": 2.6, "excellent": 2.7, "fantastic": 2.6, "amazing": 2.5, "brilliant": 2.4,
+    "lovely": 2.2, "love": 2.4, "loved": 2.4, "happy": 2.2, "delighted": 2.7, "pleased": 2.0,
+    "glad": 1.8, "excited": 2.0, "impressed": 2.1, "enjoyed": 2.0, "perfect": 2.4, "helpful": 1.9,
+    "kind": 1.6, "welcoming": 1.8, "warm": 1.2, "friendly": 1.7, "recommend": 1.5, "good": 1.6,
+    "nice": 1.6, "positive": 1.5, "forward": 0.6, "keen": 1.3, "reassured": 1.7, "reassuring": 1.7,
+    "fabulous": 2.5, "superb": 2.6, "outstanding": 2.7, "best": 2.0, "easy": 1.0, "smooth": 1.0,
+    "success": 1.8, "successful": 1.8, "congratulations": 2.2, "accept": 1.2, "accepted": 1.4,
+    # Negative
+    "disappointed": -2.2, "disappointing": -2.2, "unhappy": -2.1, "angry": -2.5, "furious": -3.0,
+    "frustrated": -2.1, "frustrating": -2.1, "annoyed": -1.9, "upset": -2.0, "concerned": -1.3,
+    "concern": -1.0, "concerns": -1.0, "worried": -1.6, "worry": -1.3, "anxious": -1.5,
+    "complaint": -2.0, "complain": -1.9, "complaining": -1.9, "unacceptable": -2.6, "poor": -1.8,
+    "terrible": -2.6, "awful": -2.5, "horrible": -2.6, "bad": -1.9, "worst": -2.8, "rude": -2.2,
+    "ignored": -1.9, "confused": -1.2, "confusing": -1.4, "delay": -1.1, "delayed": -1.2,
+    "problem": -1.4, "problems": -1.4, "issue": -0.9, "issues": -0.9, "mistake": -1.5, "wrong": -1.6,
+    "expensive": -1.2, "unaffordable": -2.0, "refund": -1.0, "withdraw": -1.5, "withdrawing": -1.6,
+    "cancel": -1.1, "cancelled": -1.2, "unfortunately": -1.2, "sadly": -1.4, "sorry": -0.6,
+    "regret": -1.6, "disappointment": -2.2, "unresponsive": -2.0, "chasing": -1.2, "still": -0.2,
+    "waiting": -0.5, "nobody": -1.1, "failed": -1.8, "fail": -1.8, "lost": -1.3, "hate": -2.7,
+}
+
+NEGATIONS = {"not", "no", "never", "none", "nothing", "neither", "nor", "without", "hardly", "cannot"}
+INTENSIFIERS = {
+    "very": 0.3, "really": 0.3, "so": 0.25, "extremely": 0.4, "incredibly": 0.4, "truly": 0.3,
+    "absolutely": 0.35, "completely": 0.3, "totally": 0.3, "deeply": 0.35, "most": 0.25, "quite": 0.1,
+    "slightly": -0.3, "somewhat": -0.2, "bit": -0.2,
+}
+# How far back a negation or intensifier reaches
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.74
+# VADER's normalisation constant
+ALPHA = 15.0
+
+TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+QUOTE_HEADER = re.compile(r"^\s*on .{0,200} wrote:\s*$", re.IGNORECASE)
+
+def scored_text(subject: Optional[str], body: Optional[str]) -> str:
+    """Subject and the new part of the body: no quoted lines, reply headers or signature"""
+    lines = []
+    for line in (body or "").splitlines():
+        stripped = line.strip()
+        if stripped in ("--", "-- ") or line.startswith("-- "):
+            break
+        if stripped.startswith(">") or QUOTE_HEADER.match(line):
+            continue
+        lines.append(line)
+    return f"{subject or ''}\n" + "\n".join(lines)[:MAX_SCORED_CHARS]
+
+def score(text: str) -> float:
+    """Compound sentiment of a text, rounded to the emails.sentiment_score precision"""
+    tokens = TOKEN.findall(text.lower())
+    total = 0.0
+    for i, token in enumerate(tokens):
+        valence = VALENCE.get(token)
+        if valence is None:
+            continue
+        window = tokens[max(0, i - NEGATION_WINDOW):i]
+        for previous in window:
+            boost = INTENSIFIERS.get(previous)
+            if boost:
+                valence += math.copysign(boost, valence)
+        if any(word in NEGATIONS or word.endswith("n't") for word in window):
+            valence *= NEGATION_FACTOR
+        total += valence
+    # Exclamation marks amplify whatever the tone already is (capped like VADER)
+    total += math.copysign(min(text.count("!"), 4) * 0.292, total) if total else 0.0
+    compound = total / math.sqrt(total * total + ALPHA)
+    return round(max(-1.0, min(1.0, compound)), 2)
+
+def label(value: float) -> str:
+    if value < NEGATIVE_SENTIMENT:
+        return "negative"
+    if value >= POSITIVE_LABEL_THRESHOLD:
+        return "positive"
+    return "neutral"
@@ -0,0 +1,272 @@
+# backend/api/modules/knowledge/crawler.py
+import asyncio
+import hashlib
+import os
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+# Requests in flight per crawl, and per host within it (be polite to school websites)
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 16))
+CRAWL_HOST_CONCURRENCY = int(os.getenv("CRAWL_HOST_CONCURRENCY", 4))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 500))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", 5))
+CRAWL_TIMEOUT_SECONDS = float(os.getenv("CRAWL_TIMEOUT_SECONDS", 15))
+CRAWL_USER_AGENT = os.getenv("CRAWL_USER_AGENT", "SmartEducationBot/1.0")
+# Larger responses are recorded as failures rather than parsed
+CRAWL_MAX_PAGE_BYTES = int(os.getenv("CRAWL_MAX_PAGE_BYTES", 2_000_000))
+
+# Outgoing links kept per page, so a 304 can still expand the crawl
+MAX_STORED_LINKS = 200
+# knowledge_base.source_url / scraped_content.url are VARCHAR(500)
+MAX_URL_LENGTH = 500
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section", "article",
+    "header", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+}
+PARSED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+class PageParser(HTMLParser):
+    """Title, visible text and links of an HTML page, using only the standard library"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.links: List[str] = []
+        self._text: List[str] = []
+        self._skipping = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+        if tag in BLOCK_TAGS:
+            self._text.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+        if tag in BLOCK_TAGS:
+            self._text.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skipping:
+            self._text.append(data)
+
+    @property
+    def text(self) -> str:
+        lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(self._text).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+class Known(NamedTuple):
+    """What the knowledge base already holds for a URL"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    links: Tuple[str, ...] = ()
+
+class Page(NamedTuple):
+    url: str
+    # changed | unchanged (same content hash) | not_modified (304) | duplicate (same content
+    # as another URL in this crawl) | skipped (not HTML, robots.txt) | failed
+    outcome: str
+    title: Optional[str] = None
+    content: Optional[str] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    links: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used for dedupe and as knowledge_base.source_url; None if not crawlable"""
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname or len(url) > MAX_URL_LENGTH:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[parts.scheme]:
+        host = f"{host}:{parts.port}"
+    return urlunsplit((parts.scheme, host, parts.path or "/", parts.query, ""))
+
+def content_hash(title: str, text: str) -> str:
+    """Hash of what lands in the knowledge base, so markup-only changes don't count as changes"""
+    return hashlib.sha256(f"{title.strip()}\n{text}".encode()).hexdigest()
+
+def parse_page(body: str, base_url: str) -> Tuple[str, str, Tuple[str, ...]]:
+    parser = PageParser()
+    parser.feed(body)
+    parser.close()
+    links = []
+    for href in parser.links:
+        link = normalize_url(urljoin(base_url, href))
+        if link and link not in links:
+            links.append(link)
+    return parser.title.strip(), parser.text, tuple(links)
+
+class Crawler:
+    """
+    Breadth-first crawl of one site from a start URL with bounded concurrency overall
+    and per host. Pages the knowledge base already has are fetched conditionally
+    (If-None-Match / If-Modified-Since); every result is handed to `sink` as it arrives.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        known: Optional[Dict[str, Known]] = None,
+        max_pages: int = CRAWL_MAX_PAGES,
+        max_depth: int = CRAWL_MAX_DEPTH,
+        concurrency: int = CRAWL_CONCURRENCY,
+        host_concurrency: int = CRAWL_HOST_CONCURRENCY,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.start_url = normalize_url(start_url)
+        if not self.start_url:
+            raise ValueError(f"Not a crawlable URL: {start_url}")
+        self.allowed_host = urlsplit(self.start_url).netloc
+        self.known = known or {}
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self._host_slots: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(host_concurrency))
+        self._client = client
+        self._robots: Optional[RobotFileParser] = None
+        self._seen: Set[str] = set()
+        self._hashes: Dict[str, str] = {}
+        self.outcomes: Dict[str, int] = defaultdict(int)
+
+    def _enqueue(self, queue: asyncio.Queue, url: str, depth: int):
+        if (
+            url not in self._seen
+            and len(self._seen) < self.max_pages
+            and urlsplit(url).netloc == self.allowed_host
+        ):
+            self._seen.add(url)
+            queue.put_nowait((url, depth))
+
+    async def _load_robots(self, client: httpx.AsyncClient):
+        robots_url = urljoin(self.start_url, "/robots.txt")
+        try:
+            response = await client.get(robots_url)
+        except httpx.HTTPError:
+            return
+        if response.status_code == 200:
+            self._robots = RobotFileParser(robots_url)
+            self._robots.parse(response.text.splitlines())
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> Page:
+        if self._robots and not self._robots.can_fetch(CRAWL_USER_AGENT, url):
+            return Page(url, "skipped", error="Disallowed by robots.txt")
+
+        known = self.known.get(url)
+        headers = {}
+        if known and known.etag:
+            headers["If-None-Match"] = known.etag
+        if known and known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+
+        try:
+            async with self._host_slots[urlsplit(url).netloc]:
+                response = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            return Page(url, "failed", error=f"{type(e).__name__}: {e}")
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if response.status_code == 304 and known:
+            if known.content_hash:
+                self._hashes.setdefault(known.content_hash, url)
+            return Page(
+                url, "not_modified", content_hash=known.content_hash,
+                etag=etag or known.etag, last_modified=last_modified or known.last_modified,
+                links=known.links
+            )
+        if response.status_code >= 400:
+            return Page(url, "failed", error=f"HTTP {response.status_code}")
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in PARSED_CONTENT_TYPES:
+            return Page(url, "skipped", error=f"Content type {content_type}")
+        if len(response.content) > CRAWL_MAX_PAGE_BYTES:
+            return Page(url, "failed", error=f"Page larger than {CRAWL_MAX_PAGE_BYTES} bytes")
+
+        final_url = normalize_url(str(response.url)) or url
+        if content_type == "text/plain":
+            title, text, links = "", response.text.strip(), ()
+        else:
+            title, text, links = parse_page(response.text, final_url)
+        digest = content_hash(title, text)
+        # A redirect target is the same page; don't crawl it again
+        self._seen.add(final_url)
+
+        first_url = self._hashes.setdefault(digest, url)
+        if known and known.content_hash == digest:
+            outcome = "unchanged"
+        elif first_url != url:
+            # The same content under another URL (index.html vs /, tracking parameters)
+            outcome = "duplicate"
+        else:
+            outcome = "changed"
+        return Page(
+            url, outcome, title=title or None, content=text, content_hash=digest,
+            etag=etag, last_modified=last_modified, links=links[:MAX_STORED_LINKS]
+        )
+
+    async def run(self, sink: Callable[[Page], Awaitable[Any]]) -> Dict[str, int]:
+        """Crawl until the frontier is empty or max_pages URLs were visited; returns outcome counts"""
+        client = self._client or httpx.AsyncClient(
+            timeout=CRAWL_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={"User-Agent": CRAWL_USER_AGENT},
+        )
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def work():
+            while True:
+                url, depth = await queue.get()
+                try:
+                    page = await self.fetch(client, url)
+                    self.outcomes[page.outcome] += 1
+                    await sink(page)
+                    if depth < self.max_depth:
+                        for link in page.links:
+                            self._enqueue(queue, link, depth + 1)
+                finally:
+                    queue.task_done()
+
+        try:
+            await self._load_robots(client)
+            self._enqueue(queue, self.start_url, 0)
+            workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            try:
+                # A worker only dies if sink raises; surface that instead of waiting forever
+                joined = asyncio.create_task(queue.join())
+                done, _ = await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not joined:
+                        task.result()
+            finally:
+                joined.cancel()
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(joined, *workers, return_exceptions=True)
+        finally:
+            if self._client is None:
+                await client.aclose()
+        return dict(self.outcomes)
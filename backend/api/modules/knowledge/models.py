@@ -0,0 +1,69 @@
+# backend/api/modules/knowledge/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class KnowledgeBase(Base):
+    """One row per version of an entry; only the is_current row of a source_url is served"""
+    __tablename__ = "knowledge_base"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    kb_id = Column(String(100), unique=True, nullable=False)
+    title = Column(String(500))
+    content = Column(Text)
+    content_type = Column(String(50))
+    source_url = Column(String(500))
+    category = Column(String(100))
+    tags = Column(ARRAY(Text))
+    meta_data = Column("metadata", JSONB, default=dict)
+    version = Column(Integer, default=1)
+    is_current = Column(Boolean, default=True)
+    approved = Column(Boolean, default=True)
+    approved_by = Column(String(50))
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    last_verified = Column(DateTime)
+
+class UrlMapping(Base):
+    __tablename__ = "url_mappings"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    phrase = Column(String(255))
+    url = Column(String(500))
+    context = Column(String(100))
+    priority = Column(Integer, default=0)
+    click_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=func.now())
+
+class ScrapingJob(Base):
+    __tablename__ = "scraping_jobs"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    job_id = Column(String(100), unique=True, nullable=False)
+    url = Column(String(500))
+    scraper_type = Column(String(50))
+    status = Column(String(20), default="pending")
+    pages_scraped = Column(Integer, default=0)
+    pages_failed = Column(Integer, default=0)
+    error_log = Column(Text)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+
+class ScrapedContent(Base):
+    """Changed pages staged by a crawl; processed once folded into knowledge_base"""
+    __tablename__ = "scraped_content"
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("scraping_jobs.id"))
+    url = Column(String(500))
+    title = Column(String(500))
+    content = Column(Text)
+    content_hash = Column(String(64))
+    meta_data = Column("metadata", JSONB, default=dict)
+    processed = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,65 @@
+# backend/api/modules/knowledge/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List
+import uuid
+
+from ...core.database import get_async_db
+from . import models, schemas
+from .crawler import normalize_url
+from .service import crawl_runner
+
+router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
+
+@router.post("/scrape-jobs", response_model=schemas.ScrapeJob, status_code=202)
+async def create_scrape_job(
+    job: schemas.ScrapeJobCreate,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start crawling a site into the knowledge base; poll the job for progress"""
+    url = normalize_url(job.url)
+    if not url:
+        raise HTTPException(status_code=400, detail="url must be an http(s) URL")
+    
+    db_job = models.ScrapingJob(
+        customer_id=customer_id,
+        job_id=f"SCRAPE-{uuid.uuid4().hex[:8].upper()}",
+        url=url,
+        scraper_type=job.scraper_type,
+        status="pending"
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    
+    crawl_runner.launch(db_job.id, max_pages=job.max_pages, max_depth=job.max_depth)
+    return db_job
+
+@router.get("/scrape-jobs", response_model=List[schemas.ScrapeJob])
+async def list_scrape_jobs(
+    customer_id: str = Query(..., description="Customer ID"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Most recent scrape jobs of a tenant"""
+    jobs = models.ScrapingJob
+    return (await db.execute(
+        select(jobs).where(jobs.customer_id == customer_id).order_by(jobs.id.desc()).limit(limit)
+    )).scalars().all()
+
+@router.get("/scrape-jobs/{job_id}", response_model=schemas.ScrapeJob)
+async def get_scrape_job(
+    job_id: str,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Job status with live pages_scraped / pages_failed"""
+    jobs = models.ScrapingJob
+    job = (await db.execute(
+        select(jobs).where(jobs.job_id == job_id, jobs.customer_id == customer_id)
+    )).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job
@@ -0,0 +1,29 @@
+# backend/api/modules/knowledge/schemas.py
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+from .crawler import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES
+
+class ScrapeJobCreate(BaseModel):
+    url: str = Field(..., max_length=500, description="Start page; the crawl stays on its host")
+    scraper_type: str = "website"
+    max_pages: int = Field(CRAWL_MAX_PAGES, ge=1, le=10000)
+    max_depth: int = Field(CRAWL_MAX_DEPTH, ge=0, le=20)
+
+class ScrapeJob(BaseModel):
+    id: int
+    job_id: str
+    customer_id: str
+    url: str
+    scraper_type: Optional[str] = None
+    status: str
+    pages_scraped: int
+    pages_failed: int
+    error_log: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,300 @@
+# backend/api/modules/knowledge/service.py
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import AsyncSessionLocal
+from ..smart_reply.retrieval import retrieval_index
+from . import models
+from .crawler import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, Crawler, Known, Page
+
+# Crawl results are written (and progress reported) every this many pages or seconds
+CRAWL_FLUSH_PAGES = int(os.getenv("CRAWL_FLUSH_PAGES", 50))
+CRAWL_PROGRESS_SECONDS = float(os.getenv("CRAWL_PROGRESS_SECONDS", 2.0))
+# Scrape jobs running at once in this process
+CRAWL_MAX_JOBS = int(os.getenv("CRAWL_MAX_JOBS", 2))
+# Per-page errors kept in scraping_jobs.error_log
+MAX_LOGGED_ERRORS = 100
+
+STAGE_PAGES = text("""
+    INSERT INTO scraped_content (job_id, url, title, content, content_hash, metadata)
+    SELECT :job_id, p.url, left(p.title, 500), p.content, p.content_hash, CAST(p.metadata AS JSONB)
+    FROM unnest(CAST(:urls AS TEXT[]), CAST(:titles AS TEXT[]), CAST(:contents AS TEXT[]),
+                CAST(:hashes AS TEXT[]), CAST(:metadata AS TEXT[])) AS p(url, title, content, content_hash, metadata)
+""")
+
+# Same content as the current version: just record that it was checked, and fresh validators
+TOUCH_UNCHANGED = text("""
+    UPDATE knowledge_base k
+    SET last_verified = LOCALTIMESTAMP,
+        metadata = coalesce(k.metadata, '{}') || jsonb_strip_nulls(jsonb_build_object(
+            'etag', u.etag, 'last_modified', u.last_modified, 'links', CAST(u.links AS JSONB)))
+    FROM unnest(CAST(:urls AS TEXT[]), CAST(:etags AS TEXT[]), CAST(:last_modified AS TEXT[]),
+                CAST(:links AS TEXT[])) AS u(url, etag, last_modified, links)
+    WHERE k.customer_id = :customer_id AND k.is_current AND k.source_url = u.url
+""")
+
+# Knowledge base sync, in three steps over the job's unprocessed staged rows up to :upto
+# (latest row per URL wins): retire current versions whose content hash differs, insert
+# a new version for every staged URL left without a current one, mark the rows processed.
+STAGED = """
+    SELECT DISTINCT ON (url) id, url, title, content, content_hash, metadata
+    FROM scraped_content
+    WHERE job_id = :job_id AND NOT processed AND id <= :upto
+    ORDER BY url, id DESC
+"""
+
+RETIRE_CHANGED = text(f"""
+    WITH staged AS ({STAGED})
+    UPDATE knowledge_base k SET is_current = FALSE
+    FROM staged s
+    WHERE k.customer_id = :customer_id AND k.is_current AND k.source_url = s.url
+      AND k.metadata->>'content_hash' IS DISTINCT FROM s.content_hash
+""")
+
+# Category, tags and approval carry over from the previous version of the page
+INSERT_VERSIONS = text(f"""
+    WITH staged AS ({STAGED})
+    INSERT INTO knowledge_base (
+        customer_id, kb_id, title, content, content_type, source_url, category, tags,
+        metadata, version, is_current, approved, approved_by, last_verified
+    )
+    SELECT :customer_id,
+           'KB-WEB-' || left(md5(CAST(:customer_id AS VARCHAR) || '|' || s.url), 16) || '-v' || (coalesce(prev.version, 0) + 1),
+           s.title, s.content, 'webpage', s.url, coalesce(prev.category, 'website'), prev.tags,
+           s.metadata || jsonb_build_object('content_hash', s.content_hash, 'job_id', CAST(:job_id AS INTEGER)),
+           coalesce(prev.version, 0) + 1, TRUE, coalesce(prev.approved, TRUE), prev.approved_by,
+           LOCALTIMESTAMP
+    FROM staged s
+    LEFT JOIN LATERAL (
+        SELECT version, category, tags, approved, approved_by FROM knowledge_base k
+        WHERE k.customer_id = :customer_id AND k.source_url = s.url
+        ORDER BY version DESC LIMIT 1
+    ) prev ON TRUE
+    WHERE NOT EXISTS (
+        SELECT 1 FROM knowledge_base k
+        WHERE k.customer_id = :customer_id AND k.is_current AND k.source_url = s.url
+    )
+""")
+
+MARK_PROCESSED = text("""
+    UPDATE scraped_content SET processed = TRUE
+    WHERE job_id = :job_id AND NOT processed AND id <= :upto
+""")
+
+async def load_known(db: AsyncSession, customer_id: str) -> Dict[str, Known]:
+    """Validators and content hashes of the tenant's current crawled pages, keyed by URL"""
+    kb = models.KnowledgeBase
+    rows = (await db.execute(
+        select(kb.source_url, kb.meta_data)
+        .where(kb.customer_id == customer_id, kb.is_current, kb.source_url.isnot(None))
+    )).all()
+    known = {}
+    for url, meta in rows:
+        meta = meta or {}
+        known[url] = Known(
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            content_hash=meta.get("content_hash"),
+            links=tuple(meta.get("links") or ()),
+        )
+    return known
+
+async def sync_knowledge_base(db: AsyncSession, customer_id: str, job_id: int) -> Dict[str, int]:
+    """
+    Fold a job's staged pages into knowledge_base: a new version only where the content
+    hash changed, the old one kept as history with is_current = FALSE. Commits.
+    """
+    # One sync per tenant at a time, so two crawls can't both create the next version
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('knowledge_base:' || CAST(:customer_id AS VARCHAR)))"),
+                     {"customer_id": customer_id})
+    upto = await db.scalar(text(
+        "SELECT max(id) FROM scraped_content WHERE job_id = :job_id AND NOT processed"
+    ), {"job_id": job_id})
+    if upto is None:
+        await db.commit()
+        return {"retired": 0, "created": 0}
+
+    params = {"customer_id": customer_id, "job_id": job_id, "upto": upto}
+    retired = (await db.execute(RETIRE_CHANGED, params)).rowcount
+    created = (await db.execute(INSERT_VERSIONS, params)).rowcount
+    await db.execute(MARK_PROCESSED, params)
+    await db.commit()
+    if retired or created:
+        retrieval_index.mark_stale(customer_id)
+    return {"retired": retired, "created": created}
+
+def _metadata(page: Page) -> Dict[str, Any]:
+    return {"etag": page.etag, "last_modified": page.last_modified, "links": list(page.links)}
+
+class JobWriter:
+    """
+    Buffers crawl results and writes them every CRAWL_FLUSH_PAGES pages or
+    CRAWL_PROGRESS_SECONDS: changed pages staged into scraped_content and synced into
+    knowledge_base, unchanged ones touched, and pages_scraped / pages_failed updated.
+    """
+
+    def __init__(self, job_id: int, customer_id: str, flush_pages: int = CRAWL_FLUSH_PAGES):
+        self.job_id = job_id
+        self.customer_id = customer_id
+        self.flush_pages = flush_pages
+        self.scraped = 0
+        self.failed = 0
+        self.staged = 0
+        self.versions_created = 0
+        self.errors: List[str] = []
+        self._pending: List[Page] = []
+        self._lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+
+    async def add(self, page: Page):
+        if page.outcome == "failed":
+            self.failed += 1
+            if len(self.errors) < MAX_LOGGED_ERRORS:
+                self.errors.append(f"{page.url}: {page.error}")
+        elif page.outcome != "skipped":
+            self.scraped += 1
+        self._pending.append(page)
+        if len(self._pending) >= self.flush_pages or time.monotonic() - self._last_flush >= CRAWL_PROGRESS_SECONDS:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            pages, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            changed = [page for page in pages if page.outcome == "changed"]
+            unchanged = [page for page in pages if page.outcome in ("unchanged", "not_modified")]
+
+            async with AsyncSessionLocal() as db:
+                if changed:
+                    await db.execute(STAGE_PAGES, {
+                        "job_id": self.job_id,
+                        "urls": [page.url for page in changed],
+                        "titles": [page.title for page in changed],
+                        "contents": [page.content for page in changed],
+                        "hashes": [page.content_hash for page in changed],
+                        "metadata": [orjson.dumps(_metadata(page)).decode() for page in changed],
+                    })
+                if unchanged:
+                    await db.execute(TOUCH_UNCHANGED, {
+                        "customer_id": self.customer_id,
+                        "urls": [page.url for page in unchanged],
+                        "etags": [page.etag for page in unchanged],
+                        "last_modified": [page.last_modified for page in unchanged],
+                        "links": [orjson.dumps(list(page.links)).decode() if page.links else None for page in unchanged],
+                    })
+                await db.execute(
+                    update(models.ScrapingJob)
+                    .where(models.ScrapingJob.id == self.job_id)
+                    .values(
+                        pages_scraped=self.scraped,
+                        pages_failed=self.failed,
+                        error_log="\n".join(self.errors) or None,
+                    )
+                )
+                await db.commit()
+
+                if changed:
+                    self.staged += len(changed)
+                    self.versions_created += (await sync_knowledge_base(db, self.customer_id, self.job_id))["created"]
+
+async def _finish_job(job_id: int, status: str, writer: Optional[JobWriter], error: Optional[str] = None):
+    values = {"status": status, "completed_at": func.localtimestamp()}
+    errors = list(writer.errors) if writer else []
+    if writer:
+        values.update(pages_scraped=writer.scraped, pages_failed=writer.failed)
+    if error:
+        errors.append(error)
+    if errors:
+        values["error_log"] = "\n".join(errors)
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(models.ScrapingJob).where(models.ScrapingJob.id == job_id).values(**values))
+        await db.commit()
+
+async def run_scrape_job(
+    job_id: int,
+    max_pages: int = CRAWL_MAX_PAGES,
+    max_depth: int = CRAWL_MAX_DEPTH,
+    client: Optional[httpx.AsyncClient] = None,
+    **crawler_options
+) -> Dict[str, Any]:
+    """Crawl a scraping_jobs row's site into its tenant's knowledge base, reporting progress as it goes"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(models.ScrapingJob, job_id)
+        if job is None:
+            raise ValueError(f"Scraping job {job_id} not found")
+        customer_id, url = job.customer_id, job.url
+        await db.execute(
+            update(models.ScrapingJob).where(models.ScrapingJob.id == job_id)
+            .values(status="running", started_at=func.localtimestamp(), completed_at=None,
+                    pages_scraped=0, pages_failed=0, error_log=None)
+        )
+        await db.commit()
+        known = await load_known(db, customer_id)
+
+    writer = None
+    started = time.perf_counter()
+    try:
+        crawler = Crawler(url, known, max_pages=max_pages, max_depth=max_depth, client=client, **crawler_options)
+        writer = JobWriter(job_id, customer_id)
+        outcomes = await crawler.run(writer.add)
+        await writer.flush()
+    except asyncio.CancelledError:
+        if writer:
+            await writer.flush()
+        await _finish_job(job_id, "cancelled", writer)
+        raise
+    except Exception as e:
+        await _finish_job(job_id, "failed", writer, f"Crawl failed: {e}")
+        raise
+    await _finish_job(job_id, "completed", writer)
+
+    return {
+        "job_id": job_id,
+        "outcomes": outcomes,
+        "pages_scraped": writer.scraped,
+        "pages_failed": writer.failed,
+        "staged": writer.staged,
+        "versions_created": writer.versions_created,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+class CrawlRunner:
+    """Scrape jobs launched from the API, run as background tasks in this process"""
+
+    def __init__(self, max_jobs: int = CRAWL_MAX_JOBS):
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def _run(self, job_id: int, options: Dict[str, Any]):
+        async with self._slots:
+            try:
+                await run_scrape_job(job_id, **options)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Scrape job {job_id} failed: {e}")
+
+    def launch(self, job_id: int, **options):
+        task = asyncio.create_task(self._run(job_id, options))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def is_running(self, job_id: int) -> bool:
+        return job_id in self._tasks
+
+    async def stop(self):
+        """Cancel running crawls; each records what it wrote so far and ends as 'cancelled'"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# Process-wide runner, stopped by the app lifespan
+crawl_runner = CrawlRunner()
@@ -0,0 +1,223 @@
+# backend/api/modules/licensing/cache.py
+import asyncio
+import os
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, NamedTuple, Optional
+
+from sqlalchemy import text
+
+from ...core.database import async_engine
+
+# How often each process re-reads the licenses it has cached: plan changes, and usage
+# merged by other processes, are seen here within this many seconds
+LICENSE_REFRESH_SECONDS = float(os.getenv("LICENSE_REFRESH_SECONDS", 30))
+# Tenants held per process; past this the least recently used is dropped (read again when next seen)
+LICENSE_MAX_TENANTS = int(os.getenv("LICENSE_MAX_TENANTS", 10_000))
+
+# Statuses a tenant may use the API under (past_due: the grace period while payment is retried)
+USABLE_STATUSES = ("active", "trial", "past_due")
+
+# A tenant's license is its newest usable one, else its newest
+CURRENT_LICENSE_ORDER = f"(status IN {USABLE_STATUSES}) DESC, id DESC"
+
+# current_usage keys counted per billing period (emails_this_month...), and the key
+# recording which period they count. The period is the license's current billing
+# period, else (no period, or one that ended without being renewed) the calendar month.
+PERIOD_METRIC_SUFFIX = "_this_month"
+USAGE_PERIOD_KEY = "usage_period"
+USAGE_PERIOD = """CAST(
+    CASE WHEN current_period_start IS NOT NULL
+              AND (current_period_end IS NULL OR current_period_end > localtimestamp)
+         THEN current_period_start ELSE date_trunc('month', localtimestamp) END
+    AS VARCHAR
+)"""
+
+SELECT_LICENSES = text(f"""
+    SELECT DISTINCT ON (customer_id)
+           customer_id, license_id, status, plan_id, modules_included, usage_limits, current_usage,
+           user_limit, current_users, trial_ends_at, {USAGE_PERIOD} AS usage_period
+    FROM licenses
+    WHERE customer_id = ANY(CAST(:customer_ids AS VARCHAR[]))
+    ORDER BY customer_id, {CURRENT_LICENSE_ORDER}
+""")
+
+def _numbers(values: Any) -> Dict[str, float]:
+    """The numeric entries of a usage_limits / current_usage object"""
+    if not isinstance(values, dict):
+        return {}
+    return {
+        key: value for key, value in values.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+def _period_usage(usage: Any, period: str) -> Dict[str, float]:
+    """current_usage as of the period: counts of an earlier one start again from zero"""
+    numbers = _numbers(usage)
+    if isinstance(usage, dict) and usage.get(USAGE_PERIOD_KEY) == period:
+        return numbers
+    return {key: value for key, value in numbers.items() if not key.endswith(PERIOD_METRIC_SUFFIX)}
+
+class LicenseSnapshot(NamedTuple):
+    customer_id: str
+    # None: the tenant has no license row
+    license_id: Optional[str]
+    status: Optional[str]
+    plan_id: Optional[str]
+    # None: modules_included not set, every module is included
+    modules: Optional[FrozenSet[str]]
+    limits: Dict[str, float]
+    # current_usage as last read or merged; counts not yet merged are held by the meter
+    usage: Dict[str, float]
+    user_limit: Optional[int]
+    current_users: int
+    trial_ends_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, row) -> "LicenseSnapshot":
+        modules = row.modules_included
+        return cls(
+            customer_id=row.customer_id,
+            license_id=row.license_id,
+            status=row.status,
+            plan_id=row.plan_id,
+            modules=frozenset(modules) if isinstance(modules, list) else None,
+            limits=_numbers(row.usage_limits),
+            usage=_period_usage(row.current_usage, row.usage_period),
+            user_limit=row.user_limit,
+            current_users=row.current_users or 0,
+            trial_ends_at=row.trial_ends_at,
+        )
+
+    @classmethod
+    def unlicensed(cls, customer_id: str) -> "LicenseSnapshot":
+        return cls(customer_id, None, None, None, None, {}, {}, None, 0, None)
+
+    def usable(self) -> Optional[str]:
+        """Why the tenant can't use the API, or None if it can"""
+        if self.license_id is None:
+            return "No license"
+        if self.status not in USABLE_STATUSES:
+            return f"License is {self.status}"
+        if self.status == "trial" and self.trial_ends_at is not None and self.trial_ends_at < datetime.utcnow():
+            return "Trial has ended"
+        return None
+
+class LicenseCache:
+    """
+    The current license of each tenant, read once and then served from memory so the
+    checks on a request touch no database. Tenants without a license are cached too,
+    so the cache keeps the LICENSE_MAX_TENANTS most recently used. A background task re-reads every cached tenant in one query; the usage meter also
+    hands back current_usage as each merge leaves it.
+    """
+
+    def __init__(self, refresh_seconds: float = LICENSE_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: "OrderedDict[str, LicenseSnapshot]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def cached(self, customer_id: str) -> Optional[LicenseSnapshot]:
+        snapshot = self._snapshots.get(customer_id)
+        if snapshot is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._snapshots.move_to_end(customer_id)
+        return snapshot
+
+    def _store(self, customer_id: str, snapshot: LicenseSnapshot):
+        self._snapshots[customer_id] = snapshot
+        self._snapshots.move_to_end(customer_id)
+        while len(self._snapshots) > LICENSE_MAX_TENANTS:
+            self._snapshots.popitem(last=False)
+
+    async def _read(self, customer_ids: Iterable[str]) -> Dict[str, LicenseSnapshot]:
+        customer_ids = list(customer_ids)
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(SELECT_LICENSES, {"customer_ids": customer_ids})).all()
+        snapshots = {customer_id: LicenseSnapshot.unlicensed(customer_id) for customer_id in customer_ids}
+        snapshots.update((row.customer_id, LicenseSnapshot.from_row(row)) for row in rows)
+        return snapshots
+
+    async def load(self, customer_id: str) -> LicenseSnapshot:
+        """The tenant's license, read once however many requests wait for it"""
+        snapshot = self._snapshots.get(customer_id)
+        if snapshot is not None:
+            return snapshot
+        lock = self._locks.setdefault(customer_id, asyncio.Lock())
+        try:
+            async with lock:
+                snapshot = self._snapshots.get(customer_id)
+                if snapshot is None:
+                    snapshot = (await self._read([customer_id]))[customer_id]
+                    self._store(customer_id, snapshot)
+                return snapshot
+        finally:
+            # Requests already waiting hold the lock object; a later one finds the snapshot cached
+            if self._locks.get(customer_id) is lock and not lock.locked():
+                del self._locks[customer_id]
+
+    async def get(self, customer_id: str) -> LicenseSnapshot:
+        snapshot = self.cached(customer_id)
+        return snapshot if snapshot is not None else await self.load(customer_id)
+
+    def merged(self, customer_id: str, usage: Any, current_users: Optional[int]):
+        """Take current_usage as a merge left it (other processes' counts included)"""
+        snapshot = self._snapshots.get(customer_id)
+        if snapshot is not None:
+            self._snapshots[customer_id] = snapshot._replace(
+                usage=_numbers(usage),
+                current_users=snapshot.current_users if current_users is None else current_users,
+            )
+
+    def invalidate(self, customer_id: str):
+        self._snapshots.pop(customer_id, None)
+
+    def clear(self):
+        self._snapshots.clear()
+
+    async def refresh(self) -> int:
+        """Re-read every cached tenant; returns how many"""
+        if not self._snapshots:
+            return 0
+        for customer_id, snapshot in (await self._read(list(self._snapshots))).items():
+            # Not one dropped or invalidated while the read ran
+            if customer_id in self._snapshots:
+                self._snapshots[customer_id] = snapshot
+        self.refreshes += 1
+        return len(self._snapshots)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"License refresh failed: {e}")
+
+    def start(self):
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+
+    def stats(self) -> dict:
+        return {
+            "tenants": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+# Process-wide cache, refreshed by the app lifespan
+license_cache = LicenseCache()
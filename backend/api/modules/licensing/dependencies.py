@@ -0,0 +1,100 @@
+# backend/api/modules/licensing/dependencies.py
+"""
+License checks and metering: `Depends(licensed("crm"))` on a route or router counts
+the request against the tenant's usage and checks its cached license (usable, the
+module included, the API call limit not reached); `Depends(within_quota(EMAILS))`
+checks another metered limit before work that consumes it. Neither touches the
+database once the tenant's license is cached.
+"""
+import logging
+import os
+from collections import Counter
+from typing import Callable, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from .cache import LicenseSnapshot, license_cache
+from .meter import API_CALLS, limit_name, usage_meter
+
+# enforce: refuse with 402/403/429. audit: allow, but log and count what would be
+# refused (the default, until every tenant has its license rows). off: no metering.
+METERING_MODE = os.getenv("METERING_MODE", "audit").lower()
+# Distinct (customer, reason) refusals logged in audit mode; later repeats are only counted
+METERING_AUDIT_LOG_LIMIT = 1000
+
+metering_log = logging.getLogger("api.licensing")
+
+denials: Counter = Counter()
+_logged: Set[Tuple] = set()
+
+def _deny(status_code: int, detail: str, customer_id: str, check: str):
+    denials[check] += 1
+    if METERING_MODE == "enforce":
+        raise HTTPException(status_code=status_code, detail=detail)
+    key = (customer_id, detail)
+    if key not in _logged and len(_logged) < METERING_AUDIT_LOG_LIMIT:
+        _logged.add(key)
+        metering_log.warning("License would refuse %s: %s", customer_id, detail)
+
+def over_limit(snapshot: LicenseSnapshot, metric: str) -> Optional[str]:
+    """The limit on metric the tenant has reached, if any"""
+    name = limit_name(metric)
+    limit = snapshot.limits.get(name)
+    if limit is None:
+        return None
+    used = snapshot.usage.get(metric, 0) + usage_meter.unmerged(snapshot.customer_id, metric)
+    return f"{name} limit of {limit:g} reached" if used >= limit else None
+
+async def _snapshot(request: Request) -> Optional[LicenseSnapshot]:
+    customer_id = request.query_params.get("customer_id") or request.path_params.get("customer_id")
+    if not customer_id:
+        return None
+    snapshot = license_cache.cached(customer_id)
+    return snapshot if snapshot is not None else await license_cache.load(customer_id)
+
+def licensed(module: Optional[str] = None) -> Callable:
+    """A dependency metering the request and checking the tenant's license covers it"""
+
+    async def check(request: Request):
+        if METERING_MODE == "off":
+            return
+        snapshot = await _snapshot(request)
+        if snapshot is None:
+            return
+
+        reason = snapshot.usable()
+        if reason is not None:
+            _deny(402, reason, snapshot.customer_id, "license")
+            return
+        if module is not None and snapshot.modules is not None and module not in snapshot.modules:
+            _deny(403, f"The {snapshot.plan_id} plan does not include {module}", snapshot.customer_id, module)
+        else:
+            reached = over_limit(snapshot, API_CALLS)
+            if reached is not None:
+                _deny(429, reached, snapshot.customer_id, API_CALLS)
+        usage_meter.record(snapshot.customer_id, API_CALLS)
+
+    return check
+
+def within_quota(metric: str) -> Callable:
+    """A dependency refusing the request once the tenant's limit on metric is reached"""
+
+    async def check(request: Request):
+        if METERING_MODE == "off":
+            return
+        snapshot = await _snapshot(request)
+        if snapshot is None or snapshot.license_id is None:
+            return
+        reached = over_limit(snapshot, metric)
+        if reached is not None:
+            _deny(429, reached, snapshot.customer_id, metric)
+
+    return check
+
+def stats() -> dict:
+    return {
+        "mode": METERING_MODE,
+        "denials": dict(denials),
+        **license_cache.stats(),
+        **usage_meter.stats(),
+    }
@@ -0,0 +1,235 @@
+# backend/api/modules/licensing/meter.py
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ...core.database import async_engine
+from .cache import (
+    CURRENT_LICENSE_ORDER, PERIOD_METRIC_SUFFIX, USAGE_PERIOD, USAGE_PERIOD_KEY, LicenseCache, license_cache
+)
+
+# How often each process merges its counts into licenses.current_usage. Limits are
+# checked against the merged usage plus this process's own unmerged counts, so with
+# several processes a tenant can overshoot by what the others counted in one interval.
+METERING_FLUSH_SECONDS = float(os.getenv("METERING_FLUSH_SECONDS", 10.0))
+METERING_DRAIN_SECONDS = float(os.getenv("METERING_DRAIN_SECONDS", 5.0))
+
+# current_usage keys; a limit on one is usage_limits[<name>_per_month]. They count
+# the license's billing period and start again from zero when it changes.
+API_CALLS = "api_calls" + PERIOD_METRIC_SUFFIX
+EMAILS = "emails" + PERIOD_METRIC_SUFFIX
+
+# Row locks in id order first, so processes merging the same tenants at once queue
+# rather than deadlock
+LOCK_LICENSES = text(f"""
+    SELECT id FROM licenses
+    WHERE id IN (
+        SELECT DISTINCT ON (customer_id) id FROM licenses
+        WHERE customer_id = ANY(CAST(:customer_ids AS VARCHAR[]))
+        ORDER BY customer_id, {CURRENT_LICENSE_ORDER}
+    )
+    ORDER BY id
+    FOR UPDATE
+""")
+
+# Each count is added to the value in the row being updated, never to one read
+# beforehand, so merges from any number of processes add up. The first merge of a new
+# billing period drops the previous period's counts, as reads of the license already
+# do. current_users is recounted while the row is locked anyway.
+MERGE_USAGE = text(f"""
+    UPDATE licenses l
+    SET current_usage = p.usage || jsonb_build_object('{USAGE_PERIOD_KEY}', p.period) || (
+            SELECT jsonb_object_agg(
+                u.metric,
+                CASE WHEN jsonb_typeof(p.usage -> u.metric) = 'number'
+                     THEN (p.usage ->> u.metric)::numeric ELSE 0 END + u.amount
+            )
+            FROM unnest(d.metrics, d.amounts) AS u(metric, amount)
+        ),
+        current_users = (
+            SELECT count(*) FROM users WHERE users.customer_id = l.customer_id AND users.status = 'active'
+        )
+    FROM (
+        SELECT c.customer_id, array_agg(c.metric) AS metrics, array_agg(c.amount) AS amounts
+        FROM unnest(
+            CAST(:customer_ids AS VARCHAR[]),
+            CAST(:metrics AS VARCHAR[]),
+            CAST(:amounts AS BIGINT[])
+        ) AS c(customer_id, metric, amount)
+        GROUP BY c.customer_id
+    ) d,
+    (
+        SELECT x.id, x.period,
+               CASE WHEN x.usage ->> '{USAGE_PERIOD_KEY}' IS DISTINCT FROM x.period
+                    THEN (
+                        SELECT coalesce(jsonb_object_agg(e.key, e.value), '{{}}')
+                        FROM jsonb_each(x.usage) e
+                        WHERE right(e.key, {len(PERIOD_METRIC_SUFFIX)}) <> '{PERIOD_METRIC_SUFFIX}'
+                    )
+                    ELSE x.usage END AS usage
+        FROM (
+            SELECT id, {USAGE_PERIOD} AS period,
+                   CASE WHEN jsonb_typeof(current_usage) = 'object' THEN current_usage ELSE '{{}}' END AS usage
+            FROM licenses
+            WHERE id = ANY(CAST(:license_ids AS INTEGER[]))
+        ) x
+    ) p
+    WHERE l.id = p.id AND l.customer_id = d.customer_id
+    RETURNING l.customer_id, l.current_usage, l.current_users
+""")
+
+def limit_name(metric: str) -> str:
+    """The usage_limits key capping a current_usage key (emails_this_month -> emails_per_month)"""
+    if metric.endswith(PERIOD_METRIC_SUFFIX):
+        return metric[:-len(PERIOD_METRIC_SUFFIX)] + "_per_month"
+    return metric
+
+class UsageMeter:
+    """
+    Per-tenant usage counted in process memory, so metering a request is a dict
+    increment rather than a write. A background task merges the counts into each
+    tenant's current license in one statement per interval, and hands the merged
+    current_usage to the license cache. Counts of a merge that fails are kept for
+    the next one; counts of tenants without a license are dropped.
+    """
+
+    def __init__(
+        self,
+        flush_seconds: float = METERING_FLUSH_SECONDS,
+        cache: LicenseCache = license_cache,
+        engine: AsyncEngine = async_engine,
+    ):
+        self.flush_seconds = flush_seconds
+        self.cache = cache
+        self.engine = engine
+        self._counts: Dict[str, Counter] = {}
+        # Counts taken by a merge still in progress, so limits keep seeing them
+        self._merging: Dict[str, Counter] = {}
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        # Counters, reported by stats()
+        self.recorded = 0
+        self.merged = 0
+        self.unlicensed = 0
+        self.failures = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def record(self, customer_id: str, metric: str, amount: int = 1):
+        counts = self._counts.get(customer_id)
+        if counts is None:
+            counts = self._counts[customer_id] = Counter()
+        counts[metric] += amount
+        self.recorded += amount
+
+    def unmerged(self, customer_id: str, metric: str) -> int:
+        """This process's count of metric not yet in current_usage"""
+        counts = self._counts.get(customer_id)
+        merging = self._merging.get(customer_id)
+        return (counts[metric] if counts else 0) + (merging[metric] if merging else 0)
+
+    def unmerged_all(self, customer_id: str) -> Dict[str, int]:
+        totals = Counter(self._counts.get(customer_id, ()))
+        totals.update(self._merging.get(customer_id, {}))
+        return dict(totals)
+
+    async def _merge(self, counts: Dict[str, Counter]) -> List:
+        customer_ids, metrics, amounts = [], [], []
+        for customer_id, tenant_counts in counts.items():
+            for metric, amount in tenant_counts.items():
+                if amount:
+                    customer_ids.append(customer_id)
+                    metrics.append(metric)
+                    amounts.append(amount)
+        if not customer_ids:
+            return []
+        async with self.engine.begin() as conn:
+            license_ids = list((await conn.execute(LOCK_LICENSES, {"customer_ids": list(counts)})).scalars())
+            if not license_ids:
+                return []
+            return (await conn.execute(MERGE_USAGE, {
+                "customer_ids": customer_ids,
+                "metrics": metrics,
+                "amounts": amounts,
+                "license_ids": license_ids,
+            })).all()
+
+    async def flush(self):
+        """Merge the counts taken so far into current_usage"""
+        async with self._lock:
+            if not self._counts:
+                return
+            self._merging, self._counts = self._counts, {}
+            started = time.perf_counter()
+            try:
+                rows = await self._merge(self._merging)
+            except asyncio.CancelledError:
+                self._restore()
+                raise
+            except Exception as e:
+                self.failures += 1
+                print(f"Usage merge failed, keeping counts for the next one: {e}")
+                self._restore()
+                return
+            merged = set()
+            for customer_id, usage, current_users in rows:
+                merged.add(customer_id)
+                self.merged += sum(self._merging[customer_id].values())
+                self.cache.merged(customer_id, usage, current_users)
+            self.unlicensed += sum(
+                sum(counts.values()) for customer_id, counts in self._merging.items() if customer_id not in merged
+            )
+            self._merging = {}
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def _restore(self):
+        for customer_id, counts in self._merging.items():
+            self._counts.setdefault(customer_id, Counter()).update(counts)
+        self._merging = {}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Usage meter error: {e}")
+
+    def start(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = METERING_DRAIN_SECONDS):
+        """Stop the background merges, then merge what is left"""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            print("Usage meter did not drain in time")
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "merged": self.merged,
+            "unlicensed": self.unlicensed,
+            "unmerged": sum(sum(counts.values()) for counts in self._counts.values()),
+            "failures": self.failures,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+# Process-wide meter, merged in the background by the app lifespan
+usage_meter = UsageMeter()
@@ -0,0 +1,41 @@
+# backend/api/modules/licensing/routes.py
+from fastapi import APIRouter, Query
+
+from . import dependencies, schemas
+from .cache import license_cache
+from .meter import API_CALLS, usage_meter
+
+router = APIRouter(prefix="/api/licenses", tags=["licenses"])
+
+@router.get("/usage", response_model=schemas.LicenseUsage)
+async def license_usage(
+    customer_id: str = Query(..., description="Customer ID"),
+    fresh: bool = Query(False, description="Re-read the license instead of the cached one")
+):
+    """The tenant's license, limits and usage as the checks on its requests see them"""
+    if fresh:
+        license_cache.invalidate(customer_id)
+    snapshot = await license_cache.get(customer_id)
+    unmerged = usage_meter.unmerged_all(customer_id)
+    usage = dict(snapshot.usage)
+    for metric, amount in unmerged.items():
+        usage[metric] = usage.get(metric, 0) + amount
+    return schemas.LicenseUsage(
+        customer_id=customer_id,
+        license_id=snapshot.license_id,
+        status=snapshot.status,
+        plan_id=snapshot.plan_id,
+        modules=sorted(snapshot.modules) if snapshot.modules is not None else None,
+        limits=snapshot.limits,
+        usage=usage,
+        unmerged=unmerged,
+        user_limit=snapshot.user_limit,
+        current_users=snapshot.current_users,
+        trial_ends_at=snapshot.trial_ends_at,
+        refused=snapshot.usable() or dependencies.over_limit(snapshot, API_CALLS)
+    )
+
+@router.get("/stats", response_model=schemas.MeteringStats)
+async def metering_stats():
+    """License cache and usage meter counters for this worker process"""
+    return schemas.MeteringStats(**dependencies.stats())
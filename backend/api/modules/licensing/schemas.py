@@ -0,0 +1,36 @@
+# backend/api/modules/licensing/schemas.py
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+class LicenseUsage(BaseModel):
+    customer_id: str
+    license_id: Optional[str] = None
+    status: Optional[str] = None
+    plan_id: Optional[str] = None
+    # None: every module is included
+    modules: Optional[List[str]] = None
+    limits: Dict[str, float]
+    # Merged usage plus this process's counts not merged yet
+    usage: Dict[str, float]
+    unmerged: Dict[str, int]
+    user_limit: Optional[int] = None
+    current_users: int
+    trial_ends_at: Optional[datetime] = None
+    # Why requests would be refused, if they would
+    refused: Optional[str] = None
+
+class MeteringStats(BaseModel):
+    mode: str
+    denials: Dict[str, int]
+    tenants: int
+    hits: int
+    misses: int
+    refreshes: int
+    recorded: int
+    merged: int
+    unlicensed: int
+    unmerged: int
+    failures: int
+    flushes: int
+    last_flush_ms: float
@@ -0,0 +1,286 @@
+# backend/api/modules/notifications/hub.py
+"""
+Unread counts and the push channel. Each process keeps the unread count of the users
+it has been asked about, adjusted as its own writes commit, and the open notification
+streams of its clients. A background poll reads notification_counts for those users
+in one query and fetches new notifications only for connected users whose count
+moved, so writes from other processes (or SQL) reach every stream within a poll.
+"""
+import asyncio
+import os
+from contextlib import suppress
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from ...core.database import async_engine
+
+# How often each process re-reads the counts it holds (and pushes what other processes wrote)
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", 2.0))
+# Events waiting for a slow stream; past this it is closed, and replays from Last-Event-ID on reconnect
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 100))
+# Unread counts held per process; past this the ones of users without a stream are dropped
+NOTIFICATION_MAX_CACHED_USERS = int(os.getenv("NOTIFICATION_MAX_CACHED_USERS", 100_000))
+# New notifications fetched per poll; more wait for the next one
+NOTIFICATION_POLL_BATCH = 1000
+
+# Key on session.info for the open transaction's notification writes
+PENDING_KEY = "notifications_pending"
+
+NOTIFICATION_COLUMNS = (
+    "id, customer_id, user_id, type, priority, title, message, action_url, read, created_at, expires_at"
+)
+
+SELECT_COUNT = text("SELECT unread FROM notification_counts WHERE user_id = :user_id")
+SELECT_COUNTS = text("""
+    SELECT user_id, unread FROM notification_counts
+    WHERE user_id = ANY(CAST(:user_ids AS VARCHAR[]))
+""")
+SELECT_LATEST_ID = text("SELECT max(id) FROM notifications WHERE user_id = :user_id")
+SELECT_SINCE = text(f"""
+    SELECT {NOTIFICATION_COLUMNS} FROM notifications
+    WHERE user_id = :user_id AND id > :after_id
+    ORDER BY id
+    LIMIT :limit
+""")
+SELECT_NEW = text("""
+    SELECT n.id, n.customer_id, n.user_id, n.type, n.priority, n.title, n.message, n.action_url, n.read,
+           n.created_at, n.expires_at
+    FROM unnest(CAST(:user_ids AS VARCHAR[]), CAST(:after_ids AS INTEGER[])) AS s(user_id, after_id)
+    JOIN notifications n ON n.user_id = s.user_id AND n.id > s.after_id
+    WHERE NOT coalesce(n.read, FALSE)
+    ORDER BY n.id
+    LIMIT :limit
+""")
+
+def notification_data(row) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    for key in ("created_at", "expires_at"):
+        if data[key] is not None:
+            data[key] = data[key].isoformat()
+    return data
+
+def sse_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    head = b"id: %d\n" % event_id if event_id is not None else b""
+    return head + b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+class Subscription:
+    """One open stream: events queued for it, and the newest notification it was sent"""
+
+    __slots__ = ("user_id", "queue", "last_id", "closed")
+
+    def __init__(self, user_id: str, last_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.last_id = last_id
+        self.closed = False
+
+    def close(self):
+        """End the stream: whatever is queued is dropped for the end marker"""
+        if not self.closed:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+class NotificationHub:
+
+    def __init__(
+        self,
+        poll_seconds: float = NOTIFICATION_POLL_SECONDS,
+        queue_size: int = NOTIFICATION_QUEUE_SIZE,
+        engine: AsyncEngine = async_engine,
+    ):
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self.engine = engine
+        self._unread: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._poller: Optional[asyncio.Task] = None
+        # Counters, reported by stats()
+        self.hits = 0
+        self.misses = 0
+        self.pushed = 0
+        self.overflowed = 0
+        self.polls = 0
+
+    async def unread(self, user_id: str) -> int:
+        """The user's unread count, read from notification_counts once, then kept here"""
+        count = self._unread.get(user_id)
+        if count is not None:
+            self.hits += 1
+            return count
+        self.misses += 1
+        async with self.engine.connect() as conn:
+            count = (await conn.execute(SELECT_COUNT, {"user_id": user_id})).scalar() or 0
+        if len(self._unread) >= NOTIFICATION_MAX_CACHED_USERS:
+            self._unread = {user: unread for user, unread in self._unread.items() if user in self._subscribers}
+        # A count written here meanwhile (created / read) is newer than the one just read
+        return self._unread.setdefault(user_id, count)
+
+    async def subscribe(self, user_id: str, last_event_id: Optional[int] = None) -> Tuple[Subscription, List]:
+        """Open a stream; returns it with the notifications it missed since last_event_id"""
+        subscription = Subscription(user_id, last_event_id or 0, self.queue_size)
+        # Registered before reading, so nothing committed in between is missed
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        async with self.engine.connect() as conn:
+            if last_event_id is None:
+                subscription.last_id = max(
+                    subscription.last_id,
+                    (await conn.execute(SELECT_LATEST_ID, {"user_id": user_id})).scalar() or 0
+                )
+                missed = []
+            else:
+                # A client further behind than this reloads the list instead
+                missed = (await conn.execute(SELECT_SINCE, {
+                    "user_id": user_id, "after_id": last_event_id, "limit": self.queue_size
+                })).all()
+                if missed:
+                    subscription.last_id = max(subscription.last_id, missed[-1].id)
+        await self.unread(user_id)
+        return subscription, missed
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+
+    def _push(self, subscription: Subscription, item: Tuple[Optional[int], bytes]):
+        if subscription.closed:
+            return
+        try:
+            subscription.queue.put_nowait(item)
+            self.pushed += 1
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            self.unsubscribe(subscription)
+            subscription.close()
+
+    def _push_unread(self, user_id: str):
+        payload = sse_event("unread", {"unread": self._unread.get(user_id, 0)})
+        for subscription in list(self._subscribers.get(user_id, ())):
+            self._push(subscription, (None, payload))
+
+    def _push_notifications(self, rows: Iterable):
+        for row in rows:
+            subscriptions = self._subscribers.get(row.user_id)
+            if not subscriptions:
+                continue
+            payload = sse_event("notification", notification_data(row), row.id)
+            for subscription in list(subscriptions):
+                if row.id > subscription.last_id:
+                    subscription.last_id = row.id
+                    self._push(subscription, (row.id, payload))
+
+    def created(self, rows: List):
+        """Notifications committed by this process: count them and push them now"""
+        changed = set()
+        for row in rows:
+            if not row.read and row.user_id in self._unread:
+                self._unread[row.user_id] += 1
+                changed.add(row.user_id)
+        self._push_notifications(rows)
+        for user_id in changed:
+            self._push_unread(user_id)
+
+    def marked_read(self, user_id: str, count: int):
+        """Notifications of the user marked read by this process"""
+        if count and user_id in self._unread:
+            self._unread[user_id] = max(self._unread[user_id] - count, 0)
+            self._push_unread(user_id)
+
+    async def poll(self) -> int:
+        """Take the counts other processes changed, and push their new notifications; returns users changed"""
+        if not self._unread:
+            return 0
+        held = dict(self._unread)
+        async with self.engine.connect() as conn:
+            counts = dict((await conn.execute(SELECT_COUNTS, {"user_ids": list(held)})).all())
+            changed = [user_id for user_id, unread in held.items() if counts.get(user_id, 0) != unread]
+            streaming = [user_id for user_id in changed if user_id in self._subscribers]
+            rows = []
+            if streaming:
+                after_ids = [min(s.last_id for s in self._subscribers[user_id]) for user_id in streaming]
+                rows = (await conn.execute(SELECT_NEW, {
+                    "user_ids": streaming, "after_ids": after_ids, "limit": NOTIFICATION_POLL_BATCH
+                })).all()
+        for user_id in changed:
+            # Unless this process changed it while the poll ran: that count is newer
+            if self._unread.get(user_id) == held[user_id]:
+                self._unread[user_id] = counts.get(user_id, 0)
+        self._push_notifications(rows)
+        for user_id in changed:
+            self._push_unread(user_id)
+        self.polls += 1
+        return len(changed)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Notification poll failed: {e}")
+
+    def start(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop polling and end every open stream (the server waits for them otherwise)"""
+        if self._poller is not None:
+            self._poller.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "cached_users": len(self._unread),
+            "streams": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "pushed": self.pushed,
+            "overflowed": self.overflowed,
+            "polls": self.polls,
+        }
+
+# Process-wide hub, polled by the app lifespan
+notification_hub = NotificationHub()
+
+def stash(session: Session, created: Iterable = (), read: Optional[Tuple[str, int]] = None):
+    """Hold a transaction's notification writes until it commits (then counted and pushed)"""
+    if not event.contains(Session, "after_commit", _after_commit):
+        return  # No hub in this process (form intake workers): API processes pick them up by polling
+    pending = session.info.setdefault(PENDING_KEY, ([], []))
+    pending[0].extend(created)
+    if read is not None:
+        pending[1].append(read)
+
+def _after_commit(session: Session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending is None:
+        return
+    created, read = pending
+    if created:
+        notification_hub.created(created)
+    for user_id, count in read:
+        notification_hub.marked_read(user_id, count)
+
+def _after_rollback(session: Session):
+    session.info.pop(PENDING_KEY, None)
+
+def install(session_class=Session):
+    """Register the hooks on a session class (Session covers AsyncSession too)"""
+    if not event.contains(session_class, "after_commit", _after_commit):
+        event.listen(session_class, "after_commit", _after_commit)
+        event.listen(session_class, "after_rollback", _after_rollback)
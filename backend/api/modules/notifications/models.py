@@ -0,0 +1,37 @@
+# backend/api/modules/notifications/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    user_id = Column(String(50), ForeignKey("users.user_id"))
+    type = Column(String(50))
+    priority = Column(String(20), default='normal')
+    title = Column(String(255))
+    message = Column(Text)
+    action_url = Column(String(500))
+    read = Column(Boolean, default=False)
+    read_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+    expires_at = Column(DateTime)
+
+class NotificationCount(Base):
+    """Kept by triggers on notifications; never written by the API"""
+    __tablename__ = "notification_counts"
+
+    user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id", ondelete="CASCADE"))
+    unread = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now())
+
+class TaskReminder(Base):
+    """A due-date reminder sent for a task, so each is sent once"""
+    __tablename__ = "task_reminders"
+
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    due_date = Column(DateTime)
+    reminded_at = Column(DateTime, default=func.now())
@@ -0,0 +1,165 @@
+# backend/api/modules/notifications/routes.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_async_db
+from ...core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from ..rbac.dependencies import RBAC_USER_HEADER
+from . import models, schemas
+from .hub import notification_data, notification_hub, sse_event
+from .service import NOTIFY_TTL_HOURS, mark_read, notification_sweeper, send
+
+router = APIRouter(prefix="/api/notifications", tags=["notifications"])
+
+# Comment line sent on an idle stream, so proxies don't time it out
+STREAM_KEEPALIVE_SECONDS = 15
+# Client reconnect delay after a dropped stream
+STREAM_RETRY_MS = 3000
+
+def caller(request: Request, user_id: Optional[str] = Query(None, description="User ID, if not in the header")) -> str:
+    """The user whose notifications these are: the authenticated one, else the user_id parameter"""
+    user_id = request.headers.get(RBAC_USER_HEADER) or user_id
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user_id
+
+@router.get("", response_model=schemas.NotificationPage)
+async def list_notifications(
+    customer_id: str = Query(..., description="Customer ID"),
+    unread_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(caller),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The caller's notifications, newest first; expired ones are left out before they are purged"""
+    n = models.Notification
+    query = select(n).where(
+        n.customer_id == customer_id,
+        n.user_id == user_id,
+        or_(n.expires_at.is_(None), n.expires_at >= func.localtimestamp())
+    )
+    if unread_only:
+        query = query.where(func.coalesce(n.read, False).is_(False))
+    if cursor:
+        try:
+            _, row_id = decode_cursor(cursor, n.id, "id", "desc")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(n.id < row_id)
+
+    rows = (await db.execute(query.order_by(n.id.desc()).limit(limit + 1))).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("id", "desc", rows[-1].id, rows[-1].id)
+
+    return schemas.NotificationPage(
+        items=[
+            schemas.Notification(
+                id=row.id,
+                type=row.type,
+                priority=row.priority,
+                title=row.title,
+                message=row.message,
+                action_url=row.action_url,
+                read=bool(row.read),
+                created_at=row.created_at,
+                expires_at=row.expires_at
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+@router.get("/unread-count", response_model=schemas.UnreadCount)
+async def unread_count(
+    customer_id: str = Query(..., description="Customer ID"),
+    user_id: str = Depends(caller)
+):
+    """The bell badge: served from this process's counts, no query once the user is cached"""
+    return schemas.UnreadCount(user_id=user_id, unread=await notification_hub.unread(user_id))
+
+@router.patch("/read", response_model=schemas.ReadResult)
+async def read_notifications(
+    request: schemas.ReadRequest,
+    customer_id: str = Query(..., description="Customer ID"),
+    user_id: str = Depends(caller),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark the caller's notifications read: the ones listed, or all of them"""
+    marked = await mark_read(db, customer_id, user_id, request.ids)
+    await db.commit()
+    return schemas.ReadResult(marked=marked, unread=await notification_hub.unread(user_id))
+
+@router.post("", response_model=schemas.SendResult)
+async def send_notification(
+    notification: schemas.NotificationSend,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Fan a notification out to users and roles of the tenant, in one statement"""
+    if not notification.user_ids and not notification.roles:
+        raise HTTPException(status_code=400, detail="user_ids or roles is required")
+    rows = await send(
+        db, customer_id, notification.title,
+        message=notification.message,
+        type=notification.type,
+        priority=notification.priority,
+        action_url=notification.action_url,
+        user_ids=notification.user_ids,
+        roles=notification.roles,
+        ttl_hours=notification.expires_in_hours or NOTIFY_TTL_HOURS,
+    )
+    await db.commit()
+    return schemas.SendResult(sent=len(rows), user_ids=[row.user_id for row in rows])
+
+@router.get("/stream")
+async def stream_notifications(
+    customer_id: str = Query(..., description="Customer ID"),
+    user_id: str = Depends(caller),
+    last_event_id: Optional[int] = Header(None, description="Id of the last notification received, on reconnect")
+):
+    """
+    The caller's notifications as server-sent events: `notification` (with the
+    notification id as the event id, so a reconnect replays what it missed) and
+    `unread` whenever the count changes, starting with the current count.
+    """
+    subscription, missed = await notification_hub.subscribe(user_id, last_event_id)
+
+    async def events():
+        try:
+            yield b"retry: %d\n\n" % STREAM_RETRY_MS
+            for row in missed:
+                yield sse_event("notification", notification_data(row), row.id)
+            yield sse_event("unread", {"unread": await notification_hub.unread(user_id)})
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if item is None:
+                    # Closed: the server is stopping or the client fell too far behind
+                    return
+                yield item[1]
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # No caching or proxy buffering of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats", response_model=schemas.NotificationStats)
+async def notification_stats():
+    """Unread-count cache, stream and sweep counters for this worker process"""
+    return schemas.NotificationStats(**notification_hub.stats(), **notification_sweeper.stats())
@@ -0,0 +1,60 @@
+# backend/api/modules/notifications/schemas.py
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class NotificationSend(BaseModel):
+    title: str = Field(..., max_length=255)
+    message: Optional[str] = None
+    type: str = Field("system", max_length=50)
+    priority: str = Field("normal", max_length=20)
+    action_url: Optional[str] = Field(None, max_length=500)
+    # None: the default lifetime
+    expires_in_hours: Optional[float] = Field(None, gt=0)
+    # Recipients: these users and every active user holding one of these roles
+    user_ids: List[str] = []
+    roles: List[str] = []
+
+class Notification(BaseModel):
+    id: int
+    type: Optional[str] = None
+    priority: Optional[str] = None
+    title: Optional[str] = None
+    message: Optional[str] = None
+    action_url: Optional[str] = None
+    read: bool
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+class NotificationPage(BaseModel):
+    items: List[Notification]
+    next_cursor: Optional[str] = None
+
+class UnreadCount(BaseModel):
+    user_id: str
+    unread: int
+
+class ReadRequest(BaseModel):
+    # None: every unread notification of the user
+    ids: Optional[List[int]] = None
+
+class ReadResult(BaseModel):
+    marked: int
+    unread: int
+
+class SendResult(BaseModel):
+    sent: int
+    user_ids: List[str]
+
+class NotificationStats(BaseModel):
+    cached_users: int
+    streams: int
+    hits: int
+    misses: int
+    pushed: int
+    overflowed: int
+    polls: int
+    sweeps: int
+    reminders: int
+    purged: int
+    last_sweep_ms: float
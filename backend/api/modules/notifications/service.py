@@ -0,0 +1,254 @@
+# backend/api/modules/notifications/service.py
+"""
+Notification writes. Every fan-out is one INSERT ... SELECT over the recipients
+(users of the tenant by id or role, task assignees), so an alert to a whole staff
+costs one statement; triggers keep notification_counts in step, and the hub counts
+and pushes the returned rows once the transaction commits.
+"""
+import asyncio
+import os
+import time
+from contextlib import suppress
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ...core.database import async_engine
+from .hub import NOTIFICATION_COLUMNS, notification_hub, stash
+
+# Lifetime of a notification unless the sender sets one; expired rows are purged
+NOTIFY_TTL_HOURS = float(os.getenv("NOTIFY_TTL_HOURS", 720))
+# A rescore taking a parent's risk score from below this to at least this alerts these roles
+NOTIFY_RISK_SCORE = int(os.getenv("NOTIFY_RISK_SCORE", 70))
+NOTIFY_RISK_ROLES = [role.strip() for role in os.getenv("NOTIFY_RISK_ROLES", "admin,staff").split(",") if role.strip()]
+# More parents at risk than this in one rescore are sent as one summary per user, not an alert each
+NOTIFY_RISK_MAX_ALERTS = int(os.getenv("NOTIFY_RISK_MAX_ALERTS", 20))
+# Task reminders go out this long before the due date; tasks overdue longer than the lookback are skipped
+NOTIFY_TASK_LEAD_HOURS = float(os.getenv("NOTIFY_TASK_LEAD_HOURS", 24))
+NOTIFY_TASK_LOOKBACK_HOURS = float(os.getenv("NOTIFY_TASK_LOOKBACK_HOURS", 168))
+# Task reminders and the purge of expired notifications (0 disables the sweep)
+NOTIFY_SWEEP_SECONDS = float(os.getenv("NOTIFY_SWEEP_SECONDS", 60))
+NOTIFY_SWEEP_BATCH = int(os.getenv("NOTIFY_SWEEP_BATCH", 1000))
+NOTIFY_PURGE_BATCH = int(os.getenv("NOTIFY_PURGE_BATCH", 5000))
+# Pause between purge batches, so a large backlog doesn't hold the table's write path
+NOTIFY_PURGE_PAUSE_SECONDS = float(os.getenv("NOTIFY_PURGE_PAUSE_SECONDS", 0.05))
+
+EXPIRES_AT = "localtimestamp + CAST(:ttl_seconds AS FLOAT) * interval '1 second'"
+
+# One notification to each active user of the tenant named or holding one of the roles
+SEND = text(f"""
+    INSERT INTO notifications (customer_id, user_id, type, priority, title, message, action_url, expires_at)
+    SELECT u.customer_id, u.user_id, :type, :priority, :title, :message, :action_url, {EXPIRES_AT}
+    FROM users u
+    WHERE u.customer_id = :customer_id AND u.status = 'active'
+      AND (u.user_id = ANY(CAST(:user_ids AS VARCHAR[])) OR u.role = ANY(CAST(:roles AS VARCHAR[])))
+    ORDER BY u.user_id
+    RETURNING {NOTIFICATION_COLUMNS}
+""")
+
+RISK_ALERTS = text(f"""
+    INSERT INTO notifications (customer_id, user_id, type, priority, title, message, action_url, expires_at)
+    SELECT p.customer_id, u.user_id, 'parent_at_risk', 'high', left('At risk: ' || p.name, 255),
+           'Risk score rose to ' || p.risk_score, '/parents/' || p.parent_id, {EXPIRES_AT}
+    FROM parents p
+    JOIN users u ON u.customer_id = p.customer_id AND u.status = 'active'
+                AND u.role = ANY(CAST(:roles AS VARCHAR[]))
+    WHERE p.customer_id = :customer_id AND p.id = ANY(CAST(:parent_ids AS INTEGER[]))
+    ORDER BY u.user_id, p.id
+    RETURNING {NOTIFICATION_COLUMNS}
+""")
+
+# Claimed through task_reminders first: a task is reminded once per due date, however
+# many processes sweep at the same time
+TASK_REMINDERS = text(f"""
+    WITH due AS (
+        SELECT t.id, t.due_date FROM tasks t
+        LEFT JOIN task_reminders r ON r.task_id = t.id
+        WHERE t.due_date BETWEEN localtimestamp - CAST(:lookback_seconds AS FLOAT) * interval '1 second'
+                             AND localtimestamp + CAST(:lead_seconds AS FLOAT) * interval '1 second'
+          AND t.assigned_to IS NOT NULL
+          AND coalesce(t.status, 'pending') NOT IN ('completed', 'cancelled')
+          AND r.due_date IS DISTINCT FROM t.due_date
+        ORDER BY t.due_date
+        LIMIT :batch
+    ), claimed AS (
+        INSERT INTO task_reminders (task_id, due_date, reminded_at)
+        SELECT id, due_date, localtimestamp FROM due ORDER BY id
+        ON CONFLICT (task_id) DO UPDATE
+        SET due_date = EXCLUDED.due_date, reminded_at = EXCLUDED.reminded_at
+        WHERE task_reminders.due_date IS DISTINCT FROM EXCLUDED.due_date
+        RETURNING task_id
+    )
+    INSERT INTO notifications (customer_id, user_id, type, priority, title, message, action_url, expires_at)
+    SELECT t.customer_id, t.assigned_to, 'task_due', coalesce(t.priority, 'normal'),
+           left(CASE WHEN t.due_date < localtimestamp THEN 'Overdue: ' ELSE 'Due soon: ' END
+                || coalesce(t.title, 'Task'), 255),
+           'Due ' || to_char(t.due_date, 'DD Mon YYYY HH24:MI') || coalesce(' - ' || p.name, ''),
+           coalesce('/parents/' || p.parent_id, '/tasks/' || t.id),
+           {EXPIRES_AT}
+    FROM claimed c
+    JOIN tasks t ON t.id = c.task_id
+    JOIN users u ON u.user_id = t.assigned_to AND u.status = 'active'
+    LEFT JOIN parents p ON p.id = t.parent_id
+    ORDER BY t.assigned_to
+    RETURNING {NOTIFICATION_COLUMNS}
+""")
+
+MARK_READ = text("""
+    UPDATE notifications SET read = TRUE, read_at = localtimestamp
+    WHERE customer_id = :customer_id AND user_id = :user_id AND NOT coalesce(read, FALSE)
+      AND (CAST(:ids AS INTEGER[]) IS NULL OR id = ANY(CAST(:ids AS INTEGER[])))
+""")
+
+# Rows locked by another purge are left to it
+PURGE_EXPIRED = text("""
+    DELETE FROM notifications WHERE id IN (
+        SELECT id FROM notifications
+        WHERE expires_at < localtimestamp
+        ORDER BY expires_at
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+def _ttl_seconds(ttl_hours: Optional[float]) -> Optional[float]:
+    return ttl_hours * 3600 if ttl_hours else None
+
+async def send(
+    db: AsyncSession,
+    customer_id: str,
+    title: str,
+    message: Optional[str] = None,
+    type: str = "system",
+    priority: str = "normal",
+    action_url: Optional[str] = None,
+    user_ids: Sequence[str] = (),
+    roles: Sequence[str] = (),
+    ttl_hours: Optional[float] = NOTIFY_TTL_HOURS,
+) -> List:
+    """Fan one notification out to the named users and holders of the roles; the caller commits"""
+    rows = (await db.execute(SEND, {
+        "customer_id": customer_id,
+        "type": type,
+        "priority": priority,
+        "title": title,
+        "message": message,
+        "action_url": action_url,
+        "user_ids": list(user_ids),
+        "roles": list(roles),
+        "ttl_seconds": _ttl_seconds(ttl_hours),
+    })).all()
+    stash(db, created=rows)
+    return rows
+
+async def alert_at_risk(db: AsyncSession, customer_id: str, parent_ids: Iterable[int]) -> List:
+    """Alert the tenant's staff to parents whose risk score just crossed NOTIFY_RISK_SCORE"""
+    parent_ids = sorted(set(parent_ids))
+    if not parent_ids or not NOTIFY_RISK_ROLES:
+        return []
+    if len(parent_ids) > NOTIFY_RISK_MAX_ALERTS:
+        return await send(
+            db, customer_id, f"{len(parent_ids)} parents are now at risk",
+            message=f"Risk scores rose to {NOTIFY_RISK_SCORE} or more in the latest rescore",
+            type="parent_at_risk", priority="high",
+            action_url=f"/parents?min_risk_score={NOTIFY_RISK_SCORE}", roles=NOTIFY_RISK_ROLES,
+        )
+    rows = (await db.execute(RISK_ALERTS, {
+        "customer_id": customer_id,
+        "parent_ids": parent_ids,
+        "roles": NOTIFY_RISK_ROLES,
+        "ttl_seconds": _ttl_seconds(NOTIFY_TTL_HOURS),
+    })).all()
+    stash(db, created=rows)
+    return rows
+
+async def mark_read(db: AsyncSession, customer_id: str, user_id: str, ids: Optional[Sequence[int]] = None) -> int:
+    """Mark the user's notifications read (all unread ones when ids is None); the caller commits"""
+    result = await db.execute(MARK_READ, {
+        "customer_id": customer_id,
+        "user_id": user_id,
+        "ids": list(ids) if ids is not None else None,
+    })
+    stash(db, read=(user_id, result.rowcount))
+    return result.rowcount
+
+async def remind_due_tasks(engine: AsyncEngine = async_engine, batch: int = NOTIFY_SWEEP_BATCH) -> int:
+    """Remind assignees of tasks coming due, a batch per transaction; returns reminders sent"""
+    sent = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(TASK_REMINDERS, {
+                "lead_seconds": NOTIFY_TASK_LEAD_HOURS * 3600,
+                "lookback_seconds": NOTIFY_TASK_LOOKBACK_HOURS * 3600,
+                "batch": batch,
+                "ttl_seconds": _ttl_seconds(NOTIFY_TTL_HOURS),
+            })).all()
+        notification_hub.created(rows)
+        sent += len(rows)
+        if len(rows) < batch:
+            return sent
+
+async def purge_expired(
+    engine: AsyncEngine = async_engine,
+    batch: int = NOTIFY_PURGE_BATCH,
+    pause: float = NOTIFY_PURGE_PAUSE_SECONDS,
+) -> int:
+    """Delete expired notifications a batch per transaction; returns rows deleted"""
+    deleted = 0
+    while True:
+        async with engine.begin() as conn:
+            rowcount = (await conn.execute(PURGE_EXPIRED, {"batch": batch})).rowcount
+        deleted += rowcount
+        if rowcount < batch:
+            return deleted
+        await asyncio.sleep(pause)
+
+class NotificationSweeper:
+    """Task reminders and the purge of expired notifications, run in the background"""
+
+    def __init__(self, interval: float = NOTIFY_SWEEP_SECONDS, engine: AsyncEngine = async_engine):
+        self.interval = interval
+        self.engine = engine
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.reminders = 0
+        self.purged = 0
+        self.last_sweep_ms = 0.0
+
+    async def sweep(self):
+        started = time.perf_counter()
+        self.reminders += await remind_due_tasks(self.engine)
+        self.purged += await purge_expired(self.engine)
+        self.sweeps += 1
+        self.last_sweep_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Notification sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "sweeps": self.sweeps,
+            "reminders": self.reminders,
+            "purged": self.purged,
+            "last_sweep_ms": self.last_sweep_ms,
+        }
+
+# Process-wide sweeper, started by the app lifespan
+notification_sweeper = NotificationSweeper()
@@ -0,0 +1,92 @@
+# backend/api/modules/parents/cache.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Upper bound on snapshot age when no write has invalidated it (covers other workers' writes)
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", 300))
+# Tenants held per process (snapshots, and invalidations remembered); past this the
+# least recently used is dropped. customer_id comes from the query string, so this
+# also bounds what arbitrary values can cost.
+STATS_CACHE_MAX_TENANTS = int(os.getenv("STATS_CACHE_MAX_TENANTS", 10_000))
+
+class SnapshotCache:
+    """
+    Per-tenant in-process snapshot cache.
+    Writes call invalidate(), which ticks a clock; a rebuild stores its snapshot only
+    if the tenant wasn't invalidated after the rebuild started. A tenant whose last
+    invalidation was forgotten counts as invalidated at the latest tick forgotten.
+    """
+
+    def __init__(self, ttl: float = STATS_CACHE_TTL, max_tenants: int = STATS_CACHE_MAX_TENANTS):
+        self.ttl = ttl
+        self.max_tenants = max_tenants
+        self._snapshots: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._clock = 0
+        self._forgotten = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def invalidate(self, customer_id: str):
+        """Drop the snapshot for a tenant after a write"""
+        self._clock += 1
+        self._invalidated[customer_id] = self._clock
+        self._invalidated.move_to_end(customer_id)
+        while len(self._invalidated) > self.max_tenants:
+            _, tick = self._invalidated.popitem(last=False)
+            self._forgotten = max(self._forgotten, tick)
+        self._snapshots.pop(customer_id, None)
+
+    def clear(self):
+        self._snapshots.clear()
+
+    def _fresh(self, customer_id: str, max_staleness: Optional[float]) -> Optional[Any]:
+        entry = self._snapshots.get(customer_id)
+        if entry is None:
+            return None
+        computed_at, value = entry
+        limit = self.ttl if max_staleness is None else min(max_staleness, self.ttl)
+        if time.monotonic() - computed_at > limit:
+            return None
+        self._snapshots.move_to_end(customer_id)
+        return value
+
+    def _store(self, customer_id: str, value: Any):
+        self._snapshots[customer_id] = (time.monotonic(), value)
+        self._snapshots.move_to_end(customer_id)
+        while len(self._snapshots) > self.max_tenants:
+            self._snapshots.popitem(last=False)
+
+    async def get(
+        self,
+        customer_id: str,
+        compute: Callable[[], Awaitable[Any]],
+        max_staleness: Optional[float] = None
+    ) -> Any:
+        """Return a snapshot no older than max_staleness seconds, rebuilding at most once per tenant"""
+        value = self._fresh(customer_id, max_staleness)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(customer_id, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have rebuilt it while we waited
+                value = self._fresh(customer_id, max_staleness)
+                if value is not None:
+                    return value
+
+                started = self._clock
+                value = await compute()
+                if self._invalidated.get(customer_id, self._forgotten) <= started:
+                    self._store(customer_id, value)
+                return value
+        finally:
+            # Requests already waiting hold the lock object; a later one finds the snapshot cached
+            if self._locks.get(customer_id) is lock and not lock.locked():
+                del self._locks[customer_id]
+
+# Parent dashboard stats, keyed by customer_id
+stats_cache = SnapshotCache()
@@ -0,0 +1,131 @@
+# backend/api/modules/parents/exporter.py
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from ...core.database import AsyncSessionLocal
+from . import models
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_COLUMNS = [
+    models.Parent.id,
+    models.Parent.parent_id,
+    models.Parent.name,
+    models.Parent.email,
+    models.Parent.phone,
+    models.Parent.secondary_email,
+    models.Parent.secondary_phone,
+    models.Parent.partner_name,
+    models.Parent.address,
+    models.Parent.status,
+    models.Parent.stage,
+    models.Parent.source,
+    models.Parent.source_detail,
+    models.Parent.lead_score,
+    models.Parent.engagement_score,
+    models.Parent.risk_score,
+    models.Parent.preferred_contact_method,
+    models.Parent.preferred_contact_time,
+    models.Parent.language,
+    models.Parent.tags,
+    models.Parent.custom_fields,
+    models.Parent.created_at,
+    models.Parent.updated_at,
+    models.Parent.first_contact_date,
+    models.Parent.last_contact_date,
+]
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS] + ["children"]
+
+# Children as one JSON array per parent, built by Postgres alongside the parent row
+children_json = select(
+    func.coalesce(
+        func.json_agg(aggregate_order_by(
+            func.json_build_object(
+                'id', models.Child.id,
+                'name', models.Child.name,
+                'dob', models.Child.dob,
+                'current_year_group', models.Child.current_year_group,
+                'target_year_group', models.Child.target_year_group,
+                'current_school', models.Child.current_school,
+                'interests', models.Child.interests,
+                'special_requirements', models.Child.special_requirements
+            ),
+            models.Child.id
+        )),
+        func.json('[]')
+    )
+).where(
+    models.Child.parent_id == models.Parent.id
+).scalar_subquery()
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _encode_ndjson(rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default) + "\n"
+        for row in rows
+    ).encode()
+
+def _encode_csv(rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+async def stream_export(query, format: str = "ndjson", compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream the filtered parents (with children) as NDJSON or CSV chunks.
+    Reads through a server-side cursor so memory stays flat whatever the tenant size.
+    The generator owns its session: it outlives the request's dependencies.
+    """
+    # gzip container (wbits=31) compressed incrementally chunk by chunk
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    first = True
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            query.add_columns(children_json).order_by(models.Parent.id).execution_options(
+                yield_per=EXPORT_CHUNK_ROWS
+            )
+        )
+        async for rows in result.partitions():
+            if format == "csv":
+                chunk = _encode_csv(rows, header=first)
+            else:
+                chunk = _encode_ndjson(rows)
+            first = False
+
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    if format == "csv" and first:
+        # Empty export still gets a header row
+        chunk = _encode_csv([], header=True)
+        yield compressor.compress(chunk) if compressor else chunk
+    if compressor:
+        yield compressor.flush()
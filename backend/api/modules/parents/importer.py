@@ -0,0 +1,249 @@
+# backend/api/modules/parents/importer.py
+import codecs
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..scoring.service import rescore_parents
+from ..webhooks.service import PARENT_CREATED, enqueue_events, has_subscribers, parent_payload
+from . import models, schemas
+
+# Fields that arrive as JSON text inside a CSV cell
+CSV_JSON_FIELDS = {"address", "custom_fields", "children", "tags"}
+
+# Cap on per-row errors returned in one report
+MAX_REPORTED_ERRORS = 1000
+
+CHILD_COPY_COLUMNS = [
+    "parent_id", "customer_id", "name", "dob", "current_year_group", "target_year_group",
+    "current_school", "interests", "special_requirements",
+]
+
+EVENT_COPY_COLUMNS = [
+    "customer_id", "parent_id", "event_type", "event_subtype", "title",
+    "description", "impact_score", "created_by",
+]
+
+# Streaming record readers
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body"""
+    # Incremental decoder - a multi-byte character may straddle two chunks
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, decoded object or error message) per NDJSON line"""
+    row = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (row number, dict or error message) per CSV record; the first record is the header"""
+    header = None
+    pending = ""
+    row = 0
+    async for line in iter_lines(chunks):
+        # Quoted fields may span lines - wait until the quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+
+        values = next(csv.reader(io.StringIO(record)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        data = {}
+        try:
+            for name, value in zip(header, values):
+                if value == "":
+                    continue
+                data[name] = json.loads(value) if name in CSV_JSON_FIELDS else value
+        except ValueError as e:
+            yield row, f"Invalid JSON in column '{name}': {e}"
+            continue
+        yield row, data
+
+# Validation
+def validate_batch(records: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, schemas.ParentCreate]], List[Dict[str, Any]]]:
+    """Validate a batch against ParentCreate, splitting good rows from per-row errors"""
+    valid, errors = [], []
+    for row, data in records:
+        if isinstance(data, str):
+            errors.append({"row": row, "errors": [data]})
+            continue
+        try:
+            valid.append((row, schemas.ParentCreate(**data)))
+        except ValidationError as e:
+            errors.append({
+                "row": row,
+                "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            })
+        except TypeError:
+            errors.append({"row": row, "errors": ["Record must be an object"]})
+    return valid, errors
+
+def describe_error(error: Exception) -> str:
+    """
+    One line about a failed insert, fit for an import report: the database's own message
+    without the SQL, bound parameters or DETAIL line (which can quote other rows' data).
+    """
+    message = str(error.orig if isinstance(error, DBAPIError) else error).split("\n", 1)[0]
+    # asyncpg errors arrive as "<class 'asyncpg.exceptions.NotNullViolationError'>: message"
+    return re.sub(r"^<class '[\w.]+'>: ", "", message) or type(error).__name__
+
+# Loading
+async def insert_parents(
+    db: AsyncSession,
+    customer_id: str,
+    parents: List[schemas.ParentCreate],
+    generate_parent_id,
+    event_subtype: str = "bulk_import",
+    description: str = "Parent record created via bulk import",
+    rescore_ids: Iterable[int] = ()
+) -> List[int]:
+    """
+    Insert validated parents in the caller's transaction (the caller commits):
+    parents via multi-row INSERT ... RETURNING, children and enquiry events via COPY,
+    then one set-based rescore of the new parents and their parent.created webhook outbox rows.
+    rescore_ids are other parents of the tenant with new activity in the same transaction,
+    folded into the same rescore pass. Returns the new database ids in input order.
+    """
+    today = datetime.utcnow().date()
+    rows = [
+        {
+            **parent.dict(exclude={'children'}),
+            "parent_id": generate_parent_id(),
+            "customer_id": customer_id,
+            "first_contact_date": today,
+            "last_contact_date": today,
+        }
+        for parent in parents
+    ]
+
+    inserted = (await db.execute(
+        insert(models.Parent).returning(models.Parent.id, models.Parent.parent_id),
+        rows
+    )).all()
+    ids_by_parent_id = {row.parent_id: row.id for row in inserted}
+
+    children, events = [], []
+    for parent, row in zip(parents, rows):
+        db_id = ids_by_parent_id[row["parent_id"]]
+        for child in parent.children or []:
+            children.append((
+                db_id, customer_id, child.name, child.dob, child.current_year_group,
+                child.target_year_group, child.current_school, child.interests,
+                child.special_requirements
+            ))
+        events.append((
+            customer_id, db_id, 'enquiry', event_subtype, 'Parent record created',
+            description, 5, 'SYSTEM'
+        ))
+
+    # COPY runs on the session's own connection, inside the same transaction
+    connection = await db.connection()
+    raw = (await connection.get_raw_connection()).driver_connection
+    if children:
+        await raw.copy_records_to_table("children", records=children, columns=CHILD_COPY_COLUMNS)
+    await raw.copy_records_to_table("journey_events", records=events, columns=EVENT_COPY_COLUMNS)
+
+    scores = await rescore_parents(db, customer_id, [*ids_by_parent_id.values(), *rescore_ids])
+    if await has_subscribers(db, customer_id, PARENT_CREATED):
+        await enqueue_events(db, customer_id, [
+            (PARENT_CREATED, {
+                **parent_payload({**row, "id": ids_by_parent_id[row["parent_id"]]}),
+                **scores.get(ids_by_parent_id[row["parent_id"]], {})
+            })
+            for row in rows
+        ])
+    return [ids_by_parent_id[row["parent_id"]] for row in rows]
+
+async def load_batch(db: AsyncSession, customer_id: str, parents: List[schemas.ParentCreate], generate_parent_id) -> int:
+    """Insert one validated import batch in a single transaction"""
+    ids = await insert_parents(db, customer_id, parents, generate_parent_id)
+    await db.commit()
+    return len(ids)
+
+async def import_parents(
+    db: AsyncSession,
+    customer_id: str,
+    records: AsyncIterator[Tuple[int, Any]],
+    generate_parent_id,
+    batch_size: int = 1000
+) -> schemas.ParentImportResult:
+    """Validate and load a record stream batch by batch, collecting per-row errors"""
+    started = time.perf_counter()
+    imported, failed, total = 0, 0, 0
+    errors: List[Dict[str, Any]] = []
+
+    async def load(valid) -> List[Dict[str, Any]]:
+        nonlocal imported
+        try:
+            imported += await load_batch(db, customer_id, [parent for _, parent in valid], generate_parent_id)
+            return []
+        except Exception as e:
+            await db.rollback()
+            if len(valid) == 1:
+                return [{"row": valid[0][0], "errors": [f"Insert failed: {describe_error(e)}"]}]
+        # Then row by row, so only the rows that fail on their own are reported
+        row_errors = []
+        for entry in valid:
+            row_errors.extend(await load([entry]))
+        return row_errors
+
+    async def flush(batch):
+        nonlocal failed
+        valid, batch_errors = validate_batch(batch)
+        if valid:
+            batch_errors.extend(await load(valid))
+        batch_errors.sort(key=lambda error: error["row"])
+        failed += len(batch_errors)
+        errors.extend(batch_errors[:max(0, MAX_REPORTED_ERRORS - len(errors))])
+
+    batch = []
+    async for record in records:
+        batch.append(record)
+        total += 1
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    elapsed = time.perf_counter() - started
+    return schemas.ParentImportResult(
+        total=total,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(total / elapsed, 1) if elapsed > 0 else 0.0
+    )
@@ -17,7 +17,7 @@ class Customer(Base):
     region = Column(String(100))
     status = Column(String(20), default='active')
     subscription_tier = Column(String(50))
-    meta_data = Column(JSON, default={})
+    meta_data = Column("metadata", JSON, default={})
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -120,6 +120,7 @@ class Email(Base):
     sentiment_score = Column(Float)
     sentiment_label = Column(String(20))
     status = Column(String(20), default='unread')
+    date_sent = Column(DateTime)
     date_received = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
     
@@ -136,12 +137,13 @@ class JourneyEvent(Base):
     event_subtype = Column(String(50))
     title = Column(String(255))
     description = Column(Text)
-    meta_data = Column(JSON, default={})
+    meta_data = Column("metadata", JSON, default={})
     sentiment_before = Column(Float)
     sentiment_after = Column(Float)
     impact_score = Column(Integer)
     created_by = Column(String(50))
-    event_date = Column(DateTime, default=func.now())
+    # Partition key (monthly ranges), hence part of the primary key
+    event_date = Column(DateTime, primary_key=True, nullable=False, default=func.now())
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
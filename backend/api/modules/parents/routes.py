@@ -1,76 +1,112 @@
 # backend/api/modules/parents/routes.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, and_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, exists, or_, and_, tuple_
 from typing import List, Optional
 from datetime import datetime, timedelta
-import uuid
 
-from ...core.database import get_db
+from ...core.database import get_async_db
+from ...core.serialization import ORJSONResponse, rows_to_dicts, schema_columns
+from ...core.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, estimate_row_count, keyset_filter
+)
+from ..search.service import text_match_filter
+from ..scoring.service import rescore_parents
+from ..webhooks.service import (
+    PARENT_CREATED, PARENT_UPDATED, PARENT_STAGE_CHANGED, enqueue_events, parent_payload
+)
+from ..webhooks.dispatcher import webhook_dispatcher
+from ..audit.capture import audit_model
 from . import models, schemas
+from .cache import stats_cache
+from .exporter import EXPORT_COLUMNS, stream_export
+from .importer import import_parents as run_import, iter_csv_records, iter_ndjson_records
+from .service import generate_parent_id
 
 router = APIRouter(prefix="/api/parents", tags=["parents"])
 
-# Helper function to generate parent ID
-def generate_parent_id():
-    return f"PARENT-{uuid.uuid4().hex[:8].upper()}"
+# Changes made through these endpoints are recorded in audit_log on commit
+audit_model(models.Parent, "parent")
+audit_model(models.Child, "child")
+audit_model(models.Note, "note")
+
+# Columns search results may be sorted (and keyset-paginated) by
+SORT_COLUMNS = {
+    column.key: column
+    for column in (
+        models.Parent.name,
+        models.Parent.email,
+        models.Parent.status,
+        models.Parent.stage,
+        models.Parent.source,
+        models.Parent.lead_score,
+        models.Parent.engagement_score,
+        models.Parent.risk_score,
+        models.Parent.created_at,
+        models.Parent.updated_at,
+        models.Parent.first_contact_date,
+        models.Parent.last_contact_date,
+    )
+}
 
 @router.get("/stats", response_model=schemas.ParentStats)
 async def get_parent_stats(
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    max_staleness: Optional[float] = Query(None, ge=0, description="Max snapshot age in seconds (0 forces a fresh read)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get statistics about parents for a customer"""
-    # Base query for this customer
-    base_query = db.query(models.Parent).filter(models.Parent.customer_id == customer_id)
-    
-    # Total parents
-    total_parents = base_query.count()
-    
-    # By status
-    status_counts = db.query(
-        models.Parent.status,
-        func.count(models.Parent.id)
-    ).filter(
-        models.Parent.customer_id == customer_id
-    ).group_by(models.Parent.status).all()
-    
-    by_status = {status: count for status, count in status_counts}
-    
-    # By stage
-    stage_counts = db.query(
-        models.Parent.stage,
-        func.count(models.Parent.id)
-    ).filter(
-        models.Parent.customer_id == customer_id
-    ).group_by(models.Parent.stage).all()
-    
-    by_stage = {stage: count for stage, count in stage_counts}
-    
-    # By source
-    source_counts = db.query(
-        models.Parent.source,
-        func.count(models.Parent.id)
-    ).filter(
-        models.Parent.customer_id == customer_id,
-        models.Parent.source.isnot(None)
-    ).group_by(models.Parent.source).all()
-    
-    by_source = {source: count for source, count in source_counts}
-    
-    # Average lead score
-    avg_score = db.query(func.avg(models.Parent.lead_score)).filter(
-        models.Parent.customer_id == customer_id
-    ).scalar() or 0
-    
-    # High risk count (risk score > 70)
-    high_risk_count = base_query.filter(models.Parent.risk_score > 70).count()
-    
-    # Recent enquiries (last 7 days)
+    return await stats_cache.get(
+        customer_id,
+        lambda: compute_parent_stats(db, customer_id),
+        max_staleness=max_staleness
+    )
+
+async def compute_parent_stats(db: AsyncSession, customer_id: str) -> schemas.ParentStats:
+    """Compute all dashboard stats in a single aggregate scan over parents"""
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_enquiries = base_query.filter(
-        models.Parent.created_at >= seven_days_ago
-    ).count()
+    
+    # One row per status / stage / source group plus a grand total row;
+    # grouping() bitmask tells the sets apart (status=4, stage=2, source=1)
+    rows = (await db.execute(
+        select(
+            func.grouping(models.Parent.status, models.Parent.stage, models.Parent.source).label("grouping"),
+            models.Parent.status,
+            models.Parent.stage,
+            models.Parent.source,
+            func.count(models.Parent.id).label("total"),
+            func.avg(models.Parent.lead_score).label("avg_lead_score"),
+            func.count(models.Parent.id).filter(models.Parent.risk_score > 70).label("high_risk"),
+            func.count(models.Parent.id).filter(models.Parent.created_at >= seven_days_ago).label("recent")
+        ).where(
+            models.Parent.customer_id == customer_id
+        ).group_by(
+            func.grouping_sets(
+                tuple_(models.Parent.status),
+                tuple_(models.Parent.stage),
+                tuple_(models.Parent.source),
+                tuple_()
+            )
+        )
+    )).all()
+    
+    by_status, by_stage, by_source = {}, {}, {}
+    total_parents, avg_score, high_risk_count, recent_enquiries = 0, 0, 0, 0
+    for row in rows:
+        if row.grouping == 0b011:
+            by_status[row.status] = row.total
+        elif row.grouping == 0b101:
+            by_stage[row.stage] = row.total
+        elif row.grouping == 0b110:
+            if row.source is not None:
+                by_source[row.source] = row.total
+        else:
+            total_parents = row.total
+            avg_score = row.avg_lead_score or 0
+            high_risk_count = row.high_risk
+            recent_enquiries = row.recent
     
     # Conversion rate (enrolled / total)
     enrolled_count = by_status.get('enrolled', 0)
@@ -81,150 +117,314 @@ async def get_parent_stats(
         by_status=by_status,
         by_stage=by_stage,
         by_source=by_source,
-        average_lead_score=round(avg_score, 1),
+        average_lead_score=round(float(avg_score), 1),
         high_risk_count=high_risk_count,
         recent_enquiries_7d=recent_enquiries,
         conversion_rate=round(conversion_rate, 1)
     )
 
-@router.get("/search", response_model=schemas.ParentListResponse)
-async def search_parents(
-    customer_id: str = Query(..., description="Customer ID"),
-    params: schemas.ParentSearchParams = Depends(),
-    db: Session = Depends(get_db)
-):
-    """Search parents with filters and pagination"""
-    query = db.query(models.Parent).filter(models.Parent.customer_id == customer_id)
+# Helper to apply ParentSearchParams filters to a select over parents
+def apply_search_filters(query, customer_id: str, params: schemas.ParentSearchParams):
+    query = query.where(models.Parent.customer_id == customer_id)
     
-    # Text search
+    # Text search over the denormalised search document (parent fields + children names)
     if params.query:
-        search_filter = or_(
-            models.Parent.name.ilike(f'%{params.query}%'),
-            models.Parent.email.ilike(f'%{params.query}%'),
-            models.Parent.phone.ilike(f'%{params.query}%'),
-            models.Parent.partner_name.ilike(f'%{params.query}%')
+        query = query.where(
+            models.Parent.id.in_(text_match_filter(customer_id, params.query))
         )
-        # Also search in children names
-        query = query.outerjoin(models.Child).filter(
-            or_(search_filter, models.Child.name.ilike(f'%{params.query}%'))
-        ).distinct()
     
     # Filters
     if params.status:
-        query = query.filter(models.Parent.status == params.status)
+        query = query.where(models.Parent.status == params.status)
     
     if params.stage:
-        query = query.filter(models.Parent.stage == params.stage)
+        query = query.where(models.Parent.stage == params.stage)
     
     if params.source:
-        query = query.filter(models.Parent.source == params.source)
+        query = query.where(models.Parent.source == params.source)
     
     if params.min_lead_score is not None:
-        query = query.filter(models.Parent.lead_score >= params.min_lead_score)
+        query = query.where(models.Parent.lead_score >= params.min_lead_score)
     
     if params.max_lead_score is not None:
-        query = query.filter(models.Parent.lead_score <= params.max_lead_score)
+        query = query.where(models.Parent.lead_score <= params.max_lead_score)
     
     if params.created_after:
-        query = query.filter(models.Parent.created_at >= params.created_after)
+        query = query.where(models.Parent.created_at >= params.created_after)
     
     if params.created_before:
-        query = query.filter(models.Parent.created_at <= params.created_before)
+        query = query.where(models.Parent.created_at <= params.created_before)
     
     if params.tags:
         for tag in params.tags:
-            query = query.filter(models.Parent.tags.contains([tag]))
+            query = query.where(models.Parent.tags.contains([tag]))
     
     if params.has_children is not None:
-        if params.has_children:
-            query = query.join(models.Child).distinct()
-        else:
-            query = query.outerjoin(models.Child).filter(models.Child.id.is_(None))
+        has_child = exists().where(models.Child.parent_id == models.Parent.id)
+        query = query.where(has_child if params.has_children else ~has_child)
     
-    # Get total count
-    total = query.count()
+    return query
+
+@router.get("/search", response_model=schemas.ParentListResponse)
+async def search_parents(
+    customer_id: str = Query(..., description="Customer ID"),
+    params: schemas.ParentSearchParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search parents with filters and pagination"""
+    # Project only the columns schemas.Parent exposes - no ORM objects to build
+    query = apply_search_filters(
+        select(*schema_columns(models.Parent, schemas.Parent)), customer_id, params
+    )
     
-    # Sorting
-    sort_column = getattr(models.Parent, params.sort_by, models.Parent.created_at)
-    if params.sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+    # Sorting (id breaks ties so pages and cursors are stable)
+    sort_column = SORT_COLUMNS.get(params.sort_by, models.Parent.created_at)
+    sort_by = sort_column.key
+    descending = params.sort_order == "desc"
+    count_query = query
+    
+    # Keyset pagination: continue after the (sort value, id) in the cursor
+    if params.cursor:
+        try:
+            value, row_id = decode_cursor(params.cursor, sort_column, sort_by, params.sort_order)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(sort_column, models.Parent.id, value, row_id, descending))
+    
+    if descending:
+        query = query.order_by(sort_column.desc(), models.Parent.id.desc())
     else:
-        query = query.order_by(sort_column)
-    
-    # Pagination
-    query = query.offset((params.page - 1) * params.per_page).limit(params.per_page)
-    
-    # Execute query with eager loading
-    parents = query.options(
-        joinedload(models.Parent.children)
-    ).all()
+        query = query.order_by(sort_column, models.Parent.id)
+    
+    # Pagination - one extra row tells us whether there is a next page
+    if not params.cursor:
+        query = query.offset((params.page - 1) * params.per_page)
+    query = query.limit(params.per_page + 1)
+    
+    parents = rows_to_dicts((await db.execute(query)).all())
+    
+    has_more = len(parents) > params.per_page
+    parents = parents[:params.per_page]
+    next_cursor = None
+    if has_more:
+        last = parents[-1]
+        next_cursor = encode_cursor(sort_by, params.sort_order, last[sort_by], last["id"])
+    
+    # Total: exact count on request, otherwise the planner's estimate
+    total_is_estimate = False
+    if not params.include_total:
+        # Infinite scroll and the like: no count, EXPLAIN or savepoint at all
+        total = None
+    elif params.exact_total:
+        total = await db.scalar(
+            select(func.count()).select_from(count_query.subquery())
+        )
+    elif not has_more and not params.cursor:
+        # Last offset page - the exact total is known for free
+        total = (params.page - 1) * params.per_page + len(parents)
+    else:
+        total = await estimate_row_count(db, count_query)
+        total_is_estimate = True
+        if total is None:
+            total = await db.scalar(
+                select(func.count()).select_from(count_query.subquery())
+            )
+            total_is_estimate = False
+        elif not params.cursor:
+            # Never report fewer rows than this page proves exist
+            total = max(total, params.page * params.per_page + 1)
     
     # Calculate pages
-    pages = (total + params.per_page - 1) // params.per_page
-    
-    return schemas.ParentListResponse(
-        parents=parents,
-        total=total,
-        page=params.page,
-        per_page=params.per_page,
-        pages=pages
+    pages = None if total is None else (total + params.per_page - 1) // params.per_page
+    
+    return ORJSONResponse({
+        "parents": parents,
+        "total": total,
+        "page": params.page,
+        "per_page": params.per_page,
+        "pages": pages,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor
+    })
+
+@router.get("/export")
+async def export_parents(
+    customer_id: str = Query(..., description="Customer ID"),
+    params: schemas.ParentSearchParams = Depends(),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Gzip-compress the stream"),
+):
+    """Stream every matching parent with their children as NDJSON or CSV"""
+    query = apply_search_filters(select(*EXPORT_COLUMNS), customer_id, params)
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"parents-{customer_id}.{format}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+    
+    return StreamingResponse(
+        stream_export(query, format=format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
+# Helper to read one keyset page of a parent's related rows, newest first
+async def fetch_related_page(
+    db: AsyncSession,
+    model,
+    schema,
+    sort_column,
+    parent_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+):
+    """
+    Return (rows as dicts of the schema's columns, next_cursor) ordered by sort_column DESC, id DESC.
+    Matches the (parent_id, <date> DESC) indexes so only `limit` rows are read.
+    """
+    query = select(*schema_columns(model, schema)).where(model.parent_id == parent_id)
+    
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, sort_column, sort_column.key, "desc")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(keyset_filter(sort_column, model.id, value, row_id, True))
+    
+    rows = rows_to_dicts((await db.execute(
+        query.order_by(sort_column.desc(), model.id.desc()).limit(limit + 1)
+    )).all())
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_column.key, "desc", last[sort_column.key], last["id"])
+    
+    return rows, next_cursor
+
+# Helper to check the parent exists for this customer
+async def ensure_parent_exists(db: AsyncSession, parent_id: int, customer_id: str):
+    exists = await db.scalar(
+        select(models.Parent.id).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        )
+    )
+    if not exists:
+        raise HTTPException(status_code=404, detail="Parent not found")
+
 @router.get("/{parent_id}", response_model=schemas.ParentWithDetails)
 async def get_parent(
     parent_id: int,
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed parent information"""
-    parent = db.query(models.Parent).filter(
-        models.Parent.id == parent_id,
-        models.Parent.customer_id == customer_id
-    ).options(
-        joinedload(models.Parent.children),
-        joinedload(models.Parent.notes),
-        joinedload(models.Parent.emails),
-        joinedload(models.Parent.journey_events)
-    ).first()
-    
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent not found")
-    
-    # Get counts
-    email_count = db.query(func.count(models.Email.id)).filter(
-        models.Email.parent_id == parent_id
-    ).scalar()
+    # Parent row and counts in one round trip
+    email_count = select(func.count(models.Email.id)).where(
+        models.Email.parent_id == models.Parent.id
+    ).scalar_subquery()
     
-    task_count = db.query(func.count(models.Task.id)).filter(
-        models.Task.parent_id == parent_id,
+    task_count = select(func.count(models.Task.id)).where(
+        models.Task.parent_id == models.Parent.id,
         models.Task.status != 'completed'
-    ).scalar()
+    ).scalar_subquery()
+    
+    row = (await db.execute(
+        select(
+            *schema_columns(models.Parent, schemas.Parent),
+            email_count.label("email_count"),
+            task_count.label("task_count")
+        ).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        )
+    )).first()
     
-    # Get recent emails (last 10)
-    recent_emails = parent.emails[:10] if parent.emails else []
+    if not row:
+        raise HTTPException(status_code=404, detail="Parent not found")
     
-    # Get recent notes (last 5)
-    recent_notes = sorted(parent.notes, key=lambda x: x.created_at, reverse=True)[:5]
+    children = rows_to_dicts((await db.execute(
+        select(*schema_columns(models.Child, schemas.Child)).where(
+            models.Child.parent_id == parent_id
+        ).order_by(models.Child.id)
+    )).all())
     
-    # Get recent journey events (last 10)
-    recent_events = sorted(parent.journey_events, key=lambda x: x.event_date, reverse=True)[:10]
+    # Each related collection is read with its own LIMITed, index-ordered query
+    recent_emails, emails_cursor = await fetch_related_page(
+        db, models.Email, schemas.EmailSummary, models.Email.date_received, parent_id, limit=10
+    )
+    recent_notes, notes_cursor = await fetch_related_page(
+        db, models.Note, schemas.Note, models.Note.created_at, parent_id, limit=5
+    )
+    recent_events, events_cursor = await fetch_related_page(
+        db, models.JourneyEvent, schemas.JourneyEventSummary, models.JourneyEvent.event_date, parent_id, limit=10
+    )
     
     # Create response
-    parent_dict = parent.__dict__.copy()
-    parent_dict['children'] = parent.children
+    parent_dict = row._asdict()
+    parent_dict['children'] = children
     parent_dict['recent_emails'] = recent_emails
     parent_dict['recent_notes'] = recent_notes
     parent_dict['journey_events'] = recent_events
-    parent_dict['email_count'] = email_count
-    parent_dict['task_count'] = task_count
+    parent_dict['emails_cursor'] = emails_cursor
+    parent_dict['notes_cursor'] = notes_cursor
+    parent_dict['events_cursor'] = events_cursor
     
-    return schemas.ParentWithDetails(**parent_dict)
+    return ORJSONResponse(parent_dict)
+
+@router.get("/{parent_id}/emails", response_model=schemas.EmailPage)
+async def list_parent_emails(
+    parent_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through a parent's emails, newest first"""
+    await ensure_parent_exists(db, parent_id, customer_id)
+    items, next_cursor = await fetch_related_page(
+        db, models.Email, schemas.EmailSummary, models.Email.date_received, parent_id, limit, cursor
+    )
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+@router.get("/{parent_id}/notes", response_model=schemas.NotePage)
+async def list_parent_notes(
+    parent_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through a parent's notes, newest first"""
+    await ensure_parent_exists(db, parent_id, customer_id)
+    items, next_cursor = await fetch_related_page(
+        db, models.Note, schemas.Note, models.Note.created_at, parent_id, limit, cursor
+    )
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+@router.get("/{parent_id}/events", response_model=schemas.JourneyEventPage)
+async def list_parent_events(
+    parent_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through a parent's journey events, newest first"""
+    await ensure_parent_exists(db, parent_id, customer_id)
+    items, next_cursor = await fetch_related_page(
+        db, models.JourneyEvent, schemas.JourneyEventSummary, models.JourneyEvent.event_date, parent_id, limit, cursor
+    )
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
 
 @router.post("/", response_model=schemas.Parent)
 async def create_parent(
     parent: schemas.ParentCreate,
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new parent and optionally their children"""
     # Generate parent ID
@@ -239,7 +439,7 @@ async def create_parent(
         last_contact_date=datetime.utcnow().date()
     )
     db.add(db_parent)
-    db.flush()  # Get the ID without committing
+    await db.flush()  # Get the ID without committing
     
     # Create children if provided
     for child_data in parent.children:
@@ -262,37 +462,110 @@ async def create_parent(
         created_by='SYSTEM'
     )
     db.add(journey_event)
+    await db.flush()
+    scores = await rescore_parents(db, customer_id, [db_parent.id])
+    
+    # Webhooks go out from the outbox after commit, never inline
+    queued = await enqueue_events(db, customer_id, [
+        (PARENT_CREATED, {**parent_payload(db_parent), **scores.get(db_parent.id, {})})
+    ])
     
-    db.commit()
-    db.refresh(db_parent)
+    await db.commit()
+    await db.refresh(db_parent)
+    stats_cache.invalidate(customer_id)
+    if queued:
+        webhook_dispatcher.notify()
     
     return db_parent
 
+@router.post("/import", response_model=schemas.ParentImportResult)
+async def import_parents(
+    request: Request,
+    customer_id: str = Query(..., description="Customer ID"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from Content-Type"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk import parents (with nested children) from a streamed CSV or NDJSON body.
+    CSV cells for address, custom_fields, tags and children hold JSON.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    reader = iter_csv_records if format == "csv" else iter_ndjson_records
+    result = await run_import(
+        db,
+        customer_id,
+        reader(request.stream()),
+        generate_parent_id,
+        batch_size=batch_size
+    )
+    
+    if result.imported:
+        stats_cache.invalidate(customer_id)
+    
+    return result
+
 @router.put("/{parent_id}", response_model=schemas.Parent)
 async def update_parent(
     parent_id: int,
     parent_update: schemas.ParentUpdate,
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update parent information"""
-    parent = db.query(models.Parent).filter(
-        models.Parent.id == parent_id,
-        models.Parent.customer_id == customer_id
-    ).first()
+    parent = await db.scalar(
+        select(models.Parent).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        )
+    )
     
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
     
     # Update fields
     update_data = parent_update.dict(exclude_unset=True)
+    previous_stage = parent.stage
     for field, value in update_data.items():
         setattr(parent, field, value)
     
     parent.last_contact_date = datetime.utcnow().date()
     
-    db.commit()
-    db.refresh(parent)
+    # Stage moves are journey events, so analytics can count transitions
+    scores = {}
+    events = []
+    new_stage = update_data.get('stage')
+    if new_stage is not None and new_stage != previous_stage:
+        new_stage = new_stage.value
+        db.add(models.JourneyEvent(
+            customer_id=customer_id,
+            parent_id=parent.id,
+            event_type='stage_change',
+            event_subtype=new_stage,
+            title=f'Stage changed to {new_stage}',
+            description=f'Stage changed from {previous_stage} to {new_stage}',
+            meta_data={'from': previous_stage, 'to': new_stage},
+            created_by='SYSTEM'
+        ))
+        await db.flush()
+        scores = await rescore_parents(db, customer_id, [parent.id])
+        events.append((PARENT_STAGE_CHANGED, {
+            **parent_payload(parent), **scores.get(parent.id, {}), 'previous_stage': previous_stage
+        }))
+    
+    if update_data:
+        events.append((PARENT_UPDATED, {
+            **parent_payload(parent, changes=update_data.keys()), **scores.get(parent.id, {})
+        }))
+    queued = await enqueue_events(db, customer_id, events)
+    
+    await db.commit()
+    await db.refresh(parent)
+    stats_cache.invalidate(customer_id)
+    if queued:
+        webhook_dispatcher.notify()
     
     return parent
 
@@ -301,13 +574,15 @@ async def add_child(
     parent_id: int,
     child: schemas.ChildCreate,
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a child to a parent"""
-    parent = db.query(models.Parent).filter(
-        models.Parent.id == parent_id,
-        models.Parent.customer_id == customer_id
-    ).first()
+    parent = await db.scalar(
+        select(models.Parent).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        )
+    )
     
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
@@ -318,8 +593,8 @@ async def add_child(
         customer_id=customer_id
     )
     db.add(db_child)
-    db.commit()
-    db.refresh(db_child)
+    await db.commit()
+    await db.refresh(db_child)
     
     return db_child
 
@@ -329,13 +604,15 @@ async def add_note(
     note: schemas.NoteCreate,
     customer_id: str = Query(..., description="Customer ID"),
     user_id: str = Query(..., description="User ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a note to a parent"""
-    parent = db.query(models.Parent).filter(
-        models.Parent.id == parent_id,
-        models.Parent.customer_id == customer_id
-    ).first()
+    parent = await db.scalar(
+        select(models.Parent).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        )
+    )
     
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
@@ -347,8 +624,11 @@ async def add_note(
         created_by=user_id
     )
     db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+    await db.flush()
+    await rescore_parents(db, customer_id, [parent_id])
+    await db.commit()
+    await db.refresh(db_note)
+    stats_cache.invalidate(customer_id)
     
     return db_note
 
@@ -356,18 +636,28 @@ async def add_note(
 async def delete_parent(
     parent_id: int,
     customer_id: str = Query(..., description="Customer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a parent and all related data"""
-    parent = db.query(models.Parent).filter(
-        models.Parent.id == parent_id,
-        models.Parent.customer_id == customer_id
-    ).first()
+    # Related rows are loaded up front so the ORM cascade runs without lazy loads
+    parent = await db.scalar(
+        select(models.Parent).where(
+            models.Parent.id == parent_id,
+            models.Parent.customer_id == customer_id
+        ).options(
+            selectinload(models.Parent.children),
+            selectinload(models.Parent.emails),
+            selectinload(models.Parent.journey_events),
+            selectinload(models.Parent.tasks),
+            selectinload(models.Parent.notes)
+        )
+    )
     
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
     
-    db.delete(parent)
-    db.commit()
+    await db.delete(parent)
+    await db.commit()
+    stats_cache.invalidate(customer_id)
     
     return {"message": "Parent deleted successfully"}
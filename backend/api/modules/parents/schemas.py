@@ -77,7 +77,7 @@ class EmailSummary(BaseModel):
     direction: str
     sentiment_score: Optional[float]
     sentiment_label: Optional[str]
-    date_received: datetime
+    date_received: Optional[datetime]
     status: str
     
     class Config:
@@ -158,10 +158,27 @@ class ParentWithDetails(Parent):
     journey_events: List[JourneyEventSummary] = []
     email_count: int = 0
     task_count: int = 0
+    # Cursors for the rest of each collection via /emails, /notes and /events
+    emails_cursor: Optional[str] = None
+    notes_cursor: Optional[str] = None
+    events_cursor: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+# Related collection pages
+class EmailPage(BaseModel):
+    items: List[EmailSummary]
+    next_cursor: Optional[str] = None
+
+class NotePage(BaseModel):
+    items: List[Note]
+    next_cursor: Optional[str] = None
+
+class JourneyEventPage(BaseModel):
+    items: List[JourneyEventSummary]
+    next_cursor: Optional[str] = None
+
 # Search/Filter Schemas
 class ParentSearchParams(BaseModel):
     query: Optional[str] = None
@@ -176,15 +193,33 @@ class ParentSearchParams(BaseModel):
     has_children: Optional[bool] = None
     page: int = Field(1, ge=1)
     per_page: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None  # Keyset mode: next_cursor from the previous page
+    exact_total: bool = False  # Otherwise total is a planner estimate
+    include_total: bool = True  # False: no count or estimate, total and pages are null
     sort_by: str = "created_at"
     sort_order: str = "desc"
 
 class ParentListResponse(BaseModel):
     parents: List[Parent]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+# Bulk import
+class ParentImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ParentImportResult(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    errors: List[ParentImportError] = []
+    elapsed_seconds: float
+    rows_per_second: float
 
 # Stats Schema
 class ParentStats(BaseModel):
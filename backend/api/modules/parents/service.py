@@ -0,0 +1,6 @@
+# backend/api/modules/parents/service.py
+import uuid
+
+# Helper function to generate parent ID
+def generate_parent_id():
+    return f"PARENT-{uuid.uuid4().hex[:8].upper()}"
@@ -0,0 +1,187 @@
+# backend/api/modules/rbac/cache.py
+import asyncio
+import os
+import time
+from contextlib import suppress
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from ...core.database import async_engine
+from .policy import TenantPolicy, compile_policy
+
+# How often each process checks permission_versions for changes made elsewhere
+# (other workers, SQL consoles); a change is enforced here within this many seconds
+RBAC_VERSION_POLL_SECONDS = float(os.getenv("RBAC_VERSION_POLL_SECONDS", 5))
+# Home tenants remembered for requests that carry no customer_id
+RBAC_MAX_USER_TENANTS = int(os.getenv("RBAC_MAX_USER_TENANTS", 100_000))
+# Compiled policies held per process; past this the cache starts over
+RBAC_MAX_TENANTS = int(os.getenv("RBAC_MAX_TENANTS", 10_000))
+
+SELECT_TENANT = text("SELECT 1 FROM customers WHERE customer_id = :customer_id")
+SELECT_VERSION = text("SELECT version FROM permission_versions WHERE customer_id = :customer_id")
+SELECT_VERSIONS = text("""
+    SELECT customer_id, version FROM permission_versions
+    WHERE customer_id = ANY(CAST(:customer_ids AS VARCHAR[]))
+""")
+SELECT_PERMISSIONS = text("""
+    SELECT id, role, resource, actions, conditions FROM role_permissions
+    WHERE customer_id = :customer_id
+""")
+SELECT_USERS = text("SELECT user_id, role, status FROM users WHERE customer_id = :customer_id")
+SELECT_USER_TENANT = text("SELECT customer_id FROM users WHERE user_id = :user_id")
+
+class PermissionCache:
+    """
+    Compiled RBAC policy per tenant. A decision on a cached tenant touches no database;
+    a tenant is compiled on first use. Writes through the API call invalidate(); writes
+    anywhere else bump permission_versions (triggers), which a background poll compares
+    against the cached versions, recompiling the tenants that changed. Only tenants in
+    customers are cached: a customer_id that isn't one gets an empty policy (which
+    denies everyone) and is looked up again on the next request.
+    """
+
+    def __init__(self, poll_seconds: float = RBAC_VERSION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._policies: Dict[str, TenantPolicy] = {}
+        # Bumped by invalidate(), so a compile that started before it isn't stored
+        self._generations: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._user_tenants: Dict[str, str] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.compiles = 0
+        self.compile_seconds = 0.0
+        self.polls = 0
+
+    def cached(self, customer_id: str) -> Optional[TenantPolicy]:
+        policy = self._policies.get(customer_id)
+        if policy is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return policy
+
+    async def _compile(self, customer_id: str) -> Optional[TenantPolicy]:
+        """The tenant's policy, or None if there is no such tenant"""
+        started = time.perf_counter()
+        async with async_engine.connect() as conn:
+            if (await conn.execute(SELECT_TENANT, {"customer_id": customer_id})).scalar() is None:
+                return None
+            # Version first: a change committing between the reads leaves an older version
+            # on newer rows (recompiled again at the next poll), never the other way round
+            version = (await conn.execute(SELECT_VERSION, {"customer_id": customer_id})).scalar() or 0
+            permissions = (await conn.execute(SELECT_PERMISSIONS, {"customer_id": customer_id})).all()
+            users = (await conn.execute(SELECT_USERS, {"customer_id": customer_id})).all()
+        policy = compile_policy(customer_id, version, permissions, users)
+        self.compiles += 1
+        self.compile_seconds += time.perf_counter() - started
+        return policy
+
+    async def load(self, customer_id: str, refresh: bool = False) -> TenantPolicy:
+        """The tenant's policy, compiling it (once, however many requests wait) if needed"""
+        policy = None if refresh else self._policies.get(customer_id)
+        if policy is not None:
+            return policy
+
+        lock = self._locks.setdefault(customer_id, asyncio.Lock())
+        try:
+            async with lock:
+                policy = None if refresh else self._policies.get(customer_id)
+                if policy is not None:
+                    return policy
+                generation = self._generations.get(customer_id, 0)
+                policy = await self._compile(customer_id)
+                if policy is None:
+                    self._policies.pop(customer_id, None)
+                    return TenantPolicy(customer_id, 0, (), {})
+                if self._generations.get(customer_id, 0) == generation:
+                    if len(self._policies) >= RBAC_MAX_TENANTS and customer_id not in self._policies:
+                        self._policies.clear()
+                    self._policies[customer_id] = policy
+                return policy
+        finally:
+            # Requests already waiting hold the lock object; a later one finds the policy cached
+            if self._locks.get(customer_id) is lock and not lock.locked():
+                del self._locks[customer_id]
+
+    async def get(self, customer_id: str) -> TenantPolicy:
+        policy = self.cached(customer_id)
+        return policy if policy is not None else await self.load(customer_id)
+
+    def invalidate(self, customer_id: str):
+        """Drop a tenant's policy after a write; the next request recompiles it"""
+        self._generations[customer_id] = self._generations.get(customer_id, 0) + 1
+        self._policies.pop(customer_id, None)
+
+    def clear(self):
+        for customer_id in list(self._policies):
+            self.invalidate(customer_id)
+        self._user_tenants.clear()
+
+    async def home_tenant(self, user_id: str) -> Optional[str]:
+        """The tenant a user belongs to, for requests that don't name one"""
+        customer_id = self._user_tenants.get(user_id)
+        if customer_id is not None:
+            policy = self._policies.get(customer_id)
+            # Still there, or unknown yet; a user who moved is looked up again
+            if policy is None or user_id in policy.users:
+                return customer_id
+        async with async_engine.connect() as conn:
+            customer_id = (await conn.execute(SELECT_USER_TENANT, {"user_id": user_id})).scalar()
+        if customer_id is not None:
+            if len(self._user_tenants) >= RBAC_MAX_USER_TENANTS:
+                self._user_tenants.clear()
+            self._user_tenants[user_id] = customer_id
+        return customer_id
+
+    async def refresh_stale(self) -> int:
+        """Recompile cached tenants whose permission version moved; returns how many"""
+        if not self._policies:
+            return 0
+        async with async_engine.connect() as conn:
+            versions = dict((await conn.execute(
+                SELECT_VERSIONS, {"customer_ids": list(self._policies)}
+            )).all())
+        stale = [
+            customer_id for customer_id, policy in list(self._policies.items())
+            if versions.get(customer_id, 0) != policy.version
+        ]
+        for customer_id in stale:
+            # Recompiled in place, so requests keep the old policy until the new one is ready
+            await self.load(customer_id, refresh=True)
+        self.polls += 1
+        return len(stale)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.refresh_stale()
+            except Exception as e:
+                print(f"RBAC version poll failed: {e}")
+
+    def start(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+
+    def stats(self) -> dict:
+        return {
+            "tenants": len(self._policies),
+            "hits": self.hits,
+            "misses": self.misses,
+            "compiles": self.compiles,
+            "compile_ms": round(self.compile_seconds * 1000, 1),
+            "polls": self.polls,
+        }
+
+# Process-wide cache; each worker compiles and polls on its own
+permission_cache = PermissionCache()
@@ -0,0 +1,78 @@
+# backend/api/modules/rbac/dependencies.py
+"""
+Route protection: `Depends(authorize("parents"))` on a route or router checks the
+caller against the tenant's compiled policy. The caller is the user named by the
+X-User-ID header, set by the authenticating gateway in front of the API; the tenant is
+the request's customer_id (else the user's own). The action follows the HTTP method
+unless given.
+"""
+import os
+from collections import Counter
+from typing import Callable, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from .cache import permission_cache
+from .policy import ACTIONS_BY_METHOD, Principal, rbac_log
+
+# enforce: deny with 401/403. audit: allow, but log and count what would be denied
+# (the default, while callers are moved onto the header). off: no checks.
+RBAC_MODE = os.getenv("RBAC_MODE", "audit").lower()
+RBAC_USER_HEADER = os.getenv("RBAC_USER_HEADER", "X-User-ID")
+# Distinct (user, resource, action, reason) denials logged in audit mode; later repeats are only counted
+RBAC_AUDIT_LOG_LIMIT = 1000
+
+denials: Counter = Counter()
+_logged: Set[Tuple] = set()
+
+def _deny(status_code: int, detail: str, user_id: Optional[str], resource: str, action: str):
+    denials[(resource, action)] += 1
+    if RBAC_MODE == "enforce":
+        raise HTTPException(status_code=status_code, detail=detail)
+    key = (user_id, resource, action, detail)
+    if key not in _logged and len(_logged) < RBAC_AUDIT_LOG_LIMIT:
+        _logged.add(key)
+        rbac_log.warning("RBAC would deny %s %s on %s: %s", user_id or "anonymous", action, resource, detail)
+
+def authorize(resource: str, action: Optional[str] = None) -> Callable:
+    """A dependency allowing the request if the caller's role may act on resource"""
+
+    async def check(request: Request) -> Optional[Principal]:
+        if RBAC_MODE == "off":
+            return None
+        needed = action or ACTIONS_BY_METHOD.get(request.method, request.method.lower())
+
+        user_id = request.headers.get(RBAC_USER_HEADER)
+        if not user_id:
+            _deny(401, "Not authenticated", None, resource, needed)
+            return None
+
+        customer_id = request.query_params.get("customer_id") or request.path_params.get("customer_id")
+        if customer_id is None:
+            customer_id = await permission_cache.home_tenant(user_id)
+            if customer_id is None:
+                _deny(403, "Unknown user", user_id, resource, needed)
+                return None
+
+        policy = permission_cache.cached(customer_id)
+        if policy is None:
+            policy = await permission_cache.load(customer_id)
+
+        principal = policy.users.get(user_id)
+        if principal is None:
+            _deny(403, "User does not belong to this customer", user_id, resource, needed)
+            return None
+
+        decision = policy.decide(principal, resource, needed)
+        if not decision.allowed:
+            _deny(403, decision.reason, user_id, resource, needed)
+        return principal
+
+    return check
+
+def stats() -> dict:
+    return {
+        "mode": RBAC_MODE,
+        "denials": {f"{resource}:{action}": count for (resource, action), count in denials.items()},
+        **permission_cache.stats(),
+    }
@@ -0,0 +1,25 @@
+# backend/api/modules/rbac/models.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, ARRAY, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class RolePermission(Base):
+    __tablename__ = "role_permissions"
+    __table_args__ = (UniqueConstraint("customer_id", "role", "resource"),)
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    role = Column(String(50))
+    resource = Column(String(100))
+    actions = Column(ARRAY(Text))
+    conditions = Column(JSONB, default=dict)
+    created_at = Column(DateTime, default=func.now())
+
+class PermissionVersion(Base):
+    """Bumped by triggers on role_permissions and users; never written by the API"""
+    __tablename__ = "permission_versions"
+
+    customer_id = Column(String(50), ForeignKey("customers.customer_id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime, default=func.now())
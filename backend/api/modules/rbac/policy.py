@@ -0,0 +1,121 @@
+# backend/api/modules/rbac/policy.py
+"""
+A tenant's role_permissions rows compiled into a lookup table. Each row grants a role
+some actions on a resource ('*' matches any), so a decision is a few dict lookups.
+
+Conditional grants (a row with `conditions`) are not supported: they would have to be
+checked against the attributes of the loaded resource, which routes don't supply, and
+not the request's query and path parameters, which the caller chooses. Such a row
+grants nothing, and is logged once per permission version; the API refuses to store
+new ones.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+ANY = "*"
+
+# The action a request needs, by HTTP method
+ACTIONS_BY_METHOD = {
+    "GET": "read",
+    "HEAD": "read",
+    "OPTIONS": "read",
+    "POST": "create",
+    "PUT": "update",
+    "PATCH": "update",
+    "DELETE": "delete",
+}
+
+# (customer_id, permission id, version) of conditional rows already logged; bounded
+# like the audit-mode denial log, later repeats are silent
+RBAC_IGNORED_LOG_LIMIT = 1000
+
+rbac_log = logging.getLogger("api.rbac")
+
+_ignored: Set[Tuple[str, int, int]] = set()
+
+class Principal(NamedTuple):
+    user_id: str
+    customer_id: str
+    role: Optional[str]
+    active: bool
+
+class Grant(NamedTuple):
+    """One role_permissions row for one action"""
+    permission_id: int
+    role: str
+    resource: str
+
+class Decision(NamedTuple):
+    allowed: bool
+    reason: str
+    permission_id: Optional[int] = None
+
+class TenantPolicy:
+    """
+    The compiled policy of one tenant at one permission version. Immutable once built
+    (the grants lookup is memoised per role, resource and action), so a request can keep
+    using it while a newer version is compiled.
+    """
+
+    def __init__(self, customer_id: str, version: int, grants: Iterable[Tuple[str, Grant]], users: Dict[str, Principal]):
+        self.customer_id = customer_id
+        self.version = version
+        self.users = users
+        self.rules: Dict[Tuple[str, str, str], List[Grant]] = {}
+        for action, grant in grants:
+            self.rules.setdefault((grant.role, grant.resource, action), []).append(grant)
+        self._applicable: Dict[Tuple[str, str, str], Tuple[Grant, ...]] = {}
+
+    def applicable(self, role: str, resource: str, action: str) -> Tuple[Grant, ...]:
+        """Grants covering the request, exact resource and action before wildcards"""
+        key = (role, resource, action)
+        grants = self._applicable.get(key)
+        if grants is None:
+            grants = tuple(
+                grant
+                for lookup in ((role, resource, action), (role, resource, ANY), (role, ANY, action), (role, ANY, ANY))
+                for grant in self.rules.get(lookup, ())
+            )
+            self._applicable[key] = grants
+        return grants
+
+    def decide(self, principal: Principal, resource: str, action: str) -> Decision:
+        if not principal.active:
+            return Decision(False, "User is not active")
+        if principal.role is None:
+            return Decision(False, "User has no role")
+        grants = self.applicable(principal.role, resource, action)
+        if not grants:
+            return Decision(False, f"Role {principal.role!r} may not {action} {resource}")
+        return Decision(True, "Granted", grants[0].permission_id)
+
+    def stats(self) -> dict:
+        return {"version": self.version, "rules": len(self.rules), "users": len(self.users)}
+
+def compile_policy(customer_id: str, version: int, permissions: Iterable[Any], users: Iterable[Any]) -> TenantPolicy:
+    """
+    Build a TenantPolicy from role_permissions rows (id, role, resource, actions,
+    conditions) and users rows (user_id, role, status). Conditional rows are left out
+    (see above).
+    """
+    grants = []
+    for row in permissions:
+        if not row.role or not row.resource:
+            continue
+        if row.conditions:
+            key = (customer_id, row.id, version)
+            if key not in _ignored and len(_ignored) < RBAC_IGNORED_LOG_LIMIT:
+                _ignored.add(key)
+                rbac_log.warning(
+                    "Ignoring permission %s of %s (version %s): conditional grants are not supported",
+                    row.id, customer_id, version
+                )
+            continue
+        for action in row.actions or ():
+            grants.append((action, Grant(row.id, row.role, row.resource)))
+
+    principals = {
+        user.user_id: Principal(user.user_id, customer_id, user.role, (user.status or "active") == "active")
+        for user in users
+    }
+    return TenantPolicy(customer_id, version, grants, principals)
@@ -0,0 +1,102 @@
+# backend/api/modules/rbac/routes.py
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_async_db
+from . import dependencies, models, schemas
+from .cache import permission_cache
+from .policy import ANY, ACTIONS_BY_METHOD
+
+router = APIRouter(prefix="/api/rbac", tags=["rbac"])
+
+KNOWN_ACTIONS = set(ACTIONS_BY_METHOD.values()) | {ANY}
+
+@router.get("/permissions", response_model=List[schemas.Permission])
+async def list_permissions(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The tenant's role permissions"""
+    result = await db.execute(
+        select(models.RolePermission)
+        .where(models.RolePermission.customer_id == customer_id)
+        .order_by(models.RolePermission.role, models.RolePermission.resource)
+    )
+    return result.scalars().all()
+
+@router.put("/permissions", response_model=schemas.Permission)
+async def put_permission(
+    permission: schemas.PermissionIn,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create or replace the permission of a role on a resource"""
+    unknown = set(permission.actions) - KNOWN_ACTIONS
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown actions: {', '.join(sorted(unknown))}")
+    if permission.conditions:
+        # They would grant nothing (see policy.py)
+        raise HTTPException(status_code=422, detail="Conditional grants are not supported yet")
+
+    statement = insert(models.RolePermission).values(customer_id=customer_id, **permission.model_dump())
+    statement = statement.on_conflict_do_update(
+        index_elements=["customer_id", "role", "resource"],
+        set_={"actions": statement.excluded.actions, "conditions": statement.excluded.conditions}
+    ).returning(models.RolePermission)
+    row = (await db.execute(statement)).scalar_one()
+    await db.commit()
+    # Other processes pick the change up from permission_versions
+    permission_cache.invalidate(customer_id)
+    return row
+
+@router.delete("/permissions/{permission_id}")
+async def delete_permission(
+    permission_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Remove a role permission"""
+    result = await db.execute(
+        delete(models.RolePermission).where(
+            models.RolePermission.id == permission_id,
+            models.RolePermission.customer_id == customer_id
+        )
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Permission not found")
+    await db.commit()
+    permission_cache.invalidate(customer_id)
+    return {"message": "Permission deleted successfully"}
+
+@router.get("/check", response_model=schemas.PermissionCheck)
+async def check_permission(
+    user_id: str,
+    resource: str,
+    action: str = "read",
+    customer_id: str = Query(..., description="Customer ID")
+):
+    """What the compiled policy decides for a user, and why"""
+    policy = await permission_cache.get(customer_id)
+    principal = policy.users.get(user_id)
+    if principal is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    decision = policy.decide(principal, resource, action)
+    return schemas.PermissionCheck(
+        user_id=user_id,
+        role=principal.role,
+        resource=resource,
+        action=action,
+        allowed=decision.allowed,
+        reason=decision.reason,
+        permission_id=decision.permission_id,
+        policy_version=policy.version
+    )
+
+@router.get("/stats", response_model=schemas.RbacStats)
+async def rbac_stats():
+    """Policy cache and denial counters for this worker process"""
+    return schemas.RbacStats(**dependencies.stats())
@@ -0,0 +1,44 @@
+# backend/api/modules/rbac/schemas.py
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class PermissionIn(BaseModel):
+    role: str = Field(..., min_length=1, max_length=50)
+    # A resource name, or '*' for every resource
+    resource: str = Field(..., min_length=1, max_length=100)
+    # read, create, update, delete, or '*'
+    actions: List[str] = Field(..., min_length=1)
+    conditions: Dict[str, Any] = Field(default_factory=dict)
+
+class Permission(BaseModel):
+    id: int
+    customer_id: str
+    role: str
+    resource: str
+    actions: List[str]
+    conditions: Dict[str, Any]
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class PermissionCheck(BaseModel):
+    user_id: str
+    role: Optional[str]
+    resource: str
+    action: str
+    allowed: bool
+    reason: str
+    permission_id: Optional[int] = None
+    policy_version: int
+
+class RbacStats(BaseModel):
+    mode: str
+    denials: Dict[str, int]
+    tenants: int
+    hits: int
+    misses: int
+    compiles: int
+    compile_ms: float
+    polls: int
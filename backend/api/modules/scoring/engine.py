@@ -0,0 +1,165 @@
+# backend/api/modules/scoring/engine.py
+"""
+Vectorised lead / engagement / risk scoring.
+
+Every activity contributes with an exponential time decay (half-life
+DECAY_HALF_LIFE_DAYS), so recent contact counts more than old contact and
+scores drift down on their own when a family goes quiet. The same kernel
+scores one parent or a whole tenant: activity arrives as flat arrays keyed by
+parent id and is reduced per parent with np.bincount.
+"""
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+DECAY_HALF_LIFE_DAYS = 30.0
+SECONDS_PER_DAY = 86400.0
+
+# Stage is the backbone of the lead score
+STAGE_BASE = {
+    "awareness": 10,
+    "interest": 20,
+    "consideration": 35,
+    "intent": 50,
+    "evaluation": 60,
+    "enrolled": 85,
+}
+
+# Activity weights for engagement (per decayed item)
+ENGAGEMENT_WEIGHTS = {
+    "inbound_email": 1.0,
+    "outbound_email": 0.3,
+    "event": 0.5,
+    "note": 0.4,
+}
+ENGAGEMENT_SATURATION = 4.0  # decayed weight at which engagement reaches ~63
+
+NEGATIVE_SENTIMENT = -0.3
+CLOSED_TASK_STATUSES = ("completed", "cancelled")
+
+class Activity(NamedTuple):
+    """Flat per-source arrays; parent ids need not be sorted or unique"""
+    email_parent: np.ndarray      # int64
+    email_time: np.ndarray        # float64 epoch seconds (NaN if unknown)
+    email_inbound: np.ndarray     # bool
+    email_sentiment: np.ndarray   # float64, NaN if not scored
+    event_parent: np.ndarray
+    event_time: np.ndarray
+    event_impact: np.ndarray      # float64, 0 if unset
+    task_parent: np.ndarray
+    task_due: np.ndarray          # float64 epoch seconds, NaN if no due date
+    note_parent: np.ndarray
+    note_time: np.ndarray
+
+class Scores(NamedTuple):
+    lead: np.ndarray
+    engagement: np.ndarray
+    risk: np.ndarray
+
+def _decay(times: np.ndarray, as_of: float) -> np.ndarray:
+    age_days = np.maximum(as_of - times, 0.0) / SECONDS_PER_DAY
+    weights = np.exp2(-age_days / DECAY_HALF_LIFE_DAYS)
+    # Undated activity still counts, at the weight of something a half-life old
+    return np.where(np.isnan(weights), 0.5, weights)
+
+def _positions(parent_ids: np.ndarray, keys: np.ndarray):
+    """Index of each key in the sorted parent_ids, plus a mask of keys that are present"""
+    idx = np.minimum(np.searchsorted(parent_ids, keys), len(parent_ids) - 1)
+    return idx, parent_ids[idx] == keys
+
+def _per_parent(positions, weights, size: int) -> np.ndarray:
+    """Sum weights per parent; positions come from _positions for the same source"""
+    idx, known = positions
+    # astype: bincount of an empty selection comes back as int64 even with float weights
+    return np.bincount(idx[known], weights=weights[known], minlength=size).astype(np.float64)
+
+def compute_scores(parent_ids: np.ndarray, stages: np.ndarray, activity: Activity, as_of: float) -> Scores:
+    """
+    Scores for parent_ids (sorted ascending, unique) with stage names ('' if unset) in the same order.
+    Returns int arrays in 0..100 aligned with parent_ids.
+    """
+    if len(parent_ids) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Scores(empty, empty, empty)
+
+    n = len(parent_ids)
+    email_at = _positions(parent_ids, activity.email_parent)
+    event_at = _positions(parent_ids, activity.event_parent)
+
+    # Emails
+    email_w = _decay(activity.email_time, as_of)
+    inbound = activity.email_inbound
+    inbound_w = np.where(inbound, email_w, 0.0)
+    scored = inbound & ~np.isnan(activity.email_sentiment)
+    sentiment = np.nan_to_num(activity.email_sentiment)
+
+    e_in = _per_parent(email_at, inbound_w, n)
+    e_out = _per_parent(email_at, email_w - inbound_w, n)
+    sent_w = _per_parent(email_at, np.where(scored, email_w, 0.0), n)
+    sent_sum = _per_parent(email_at, np.where(scored, email_w * sentiment, 0.0), n)
+    negative = _per_parent(email_at, np.where(scored & (sentiment < NEGATIVE_SENTIMENT), email_w, 0.0), n)
+
+    # Last inbound contact (-inf when there never was one)
+    last_inbound = np.full(n, -np.inf)
+    idx, known = email_at
+    dated = known & inbound & ~np.isnan(activity.email_time)
+    np.maximum.at(last_inbound, idx[dated], activity.email_time[dated])
+
+    # Journey events and notes
+    event_w = _decay(activity.event_time, as_of)
+    events = _per_parent(event_at, event_w, n)
+    impact = _per_parent(event_at, event_w * activity.event_impact, n)
+    notes = _per_parent(
+        _positions(parent_ids, activity.note_parent), _decay(activity.note_time, as_of), n
+    )
+
+    # Open tasks (callers pass open tasks only)
+    overdue = _per_parent(
+        _positions(parent_ids, activity.task_parent),
+        (activity.task_due < as_of).astype(np.float64), n
+    )
+
+    # Engagement: saturating sum of decayed activity
+    activity_weight = (
+        ENGAGEMENT_WEIGHTS["inbound_email"] * e_in
+        + ENGAGEMENT_WEIGHTS["outbound_email"] * e_out
+        + ENGAGEMENT_WEIGHTS["event"] * events
+        + ENGAGEMENT_WEIGHTS["note"] * notes
+    )
+    engagement = 100.0 * (1.0 - np.exp(-activity_weight / ENGAGEMENT_SATURATION))
+
+    # Lead: stage base + engagement + mood + journey impact
+    stage_base = np.fromiter((STAGE_BASE.get(stage, 0) for stage in stages), np.float64, n)
+    mean_sentiment = np.divide(sent_sum, sent_w, out=np.zeros_like(sent_sum), where=sent_w > 0)
+    lead = (
+        stage_base
+        + 0.35 * engagement
+        + 15.0 * mean_sentiment
+        + np.clip(2.0 * impact, -20.0, 20.0)
+    )
+
+    # Risk: negative mood, overdue follow-ups, silence since the family last wrote
+    negative_share = np.divide(negative, e_in, out=np.zeros_like(negative), where=e_in > 0)
+    silent_days = np.where(
+        np.isfinite(last_inbound),
+        np.maximum(as_of - last_inbound, 0.0) / SECONDS_PER_DAY,
+        0.0
+    )
+    risk = (
+        40.0 * negative_share
+        + 10.0 * np.minimum(overdue, 3.0)
+        + 30.0 * (1.0 - np.exp(-silent_days / 45.0))
+        + np.where(mean_sentiment < -0.2, 20.0, 0.0)
+    )
+
+    def to_int(values):
+        return np.clip(np.rint(values), 0, 100).astype(np.int64)
+
+    return Scores(to_int(lead), to_int(engagement), to_int(risk))
+
+def scores_by_parent(parent_ids: np.ndarray, scores: Scores) -> Dict[int, Dict[str, int]]:
+    """Scores keyed by parent id (for small result sets)"""
+    return {
+        int(pid): {"lead_score": int(l), "engagement_score": int(e), "risk_score": int(r)}
+        for pid, l, e, r in zip(parent_ids, scores.lead, scores.engagement, scores.risk)
+    }
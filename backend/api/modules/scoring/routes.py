@@ -0,0 +1,37 @@
+# backend/api/modules/scoring/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.database import get_async_db
+from ..parents.cache import stats_cache
+from . import schemas
+from .service import rescore_parents, recompute_tenant
+
+router = APIRouter(prefix="/api/scoring", tags=["scoring"])
+
+@router.post("/recompute", response_model=schemas.ScoreRecomputeResult)
+async def recompute_scores(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recompute lead, engagement and risk scores for every parent of a tenant"""
+    result = await recompute_tenant(db, customer_id)
+    if result.updated:
+        stats_cache.invalidate(customer_id)
+    return result
+
+@router.post("/parents/{parent_id}", response_model=schemas.ParentScores)
+async def rescore_parent(
+    parent_id: int,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recompute one parent's scores now"""
+    scores = await rescore_parents(db, customer_id, [parent_id])
+    if parent_id not in scores:
+        raise HTTPException(status_code=404, detail="Parent not found")
+    
+    await db.commit()
+    stats_cache.invalidate(customer_id)
+    
+    return {"parent_id": parent_id, **scores[parent_id]}
@@ -0,0 +1,15 @@
+# backend/api/modules/scoring/schemas.py
+from pydantic import BaseModel
+
+class ParentScores(BaseModel):
+    parent_id: int
+    lead_score: int
+    engagement_score: int
+    risk_score: int
+
+class ScoreRecomputeResult(BaseModel):
+    customer_id: str
+    parents: int
+    updated: int
+    elapsed_seconds: float
+    parents_per_second: float
@@ -0,0 +1,189 @@
+# backend/api/modules/scoring/service.py
+import time
+from typing import Dict, Iterable
+
+import numpy as np
+from sqlalchemy import Float, select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..notifications.service import NOTIFY_RISK_SCORE, alert_at_risk
+from ..parents import models
+from . import schemas
+from .engine import Activity, CLOSED_TASK_STATUSES, compute_scores, scores_by_parent
+
+# Parents scored per round trip / transaction by the tenant recompute
+RECOMPUTE_CHUNK_PARENTS = 50_000
+
+def _epoch(column):
+    # date_part returns float8 directly; extract() goes through numeric and is slower
+    return func.date_part('epoch', column)
+
+def _array(values, dtype) -> np.ndarray:
+    """asyncpg returns array_agg as a list (or None for no rows); NULL elements become NaN"""
+    return np.array(values or [], dtype=dtype)
+
+def _activity_queries(customer_id: str, parent_filter):
+    """One array_agg row per source: each source is a single round trip, however many rows"""
+    email, event, task, note = models.Email, models.JourneyEvent, models.Task, models.Note
+    return {
+        "email": select(
+            func.array_agg(email.parent_id),
+            func.array_agg(_epoch(email.date_received)),
+            func.array_agg(func.coalesce(email.direction == 'inbound', False)),
+            func.array_agg(email.sentiment_score.cast(Float)),
+        ).where(email.customer_id == customer_id, parent_filter(email.parent_id)),
+        "event": select(
+            func.array_agg(event.parent_id),
+            func.array_agg(_epoch(event.event_date)),
+            func.array_agg(func.coalesce(event.impact_score, 0)),
+        ).where(event.customer_id == customer_id, parent_filter(event.parent_id)),
+        "task": select(
+            func.array_agg(task.parent_id),
+            func.array_agg(_epoch(task.due_date)),
+        ).where(
+            task.customer_id == customer_id,
+            parent_filter(task.parent_id),
+            func.coalesce(task.status, 'pending').notin_(CLOSED_TASK_STATUSES)
+        ),
+        "note": select(
+            func.array_agg(note.parent_id),
+            func.array_agg(_epoch(note.created_at)),
+        ).where(note.customer_id == customer_id, parent_filter(note.parent_id)),
+    }
+
+async def load_activity(db: AsyncSession, customer_id: str, parent_filter) -> Activity:
+    """Fetch the activity arrays for the parents selected by parent_filter(column)"""
+    queries = _activity_queries(customer_id, parent_filter)
+    emails = (await db.execute(queries["email"])).one()
+    events = (await db.execute(queries["event"])).one()
+    tasks = (await db.execute(queries["task"])).one()
+    notes = (await db.execute(queries["note"])).one()
+
+    return Activity(
+        email_parent=_array(emails[0], np.int64),
+        email_time=_array(emails[1], np.float64),
+        email_inbound=_array(emails[2], bool),
+        email_sentiment=_array(emails[3], np.float64),
+        event_parent=_array(events[0], np.int64),
+        event_time=_array(events[1], np.float64),
+        event_impact=_array(events[2], np.float64),
+        task_parent=_array(tasks[0], np.int64),
+        task_due=_array(tasks[1], np.float64),
+        note_parent=_array(notes[0], np.int64),
+        note_time=_array(notes[1], np.float64),
+    )
+
+async def database_now(db: AsyncSession) -> float:
+    """Scoring clock in the same (naive, server-local) time base as the stored timestamps"""
+    return float(await db.scalar(select(_epoch(func.localtimestamp()))))
+
+# Only rows whose scores actually moved are written, so unchanged parents keep their updated_at.
+# o is the row as it was before this statement, so at_risk marks parents whose risk
+# score just crossed the alert threshold (not ones already above it).
+WRITE_SCORES = text("""
+    WITH written AS (
+        UPDATE parents AS p
+        SET lead_score = s.lead_score,
+            engagement_score = s.engagement_score,
+            risk_score = s.risk_score
+        FROM unnest(
+            CAST(:ids AS INTEGER[]),
+            CAST(:lead AS INTEGER[]),
+            CAST(:engagement AS INTEGER[]),
+            CAST(:risk AS INTEGER[])
+        ) AS s(id, lead_score, engagement_score, risk_score)
+        JOIN parents AS o ON o.id = s.id
+        WHERE p.id = s.id
+          AND (p.lead_score, p.engagement_score, p.risk_score)
+              IS DISTINCT FROM (s.lead_score, s.engagement_score, s.risk_score)
+        RETURNING p.id, s.risk_score >= :risk_alert AND coalesce(o.risk_score, 0) < :risk_alert AS at_risk
+    )
+    SELECT count(*) AS updated, coalesce(array_agg(id) FILTER (WHERE at_risk), '{}') AS at_risk
+    FROM written
+""")
+
+async def _score_and_write(db: AsyncSession, customer_id: str, parent_ids, stages, parent_filter, as_of):
+    activity = await load_activity(db, customer_id, parent_filter)
+    scores = compute_scores(parent_ids, stages, activity, as_of)
+    row = (await db.execute(WRITE_SCORES, {
+        "ids": parent_ids.tolist(),
+        "lead": scores.lead.tolist(),
+        "engagement": scores.engagement.tolist(),
+        "risk": scores.risk.tolist(),
+        "risk_alert": NOTIFY_RISK_SCORE,
+    })).one()
+    # Same transaction: the alerts commit (and are pushed) with the scores that raised them
+    await alert_at_risk(db, customer_id, row.at_risk)
+    return scores, row.updated
+
+async def rescore_parents(db: AsyncSession, customer_id: str, parent_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Incremental path: rescore just these parents after new activity landed.
+    Runs in the caller's transaction (flush first); the caller commits.
+    """
+    ids = sorted(set(parent_ids))
+    if not ids:
+        return {}
+
+    rows = (await db.execute(
+        select(models.Parent.id, func.coalesce(models.Parent.stage, ''))
+        .where(models.Parent.customer_id == customer_id, models.Parent.id.in_(ids))
+        .order_by(models.Parent.id)
+    )).all()
+    if not rows:
+        return {}
+
+    parent_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    stages = np.array([row[1] for row in rows], dtype=object)
+    as_of = await database_now(db)
+    id_list = parent_ids.tolist()
+
+    scores, _ = await _score_and_write(
+        db, customer_id, parent_ids, stages,
+        lambda column: column.in_(id_list), as_of
+    )
+    return scores_by_parent(parent_ids, scores)
+
+async def recompute_tenant(
+    db: AsyncSession,
+    customer_id: str,
+    chunk_size: int = RECOMPUTE_CHUNK_PARENTS
+) -> schemas.ScoreRecomputeResult:
+    """
+    Batch path: rescore every parent of a tenant from emails, journey events,
+    tasks and notes, one parent-id range per transaction.
+    """
+    started = time.perf_counter()
+    as_of = await database_now(db)
+
+    rows = (await db.execute(
+        select(
+            func.array_agg(models.Parent.id),
+            func.array_agg(func.coalesce(models.Parent.stage, '')),
+        ).where(models.Parent.customer_id == customer_id)
+    )).one()
+    all_ids = _array(rows[0], np.int64)
+    order = np.argsort(all_ids)
+    all_ids = all_ids[order]
+    all_stages = np.array(rows[1] or [], dtype=object)[order]
+    await db.commit()
+
+    updated = 0
+    for start in range(0, len(all_ids), chunk_size):
+        parent_ids = all_ids[start:start + chunk_size]
+        low, high = int(parent_ids[0]), int(parent_ids[-1])
+        _, rowcount = await _score_and_write(
+            db, customer_id, parent_ids, all_stages[start:start + chunk_size],
+            lambda column: column.between(low, high), as_of
+        )
+        await db.commit()
+        updated += rowcount
+
+    elapsed = time.perf_counter() - started
+    return schemas.ScoreRecomputeResult(
+        customer_id=customer_id,
+        parents=len(all_ids),
+        updated=updated,
+        elapsed_seconds=round(elapsed, 3),
+        parents_per_second=round(len(all_ids) / elapsed, 1) if elapsed > 0 else 0.0,
+    )
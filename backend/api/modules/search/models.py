@@ -0,0 +1,18 @@
+# backend/api/modules/search/models.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class ParentSearchDocument(Base):
+    """
+    Denormalised search text for one parent (name, email, phone, partner, children's names).
+    Maintained by database triggers on parents/children - see create_all_tables.sql.
+    """
+    __tablename__ = "parent_search_documents"
+    
+    parent_id = Column(Integer, ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    document = Column(Text, nullable=False)
+    search_vector = Column(TSVECTOR)
+    updated_at = Column(DateTime, default=func.now())
@@ -0,0 +1,58 @@
+# backend/api/modules/search/routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_
+
+from ...core.database import get_async_db
+from ..parents import models as parent_models
+from . import models, schemas
+from .service import build_prefix_tsquery
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+@router.get("/parents", response_model=schemas.ParentSearchResults)
+async def search_parent_documents(
+    customer_id: str = Query(..., description="Customer ID"),
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Ranked, prefix-aware lookup over parent and child names, email, phone and partner"""
+    doc = models.ParentSearchDocument
+    
+    # Word prefixes via the tsvector index, typos / partial tokens via trigram word similarity
+    conditions = [doc.document.op('%>')(q)]
+    rank = func.word_similarity(q, doc.document)
+    
+    prefix_query = build_prefix_tsquery(q)
+    if prefix_query:
+        tsquery = func.to_tsquery('simple', prefix_query)
+        conditions.append(doc.search_vector.op('@@')(tsquery))
+        rank = rank + func.ts_rank_cd(doc.search_vector, tsquery)
+    
+    rows = (await db.execute(
+        select(
+            parent_models.Parent.id,
+            parent_models.Parent.parent_id,
+            parent_models.Parent.name,
+            parent_models.Parent.email,
+            parent_models.Parent.phone,
+            parent_models.Parent.partner_name,
+            parent_models.Parent.status,
+            parent_models.Parent.stage,
+            parent_models.Parent.lead_score,
+            rank.label("rank")
+        ).join(
+            doc, doc.parent_id == parent_models.Parent.id
+        ).where(
+            doc.customer_id == customer_id,
+            or_(*conditions)
+        ).order_by(
+            rank.desc(), parent_models.Parent.id
+        ).limit(limit)
+    )).all()
+    
+    return schemas.ParentSearchResults(
+        query=q,
+        results=[schemas.ParentSearchHit(**row._mapping) for row in rows]
+    )
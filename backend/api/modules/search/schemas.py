@@ -0,0 +1,19 @@
+# backend/api/modules/search/schemas.py
+from pydantic import BaseModel
+from typing import Optional, List
+
+class ParentSearchHit(BaseModel):
+    id: int
+    parent_id: str
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    partner_name: Optional[str] = None
+    status: Optional[str] = None
+    stage: Optional[str] = None
+    lead_score: Optional[int] = None
+    rank: float
+
+class ParentSearchResults(BaseModel):
+    query: str
+    results: List[ParentSearchHit]
@@ -0,0 +1,20 @@
+# backend/api/modules/search/service.py
+from sqlalchemy import select
+import re
+
+from . import models
+
+# Helper to turn free text into a prefix-matching tsquery ("jes wil" -> "jes:* & wil:*")
+def build_prefix_tsquery(text: str) -> str:
+    tokens = re.findall(r"[^\W_]+", text.lower())
+    return " & ".join(f"{token}:*" for token in tokens)
+
+def text_match_filter(customer_id: str, text: str):
+    """
+    Parent ids whose search document contains `text` as a substring.
+    Served by the trigram index on parent_search_documents.document.
+    """
+    return select(models.ParentSearchDocument.parent_id).where(
+        models.ParentSearchDocument.customer_id == customer_id,
+        models.ParentSearchDocument.document.ilike(f'%{text}%')
+    )
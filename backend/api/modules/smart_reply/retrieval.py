@@ -0,0 +1,601 @@
+# backend/api/modules/smart_reply/retrieval.py
+"""
+Knowledge-base retrieval for Smart Reply.
+
+Current, approved knowledge_base entries are cut into passages and vectorised with
+feature hashing (word unigrams and bigrams, 32-bit hashes, sublinear tf, L2
+normalised): no vocabulary to fit, ship or keep in sync. Vectors are stored sparse,
+as an inverted index of sorted NumPy arrays (feature hash -> passage, weight) saved
+as .npy files under KB_INDEX_DIR and memory-mapped, so a restart or another worker
+process reopens the index instead of re-vectorising it. Passage texts and their
+knowledge_base ids are written with the segment that holds them, so the metadata
+rewritten on every update stays the size of the entry list, not of the corpus. Scoring is exact TF-IDF
+cosine; document frequencies come from posting-list lengths at query time, so adding
+or removing passages never re-weights stored postings.
+
+Updates are incremental, LSM style: passages of new or edited entries go into a new
+small segment, retired ones are tombstoned, and all segments are merged into one
+once there are more than KB_INDEX_MAX_SEGMENTS or tombstones pass KB_INDEX_COMPACT_RATIO.
+"""
+import asyncio
+import fcntl
+import hashlib
+import os
+import re
+import time
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Where per-tenant index files are kept (one directory per tenant)
+KB_INDEX_DIR = os.getenv("KB_INDEX_DIR", "data/kb_index")
+# Passage size in words, and words repeated between consecutive passages of a long paragraph
+KB_CHUNK_WORDS = int(os.getenv("KB_CHUNK_WORDS", 120))
+KB_CHUNK_OVERLAP = int(os.getenv("KB_CHUNK_OVERLAP", 20))
+# How often a tenant's index is checked against knowledge_base when queried
+KB_INDEX_REFRESH_SECONDS = float(os.getenv("KB_INDEX_REFRESH_SECONDS", 30))
+# Segments are merged into one past this count, or when this share of passages is tombstoned
+KB_INDEX_MAX_SEGMENTS = int(os.getenv("KB_INDEX_MAX_SEGMENTS", 8))
+KB_INDEX_COMPACT_RATIO = float(os.getenv("KB_INDEX_COMPACT_RATIO", 0.25))
+# Tenant indexes held per process; past this the least recently used is dropped (and
+# reopened from disk on its next query)
+KB_INDEX_MAX_TENANTS = int(os.getenv("KB_INDEX_MAX_TENANTS", 1000))
+
+# Passages returned per knowledge_base entry, so one long page can't fill the top-k
+PASSAGES_PER_ENTRY = 2
+INDEX_FORMAT = 2
+SEGMENT_ARRAYS = ("keys", "passages", "weights", "entry_ids", "offsets", "text")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset("""
+    a an and are as at be but by can do does for from has have how i if in is it its
+    me my of on or our so than that the their them then there these they this to
+    us was we were what when where which who will with would you your
+""".split())
+
+CURRENT_ENTRIES = text("""
+    SELECT id, updated_at FROM knowledge_base
+    WHERE customer_id = :customer_id AND is_current AND coalesce(approved, TRUE)
+""")
+
+ENTRY_CONTENT = text("""
+    SELECT id, updated_at, kb_id, title, content, source_url, category
+    FROM knowledge_base WHERE id = ANY(CAST(:ids AS INTEGER[]))
+""")
+
+URL_MAPPINGS = text("""
+    SELECT phrase, url, context, coalesce(priority, 0) FROM url_mappings
+    WHERE customer_id = :customer_id AND phrase IS NOT NULL AND url IS NOT NULL
+""")
+
+def tokenize(value: str) -> List[str]:
+    return TOKEN_PATTERN.findall(value.lower())
+
+def features(value: str) -> Counter:
+    """Unigrams and bigrams of the non-stopword tokens"""
+    words = [token for token in tokenize(value) if token not in STOPWORDS]
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts
+
+@lru_cache(maxsize=1 << 17)
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode())
+
+def vectorize(value: str, normalize: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse hashed vector: (sorted unique uint32 feature hashes, float32 sublinear tf weights)"""
+    counts = features(value)
+    if not counts:
+        return np.zeros(0, np.uint32), np.zeros(0, np.float32)
+    hashes = np.fromiter((_hash(f) for f in counts), dtype=np.uint32, count=len(counts))
+    tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    keys, inverse = np.unique(hashes, return_inverse=True)
+    weights = np.bincount(inverse, weights=tf, minlength=len(keys)).astype(np.float32)
+    if normalize:
+        weights /= np.linalg.norm(weights)
+    return keys, weights
+
+def chunk(content: str, words: int = KB_CHUNK_WORDS, overlap: int = KB_CHUNK_OVERLAP) -> List[str]:
+    """Paragraphs packed into passages of up to `words` words; longer paragraphs split with overlap"""
+    passages: List[str] = []
+    current: List[str] = []
+    for paragraph in (content or "").split("\n"):
+        tokens = paragraph.split()
+        if not tokens:
+            continue
+        if len(current) + len(tokens) <= words:
+            current.extend(tokens)
+            continue
+        if current:
+            passages.append(" ".join(current))
+            current = []
+        step = max(1, words - overlap)
+        while len(tokens) > words:
+            passages.append(" ".join(tokens[:words]))
+            tokens = tokens[step:]
+        current = tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+def _digest(title: Optional[str], content: Optional[str], category: Optional[str]) -> str:
+    return hashlib.md5(f"{title}\x00{category}\x00{content}".encode()).hexdigest()
+
+class Entry(NamedTuple):
+    """A knowledge_base row as indexed"""
+    updated_at: str
+    digest: str
+    kb_id: str
+    title: Optional[str]
+    source_url: Optional[str]
+    category: Optional[str]
+
+class Passage(NamedTuple):
+    kb_id: str
+    title: Optional[str]
+    source_url: Optional[str]
+    category: Optional[str]
+    text: str
+    score: float
+
+class UrlMatch(NamedTuple):
+    phrase: str
+    url: str
+    context: Optional[str]
+    priority: int
+
+class Segment(NamedTuple):
+    """
+    Postings sorted by feature hash: keys (uint32), passages (int32 position), weights (float32).
+    The segment's own passages are positions start.. onwards: their knowledge_base ids (int64),
+    and their UTF-8 texts concatenated (uint8) with offsets (int64, one more than passages).
+    """
+    id: int
+    start: int
+    keys: np.ndarray
+    passages: np.ndarray
+    weights: np.ndarray
+    entry_ids: np.ndarray
+    offsets: np.ndarray
+    text: np.ndarray
+
+class IndexState(NamedTuple):
+    """
+    Immutable snapshot of a tenant index. Updates build a new one and never modify
+    the files an existing snapshot has mapped, so searches need no locking.
+    """
+    segments: Tuple[Segment, ...]
+    entry_ids: np.ndarray           # knowledge_base id per passage position
+    alive: np.ndarray               # False once the entry was retired or edited
+    entries: Dict[int, Entry]
+    next_segment: int
+    revision: int
+    obsolete: List[int]             # merged away; deleted at the next save
+
+    @property
+    def size(self) -> int:
+        return len(self.entry_ids)
+
+    def text(self, position: int) -> str:
+        segment = next(segment for segment in reversed(self.segments) if segment.start <= position)
+        offset = position - segment.start
+        return bytes(segment.text[segment.offsets[offset]:segment.offsets[offset + 1]]).decode()
+
+    @property
+    def live(self) -> int:
+        return int(self.alive.sum())
+
+    @property
+    def postings(self) -> int:
+        return sum(len(segment.keys) for segment in self.segments)
+
+EMPTY_STATE = IndexState((), np.zeros(0, np.int64), np.zeros(0, bool), {}, 0, 0, [])
+
+class TenantIndex:
+    """One tenant's passages and inverted-index segments on disk"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.state = EMPTY_STATE
+        self._loaded_mtime: Optional[int] = None
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def _segment_path(self, segment_id: int, array: str) -> str:
+        return os.path.join(self.directory, f"segment-{segment_id}.{array}.npy")
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialises writers across processes sharing KB_INDEX_DIR"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "lock"), "w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def reload_if_changed(self) -> bool:
+        """Pick up an index written by another process; False if nothing changed on disk"""
+        for attempt in range(3):
+            try:
+                mtime = os.stat(self._meta_path).st_mtime_ns
+                if mtime == self._loaded_mtime:
+                    return False
+                with open(self._meta_path, "rb") as handle:
+                    meta = orjson.loads(handle.read())
+                if meta.get("format") != INDEX_FORMAT:
+                    # Older layout: start over (the next apply rewrites it)
+                    self.state, self._loaded_mtime = EMPTY_STATE, mtime
+                    return True
+                segments: List[Segment] = []
+                for segment_id in meta["segments"]:
+                    start = segments[-1].start + len(segments[-1].entry_ids) if segments else 0
+                    segments.append(Segment(segment_id, start, *(
+                        np.load(self._segment_path(segment_id, array), mmap_mode="r") for array in SEGMENT_ARRAYS
+                    )))
+            except FileNotFoundError:
+                if attempt == 2 or not os.path.exists(self._meta_path):
+                    return False
+                # A writer merged segments between reading the metadata and opening them
+                continue
+            entry_ids = np.concatenate([segment.entry_ids for segment in segments] or [np.zeros(0, np.int64)])
+            alive = np.ones(len(entry_ids), bool)
+            alive[meta["dead"]] = False
+            self.state = IndexState(
+                tuple(segments), entry_ids.astype(np.int64), alive,
+                {int(key): Entry(*value) for key, value in meta["entries"].items()},
+                meta["next_segment"], meta["revision"], meta["obsolete"],
+            )
+            self._loaded_mtime = mtime
+            return True
+        return False
+
+    def _write_segment(self, segment_id: int, start: int, keys, passages, weights,
+                       entry_ids, texts: List[str]) -> Segment:
+        order = np.argsort(keys, kind="stable")
+        encoded = [value.encode() for value in texts]
+        offsets = np.zeros(len(encoded) + 1, np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        arrays = (
+            keys[order].astype(np.uint32), passages[order].astype(np.int32), weights[order].astype(np.float32),
+            np.asarray(entry_ids, np.int64), offsets, np.frombuffer(b"".join(encoded), np.uint8),
+        )
+        for name, array in zip(SEGMENT_ARRAYS, arrays):
+            np.save(self._segment_path(segment_id, name), array)
+        return Segment(segment_id, start, *(np.load(self._segment_path(segment_id, name), mmap_mode="r")
+                                            for name in SEGMENT_ARRAYS))
+
+    def _save(self, state: IndexState, previous: IndexState):
+        meta = {
+            "format": INDEX_FORMAT,
+            "segments": [segment.id for segment in state.segments],
+            "next_segment": state.next_segment,
+            "revision": state.revision,
+            "obsolete": state.obsolete,
+            "dead": np.flatnonzero(~state.alive).tolist(),
+            "entries": {str(key): list(entry) for key, entry in state.entries.items()},
+        }
+        temporary = self._meta_path + ".tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(orjson.dumps(meta))
+        os.replace(temporary, self._meta_path)
+        self._loaded_mtime = os.stat(self._meta_path).st_mtime_ns
+        # Segments merged away one save ago: every reader has had a chance to move on
+        for segment_id in previous.obsolete:
+            for name in SEGMENT_ARRAYS:
+                try:
+                    os.remove(self._segment_path(segment_id, name))
+                except FileNotFoundError:
+                    pass
+
+    def _merge(self, state: IndexState) -> IndexState:
+        """All segments into one, without tombstoned passages (positions renumbered)"""
+        keep = state.alive
+        position = np.full(state.size, -1, np.int64)
+        position[keep] = np.arange(int(keep.sum()))
+        keys = np.concatenate([segment.keys for segment in state.segments] or [np.zeros(0, np.uint32)])
+        passages = np.concatenate([segment.passages for segment in state.segments] or [np.zeros(0, np.int32)])
+        weights = np.concatenate([segment.weights for segment in state.segments] or [np.zeros(0, np.float32)])
+        kept = keep[passages]
+        segment = self._write_segment(
+            state.next_segment, 0, keys[kept], position[passages[kept]], weights[kept],
+            state.entry_ids[keep], [state.text(p) for p in np.flatnonzero(keep)],
+        )
+        return state._replace(
+            segments=(segment,),
+            entry_ids=state.entry_ids[keep],
+            alive=np.ones(int(keep.sum()), bool),
+            next_segment=state.next_segment + 1,
+            obsolete=[segment.id for segment in state.segments],
+        )
+
+    def apply(self, current: Dict[int, str], fetched: Iterable[tuple]) -> Dict[str, int]:
+        """
+        Bring the index in line with `current` ({knowledge_base id: updated_at} of the
+        tenant's live rows), vectorising entries from `fetched` (id, updated_at, kb_id,
+        title, content, source_url, category) whose content changed. Returns counts.
+        """
+        with self._write_lock():
+            self.reload_if_changed()
+            previous = state = self.state
+            stats = {"entries_added": 0, "entries_removed": 0, "passages_added": 0, "compacted": 0}
+
+            new_entries: Dict[int, Entry] = {}
+            new_passages: List[Tuple[int, str]] = []
+            touched: Dict[int, Entry] = {}
+            for row_id, updated_at, kb_id, title, content, source_url, category in fetched:
+                if current.get(row_id) != updated_at:
+                    continue
+                entry = Entry(updated_at, _digest(title, content, category), kb_id, title, source_url, category)
+                indexed = state.entries.get(row_id)
+                if indexed and indexed.digest == entry.digest:
+                    # Only updated_at moved (e.g. a crawl re-verified the page)
+                    touched[row_id] = entry
+                    continue
+                new_entries[row_id] = entry
+                for passage in chunk(content) or ([title] if title else []):
+                    new_passages.append((row_id, passage))
+
+            removed = {row_id for row_id in state.entries if row_id not in current or row_id in new_entries}
+            if not removed and not new_entries and not touched:
+                return stats
+
+            alive = state.alive.copy()
+            if removed:
+                alive &= ~np.isin(state.entry_ids, list(removed))
+            entries = {key: value for key, value in state.entries.items() if key not in removed}
+            entries.update(touched)
+            entries.update(new_entries)
+            state = state._replace(alive=alive, entries=entries, obsolete=[])
+
+            if new_passages:
+                start = state.size
+                vectors = [vectorize(f"{entries[row_id].title or ''}\n{passage}") for row_id, passage in new_passages]
+                segment = self._write_segment(
+                    state.next_segment,
+                    start,
+                    np.concatenate([keys for keys, _ in vectors]),
+                    np.repeat(np.arange(start, start + len(vectors)), [len(keys) for keys, _ in vectors]),
+                    np.concatenate([weights for _, weights in vectors]),
+                    [row_id for row_id, _ in new_passages],
+                    [passage for _, passage in new_passages],
+                )
+                state = state._replace(
+                    segments=state.segments + (segment,),
+                    entry_ids=np.concatenate([state.entry_ids, segment.entry_ids]).astype(np.int64),
+                    alive=np.concatenate([state.alive, np.ones(len(new_passages), bool)]),
+                    next_segment=state.next_segment + 1,
+                )
+
+            dead = state.size - state.live
+            if len(state.segments) > KB_INDEX_MAX_SEGMENTS or (dead and dead >= KB_INDEX_COMPACT_RATIO * state.size):
+                state = self._merge(state)
+                stats["compacted"] = 1
+
+            state = state._replace(revision=state.revision + 1)
+            self._save(state, previous)
+            self.state = state
+            stats.update(
+                entries_added=len(new_entries),
+                entries_removed=len(removed),
+                passages_added=len(new_passages),
+            )
+            return stats
+
+    def search(self, query: str, k: int = 5, category: Optional[str] = None) -> List[Passage]:
+        state = self.state
+        keys, query_tf = vectorize(query, normalize=False)
+        live = state.live
+        if not len(keys) or not live:
+            return []
+
+        # Posting-list bounds of each query feature in each segment; df is their total length
+        bounds = [
+            (segment, np.searchsorted(segment.keys, keys, "left"), np.searchsorted(segment.keys, keys, "right"))
+            for segment in state.segments
+        ]
+        df = sum(right - left for _, left, right in bounds)
+        query_weights = query_tf * (np.log((1.0 + live) / (1.0 + df)) + 1.0)
+        passages, weights = [], []
+        for segment, left, right in bounds:
+            for feature in np.flatnonzero(right > left):
+                start, end = left[feature], right[feature]
+                passages.append(segment.passages[start:end])
+                weights.append(segment.weights[start:end] * query_weights[feature])
+        if not passages:
+            return []
+        scores = np.bincount(np.concatenate(passages), weights=np.concatenate(weights), minlength=state.size)
+        scores /= np.linalg.norm(query_weights)
+
+        mask = state.alive
+        if category:
+            ids = [row_id for row_id, entry in state.entries.items() if entry.category == category]
+            mask = mask & np.isin(state.entry_ids, ids)
+        scores = np.where(mask, scores, 0.0)
+
+        # Over-fetch so the per-entry cap still leaves k passages
+        candidates = min(state.size, k * (PASSAGES_PER_ENTRY + 2))
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        results: List[Passage] = []
+        per_entry: Dict[int, int] = defaultdict(int)
+        for position in top[np.argsort(-scores[top], kind="stable")]:
+            score = float(scores[position])
+            if score <= 0:
+                break
+            row_id = int(state.entry_ids[position])
+            if per_entry[row_id] >= PASSAGES_PER_ENTRY:
+                continue
+            per_entry[row_id] += 1
+            entry = state.entries[row_id]
+            results.append(Passage(entry.kb_id, entry.title, entry.source_url, entry.category,
+                                   state.text(position), round(score, 4)))
+            if len(results) == k:
+                break
+        return results
+
+class UrlMatcher:
+    """A tenant's url_mappings; a mapping matches when every word of its phrase is in the query"""
+
+    def __init__(self, mappings: Iterable[tuple]):
+        self._by_token: Dict[str, List[Tuple[frozenset, UrlMatch]]] = defaultdict(list)
+        for phrase, url, context, priority in mappings:
+            tokens = frozenset(tokenize(phrase))
+            if tokens:
+                # Indexed under one word of the phrase; the rest is checked at match time
+                self._by_token[min(tokens)].append((tokens, UrlMatch(phrase, url, context, priority)))
+
+    def match(self, query: str, limit: int = 3) -> List[UrlMatch]:
+        tokens = set(tokenize(query))
+        found = [
+            (len(phrase_tokens), mapping)
+            for token in tokens
+            for phrase_tokens, mapping in self._by_token.get(token, ())
+            if phrase_tokens <= tokens
+        ]
+        found.sort(key=lambda item: (-item[1].priority, -item[0]))
+        results: List[UrlMatch] = []
+        seen: Set[str] = set()
+        for _, mapping in found:
+            if mapping.url not in seen:
+                seen.add(mapping.url)
+                results.append(mapping)
+            if len(results) == limit:
+                break
+        return results
+
+class Retrieval(NamedTuple):
+    passages: List[Passage]
+    url_mappings: List[UrlMatch]
+
+def _tenant_directory(root: str, customer_id: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", customer_id)[:40]
+    return os.path.join(root, f"{safe}-{hashlib.md5(customer_id.encode()).hexdigest()[:8]}")
+
+class RetrievalIndex:
+    """
+    Process-wide registry of tenant indexes. A tenant is synced with knowledge_base
+    on first use, then at most every KB_INDEX_REFRESH_SECONDS or when marked stale.
+    At most max_tenants are held, least recently used dropped first.
+    """
+
+    def __init__(self, directory: str = KB_INDEX_DIR, refresh_seconds: float = KB_INDEX_REFRESH_SECONDS,
+                 max_tenants: int = KB_INDEX_MAX_TENANTS):
+        self.directory = directory
+        self.refresh_seconds = refresh_seconds
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, TenantIndex]" = OrderedDict()
+        self._urls: Dict[str, UrlMatcher] = {}
+        self._checked: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def tenant(self, customer_id: str) -> TenantIndex:
+        index = self._tenants.get(customer_id)
+        if index is None:
+            index = self._tenants[customer_id] = TenantIndex(_tenant_directory(self.directory, customer_id))
+            index.reload_if_changed()
+            while len(self._tenants) > self.max_tenants:
+                evicted, _ = self._tenants.popitem(last=False)
+                self._urls.pop(evicted, None)
+                self._checked.pop(evicted, None)
+        self._tenants.move_to_end(customer_id)
+        return index
+
+    def mark_stale(self, customer_id: str):
+        """Knowledge base changed in this process: sync on the next query"""
+        self._checked.pop(customer_id, None)
+
+    async def refresh(self, db: AsyncSession, customer_id: str) -> Dict[str, int]:
+        """Sync the tenant's index and URL mappings with the database"""
+        lock = self._locks.setdefault(customer_id, asyncio.Lock())
+        try:
+            async with lock:
+                return await self._refresh(db, customer_id)
+        finally:
+            if self._locks.get(customer_id) is lock and not lock.locked():
+                del self._locks[customer_id]
+
+    async def _refresh(self, db: AsyncSession, customer_id: str) -> Dict[str, int]:
+        index = self.tenant(customer_id)
+        await asyncio.to_thread(index.reload_if_changed)
+        current = {
+            row_id: updated_at.isoformat() if updated_at else ""
+            for row_id, updated_at in (await db.execute(CURRENT_ENTRIES, {"customer_id": customer_id})).all()
+        }
+        entries = index.state.entries
+        changed = [
+            row_id for row_id, updated_at in current.items()
+            if row_id not in entries or entries[row_id].updated_at != updated_at
+        ]
+        fetched = []
+        if changed:
+            fetched = [
+                (row[0], row[1].isoformat() if row[1] else "", *row[2:])
+                for row in (await db.execute(ENTRY_CONTENT, {"ids": changed})).all()
+            ]
+        stats = {"entries_added": 0, "entries_removed": 0, "passages_added": 0, "compacted": 0}
+        if fetched or len(current) != len(entries) or any(row_id not in current for row_id in entries):
+            stats = await asyncio.to_thread(index.apply, current, fetched)
+
+        urls = UrlMatcher((await db.execute(URL_MAPPINGS, {"customer_id": customer_id})).all())
+        # Evicted meanwhile: leave nothing behind for it
+        if self._tenants.get(customer_id) is index:
+            self._urls[customer_id] = urls
+            self._checked[customer_id] = time.monotonic()
+        return stats
+
+    async def ensure_fresh(self, db: AsyncSession, customer_id: str):
+        checked = self._checked.get(customer_id)
+        if checked is None or time.monotonic() - checked >= self.refresh_seconds:
+            await self.refresh(db, customer_id)
+
+    async def retrieve(
+        self,
+        db: AsyncSession,
+        customer_id: str,
+        query: str,
+        k: int = 5,
+        category: Optional[str] = None,
+        url_limit: int = 3
+    ) -> Retrieval:
+        """Top-k passages for `query` and the URL mappings its wording triggers"""
+        await self.ensure_fresh(db, customer_id)
+        return self.search(customer_id, query, k, category, url_limit)
+
+    def search(self, customer_id: str, query: str, k: int = 5, category: Optional[str] = None,
+               url_limit: int = 3) -> Retrieval:
+        """Query the in-memory state as it is (no database round trip)"""
+        matcher = self._urls.get(customer_id)
+        return Retrieval(
+            self.tenant(customer_id).search(query, k, category),
+            matcher.match(query, url_limit) if matcher else [],
+        )
+
+    def status(self, customer_id: str) -> Dict[str, object]:
+        state = self.tenant(customer_id).state
+        checked = self._checked.get(customer_id)
+        return {
+            "customer_id": customer_id,
+            "entries": len(state.entries),
+            "passages": state.live,
+            "tombstones": state.size - state.live,
+            "segments": len(state.segments),
+            "postings": state.postings,
+            "revision": state.revision,
+            "index_bytes": sum(
+                segment.keys.nbytes + segment.passages.nbytes + segment.weights.nbytes for segment in state.segments
+            ),
+            "seconds_since_sync": round(time.monotonic() - checked, 1) if checked is not None else None,
+        }
+
+# Process-wide index; the crawler marks tenants stale after syncing the knowledge base
+retrieval_index = RetrievalIndex()
@@ -0,0 +1,49 @@
+# backend/api/modules/smart_reply/routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+import time
+
+from ...core.database import get_async_db
+from . import schemas
+from .retrieval import retrieval_index
+
+router = APIRouter(prefix="/api/smart-reply", tags=["smart-reply"])
+
+@router.post("/retrieve", response_model=schemas.RetrievalResult)
+async def retrieve(
+    request: schemas.RetrieveRequest,
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Knowledge-base passages and URL mappings to ground a reply to `query`"""
+    started = time.perf_counter()
+    result = await retrieval_index.retrieve(
+        db, customer_id, request.query, request.k, request.category, request.url_limit
+    )
+    return schemas.RetrievalResult(
+        query=request.query,
+        passages=[schemas.RetrievedPassage(**passage._asdict()) for passage in result.passages],
+        url_mappings=[schemas.UrlMappingMatch(**mapping._asdict()) for mapping in result.url_mappings],
+        took_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
+
+@router.get("/index", response_model=schemas.IndexStatus)
+async def index_status(
+    customer_id: str = Query(..., description="Customer ID")
+):
+    """Size and freshness of the tenant's retrieval index in this process"""
+    return schemas.IndexStatus(**retrieval_index.status(customer_id))
+
+@router.post("/index/refresh", response_model=schemas.IndexRefresh)
+async def refresh_index(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Sync the tenant's index with knowledge_base and url_mappings now"""
+    started = time.perf_counter()
+    stats = await retrieval_index.refresh(db, customer_id)
+    return schemas.IndexRefresh(
+        customer_id=customer_id,
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+        **stats
+    )
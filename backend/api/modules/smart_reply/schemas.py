@@ -0,0 +1,48 @@
+# backend/api/modules/smart_reply/schemas.py
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class RetrieveRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=5000, description="Incoming message or question")
+    k: int = Field(5, ge=1, le=20, description="Passages to return")
+    category: Optional[str] = None
+    url_limit: int = Field(3, ge=0, le=10)
+
+class RetrievedPassage(BaseModel):
+    kb_id: str
+    title: Optional[str] = None
+    source_url: Optional[str] = None
+    category: Optional[str] = None
+    text: str
+    score: float
+
+class UrlMappingMatch(BaseModel):
+    phrase: str
+    url: str
+    context: Optional[str] = None
+    priority: int
+
+class RetrievalResult(BaseModel):
+    query: str
+    passages: List[RetrievedPassage]
+    url_mappings: List[UrlMappingMatch]
+    took_ms: float
+
+class IndexStatus(BaseModel):
+    customer_id: str
+    entries: int
+    passages: int
+    tombstones: int
+    segments: int
+    postings: int
+    revision: int
+    index_bytes: int
+    seconds_since_sync: Optional[float] = None
+
+class IndexRefresh(BaseModel):
+    customer_id: str
+    entries_added: int
+    entries_removed: int
+    passages_added: int
+    compacted: int
+    took_ms: float
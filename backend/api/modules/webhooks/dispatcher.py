@@ -0,0 +1,447 @@
+# backend/api/modules/webhooks/dispatcher.py
+import asyncio
+import hashlib
+import hmac
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+import httpx
+import orjson
+from sqlalchemy import text
+
+from ...core.database import async_engine
+
+WEBHOOK_POLL_SECONDS = float(os.getenv("WEBHOOK_POLL_SECONDS", 1.0))
+# Deliveries in progress per process, and per tenant (one slow endpoint can't starve the rest).
+# Both caps are per process: with N dispatcher processes a tenant can have N times as many in flight.
+WEBHOOK_MAX_IN_FLIGHT = int(os.getenv("WEBHOOK_MAX_IN_FLIGHT", 200))
+WEBHOOK_CUSTOMER_CONCURRENCY = int(os.getenv("WEBHOOK_CUSTOMER_CONCURRENCY", 4))
+# Pooled keep-alive connections per target host
+WEBHOOK_HOST_CONNECTIONS = int(os.getenv("WEBHOOK_HOST_CONNECTIONS", 10))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", 10))
+# A claimed delivery that isn't settled by then (worker died) is claimed again
+WEBHOOK_LEASE_SECONDS = int(os.getenv("WEBHOOK_LEASE_SECONDS", 120))
+# First retry delay; later ones grow by the webhook's retry_config backoff_multiplier
+WEBHOOK_BACKOFF_BASE_SECONDS = float(os.getenv("WEBHOOK_BACKOFF_BASE_SECONDS", 5))
+WEBHOOK_BACKOFF_MAX_SECONDS = float(os.getenv("WEBHOOK_BACKOFF_MAX_SECONDS", 3600))
+# Outcomes are written back in batches: outbox status, webhook_logs and counters together
+WEBHOOK_RESULT_FLUSH_ROWS = int(os.getenv("WEBHOOK_RESULT_FLUSH_ROWS", 500))
+WEBHOOK_RESULT_FLUSH_SECONDS = float(os.getenv("WEBHOOK_RESULT_FLUSH_SECONDS", 0.5))
+WEBHOOK_DRAIN_SECONDS = float(os.getenv("WEBHOOK_DRAIN_SECONDS", 10))
+
+DEFAULT_RETRY_CONFIG = {"max_retries": 3, "backoff_multiplier": 2}
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+RESPONSE_BODY_LIMIT = 2000
+
+# Due rows, oldest first, at most per_customer per tenant less what this process already has in
+# flight for it, and none for tenants already at their cap: every claimed row can start at once,
+# so none sits out its lease waiting for a slot.
+# Claiming moves next_attempt_at to the lease expiry, so one partial index serves both states.
+CLAIM_DELIVERIES = text("""
+    WITH candidates AS (
+        SELECT id, customer_id, next_attempt_at FROM webhook_outbox
+        WHERE status IN ('pending', 'delivering')
+          AND next_attempt_at <= LOCALTIMESTAMP
+          AND coalesce(customer_id, '') <> ALL(CAST(:busy AS VARCHAR[]))
+        ORDER BY next_attempt_at
+        LIMIT :scan
+        FOR UPDATE SKIP LOCKED
+    ), ranked AS (
+        SELECT id, coalesce(customer_id, '') AS customer_id,
+               row_number() OVER (PARTITION BY customer_id ORDER BY next_attempt_at, id) AS position
+        FROM candidates
+    ), claimed AS (
+        SELECT r.id FROM ranked r
+        LEFT JOIN unnest(CAST(:in_flight_customers AS VARCHAR[]), CAST(:in_flight_counts AS INTEGER[]))
+            AS f(customer_id, deliveries) ON f.customer_id = r.customer_id
+        WHERE r.position <= :per_customer - coalesce(f.deliveries, 0)
+        ORDER BY r.id LIMIT :limit
+    )
+    UPDATE webhook_outbox AS o
+    SET status = 'delivering',
+        attempts = o.attempts + 1,
+        next_attempt_at = LOCALTIMESTAMP + make_interval(secs => :lease)
+    FROM claimed c, webhook_configs w
+    WHERE o.id = c.id AND w.id = o.webhook_id
+    RETURNING o.id, o.customer_id, o.webhook_id, o.event_type, o.payload, o.attempts, o.created_at,
+              w.webhook_id AS endpoint_id, w.url, w.secret, w.headers, w.retry_config, w.active
+""")
+
+SETTLE_DELIVERED = text("DELETE FROM webhook_outbox WHERE id = ANY(CAST(:ids AS BIGINT[]))")
+
+SETTLE_RESCHEDULED = text("""
+    UPDATE webhook_outbox AS o
+    SET status = u.status,
+        next_attempt_at = LOCALTIMESTAMP + make_interval(secs => u.delay),
+        last_error = u.error
+    FROM unnest(
+        CAST(:ids AS BIGINT[]), CAST(:statuses AS VARCHAR[]),
+        CAST(:delays AS DOUBLE PRECISION[]), CAST(:errors AS TEXT[])
+    ) AS u(id, status, delay, error)
+    WHERE o.id = u.id
+""")
+
+INSERT_LOGS = text("""
+    INSERT INTO webhook_logs
+        (webhook_id, request_id, payload, response_status, response_body, error_message, retry_count)
+    SELECT webhook_id, request_id, CAST(payload AS JSONB), response_status, response_body, error_message, retry_count
+    FROM unnest(
+        CAST(:webhook_ids AS INTEGER[]), CAST(:request_ids AS VARCHAR[]), CAST(:payloads AS TEXT[]),
+        CAST(:statuses AS INTEGER[]), CAST(:bodies AS TEXT[]), CAST(:errors AS TEXT[]),
+        CAST(:retries AS INTEGER[])
+    ) AS l(webhook_id, request_id, payload, response_status, response_body, error_message, retry_count)
+""")
+
+UPDATE_COUNTERS = text("""
+    UPDATE webhook_configs AS w
+    SET success_count = coalesce(w.success_count, 0) + c.succeeded,
+        failure_count = coalesce(w.failure_count, 0) + c.failed,
+        last_triggered = LOCALTIMESTAMP
+    FROM unnest(CAST(:ids AS INTEGER[]), CAST(:succeeded AS INTEGER[]), CAST(:failed AS INTEGER[]))
+        AS c(id, succeeded, failed)
+    WHERE w.id = c.id
+""")
+
+class Outcome(NamedTuple):
+    """Result of one delivery attempt, waiting to be written back"""
+    outbox_id: int
+    webhook_id: int
+    status: str  # delivered | pending (retry) | failed
+    delay: float
+    attempts: int
+    body: str
+    response_status: Optional[int]
+    response_body: Optional[str]
+    error: Optional[str]
+
+def _json(value) -> Any:
+    # text() results may hand JSONB back undecoded
+    return orjson.loads(value) if isinstance(value, (str, bytes)) else value
+
+def retry_delay(attempts: int, retry_config: Optional[Dict[str, Any]], retry_after: Optional[float] = None) -> float:
+    """
+    Exponential backoff from the webhook's retry_config with equal jitter: half the step
+    is fixed, half random, so deliveries that failed together don't retry together.
+    """
+    multiplier = float((retry_config or {}).get("backoff_multiplier", DEFAULT_RETRY_CONFIG["backoff_multiplier"]))
+    step = min(WEBHOOK_BACKOFF_BASE_SECONDS * multiplier ** max(attempts - 1, 0), WEBHOOK_BACKOFF_MAX_SECONDS)
+    delay = step / 2 + random.uniform(0, step / 2)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, WEBHOOK_BACKOFF_MAX_SECONDS))
+    return delay
+
+def sign(secret: Optional[str], timestamp: str, body: bytes) -> Optional[str]:
+    """HMAC-SHA256 over "<timestamp>.<body>", sent as X-Webhook-Signature"""
+    if not secret:
+        return None
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+class WebhookDispatcher:
+    """
+    Delivers webhook_outbox rows. A claim loop takes due rows with SKIP LOCKED (so
+    any number of workers can run) and no more per tenant than the tenant has free
+    slots in this process, deliveries run as tasks on per-host connection pools,
+    and a flush loop settles outcomes in batches. The per-tenant cap is per process.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = WEBHOOK_MAX_IN_FLIGHT,
+        customer_concurrency: int = WEBHOOK_CUSTOMER_CONCURRENCY,
+        host_connections: int = WEBHOOK_HOST_CONNECTIONS,
+        poll_seconds: float = WEBHOOK_POLL_SECONDS,
+    ):
+        self.max_in_flight = max_in_flight
+        self.customer_concurrency = customer_concurrency
+        self.host_connections = host_connections
+        self.poll_seconds = poll_seconds
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # customer_id ("" for none) -> deliveries running, only tenants with any
+        self._in_flight: Dict[str, int] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+        self._outcomes: List[Outcome] = []
+        self._wake = asyncio.Event()
+        self._flush_requested = asyncio.Event()
+        self._claimer: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+        # Counters, reported by stats()
+        self.claimed = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.flushes = 0
+
+    # Connection pools and tenant slots
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        origin = httpx.URL(url).copy_with(path="/", query=None, fragment=None)
+        key = str(origin)
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.host_connections,
+                    max_keepalive_connections=self.host_connections,
+                ),
+                # Waiting for a pooled connection is not the endpoint's fault
+                timeout=httpx.Timeout(WEBHOOK_TIMEOUT_SECONDS, pool=None),
+                follow_redirects=False,
+            )
+            self._clients[key] = client
+        return client
+
+    def _take_slot(self, customer_id: Optional[str]):
+        key = customer_id or ""
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def _release_slot(self, customer_id: Optional[str]):
+        key = customer_id or ""
+        left = self._in_flight[key] - 1
+        if left:
+            self._in_flight[key] = left
+        else:
+            del self._in_flight[key]
+
+    def _claim_params(self, limit: int) -> Dict[str, Any]:
+        return {
+            "busy": [c for c, n in self._in_flight.items() if n >= self.customer_concurrency],
+            "in_flight_customers": list(self._in_flight),
+            "in_flight_counts": list(self._in_flight.values()),
+            "scan": limit * 4,
+            "limit": limit,
+            "per_customer": self.customer_concurrency,
+            "lease": WEBHOOK_LEASE_SECONDS,
+        }
+
+    # Claiming
+    async def _claim(self, limit: int):
+        async with async_engine.begin() as connection:
+            return (await connection.execute(CLAIM_DELIVERIES, self._claim_params(limit))).all()
+
+    async def _run_claims(self):
+        while not self._closing:
+            claimed = 0
+            free = self.max_in_flight - len(self._deliveries)
+            if free > 0:
+                try:
+                    rows = await self._claim(free)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Webhook claim failed: {e}")
+                    rows = []
+                for row in rows:
+                    # Taken before the next claim reads the counts
+                    self._take_slot(row.customer_id)
+                    task = asyncio.create_task(self._deliver(row))
+                    self._deliveries.add(task)
+                    task.add_done_callback(self._delivery_done)
+                claimed = len(rows)
+                self.claimed += claimed
+
+            # A full batch means more may be due: go again as soon as there is room
+            if claimed < free or free <= 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _delivery_done(self, task: asyncio.Task):
+        self._deliveries.discard(task)
+        self._wake.set()
+
+    # Delivery
+    async def _deliver(self, row):
+        try:
+            outcome = await self._attempt(row)
+        finally:
+            self._release_slot(row.customer_id)
+        self._outcomes.append(outcome)
+        if outcome.status == "delivered":
+            self.delivered += 1
+        elif outcome.status == "pending":
+            self.retried += 1
+        else:
+            self.failed += 1
+        if len(self._outcomes) >= WEBHOOK_RESULT_FLUSH_ROWS:
+            self._flush_requested.set()
+
+    async def _attempt(self, row) -> Outcome:
+        retry_config = _json(row.retry_config) or DEFAULT_RETRY_CONFIG
+        max_retries = int(retry_config.get("max_retries", DEFAULT_RETRY_CONFIG["max_retries"]))
+        body = orjson.dumps({
+            "id": row.id,
+            "event": row.event_type,
+            "created_at": row.created_at,
+            "data": _json(row.payload),
+        })
+
+        def settle(retryable: bool, response_status=None, response_body=None, error=None, retry_after=None):
+            if response_status is not None and 200 <= response_status < 300:
+                status, delay = "delivered", 0.0
+            elif retryable and row.attempts <= max_retries:
+                status, delay = "pending", retry_delay(row.attempts, retry_config, retry_after)
+            else:
+                status, delay = "failed", 0.0
+            return Outcome(
+                row.id, row.webhook_id, status, delay, row.attempts, body.decode(),
+                response_status, response_body, error
+            )
+
+        if not row.active or not row.url:
+            return settle(False, error="webhook is inactive or has no URL")
+
+        timestamp = str(int(time.time()))
+        headers = {str(k): str(v) for k, v in (_json(row.headers) or {}).items()}
+        headers.update({
+            "Content-Type": "application/json",
+            "User-Agent": "SmartEducation-Webhooks/1.0",
+            "X-Webhook-Id": row.endpoint_id,
+            "X-Webhook-Event": row.event_type,
+            "X-Webhook-Delivery": str(row.id),
+            "X-Webhook-Timestamp": timestamp,
+        })
+        signature = sign(row.secret, timestamp, body)
+        if signature:
+            headers["X-Webhook-Signature"] = signature
+
+        try:
+            response = await self._client_for(row.url).post(row.url, content=body, headers=headers)
+        except (httpx.InvalidURL, httpx.UnsupportedProtocol) as e:
+            return settle(False, error=f"{type(e).__name__}: {e}")
+        except (httpx.HTTPError, OSError) as e:
+            return settle(True, error=f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+
+        status = response.status_code
+        return settle(
+            status in RETRYABLE_STATUSES,
+            response_status=status,
+            response_body=response.text[:RESPONSE_BODY_LIMIT],
+            error=None if status < 300 else f"HTTP {status}",
+            retry_after=_retry_after(response) if status in (429, 503) else None,
+        )
+
+    # Batched write-back
+    async def flush(self) -> int:
+        """Write buffered outcomes: outbox rows, one log row per attempt, per-webhook counters"""
+        outcomes, self._outcomes = self._outcomes, []
+        if not outcomes:
+            return 0
+
+        rescheduled = [o for o in outcomes if o.status != "delivered"]
+        counters: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        for o in outcomes:
+            counters[o.webhook_id][0 if o.status == "delivered" else 1] += 1
+
+        try:
+            async with async_engine.begin() as connection:
+                await connection.execute(SETTLE_DELIVERED, {
+                    "ids": [o.outbox_id for o in outcomes if o.status == "delivered"]
+                })
+                if rescheduled:
+                    await connection.execute(SETTLE_RESCHEDULED, {
+                        "ids": [o.outbox_id for o in rescheduled],
+                        "statuses": [o.status for o in rescheduled],
+                        "delays": [o.delay for o in rescheduled],
+                        "errors": [o.error for o in rescheduled],
+                    })
+                await connection.execute(INSERT_LOGS, {
+                    "webhook_ids": [o.webhook_id for o in outcomes],
+                    "request_ids": [str(o.outbox_id) for o in outcomes],
+                    "payloads": [o.body for o in outcomes],
+                    "statuses": [o.response_status for o in outcomes],
+                    "bodies": [o.response_body for o in outcomes],
+                    "errors": [o.error for o in outcomes],
+                    "retries": [o.attempts - 1 for o in outcomes],
+                })
+                await connection.execute(UPDATE_COUNTERS, {
+                    "ids": list(counters),
+                    "succeeded": [c[0] for c in counters.values()],
+                    "failed": [c[1] for c in counters.values()],
+                })
+        except Exception:
+            # Keep them for the next flush; unsettled leases expire and redeliver if we never get there
+            self._outcomes[:0] = outcomes
+            raise
+        self.flushes += 1
+        return len(outcomes)
+
+    async def _run_flushes(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), WEBHOOK_RESULT_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Webhook outcome flush failed: {e}")
+
+    # Lifecycle
+    def start(self):
+        if self._claimer is None or self._claimer.done():
+            self._closing = False
+            self._claimer = asyncio.create_task(self._run_claims())
+            self._flusher = asyncio.create_task(self._run_flushes())
+
+    def notify(self):
+        """Claim now instead of at the next poll (e.g. right after enqueueing)"""
+        self._wake.set()
+
+    async def stop(self, timeout: float = WEBHOOK_DRAIN_SECONDS):
+        """Stop claiming, let in-flight deliveries finish, write back their outcomes"""
+        if self._claimer is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._claimer
+
+        if self._deliveries:
+            _, pending = await asyncio.wait(set(self._deliveries), timeout=timeout)
+            for task in pending:
+                # Lease expires and another worker redelivers
+                task.cancel()
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Webhook outcome flush failed at shutdown, {len(self._outcomes)} outcomes lost: {e}")
+
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._claimer = self._flusher = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._deliveries),
+            "claimed": self.claimed,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "unflushed": len(self._outcomes),
+            "flushes": self.flushes,
+            "hosts": len(self._clients),
+        }
+
+# Process-wide dispatcher, started and drained by the app lifespan
+webhook_dispatcher = WebhookDispatcher()
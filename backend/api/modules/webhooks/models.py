@@ -0,0 +1,55 @@
+# backend/api/modules/webhooks/models.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Boolean, ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from api.core.database import Base
+
+class WebhookConfig(Base):
+    __tablename__ = "webhook_configs"
+    
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    webhook_id = Column(String(100), unique=True, nullable=False)
+    name = Column(String(255))
+    type = Column(String(50))
+    url = Column(String(500))
+    secret = Column(String(255))
+    active = Column(Boolean, default=True)
+    headers = Column(JSONB, default=dict)
+    retry_config = Column(JSONB, default=lambda: {"max_retries": 3, "backoff_multiplier": 2})
+    events = Column(ARRAY(Text), default=list)
+    last_triggered = Column(DateTime)
+    success_count = Column(Integer, default=0)
+    failure_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class WebhookLog(Base):
+    """One row per delivery attempt (monthly partitions on created_at)"""
+    __tablename__ = "webhook_logs"
+    
+    id = Column(Integer, primary_key=True)
+    webhook_id = Column(Integer, ForeignKey("webhook_configs.id"))
+    request_id = Column(String(100))
+    payload = Column(JSONB)
+    response_status = Column(Integer)
+    response_body = Column(Text)
+    error_message = Column(Text)
+    retry_count = Column(Integer, default=0)
+    # Partition key (monthly ranges), hence part of the primary key
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=func.now())
+
+class WebhookOutbox(Base):
+    """Pending delivery, written in the transaction that made the change"""
+    __tablename__ = "webhook_outbox"
+    
+    id = Column(BigInteger, primary_key=True)
+    customer_id = Column(String(50), ForeignKey("customers.customer_id"))
+    webhook_id = Column(Integer, ForeignKey("webhook_configs.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=func.now())
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,57 @@
+# backend/api/modules/webhooks/routes.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, update, case
+
+from ...core.database import get_async_db
+from . import models, schemas
+from .dispatcher import webhook_dispatcher
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
+
+@router.get("/outbox", response_model=schemas.OutboxStatus)
+async def outbox_status(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queued, in-flight and dead-lettered deliveries for a tenant"""
+    outbox = models.WebhookOutbox
+    row = (await db.execute(
+        select(
+            func.count().filter(outbox.status == 'pending'),
+            func.count().filter(outbox.status == 'delivering'),
+            func.count().filter(outbox.status == 'failed'),
+            func.min(case((outbox.status == 'pending', outbox.created_at))),
+            func.localtimestamp(),
+        ).where(outbox.customer_id == customer_id)
+    )).one()
+    pending, delivering, failed, oldest, now = row
+    
+    return schemas.OutboxStatus(
+        customer_id=customer_id,
+        pending=pending,
+        delivering=delivering,
+        failed=failed,
+        oldest_pending_seconds=round((now - oldest).total_seconds(), 1) if oldest else None
+    )
+
+@router.post("/outbox/retry-failed", response_model=schemas.RetryFailedResult)
+async def retry_failed(
+    customer_id: str = Query(..., description="Customer ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Put a tenant's failed deliveries back in the queue with a fresh retry budget"""
+    outbox = models.WebhookOutbox
+    result = await db.execute(
+        update(outbox)
+        .where(outbox.customer_id == customer_id, outbox.status == 'failed')
+        .values(status='pending', attempts=0, next_attempt_at=func.localtimestamp())
+    )
+    await db.commit()
+    webhook_dispatcher.notify()
+    return schemas.RetryFailedResult(customer_id=customer_id, requeued=result.rowcount)
+
+@router.get("/dispatcher", response_model=schemas.DispatcherStats)
+async def dispatcher_stats():
+    """Delivery counters for this worker process"""
+    return schemas.DispatcherStats(**webhook_dispatcher.stats())
@@ -0,0 +1,24 @@
+# backend/api/modules/webhooks/schemas.py
+from pydantic import BaseModel
+from typing import Optional
+
+class OutboxStatus(BaseModel):
+    customer_id: str
+    pending: int
+    delivering: int
+    failed: int
+    oldest_pending_seconds: Optional[float] = None
+
+class DispatcherStats(BaseModel):
+    in_flight: int
+    claimed: int
+    delivered: int
+    retried: int
+    failed: int
+    unflushed: int
+    flushes: int
+    hosts: int
+
+class RetryFailedResult(BaseModel):
+    customer_id: str
+    requeued: int
@@ -0,0 +1,60 @@
+# backend/api/modules/webhooks/service.py
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Outbound event types a webhook_configs row can list in `events`
+PARENT_CREATED = "parent.created"
+PARENT_UPDATED = "parent.updated"
+PARENT_STAGE_CHANGED = "parent.stage_changed"
+
+# Parent fields carried in parent.* payloads
+PARENT_PAYLOAD_FIELDS = (
+    "id", "parent_id", "name", "email", "phone", "status", "stage", "source",
+    "lead_score", "engagement_score", "risk_score",
+)
+
+# Fans each event out to every active webhook of the tenant subscribed to it, in one statement
+ENQUEUE_EVENTS = text("""
+    INSERT INTO webhook_outbox (customer_id, webhook_id, event_type, payload)
+    SELECT w.customer_id, w.id, e.event_type, CAST(e.payload AS JSONB)
+    FROM unnest(CAST(:event_types AS VARCHAR[]), CAST(:payloads AS TEXT[])) AS e(event_type, payload)
+    JOIN webhook_configs w
+      ON w.customer_id = :customer_id AND w.active AND e.event_type = ANY(w.events)
+""")
+
+HAS_SUBSCRIBERS = text("""
+    SELECT EXISTS (
+        SELECT 1 FROM webhook_configs
+        WHERE customer_id = :customer_id AND active AND :event_type = ANY(events)
+    )
+""")
+
+def parent_payload(parent: Any, changes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """parent.* event payload from an ORM parent or a row dict"""
+    get = parent.get if isinstance(parent, dict) else lambda field: getattr(parent, field, None)
+    payload = {field: get(field) for field in PARENT_PAYLOAD_FIELDS}
+    if changes is not None:
+        payload["changed_fields"] = sorted(changes)
+    return payload
+
+async def enqueue_events(db: AsyncSession, customer_id: str, events: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+    """
+    Queue (event_type, payload) deliveries in the caller's transaction; the caller commits.
+    Delivery happens later in the dispatcher, so the write never waits on a remote endpoint.
+    """
+    events = list(events)
+    if not events:
+        return 0
+    result = await db.execute(ENQUEUE_EVENTS, {
+        "customer_id": customer_id,
+        "event_types": [event_type for event_type, _ in events],
+        "payloads": [orjson.dumps(payload).decode() for _, payload in events],
+    })
+    return result.rowcount
+
+async def has_subscribers(db: AsyncSession, customer_id: str, event_type: str) -> bool:
+    """Lets bulk writers skip building payloads nobody will receive"""
+    return bool(await db.scalar(HAS_SUBSCRIBERS, {"customer_id": customer_id, "event_type": event_type}))
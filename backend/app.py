@@ -1,14 +1,50 @@
 # backend/app.py
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 # Import routers
 from api.modules.parents import routes as parent_routes
-from api.core.database import check_database_connection
+from api.modules.search import routes as search_routes
+from api.modules.scoring import routes as scoring_routes
+from api.modules.analytics import routes as analytics_routes
+from api.modules.analytics.service import run_refresh_loop, REFRESH_INTERVAL_SECONDS
+from api.modules.analytics.ingest import event_ingestor
+from api.modules.webhooks import routes as webhook_routes
+from api.modules.webhooks.dispatcher import webhook_dispatcher
+from api.modules.forms import routes as form_routes
+from api.modules.forms.worker import form_intake_worker
+from api.modules.knowledge import routes as knowledge_routes
+from api.modules.knowledge.service import crawl_runner
+from api.modules.smart_reply import routes as smart_reply_routes
+from api.modules.inbox import routes as inbox_routes
+from api.modules.inbox.ingest import parse_pool
+from api.modules.chatbot import routes as chatbot_routes
+from api.modules.chatbot.intents import intent_model
+from api.modules.chatbot.sessions import session_cache
+from api.modules.chatbot.writer import chatbot_writer
+from api.modules.rbac import routes as rbac_routes
+from api.modules.rbac.cache import permission_cache
+from api.modules.rbac.dependencies import authorize
+from api.modules.audit import capture as audit_capture
+from api.modules.audit import routes as audit_routes
+from api.modules.audit.writer import audit_writer
+from api.modules.licensing import routes as licensing_routes
+from api.modules.licensing.cache import license_cache
+from api.modules.licensing.dependencies import licensed
+from api.modules.licensing.meter import usage_meter
+from api.modules.notifications import hub as notification_hooks
+from api.modules.notifications import routes as notification_routes
+from api.modules.notifications.hub import notification_hub
+from api.modules.notifications.service import notification_sweeper
+from api.core.partitions import run_partition_maintenance_loop, PARTITION_MAINTENANCE_SECONDS
+from api.core.database import check_database_connection, engine, async_engine, DB_POOL_MODE, POOL_SETTINGS
+from api.core.metrics import MetricsMiddleware, instrument_engine, registry as metrics_registry
 
 load_dotenv()
 
@@ -21,20 +57,89 @@ async def lifespan(app: FastAPI):
     # Check database connection
     if await check_database_connection():
         print("✅ Database connected successfully")
+        print(
+            f"🔌 Pool: mode={DB_POOL_MODE} size={POOL_SETTINGS['pool_size']} "
+            f"overflow={POOL_SETTINGS['max_overflow']} workers={POOL_SETTINGS['workers']} "
+            f"budget={POOL_SETTINGS['budget']}"
+        )
     else:
         print("❌ Database connection failed")
     
+    # Background refresh of the analytics rollups (0 disables it)
+    rollup_task = asyncio.create_task(run_refresh_loop()) if REFRESH_INTERVAL_SECONDS > 0 else None
+    
+    # Monthly partitions ahead of time, and retention by dropping old ones (0 disables it)
+    partition_task = (
+        asyncio.create_task(run_partition_maintenance_loop()) if PARTITION_MAINTENANCE_SECONDS > 0 else None
+    )
+    
+    # Batched writer behind POST /api/analytics/events
+    event_ingestor.start()
+    
+    # Outbound webhook delivery from the outbox
+    webhook_dispatcher.start()
+    
+    # Enquiry form intake (dedicated processes: python -m api.modules.forms.worker)
+    form_intake_worker.start()
+    
+    # Chatbot: intent model loaded before the first message, hot sessions and their write-behind
+    intent_model.load()
+    chatbot_writer.start()
+    session_cache.start()
+    
+    # Compiled RBAC policies follow permission_versions
+    permission_cache.start()
+    
+    # Audit trail of ORM writes, written behind in batches
+    audit_writer.start()
+    
+    # Licenses cached for the checks on each request; usage counted in memory and merged
+    license_cache.start()
+    usage_meter.start()
+    
+    # Unread counts and notification streams kept in step with other processes; task
+    # reminders and the purge of expired notifications
+    notification_hub.start()
+    notification_sweeper.start()
+    
     yield
     
     # Shutdown
     print("👋 Shutting down API...")
+    # Open notification streams end first, or the server waits on them
+    await notification_hub.stop()
+    await notification_sweeper.stop()
+    # Drain buffered analytics events before the engine goes away
+    await event_ingestor.stop()
+    stats = event_ingestor.stats()
+    print(f"📊 Analytics events: {stats['written']} written, {stats['dropped']} dropped")
+    # Then chatbot messages and conversation state still buffered
+    await session_cache.stop()
+    await chatbot_writer.stop()
+    # And audit entries (spilled to disk if the database won't take them)
+    await audit_writer.stop()
+    # Usage counted since the last merge
+    await usage_meter.stop()
+    await license_cache.stop()
+    await crawl_runner.stop()
+    await permission_cache.stop()
+    parse_pool.stop()
+    await form_intake_worker.stop()
+    await webhook_dispatcher.stop()
+    for task in (rollup_task, partition_task):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="Smart Education Platform API",
     description="Multi-tenant education CRM and communications platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -46,6 +151,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics, query counting and Server-Timing (outermost, so timings cover CORS too)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+# Field-level audit entries from every session's flushes (models opt in with audit_model)
+audit_capture.install()
+# Notifications written in a transaction are counted and pushed once it commits
+notification_hooks.install()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -61,6 +175,12 @@ async def health_check():
         "version": "1.0.0"
     }
 
+# Prometheus scrape endpoint (per worker process)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request latency, per-request query counts, slow queries and N+1 flags"""
+    return metrics_registry.render()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -71,8 +191,28 @@ async def root():
         "health": "/health"
     }
 
-# Include routers
-app.include_router(parent_routes.router)
+# Include routers. Staff APIs are checked against the tenant's role permissions as a
+# whole; analytics, forms and chatbot also serve the public website, so only their
+# staff routes carry the check. Licensed modules are metered and checked against the
+# tenant's plan.
+app.include_router(parent_routes.router, dependencies=[Depends(authorize("parents")), Depends(licensed("crm"))])
+app.include_router(search_routes.router, dependencies=[Depends(authorize("parents")), Depends(licensed("crm"))])
+app.include_router(scoring_routes.router, dependencies=[Depends(authorize("scoring")), Depends(licensed("crm"))])
+app.include_router(analytics_routes.router)
+app.include_router(webhook_routes.router, dependencies=[Depends(authorize("webhooks")), Depends(licensed("crm"))])
+app.include_router(form_routes.router)
+app.include_router(
+    knowledge_routes.router, dependencies=[Depends(authorize("knowledge_base")), Depends(licensed("kb"))]
+)
+app.include_router(
+    smart_reply_routes.router, dependencies=[Depends(authorize("smart_reply")), Depends(licensed("smart_reply"))]
+)
+app.include_router(inbox_routes.router, dependencies=[Depends(authorize("emails")), Depends(licensed("inbox"))])
+app.include_router(chatbot_routes.router)
+app.include_router(rbac_routes.router, dependencies=[Depends(authorize("role_permissions"))])
+app.include_router(audit_routes.router, dependencies=[Depends(authorize("audit_log"))])
+app.include_router(licensing_routes.router, dependencies=[Depends(authorize("licenses"))])
+app.include_router(notification_routes.router, dependencies=[Depends(authorize("notifications"))])
 
 # Run the application
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+# backend/benchmarks/audit_bench.py
+"""
+Audit logging benchmark on PUT /api/parents/{id}.
+
+Seeds a BENCH-AUDIT-000 tenant with --parents parents, then sends --requests
+updates (--concurrency at a time) three ways:
+
+  off          - no model registered for auditing (the baseline)
+  synchronous  - the same diffs inserted into audit_log inside each request's
+                 transaction, before commit (what a per-endpoint insert would cost)
+  write-behind - the session hook and the audit writer: diffs queued on commit,
+                 written in bulk by the background task
+
+Then checks:
+  - every write-behind update has exactly one entry, with the field diff and the
+    caller, once the writer drains
+  - write-behind adds no query to the request (synchronous adds one, inside the
+    transaction, so row locks of the update are held for another round trip)
+  - a flushed change that is rolled back leaves no entry
+  - with the database unreachable, entries are spilled to disk rather than lost,
+    and replayed once it is back
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/audit_bench.py --parents 500 --requests 2000
+"""
+import argparse
+import asyncio
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+import orjson
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app import app
+from api.core.database import AsyncSessionLocal, async_engine
+from api.modules.audit import capture
+from api.modules.audit.writer import INSERT_ENTRIES, audit_writer
+from api.modules.parents import models
+
+CUSTOMER_ID = "BENCH-AUDIT-000"
+USER_ID = "BENCH-AUDIT-USER"
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def setup(connection, parents):
+    await cleanup(connection)
+    await connection.execute(text(
+        "INSERT INTO customers (customer_id, name, status) VALUES (:c, 'Audit Bench School', 'active')"
+    ), {"c": CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO parents (customer_id, parent_id, name, email, status, stage)
+        SELECT :c, 'BENCH-AUDIT-' || n, 'Audit Parent ' || n, 'audit' || n || '@example.com', 'lead', 'awareness'
+        FROM generate_series(1, :n) n
+    """), {"c": CUSTOMER_ID, "n": parents})
+    await connection.commit()
+    return list((await connection.execute(
+        text("SELECT id FROM parents WHERE customer_id = :c ORDER BY id"), {"c": CUSTOMER_ID}
+    )).scalars())
+
+
+async def cleanup(connection):
+    for statement in (
+        "DELETE FROM audit_log WHERE customer_id = :c",
+        "DELETE FROM journey_events WHERE customer_id = :c",
+        "DELETE FROM parents WHERE customer_id = :c",
+        "DELETE FROM customers WHERE customer_id = :c",
+    ):
+        await connection.execute(text(statement), {"c": CUSTOMER_ID})
+    await connection.commit()
+
+
+def synchronous_insert(session):
+    """The naive alternative: write the transaction's entries before it commits"""
+    # before_commit runs ahead of the commit's own flush, which would find the changes
+    session.flush()
+    pending = session.info.pop(capture.PENDING_KEY, None)
+    if not pending:
+        return
+    rows = [
+        (customer_id, USER_ID, action, resource_type, resource_id, orjson.dumps(changes, default=str).decode())
+        for (resource_type, resource_id), (customer_id, action, changes) in capture._fold(pending).items()
+    ]
+    columns = list(zip(*rows))
+    session.execute(INSERT_ENTRIES, {
+        "customer_ids": list(columns[0]),
+        "user_ids": list(columns[1]),
+        "actions": list(columns[2]),
+        "resource_types": list(columns[3]),
+        "resource_ids": list(columns[4]),
+        "changes": list(columns[5]),
+        "ip_addresses": [None] * len(rows),
+        "user_agents": [None] * len(rows),
+        "created_ats": [datetime.utcnow()] * len(rows),
+    })
+
+
+async def run(client, parent_ids, requests, concurrency, label, offset):
+    latencies, queries, statuses = [], [], []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            number = queue.pop()
+            parent_id = parent_ids[number % len(parent_ids)]
+            started = time.perf_counter()
+            response = await client.put(
+                f"/api/parents/{parent_id}", params={"customer_id": CUSTOMER_ID},
+                headers={"X-User-ID": USER_ID},
+                json={"phone": f"07700{offset + number:06d}", "source_detail": f"{label} {number}"}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(int(QUERIES.search(response.headers.get("server-timing", "")).group(1)))
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:13s} {requests / elapsed:7.0f} req/s  p50 {percentile(latencies, 50):7.1f}ms  "
+          f"p95 {percentile(latencies, 95):7.1f}ms  queries/request {statistics.median(queries):g}")
+    return statistics.median(queries), statuses
+
+
+async def entries(connection, label):
+    count = await connection.scalar(text("""
+        SELECT count(*) FROM audit_log
+        WHERE customer_id = :c AND action = 'update' AND changes -> 'source_detail' ->> 'new' LIKE :label
+          AND changes ? 'phone' AND user_id = :u
+    """), {"c": CUSTOMER_ID, "label": f"{label} %", "u": USER_ID})
+    await connection.commit()
+    return count
+
+
+async def main(args):
+    checks = {}
+    registered = dict(capture.AUDITED)
+    audit_writer.spill_dir = tempfile.mkdtemp(prefix="audit-spill-")
+    audit_writer.start()
+    transport = httpx.ASGITransport(app=app)
+
+    async with async_engine.connect() as connection, \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        parent_ids = await setup(connection, args.parents)
+        try:
+            print(f"{args.requests:,} updates over {args.parents} parents, {args.concurrency} concurrent")
+
+            capture.AUDITED.clear()
+            off_queries, _ = await run(client, parent_ids, args.requests, args.concurrency, "off", 0)
+            capture.AUDITED.update(registered)
+
+            event.listen(Session, "before_commit", synchronous_insert)
+            try:
+                sync_queries, _ = await run(
+                    client, parent_ids, args.requests, args.concurrency, "synchronous", args.requests
+                )
+            finally:
+                event.remove(Session, "before_commit", synchronous_insert)
+
+            behind_queries, statuses = await run(
+                client, parent_ids, args.requests, args.concurrency, "write-behind", args.requests * 2
+            )
+            await audit_writer.flush()
+            print(f"  writer: {audit_writer.stats()}")
+
+            written = await entries(connection, "write-behind")
+            checks[f"write-behind: {written:,} of {args.requests:,} updates audited with diff and user"] = (
+                written == args.requests and statuses.count(200) == args.requests
+            )
+            checks[f"synchronous: {await entries(connection, 'synchronous'):,} entries"] = (
+                await entries(connection, "synchronous") == args.requests
+            )
+            checks[f"write-behind adds no query per request ({off_queries:g} -> {behind_queries:g}; "
+                   f"synchronous {sync_queries:g})"] = behind_queries == off_queries < sync_queries
+
+            # A flushed change that is rolled back
+            async with AsyncSessionLocal() as db:
+                parent = await db.scalar(select(models.Parent).where(models.Parent.id == parent_ids[0]))
+                parent.source_detail = "rolled-back 0"
+                await db.flush()
+                await db.rollback()
+            await audit_writer.flush()
+            checks["rolled-back change not audited"] = await entries(connection, "rolled-back") == 0
+
+            # Database unreachable for the writer: spill, then replay
+            outage_requests = min(args.requests, 200)
+            unreachable = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none", pool_pre_ping=False)
+            audit_writer.engine = unreachable
+            audit_writer.max_retries = 0
+            await run(client, parent_ids, outage_requests, args.concurrency, "outage", args.requests * 3)
+            await audit_writer.flush()
+            spilled_files = len(audit_writer.spill_files())
+            during = await entries(connection, "outage")
+            audit_writer.engine = async_engine
+            started = time.perf_counter()
+            await audit_writer.flush()
+            replay_ms = (time.perf_counter() - started) * 1000
+            after = await entries(connection, "outage")
+            print(f"  outage: {spilled_files} spill file(s), {during} entries in the database during, "
+                  f"{after} after replay ({replay_ms:.1f}ms)")
+            checks[f"outage: {outage_requests} entries spilled, then replayed"] = (
+                spilled_files > 0 and during == 0 and after == outage_requests and not audit_writer.spill_files()
+            )
+            await unreachable.dispose()
+        finally:
+            await audit_writer.stop()
+            shutil.rmtree(audit_writer.spill_dir, ignore_errors=True)
+            await cleanup(connection)
+
+    failed = False
+    for name, passed in checks.items():
+        print(f"[{'ok' if passed else 'FAIL'}] {name}")
+        failed = failed or not passed
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit logging on parent updates")
+    parser.add_argument("--parents", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
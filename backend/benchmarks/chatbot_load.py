@@ -0,0 +1,345 @@
+# backend/benchmarks/chatbot_load.py
+"""
+Concurrent-sessions load test for the chatbot.
+
+Seeds a BENCH-CHAT-000 tenant with a small knowledge base, then runs --sessions
+conversations of --turns messages each, all at once, three ways:
+
+  naive  - what a straightforward handler would do per turn: read the conversation
+           and its history, answer, insert both messages and update the
+           conversation, commit
+  cached - the chatbot service (session cache, write-behind writer), called directly
+  sse    - the same through POST /api/chatbot/conversations/{id}/stream, reading
+           the whole event stream; database queries per turn from Server-Timing
+
+Then checks:
+  - every turn answered and every message written, in order, once the writer drains
+  - hot turns make no database query
+  - idle sessions are swept and marked ended, and a later turn reopens them with
+    their history
+  - the intent model on held-out phrasings
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/chatbot_load.py --sessions 200 --turns 10
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import text
+
+from app import app
+from api.core.database import AsyncSessionLocal, async_engine
+from api.modules.chatbot import service
+from api.modules.chatbot.intents import intent_model
+from api.modules.chatbot.sessions import session_cache
+from api.modules.chatbot.writer import chatbot_writer
+from api.modules.smart_reply.retrieval import retrieval_index
+
+CUSTOMER_ID = "BENCH-CHAT-000"
+
+KNOWLEDGE = [
+    ("fees", "Fees and charges",
+     "Fees for Year 7 to Year 11 are £6,200 per term. Sixth form fees are £6,500 per term. "
+     "Lunch and most trips are included in the fees."),
+    ("financial_aid", "Bursaries and scholarships",
+     "Means-tested bursaries cover up to 100% of fees. Scholarships are awarded for academic, "
+     "music and sport excellence, and can be combined with a bursary."),
+    ("childcare", "Wraparound care",
+     "Breakfast club opens at 7:30am. After school club runs until 6pm, and a holiday club runs in most holidays."),
+    ("visit", "Visiting us",
+     "Open mornings are held every term. Private tours can be booked with the admissions office on any weekday."),
+    ("transport", "Getting to school",
+     "School bus routes serve the surrounding towns. A minibus runs from the train station every morning."),
+]
+
+SCRIPT = [
+    "Hello",
+    "How much are the fees?",
+    "and for the sixth form?",
+    "Do you offer bursaries or scholarships?",
+    "Is there a breakfast club?",
+    "When can we visit the school?",
+    "Is there a school bus from town?",
+    "What is the weather like on Mars?",
+    "thanks",
+    "bye",
+]
+
+HELD_OUT = [
+    ("hiya", "greeting"),
+    ("what do the fees come to per year", "fees"),
+    ("can we get help paying the fees", "financial_aid"),
+    ("is there an open day soon", "visit"),
+    ("when does the summer term start", "term_dates"),
+    ("does a bus go to the school", "transport"),
+    ("where can I buy the uniform", "uniform"),
+    ("what is on the lunch menu", "catering"),
+    ("is there an after school club", "childcare"),
+    ("what support is there for dyslexia", "learning_support"),
+    ("which GCSE options are there", "curriculum"),
+    ("can I speak to someone in admissions", "contact_human"),
+    ("I want to make a formal complaint", "complaint"),
+    ("how do we apply for year 7", "admissions"),
+    ("thank you very much", "thanks"),
+    ("goodbye for now", "goodbye"),
+]
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(label, latencies, elapsed):
+    print(f"{label:>7}: {len(latencies):,} turns in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} turns/s), "
+          f"p50 {percentile(latencies, 50):.1f}ms p95 {percentile(latencies, 95):.1f}ms "
+          f"p99 {percentile(latencies, 99):.1f}ms")
+
+
+async def setup(connection):
+    await cleanup(connection)
+    await connection.execute(text(
+        "INSERT INTO customers (customer_id, name) VALUES (:c, 'Chatbot Benchmark School')"
+    ), {"c": CUSTOMER_ID})
+    for number, (category, title, content) in enumerate(KNOWLEDGE, 1):
+        await connection.execute(text("""
+            INSERT INTO knowledge_base (customer_id, kb_id, title, content, content_type, category, source_url)
+            VALUES (:c, :kb_id, :title, :content, 'text', :category, :url)
+        """), {"c": CUSTOMER_ID, "kb_id": f"BENCH-CHAT-KB-{number}", "title": title, "content": content,
+               "category": category, "url": f"https://bench.example/{category}"})
+    await connection.execute(text("""
+        INSERT INTO url_mappings (customer_id, phrase, url, context, priority)
+        VALUES (:c, 'open day', 'https://bench.example/open-days', 'general', 10)
+    """), {"c": CUSTOMER_ID})
+    await connection.commit()
+
+
+async def cleanup(connection):
+    params = {"c": CUSTOMER_ID}
+    await connection.execute(text("""
+        DELETE FROM chatbot_messages WHERE conversation_id IN (
+            SELECT id FROM chatbot_conversations WHERE customer_id = :c
+        )
+    """), params)
+    for table in ("chatbot_conversations", "url_mappings", "knowledge_base", "customers"):
+        await connection.execute(text(f"DELETE FROM {table} WHERE customer_id = :c"), params)
+    await connection.commit()
+
+
+# Naive handler: everything synchronous, history from the database on every turn
+NAIVE_CONVERSATION = text("""
+    SELECT id, escalated, sentiment_score FROM chatbot_conversations
+    WHERE conversation_id = :conversation_id AND customer_id = :c
+""")
+NAIVE_HISTORY = text("""
+    SELECT message_type, message FROM chatbot_messages WHERE conversation_id = :id
+    ORDER BY created_at DESC, id DESC LIMIT 20
+""")
+NAIVE_MESSAGE = text("""
+    INSERT INTO chatbot_messages (conversation_id, message_type, message, intent, entities, confidence, created_at)
+    VALUES (:id, :message_type, :message, :intent, CAST(:entities AS JSONB), :confidence, :created_at)
+""")
+NAIVE_UPDATE = text("UPDATE chatbot_conversations SET sentiment_score = :s WHERE id = :id")
+
+
+async def naive_session(number, turns, latencies):
+    conversation_id = f"CHAT-BENCH-NAIVE-{number}"
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("""
+            INSERT INTO chatbot_conversations (customer_id, conversation_id, session_id, started_at)
+            VALUES (:c, :conversation_id, 'naive', now())
+        """), {"c": CUSTOMER_ID, "conversation_id": conversation_id})
+        await db.commit()
+    for turn in range(turns):
+        message = SCRIPT[turn % len(SCRIPT)]
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(NAIVE_CONVERSATION, {"conversation_id": conversation_id, "c": CUSTOMER_ID})).one()
+            history = (await db.execute(NAIVE_HISTORY, {"id": row.id})).all()
+            # The same classification and answer as the service, on a throwaway conversation object
+            scratch = service.Conversation(row.id, conversation_id, CUSTOMER_ID, None, datetime.utcnow(), history=[
+                service.ChatMessage(row.id, message_type, text_, None, None, None, None)
+                for message_type, text_ in reversed(history)
+            ])
+            prediction, query = service._classify(scratch, message)
+            if prediction.intent in service.CANNED_REPLIES:
+                reply = service.CANNED_REPLIES[prediction.intent]
+            else:
+                reply, _ = await service._knowledge_reply(db, scratch, query, prediction.intent)
+            for message_type, value in (("user", message), ("bot", reply)):
+                await db.execute(NAIVE_MESSAGE, {
+                    "id": row.id, "message_type": message_type, "message": value, "intent": prediction.intent,
+                    "entities": None, "confidence": prediction.confidence, "created_at": datetime.utcnow(),
+                })
+            await db.execute(NAIVE_UPDATE, {"s": 0, "id": row.id})
+            await db.commit()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def cached_session(number, turns, latencies):
+    async with AsyncSessionLocal() as db:
+        conversation = await service.start_conversation(db, CUSTOMER_ID, session_id="cached")
+    for turn in range(turns):
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            current = await service.load_conversation(db, CUSTOMER_ID, conversation.conversation_id)
+            await service.respond(db, current, SCRIPT[turn % len(SCRIPT)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return conversation.conversation_id
+
+
+async def sse_session(client, turns, latencies, queries, failures):
+    params = {"customer_id": CUSTOMER_ID}
+    response = await client.post("/api/chatbot/conversations", params=params, json={"session_id": "sse"})
+    conversation_id = response.json()["conversation_id"]
+    for turn in range(turns):
+        started = time.perf_counter()
+        response = await client.post(f"/api/chatbot/conversations/{conversation_id}/stream", params=params,
+                                     json={"message": SCRIPT[turn % len(SCRIPT)]})
+        latencies.append((time.perf_counter() - started) * 1000)
+        events = [block.split("\n", 1)[0] for block in response.text.strip().split("\n\n")]
+        if response.status_code != 200 or events[0] != "event: meta" or events[-1] != "event: done":
+            failures.append(response.status_code)
+        queries.append(int(QUERIES.search(response.headers.get("server-timing", "")).group(1)))
+    return conversation_id
+
+
+async def drained():
+    """Flush everything the writer holds, then restart it"""
+    await chatbot_writer.stop(timeout=600)
+    chatbot_writer.start()
+
+
+async def stored(connection, session_id):
+    row = (await connection.execute(text("""
+        SELECT count(DISTINCT c.id), count(m.id),
+               count(*) FILTER (WHERE m.id IS NOT NULL AND m.id < m.previous_id)
+        FROM chatbot_conversations c
+        LEFT JOIN (
+            SELECT id, conversation_id, lag(id) OVER (PARTITION BY conversation_id ORDER BY created_at, id) AS previous_id
+            FROM chatbot_messages
+        ) m ON m.conversation_id = c.id
+        WHERE c.customer_id = :c AND c.session_id = :s
+    """), {"c": CUSTOMER_ID, "s": session_id})).one()
+    await connection.commit()
+    return row
+
+
+async def main(args):
+    retrieval_index.directory = tempfile.mkdtemp(prefix="chatbot-load-")
+    intent_model.load()
+    chatbot_writer.start()
+    checks = {}
+    turns = args.sessions * args.turns
+
+    correct = sum(intent_model.predict(phrase).intent == intent for phrase, intent in HELD_OUT)
+    checks[f"intent model: {correct}/{len(HELD_OUT)} held-out phrasings"] = correct >= len(HELD_OUT) * 0.8
+
+    async with async_engine.connect() as connection:
+        await setup(connection)
+
+        latencies = []
+        started = time.perf_counter()
+        await asyncio.gather(*(naive_session(number, args.turns, latencies) for number in range(args.sessions)))
+        report("naive", latencies, time.perf_counter() - started)
+        naive_p95 = percentile(latencies, 95)
+
+        latencies = []
+        started = time.perf_counter()
+        cached_ids = await asyncio.gather(*(
+            cached_session(number, args.turns, latencies) for number in range(args.sessions)
+        ))
+        report("cached", latencies, time.perf_counter() - started)
+        checks[f"cached turns faster at p95 than naive ({naive_p95:.1f}ms -> {percentile(latencies, 95):.1f}ms)"] = \
+            percentile(latencies, 95) < naive_p95
+
+        latencies, queries, failures = [], [], []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            sse_ids = await asyncio.gather(*(
+                sse_session(client, args.turns, latencies, queries, failures) for _ in range(args.sessions)
+            ))
+            report("sse", latencies, time.perf_counter() - started)
+            print(f"         database queries per streamed turn: median {statistics.median(queries)}, "
+                  f"max {max(queries)}; writer {chatbot_writer.stats()}")
+            checks[f"every streamed turn answered meta..done ({len(failures)} failures)"] = not failures
+            checks["hot turns make no database query"] = statistics.median(queries) == 0
+
+            await drained()
+            for session_id in ("naive", "cached", "sse"):
+                conversations, messages, out_of_order = await stored(connection, session_id)
+                expected = turns * 2 + (0 if session_id == "naive" else args.sessions)
+                checks[f"{session_id}: {messages:,} of {expected:,} messages stored, in order"] = (
+                    conversations == args.sessions and messages == expected and out_of_order == 0
+                )
+
+            # Idle sweep: everything goes, and ends at its last message
+            session_cache.idle_seconds = 0
+            swept = session_cache.sweep()
+            session_cache.idle_seconds = 900
+            await drained()
+            ended = await connection.scalar(text("""
+                SELECT count(*) FROM chatbot_conversations
+                WHERE customer_id = :c AND session_id IN ('cached', 'sse') AND ended_at IS NOT NULL
+            """), {"c": CUSTOMER_ID})
+            await connection.commit()
+            checks[f"idle sweep evicted {swept:,} sessions and marked them ended"] = (
+                swept == args.sessions * 2 and ended == args.sessions * 2 and len(session_cache) == 0
+            )
+
+            # A returning visitor: history reloaded from the database, conversation reopened
+            params = {"customer_id": CUSTOMER_ID}
+            response = await client.post(f"/api/chatbot/conversations/{sse_ids[0]}/stream", params=params,
+                                         json={"message": "How much are the fees?"})
+            history = (await client.get(f"/api/chatbot/conversations/{sse_ids[0]}", params=params)).json()
+            await drained()
+            reopened = await connection.scalar(text(
+                "SELECT ended_at IS NULL FROM chatbot_conversations WHERE conversation_id = :id"
+            ), {"id": sse_ids[0]})
+            await connection.commit()
+            checks["returning visitor: history reloaded, conversation reopened"] = (
+                response.status_code == 200 and reopened
+                and len(history["messages"]) == min(20, 1 + 2 * args.turns + 2)
+                and history["messages"][-1]["message"].startswith("Fees for Year 7")
+            )
+
+            # Capacity: the least recently used go first, and come back intact
+            session_cache.capacity = max(1, args.sessions // 10)
+            latencies = []
+            started = time.perf_counter()
+            await asyncio.gather(*(cached_session(number, 3, latencies) for number in range(args.sessions)))
+            report("lru", latencies, time.perf_counter() - started)
+            await drained()
+            conversations, messages, out_of_order = await stored(connection, "cached")
+            checks[f"over capacity: {session_cache.evicted_lru:,} LRU evictions, nothing lost"] = (
+                session_cache.evicted_lru > 0 and out_of_order == 0
+                and messages == args.sessions * (2 * args.turns + 1) + args.sessions * (2 * 3 + 1)
+            )
+            session_cache.capacity = 10_000
+
+        await chatbot_writer.stop()
+        if not args.keep:
+            await cleanup(connection)
+    await async_engine.dispose()
+
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot concurrent-sessions load test")
+    parser.add_argument("--sessions", type=int, default=200, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=10, help="messages per conversation")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenant in place")
+    asyncio.run(main(parser.parse_args()))
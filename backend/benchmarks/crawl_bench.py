@@ -0,0 +1,213 @@
+# backend/benchmarks/crawl_bench.py
+"""
+Website crawler benchmark and end-to-end check against a local static site.
+
+Generates --pages HTML pages (each linking to a few others), a robots.txt that
+disallows /private/, a link to a missing page and a duplicate of the home page,
+serves them with a threaded http.server (--latency ms per response, tracking peak
+concurrency and status codes) and runs scrape jobs through run_scrape_job:
+  sequential - one request at a time, for comparison
+  first      - every page is new: one knowledge_base version each
+  recrawl    - nothing changed: every page answered 304, no new versions
+  touched    - --touched pages rewritten with the same text: fetched, not versioned
+  modified   - --modified pages changed: exactly that many new versions, the old
+               ones kept as history with is_current = FALSE
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/crawl_bench.py --pages 300 --latency 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import text
+
+from api.core.database import async_engine
+from api.modules.knowledge.service import run_scrape_job
+
+PREFIX = "BENCH-CRAWL-"
+FANOUT = 5
+
+
+class TrackingHandler(SimpleHTTPRequestHandler):
+    """Static files with artificial latency; If-Modified-Since gives 304s"""
+    stats = None
+
+    def handle_one_request(self):
+        stats = self.stats
+        with stats["lock"]:
+            stats["active"] += 1
+            stats["peak"] = max(stats["peak"], stats["active"])
+        try:
+            time.sleep(stats["latency"])
+            super().handle_one_request()
+        finally:
+            with stats["lock"]:
+                stats["active"] -= 1
+
+    def send_response(self, code, message=None):
+        self.stats["codes"][code] += 1
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def page_html(i, pages, revision=0):
+    links = [f"/page-{j}.html" for j in range(i * FANOUT + 1, min(pages, i * FANOUT + FANOUT + 1))]
+    cross = (i * 37 + 11) % pages
+    links.append(f"/page-{cross}.html" if cross else "/")
+    if i == 0:
+        links += ["/missing.html", "/private/staff.html", "/index.html"]
+    anchors = "".join(f'<li><a href="{link}">link</a></li>' for link in links)
+    body = f"Admissions information, section {i}." + (f" Updated in revision {revision}." if revision else "")
+    return (f"<html><head><title>Page {i}</title><style>p {{color: red}}</style></head>"
+            f"<body><nav><a href=\"/\">Home</a></nav><h1>Page {i}</h1><p>{body}</p><ul>{anchors}</ul></body></html>")
+
+
+def write_page(root, i, pages, revision=0, bump=0):
+    path = os.path.join(root, "index.html" if i == 0 else f"page-{i}.html")
+    with open(path, "w") as f:
+        f.write(page_html(i, pages, revision))
+    if bump:
+        # http.server dates are to the second; move the mtime clearly past the last crawl
+        stamp = time.time() + bump
+        os.utime(path, (stamp, stamp))
+
+
+def build_site(root, pages):
+    for i in range(pages):
+        write_page(root, i, pages)
+    os.makedirs(os.path.join(root, "private"))
+    with open(os.path.join(root, "private", "staff.html"), "w") as f:
+        f.write("<html><body>Staff only</body></html>")
+    with open(os.path.join(root, "robots.txt"), "w") as f:
+        f.write("User-agent: *\nDisallow: /private/\n")
+
+
+async def setup(connection):
+    await cleanup(connection)
+    for tenant in range(2):
+        await connection.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Crawl Benchmark School')"
+        ), {"c": f"{PREFIX}{tenant:03d}"})
+
+
+async def cleanup(connection):
+    params = {"prefix": PREFIX + "%"}
+    await connection.execute(text(
+        "DELETE FROM scraped_content WHERE job_id IN (SELECT id FROM scraping_jobs WHERE customer_id LIKE :prefix)"
+    ), params)
+    for table in ("scraping_jobs", "knowledge_base", "customers"):
+        await connection.execute(text(f"DELETE FROM {table} WHERE customer_id LIKE :prefix"), params)
+
+
+async def crawl(connection, stats, customer_id, url, label, **options):
+    job_id = await connection.scalar(text("""
+        INSERT INTO scraping_jobs (customer_id, job_id, url, scraper_type)
+        VALUES (:c, :j, :u, 'website') RETURNING id
+    """), {"c": customer_id, "j": f"{PREFIX}{label}-{time.time_ns()}", "u": url})
+    await connection.commit()
+    stats["peak"] = 0
+    stats["codes"].clear()
+    result = await run_scrape_job(job_id, **options)
+    job = (await connection.execute(text(
+        "SELECT status, pages_scraped, pages_failed, error_log FROM scraping_jobs WHERE id = :id"
+    ), {"id": job_id})).one()
+    await connection.commit()
+    result.update(peak=stats["peak"], codes=dict(stats["codes"]), job=job)
+    seconds = result["elapsed_seconds"]
+    print(f"{label:>10}: {sum(result['outcomes'].values()):,} pages in {seconds:.2f}s "
+          f"({sum(result['outcomes'].values()) / seconds:,.0f} pages/s), peak {result['peak']} in flight, "
+          f"{result['versions_created']} new versions, outcomes {result['outcomes']}, HTTP {result['codes']}")
+    return result
+
+
+async def versions(connection, customer_id):
+    return (await connection.execute(text("""
+        SELECT count(*) FILTER (WHERE is_current), count(*) FILTER (WHERE NOT is_current),
+               count(*) FILTER (WHERE is_current AND version = 2),
+               count(DISTINCT source_url) FILTER (WHERE is_current)
+        FROM knowledge_base WHERE customer_id = :c
+    """), {"c": customer_id})).one()
+
+
+async def main(args):
+    root = tempfile.mkdtemp(prefix="crawl-bench-")
+    build_site(root, args.pages)
+    stats = {"lock": threading.Lock(), "active": 0, "peak": 0, "codes": Counter(), "latency": args.latency / 1000}
+    TrackingHandler.stats = stats
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(TrackingHandler, directory=root))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    tenant, baseline = f"{PREFIX}000", f"{PREFIX}001"
+    options = {"max_pages": args.pages + 10, "max_depth": 10,
+               "concurrency": args.concurrency, "host_concurrency": args.host_concurrency}
+    checks = {}
+    async with async_engine.connect() as connection:
+        await setup(connection)
+        await connection.commit()
+
+        sequential = await crawl(connection, stats, baseline, url, "sequential",
+                                 **{**options, "concurrency": 1, "host_concurrency": 1})
+        first = await crawl(connection, stats, tenant, url, "first", **options)
+        checks[f"first crawl {sequential['elapsed_seconds'] / first['elapsed_seconds']:.1f}x faster than sequential"] = \
+            first["elapsed_seconds"] < sequential["elapsed_seconds"]
+        checks["per-host concurrency cap respected"] = 1 < first["peak"] <= args.host_concurrency
+        checks["one version per page, duplicate and robots.txt page excluded"] = \
+            first["versions_created"] == args.pages and (await versions(connection, tenant))[3] == args.pages
+        checks["job counts: scraped pages and the 404 failure"] = first["job"][:3] == (
+            "completed", args.pages + 1, 1) and "missing.html: HTTP 404" in (first["job"][3] or "")
+
+        recrawl = await crawl(connection, stats, tenant, url, "recrawl", **options)
+        checks["recrawl: every page 304, nothing versioned"] = (
+            recrawl["outcomes"].get("not_modified") == args.pages and recrawl["versions_created"] == 0
+        )
+
+        for i in range(1, args.touched + 1):
+            write_page(root, i, args.pages, bump=5)
+        touched = await crawl(connection, stats, tenant, url, "touched", **options)
+        checks["touched pages re-fetched but not versioned"] = (
+            touched["outcomes"].get("unchanged") == args.touched and touched["versions_created"] == 0
+        )
+
+        modified_pages = range(args.pages - args.modified, args.pages)
+        for i in modified_pages:
+            write_page(root, i, args.pages, revision=1, bump=10)
+        modified = await crawl(connection, stats, tenant, url, "modified", **options)
+        current, history, second, _ = await versions(connection, tenant)
+        checks["modified pages versioned, old versions kept as history"] = (
+            modified["versions_created"] == args.modified and current == args.pages
+            and history == args.modified and second == args.modified
+        )
+
+        if not args.keep:
+            await cleanup(connection)
+            await connection.commit()
+    server.shutdown()
+    await async_engine.dispose()
+
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Website crawler benchmark")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=20, help="server latency per response, ms")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--host-concurrency", type=int, default=4)
+    parser.add_argument("--touched", type=int, default=20, help="pages rewritten with the same content")
+    parser.add_argument("--modified", type=int, default=10, help="pages whose content changes")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenants in place")
+    asyncio.run(main(parser.parse_args()))
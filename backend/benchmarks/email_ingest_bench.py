@@ -0,0 +1,276 @@
+# backend/benchmarks/email_ingest_bench.py
+"""
+Bulk email ingest benchmark and end-to-end check over a generated mbox.
+
+Generates a tenant with --parents families (every other one with a secondary_email)
+and an mbox of --messages messages in threads of four: parent enquiries and school
+replies alternating, some HTML-only, some with attachments or ">From " quoted lines,
+a tenth from families the school doesn't know. Sentiment cycles through positive,
+negative and neutral wording.
+
+The mbox is ingested once per --processes value (0 parses in the event loop),
+recording messages/s and the worst event-loop stall seen by a 10ms ticker. The
+last run goes through POST /api/inbox/import, then checks:
+  - every message imported, the right ones linked to parents (email or secondary)
+  - last_contact_date is each family's latest message
+  - sentiment labels follow the wording, one inbox thread per thread
+  - re-importing the same mbox only reports duplicates
+  - an oversized message is reported without stopping the import
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/email_ingest_bench.py --messages 20000 --processes 0,1,2
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import text
+
+from app import app
+from api.core.database import AsyncSessionLocal, async_engine
+from api.modules.inbox import ingest, schemas
+from api.modules.inbox.ingest import ParsePool, ingest_emails
+from api.modules.inbox.mime import iter_mbox_messages
+
+CUSTOMER_ID = "BENCH-EMAIL-000"
+MAILBOX = "admissions@school.example"
+CHUNK_BYTES = 256 * 1024
+START = datetime(2025, 1, 6, 8, 0)
+
+TONES = {
+    "positive": "Thank you so much for the wonderful visit, we were really impressed and delighted.",
+    "negative": "I am very disappointed and frustrated that nobody has replied, this is unacceptable.",
+    "neutral": "Could you send the fees schedule and the dates for the assessment day please?",
+}
+
+
+def family_of(thread, parents):
+    # One family in eleven is not a parent of the tenant
+    return thread % (parents + parents // 10)
+
+
+def message(j, parents):
+    """(mbox bytes, family, date, tone, direction) of generated message j"""
+    thread, position = divmod(j, 4)
+    family = family_of(thread, parents)
+    # Even families write from their secondary address on the third message
+    address = f"partner{family}@example.com" if family % 2 == 0 and position == 2 else f"parent{family}@example.com"
+    outbound = position % 2 == 1
+    sender, recipient = (MAILBOX, address) if outbound else (address, MAILBOX)
+    tone = "neutral" if outbound else list(TONES)[(j // 2) % 3]
+    date = START + timedelta(minutes=j)
+    headers = [
+        f"From: Family {family} <{sender}>" if not outbound else f"From: Admissions <{sender}>",
+        f"To: {recipient}",
+        f"Subject: {'Re: ' if position else ''}Admissions question {thread}",
+        f"Date: {date.strftime('%a, %d %b %Y %H:%M:%S')} +0000",
+        f"Message-ID: <{j}@bench.example>",
+    ]
+    if position:
+        headers += [f"In-Reply-To: <{j - 1}@bench.example>", f"References: <{thread * 4}@bench.example> <{j - 1}@bench.example>"]
+    body = TONES[tone] + ("\n>From the prospectus: quoted line" if j % 11 == 0 else "") + \
+        f"\n\n> On an earlier date someone wrote:\n> terrible awful quoted text\n\n-- \nFamily {family}\n"
+    if j % 5 == 0:
+        headers += ["MIME-Version: 1.0", "Content-Type: text/html; charset=utf-8"]
+        body = "<html><body>" + "".join(f"<p>{line}</p>" for line in body.split("\n")) + "</body></html>\n"
+    elif j % 7 == 0:
+        headers += ["MIME-Version: 1.0", 'Content-Type: multipart/mixed; boundary="b"']
+        body = (f'--b\nContent-Type: text/plain\n\n{body}\n--b\nContent-Type: application/pdf\n'
+                f'Content-Disposition: attachment; filename="form{j}.pdf"\nContent-Transfer-Encoding: base64\n\n'
+                f'JVBERi0xLjQK\n--b--\n')
+    raw = f"From {sender} {date.strftime('%a %b %d %H:%M:%S %Y')}\n" + "\n".join(headers) + "\n\n" + \
+        body.replace("\nFrom ", "\n>From ") + "\n"
+    return raw.encode(), family, date, tone, "outbound" if outbound else "inbound"
+
+
+def build_mbox(path, messages, parents):
+    """Write the mbox and return the expected outcome"""
+    expected = {"matched": 0, "last_contact": {}, "tones": {}, "threads": (messages + 3) // 4}
+    with open(path, "wb") as f:
+        for j in range(messages):
+            raw, family, date, tone, direction = message(j, parents)
+            f.write(raw)
+            if family < parents:
+                expected["matched"] += 1
+                expected["last_contact"][family] = date.date()
+            if direction == "inbound":
+                expected["tones"][f"<{j}@bench.example>"] = tone
+    return expected
+
+
+async def file_chunks(path):
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_BYTES):
+            yield chunk
+            # Let the loop breathe between chunks, as a network stream would
+            await asyncio.sleep(0)
+
+
+class LoopMonitor:
+    """Worst lateness of a 10ms sleep while the import runs"""
+
+    def __init__(self):
+        self.worst = 0.0
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            self.worst = max(self.worst, time.perf_counter() - started - 0.01)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def reset(connection):
+    params = {"c": CUSTOMER_ID}
+    await connection.execute(text("DELETE FROM emails WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM email_threads WHERE customer_id = :c"), params)
+    await connection.execute(text("UPDATE parents SET last_contact_date = NULL WHERE customer_id = :c"), params)
+    await connection.commit()
+
+
+async def setup(connection, parents):
+    await cleanup(connection)
+    await connection.execute(text(
+        "INSERT INTO customers (customer_id, name) VALUES (:c, 'Email Ingest Benchmark School')"
+    ), {"c": CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO parents (customer_id, parent_id, name, email, secondary_email, status, stage)
+        SELECT CAST(:c AS VARCHAR), 'BENCH-EMAIL-' || g, 'Family ' || g, 'Parent' || g || '@Example.com',
+               CASE WHEN g % 2 = 0 THEN 'partner' || g || '@example.com' END, 'lead', 'interest'
+        FROM generate_series(0, :parents - 1) AS g
+    """), {"c": CUSTOMER_ID, "parents": parents})
+    await connection.commit()
+
+
+async def cleanup(connection):
+    params = {"c": CUSTOMER_ID}
+    await connection.execute(text("DELETE FROM emails WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM email_threads WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM parents WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM customers WHERE customer_id = :c"), params)
+    await connection.commit()
+
+
+def report(label, result, monitor):
+    print(f"{label:>12}: {result.total:,} messages in {result.elapsed_seconds:.2f}s "
+          f"({result.messages_per_second:,.0f}/s), imported {result.imported:,}, matched {result.matched:,}, "
+          f"duplicates {result.duplicates:,}, failed {result.failed}, worst loop stall {monitor.worst * 1000:.0f}ms")
+
+
+async def main(args):
+    root = tempfile.mkdtemp(prefix="email-ingest-bench-")
+    path = os.path.join(root, "bench.mbox")
+    expected = build_mbox(path, args.messages, args.parents)
+    print(f"mbox: {args.messages:,} messages, {os.path.getsize(path) / 1e6:.1f} MB, {args.parents:,} families")
+
+    checks = {}
+    runs = [int(value) for value in args.processes.split(",")]
+    async with async_engine.connect() as connection:
+        await setup(connection, args.parents)
+        stalls = {}
+        for processes in runs[:-1]:
+            await reset(connection)
+            pool = ParsePool(processes)
+            async with AsyncSessionLocal() as db:
+                with LoopMonitor() as monitor:
+                    result = await ingest_emails(
+                        db, CUSTOMER_ID, iter_mbox_messages(file_chunks(path), 1_000_000),
+                        mailbox=[MAILBOX], batch_size=args.batch_size, pool=pool
+                    )
+            pool.stop()
+            stalls[processes] = monitor.worst
+            report(f"{processes} processes", result, monitor)
+
+        # Last configuration through the HTTP endpoint
+        await reset(connection)
+        ingest.parse_pool.processes = runs[-1]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            params = {"customer_id": CUSTOMER_ID, "mailbox": MAILBOX, "batch_size": args.batch_size}
+            with LoopMonitor() as monitor:
+                response = await client.post("/api/inbox/import", params=params, content=file_chunks(path),
+                                             headers={"Content-Type": "application/mbox"})
+            result = schemas.EmailImportResult(**response.json())
+            stalls[runs[-1]] = monitor.worst
+            report(f"{runs[-1]} proc (HTTP)", result, monitor)
+
+            checks["every message imported"] = result.imported == args.messages and result.failed == 0
+            checks[f"{expected['matched']:,} messages linked to parents by email or secondary_email"] = \
+                result.matched == expected["matched"]
+
+            rows = (await connection.execute(text("""
+                SELECT split_part(parent_id, '-', 3)::int, last_contact_date FROM parents WHERE customer_id = :c
+            """), {"c": CUSTOMER_ID})).all()
+            await connection.commit()
+            checks["last_contact_date is each family's latest message"] = all(
+                day == expected["last_contact"].get(family) for family, day in rows
+            )
+
+            # Sentiment labels by message, via the deterministic email_id
+            labels = dict((await connection.execute(text("""
+                SELECT email_id, sentiment_label FROM emails WHERE customer_id = :c AND direction = 'inbound'
+            """), {"c": CUSTOMER_ID})).all())
+            await connection.commit()
+            wrong = sum(
+                1 for message_id, tone in expected["tones"].items()
+                if labels.get(ingest.email_id_for(CUSTOMER_ID, message_id)) != tone
+            )
+            checks[f"sentiment labels follow the wording (quotes and signatures ignored), {wrong} wrong"] = wrong == 0
+            threads = await connection.scalar(text("SELECT count(*) FROM email_threads WHERE customer_id = :c"),
+                                              {"c": CUSTOMER_ID})
+            await connection.commit()
+            checks[f"{expected['threads']:,} inbox threads from References"] = threads == expected["threads"]
+
+            with LoopMonitor() as monitor:
+                again = await client.post("/api/inbox/import", params=params, content=file_chunks(path),
+                                          headers={"Content-Type": "application/mbox"})
+            again = schemas.EmailImportResult(**again.json())
+            report("re-import", again, monitor)
+            checks["re-import only reports duplicates"] = again.imported == 0 and again.duplicates == args.messages
+
+        if 0 in stalls and len(stalls) > 1:
+            pooled = min(stall for processes, stall in stalls.items() if processes)
+            checks[f"parser processes keep the loop responsive ({stalls[0] * 1000:.0f}ms -> {pooled * 1000:.0f}ms worst stall)"] = \
+                pooled < stalls[0]
+
+        async def tiny_mbox():
+            yield message(10 ** 7, args.parents)[0]
+            yield b"From x Mon Jan  1 00:00:00 2024\nSubject: huge\n\n" + b"x" * 5000 + b"\n"
+            yield message(10 ** 7 + 2, args.parents)[0]
+        async with AsyncSessionLocal() as db:
+            result = await ingest_emails(db, CUSTOMER_ID, iter_mbox_messages(tiny_mbox(), 4000),
+                                         mailbox=[MAILBOX], pool=ParsePool(0))
+        checks["oversized message reported, the rest imported"] = (
+            result.imported == 2 and result.failed == 1 and result.errors[0].message == 2
+        )
+
+        ingest.parse_pool.stop()
+        if not args.keep:
+            await cleanup(connection)
+    await async_engine.dispose()
+
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk email ingest benchmark")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--parents", type=int, default=2000)
+    parser.add_argument("--processes", default="0,1,2", help="parser process counts to compare; the last runs over HTTP")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenant in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,199 @@
+# backend/benchmarks/form_intake_bench.py
+"""
+Form intake queue benchmark: worker processes draining form_submissions.
+
+For each process count, seeds BENCH-FORM-* tenants with existing parents, then
+  backlog - queues --submissions rows up front and times the drain (throughput)
+  steady  - keeps inserting at --rate submissions/s for --seconds while the
+            workers run, sampling queue lag (age of the oldest pending row)
+The mix: 40% follow-ups matching an existing parent by email (mixed case), 20% by
+phone (different formatting), 30% new families, 5% repeats of a new family within
+the run and 5% with no contact details (must fail). Checks afterwards that no
+submission was processed twice and no duplicate parent was created.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/form_intake_bench.py --processes 1,4 --submissions 20000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+
+from api.core.database import async_engine
+from api.modules.forms.worker import start_processes, stop_processes
+
+PREFIX = "BENCH-FORM-"
+TENANTS = 10
+
+
+def make_submission(i, existing):
+    """(customer_id, submission_id, form_data) for submission i"""
+    kind = i % 20
+    # Repeats (kind 18) go to the tenant of the family they repeat
+    tenant = (i - 1 if kind == 18 else i) % TENANTS
+    customer = f"{PREFIX}{tenant:03d}"
+    # A parent on file in the same tenant (known parent g belongs to tenant g % TENANTS)
+    known = (i * 7919) % (existing // TENANTS) * TENANTS + tenant
+    if kind < 8:
+        data = {"name": f"Known Parent {known}", "email": f"Bench.Parent{known}@Example.com"}
+    elif kind < 12:
+        data = {"parent_name": f"Known Parent {known}", "phone": f"07700 {known:06d}"}
+    elif kind < 18:
+        data = {"name": f"New Parent {i}", "email": f"new.parent{i}@example.com", "child_name": f"Child {i}"}
+    elif kind < 19:
+        # Same family as the "new" submission just before it, from the other form
+        data = {"name": f"New Parent {i - 1}", "email": f"NEW.PARENT{i - 1}@example.com"}
+    else:
+        data = {"name": f"Anonymous {i}", "message": "Please call me"}
+    return customer, f"BENCH-FORM-S{i}", data
+
+
+async def setup(connection, existing):
+    await cleanup(connection)
+    for tenant in range(TENANTS):
+        await connection.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Form Intake Benchmark School')"
+        ), {"c": f"{PREFIX}{tenant:03d}"})
+    # Known parents live in the tenant their follow-up submissions are sent to
+    await connection.execute(text("""
+        INSERT INTO parents (customer_id, parent_id, name, email, phone, status, stage)
+        SELECT :prefix || lpad((g % :tenants)::text, 3, '0'), 'BENCH-FORM-P' || g, 'Known Parent ' || g,
+               'bench.parent' || g || '@example.com', '+44 7700 ' || lpad(g::text, 6, '0'), 'lead', 'awareness'
+        FROM generate_series(0, :n - 1) AS g
+    """), {"prefix": PREFIX, "tenants": TENANTS, "n": existing})
+    await connection.execute(text("ANALYZE parents"))
+
+
+async def cleanup(connection):
+    params = {"prefix": PREFIX + "%"}
+    for table in ("form_submissions", "journey_events", "children", "parents", "customers"):
+        await connection.execute(text(f"DELETE FROM {table} WHERE customer_id LIKE :prefix"), params)
+
+
+async def queue(connection, start, count, existing):
+    """Insert submissions start..start+count in one statement"""
+    rows = [make_submission(i, existing) for i in range(start, start + count)]
+    await connection.execute(text("""
+        INSERT INTO form_submissions (customer_id, submission_id, form_source, form_data, submitted_at)
+        SELECT c, s, 'website_enquiry', CAST(d AS JSONB), LOCALTIMESTAMP
+        FROM unnest(CAST(:c AS VARCHAR[]), CAST(:s AS VARCHAR[]), CAST(:d AS TEXT[])) AS r(c, s, d)
+    """), {
+        "c": [r[0] for r in rows],
+        "s": [r[1] for r in rows],
+        "d": [json.dumps(r[2]) for r in rows],
+    })
+
+
+async def backlog(connection):
+    return (await connection.execute(text("""
+        SELECT count(*), EXTRACT(EPOCH FROM LOCALTIMESTAMP - min(created_at))
+        FROM form_submissions WHERE processing_status = 'pending' AND customer_id LIKE :prefix
+    """), {"prefix": PREFIX + "%"})).one()
+
+
+async def wait_for_drain(connection, lags):
+    while True:
+        await connection.commit()
+        pending, lag = await backlog(connection)
+        if lag is not None:
+            lags.append(float(lag))
+        if not pending:
+            return
+        await asyncio.sleep(0.1)
+
+
+async def verify(connection, total):
+    params = {"prefix": PREFIX + "%"}
+    statuses = dict((await connection.execute(text(
+        "SELECT processing_status, count(*) FROM form_submissions WHERE customer_id LIKE :prefix GROUP BY 1"
+    ), params)).all())
+    duplicate_parents = await connection.scalar(text("""
+        SELECT count(*) FROM (
+            SELECT 1 FROM parents WHERE customer_id LIKE :prefix AND email IS NOT NULL
+            GROUP BY customer_id, lower(email) HAVING count(*) > 1
+        ) d
+    """), params)
+    # Each successful submission leaves exactly one enquiry_form journey event
+    events = await connection.scalar(text(
+        "SELECT count(*) FROM journey_events WHERE customer_id LIKE :prefix AND event_subtype = 'enquiry_form'"
+    ), params)
+    created = await connection.scalar(text(
+        "SELECT count(*) FROM parents WHERE customer_id LIKE :prefix AND source = 'website_enquiry'"
+    ), params)
+    expected_new = sum(1 for i in range(total) if 12 <= i % 20 < 18)
+    return {
+        "every submission settled": statuses.get("pending", 0) == 0 and sum(statuses.values()) == total,
+        "contactless submissions failed": statuses.get("failed", 0) == sum(1 for i in range(total) if i % 20 == 19),
+        "processed exactly once": events == statuses.get("processed", 0),
+        "no duplicate parents": duplicate_parents == 0,
+        "one parent per new family": created == expected_new,
+    }
+
+
+async def run(args, processes):
+    async with async_engine.connect() as connection:
+        await setup(connection, args.existing)
+        await connection.commit()
+
+        # Backlog drain
+        for start in range(0, args.submissions, 5000):
+            await queue(connection, start, min(5000, args.submissions - start), args.existing)
+        await connection.commit()
+        workers = start_processes(processes, args.concurrency, args.batch_size, report_seconds=0)
+        started = time.perf_counter()
+        await wait_for_drain(connection, [])
+        drain = time.perf_counter() - started
+
+        # Steady arrival at --rate per second, in 100ms ticks
+        lags = []
+        sent = args.submissions
+        per_tick = max(1, int(args.rate / 10))
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            tick = time.perf_counter()
+            await queue(connection, sent, per_tick, args.existing)
+            await connection.commit()
+            sent += per_tick
+            pending, lag = await backlog(connection)
+            lags.append(float(lag or 0))
+            await asyncio.sleep(max(0, 0.1 - (time.perf_counter() - tick)))
+        await wait_for_drain(connection, lags)
+        stop_processes(workers)
+
+        checks = await verify(connection, sent)
+        if not args.keep:
+            await cleanup(connection)
+            await connection.commit()
+
+    lags.sort()
+    print(f"{processes} process(es) x {args.concurrency} loops: backlog of {args.submissions:,} drained in "
+          f"{drain:.2f}s ({args.submissions / drain:,.0f} submissions/s); at {per_tick * 10:,}/s arrival "
+          f"queue lag p50 {statistics.median(lags):.2f}s, p95 {lags[int(len(lags) * 0.95)]:.2f}s, max {lags[-1]:.2f}s")
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    return all(checks.values())
+
+
+async def main(args):
+    ok = True
+    for processes in [int(p) for p in args.processes.split(",")]:
+        ok = await run(args, processes) and ok
+    await async_engine.dispose()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Form intake worker benchmark")
+    parser.add_argument("--processes", default="1,4", help="comma-separated worker process counts to compare")
+    parser.add_argument("--concurrency", type=int, default=2, help="claim loops per process")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--existing", type=int, default=50000, help="parents already on file")
+    parser.add_argument("--submissions", type=int, default=20000, help="backlog size")
+    parser.add_argument("--rate", type=int, default=500, help="steady arrival rate, submissions/s")
+    parser.add_argument("--seconds", type=float, default=10, help="steady arrival duration")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenants in place")
+    asyncio.run(main(parser.parse_args()))
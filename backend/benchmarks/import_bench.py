@@ -0,0 +1,114 @@
+# backend/benchmarks/import_bench.py
+"""
+Parent import benchmark: POST /api/parents one record at a time vs POST /api/parents/import.
+
+Both paths write the same generated families (two children each) into a
+throwaway tenant, which is deleted afterwards.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/import_bench.py --rows 50000 --single-rows 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app import app
+from api.core.database import AsyncSessionLocal
+
+CUSTOMER_ID = "BENCH-IMPORT"
+
+# Tenant rows deleted before the tenant's parents, children of a foreign key first.
+# Creating parents fans out (journey events, webhook outbox, tasks), and a database
+# used for anything else may hold emails, notes and the rest against them too.
+DEPENDENT_DELETES = (
+    "DELETE FROM event_registrations WHERE parent_id IN (SELECT id FROM parents WHERE customer_id = :c)",
+    "DELETE FROM chatbot_messages WHERE conversation_id IN "
+    "(SELECT id FROM chatbot_conversations WHERE customer_id = :c)",
+)
+TENANT_TABLES = (
+    "emails", "email_threads", "journey_events", "tasks", "notes", "analytics_events",
+    "ml_predictions", "documents", "form_submissions", "chatbot_conversations",
+    "personalized_content", "webhook_outbox", "children", "parents",
+)
+
+
+def make_record(i):
+    return {
+        "name": f"Import Parent {i}",
+        "email": f"import.parent{i}@example.com",
+        "phone": f"+44 7700 {i % 1000000:06d}",
+        "source": "website",
+        "tags": ["imported"],
+        "children": [
+            {"name": f"Child A{i}", "dob": "2016-09-01", "target_year_group": "Year 3"},
+            {"name": f"Child B{i}", "dob": "2018-09-01", "target_year_group": "Reception"},
+        ],
+    }
+
+
+async def ndjson_body(rows, chunk_rows=500):
+    """Stream the payload in chunks, as a client uploading a large file would"""
+    for start in range(0, rows, chunk_rows):
+        lines = (json.dumps(make_record(i)) for i in range(start, min(rows, start + chunk_rows)))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def reset_tenant():
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Import Benchmark School') "
+            "ON CONFLICT (customer_id) DO NOTHING"
+        ), {"c": CUSTOMER_ID})
+        for statement in DEPENDENT_DELETES:
+            await db.execute(text(statement), {"c": CUSTOMER_ID})
+        # task_reminders and parent_search_documents go with their rows (ON DELETE CASCADE)
+        for table in TENANT_TABLES:
+            await db.execute(text(f"DELETE FROM {table} WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+        await db.commit()
+
+
+async def main(args):
+    params = {"customer_id": CUSTOMER_ID}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await reset_tenant()
+
+        started = time.perf_counter()
+        for i in range(args.single_rows):
+            response = await client.post("/api/parents/", params=params, json=make_record(i))
+            response.raise_for_status()
+        single_elapsed = time.perf_counter() - started
+
+        await reset_tenant()
+
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/parents/import",
+            params={**params, "batch_size": args.batch_size},
+            content=ndjson_body(args.rows),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        response.raise_for_status()
+        bulk_elapsed = time.perf_counter() - started
+        report = response.json()
+
+        await reset_tenant()
+
+    single_rate = args.single_rows / single_elapsed
+    bulk_rate = report["imported"] / bulk_elapsed
+    print(f"{'path':<24} {'rows':>8} {'seconds':>9} {'rows/s':>10}")
+    print(f"{'POST /api/parents':<24} {args.single_rows:>8} {single_elapsed:>9.2f} {single_rate:>10.1f}")
+    print(f"{'POST /api/parents/import':<24} {report['imported']:>8} {bulk_elapsed:>9.2f} {bulk_rate:>10.1f}")
+    print(f"speed-up: {bulk_rate / single_rate:.1f}x, failed rows: {report['failed']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parent import benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single-rows", type=int, default=1_000)
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,293 @@
+# backend/benchmarks/inbox_bench.py
+"""
+Inbox thread listing benchmark and email_threads consistency check.
+
+Grows one tenant's mailbox through --sizes emails (about four per thread, every
+tenth email on a thread of its own), inserting --batch rows per statement the way
+a bulk ingest does, and at each size times the first and a 50-pages-deep page of
+/api/inbox/threads (all threads, unread, negative, awaiting reply) against the
+same listing computed with GROUP BY over emails.
+
+Then exercises every maintenance path - status and sentiment updates, emails
+moved between threads, deletes, back-dated arrivals and concurrent inserts into
+the same threads - and checks each summary against a recompute from scratch.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/inbox_bench.py --sizes 5000,50000,200000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app import app
+from api.core.database import async_engine
+
+CUSTOMER_ID = "BENCH-INBOX-000"
+FILTERS = {"all": {}, "unread": {"unread": True}, "negative": {"negative": True}, "awaiting": {"awaiting_reply": True}}
+
+# Email g of the tenant: threads of four, every tenth email threadless, one minute apart
+INSERT_SQL = """
+INSERT INTO emails (customer_id, parent_id, email_id, thread_id, direction, from_address, to_address,
+                    cc_addresses, subject, body_plain, sentiment_score, sentiment_label, status, date_received)
+SELECT CAST(:c AS VARCHAR),
+       CASE WHEN g % 3 = 0 THEN CAST(:parent AS INTEGER) END,
+       CAST(:c AS VARCHAR) || '-' || g,
+       CASE WHEN g % 10 <> 0 THEN CAST(:c AS VARCHAR) || '-T' || g / 4 END,
+       CASE WHEN g % 4 = 3 THEN 'outbound' ELSE 'inbound' END,
+       CASE WHEN g % 4 = 3 THEN 'admissions@school.example' ELSE 'Parent' || g / 4 || '@example.com' END,
+       CASE WHEN g % 4 = 3 THEN 'parent' || g / 4 || '@example.com' ELSE 'admissions@school.example' END,
+       CASE WHEN g % 8 = 1 THEN ARRAY['Partner' || g / 4 || '@example.com'] END,
+       'Question ' || g / 4,
+       'Message body of email ' || g || repeat(' with more words', g % 5),
+       CASE WHEN g % 4 <> 3 THEN ((g * 37) % 200 - 100) / 100.0 END,
+       CASE WHEN g % 4 <> 3 THEN 'neutral' END,
+       CASE WHEN g % 5 = 0 THEN 'unread' WHEN g % 7 = 0 THEN 'replied' ELSE 'read' END,
+       TIMESTAMP '2025-01-01' + g * INTERVAL '1 minute'
+FROM generate_series(:lo, :hi - 1) AS g
+"""
+
+# Thread summaries recomputed from emails from scratch, in comparable form
+EXPECTED_SQL = """
+WITH e AS (
+    SELECT *, email_thread_key(thread_id, id) AS k, coalesce(date_received, date_sent, created_at) AS at
+    FROM emails WHERE customer_id = :c
+),
+counts AS (
+    SELECT k, count(*) AS messages,
+           count(*) FILTER (WHERE direction = 'inbound' AND coalesce(status, 'unread') = 'unread') AS unread,
+           min(at) AS first_at, max(at) AS last_at
+    FROM e GROUP BY k
+),
+latest AS (SELECT DISTINCT ON (k) k, id, direction, status FROM e ORDER BY k, at DESC, id DESC),
+earliest AS (SELECT DISTINCT ON (k) k, subject FROM e ORDER BY k, at, id),
+sentiment AS (
+    SELECT DISTINCT ON (k) k, sentiment_score FROM e
+    WHERE direction = 'inbound' AND sentiment_score IS NOT NULL ORDER BY k, at DESC, id DESC
+),
+parent AS (SELECT DISTINCT ON (k) k, parent_id FROM e WHERE parent_id IS NOT NULL ORDER BY k, at DESC, id DESC),
+people AS (
+    SELECT k, array_agg(DISTINCT lower(btrim(a)) ORDER BY lower(btrim(a))) AS participants
+    FROM e, unnest(ARRAY[from_address, to_address] || coalesce(cc_addresses, '{}')) a
+    WHERE btrim(a) <> '' GROUP BY k
+)
+SELECT k, messages, unread, first_at, last_at, latest.id, latest.direction, latest.status, earliest.subject,
+       sentiment.sentiment_score, parent.parent_id, coalesce(people.participants, '{}')
+FROM counts
+JOIN latest USING (k)
+JOIN earliest USING (k)
+LEFT JOIN sentiment USING (k)
+LEFT JOIN parent USING (k)
+LEFT JOIN people USING (k)
+"""
+
+ACTUAL_SQL = """
+SELECT thread_id, message_count, unread_count, first_message_at, last_message_at, last_email_id,
+       last_direction, last_status, subject, latest_sentiment, parent_id,
+       ARRAY(SELECT p FROM unnest(participants) p ORDER BY 1)
+FROM email_threads WHERE customer_id = :c
+"""
+
+# What the inbox page costs without email_threads
+GROUP_BY_SQL = """
+SELECT email_thread_key(thread_id, id) AS k,
+       count(*) AS messages,
+       count(*) FILTER (WHERE direction = 'inbound' AND coalesce(status, 'unread') = 'unread') AS unread,
+       max(coalesce(date_received, date_sent, created_at)) AS last_at,
+       (array_agg(direction ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC))[1] AS last_direction,
+       (array_agg(status ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC))[1] AS last_status,
+       (array_agg(sentiment_score ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC)
+            FILTER (WHERE direction = 'inbound' AND sentiment_score IS NOT NULL))[1] AS sentiment
+FROM emails
+WHERE customer_id = :c
+GROUP BY 1
+HAVING {having}
+ORDER BY last_at DESC, k DESC
+LIMIT 20 OFFSET {offset}
+"""
+GROUP_BY_HAVING = {
+    "all": "TRUE",
+    "unread": "count(*) FILTER (WHERE direction = 'inbound' AND coalesce(status, 'unread') = 'unread') > 0",
+    "negative": "coalesce((array_agg(sentiment_score ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC)"
+                " FILTER (WHERE direction = 'inbound' AND sentiment_score IS NOT NULL))[1] < -0.3, FALSE)",
+    "awaiting": "(array_agg(direction ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC))[1] = 'inbound'"
+                " AND coalesce((array_agg(status ORDER BY coalesce(date_received, date_sent, created_at) DESC, id DESC))[1],"
+                " 'unread') <> 'replied'",
+}
+
+
+async def time_it(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def cleanup(connection):
+    params = {"c": CUSTOMER_ID}
+    await connection.execute(text("DELETE FROM emails WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM email_threads WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM parents WHERE customer_id = :c"), params)
+    await connection.execute(text("DELETE FROM customers WHERE customer_id = :c"), params)
+
+
+def comparable(row):
+    return tuple(tuple(value) if isinstance(value, list) else value for value in row)
+
+
+async def mismatches(connection):
+    params = {"c": CUSTOMER_ID}
+    expected = {comparable(row) for row in (await connection.execute(text(EXPECTED_SQL), params)).all()}
+    actual = {comparable(row) for row in (await connection.execute(text(ACTUAL_SQL), params)).all()}
+    return len(expected ^ actual), len(expected)
+
+
+async def insert_range(connection, parent_id, lo, hi, batch):
+    for start in range(lo, hi, batch):
+        await connection.execute(text(INSERT_SQL), {
+            "c": CUSTOMER_ID, "parent": parent_id, "lo": start, "hi": min(hi, start + batch)
+        })
+        await connection.commit()
+
+
+async def deep_cursor(client, params, pages):
+    cursor = None
+    for _ in range(pages):
+        response = (await client.get("/api/inbox/threads", params={**params, **({"cursor": cursor} if cursor else {})})).json()
+        cursor = response["next_cursor"]
+        if not cursor:
+            break
+    return cursor
+
+
+async def main(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    checks = {}
+    transport = httpx.ASGITransport(app=app)
+    async with async_engine.connect() as connection, \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await cleanup(connection)
+        await connection.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Inbox Benchmark School')"
+        ), {"c": CUSTOMER_ID})
+        parent_id = await connection.scalar(text(
+            "INSERT INTO parents (customer_id, parent_id, name, email) "
+            "VALUES (:c, 'BENCH-INBOX-P1', 'Inbox Parent', 'inbox.parent@example.com') RETURNING id"
+        ), {"c": CUSTOMER_ID})
+        await connection.commit()
+
+        print(f"{'emails':>8} {'threads':>8} {'insert/s':>9}  "
+              + "  ".join(f"{name + ' p1/p50':>17}" for name in FILTERS)
+              + f"  {'group by p1/p50':>17}  (ms, median of {args.repeat})")
+        inserted = 0
+        first_pages, deep_pages = [], []
+        for size in sizes:
+            started = time.perf_counter()
+            await insert_range(connection, parent_id, inserted, size, args.batch)
+            rate = (size - inserted) / (time.perf_counter() - started)
+            inserted = size
+            await connection.execute(text("ANALYZE emails"))
+            await connection.execute(text("ANALYZE email_threads"))
+            await connection.commit()
+            threads = await connection.scalar(text("SELECT count(*) FROM email_threads WHERE customer_id = :c"),
+                                              {"c": CUSTOMER_ID})
+
+            cells = []
+            for name, filters in FILTERS.items():
+                params = {"customer_id": CUSTOMER_ID, "limit": 20, **filters}
+                cursor = await deep_cursor(client, params, 49)
+                first = await time_it(lambda: client.get("/api/inbox/threads", params=params), args.repeat)
+                deep_params = {**params, "cursor": cursor} if cursor else params
+                deep = await time_it(lambda: client.get("/api/inbox/threads", params=deep_params), args.repeat)
+                first_pages.append(first)
+                deep_pages.append(deep)
+                cells.append(f"{first:>8.1f}/{deep:<8.1f}")
+
+            async def group_by(offset):
+                await connection.execute(text(GROUP_BY_SQL.format(having=GROUP_BY_HAVING["unread"], offset=offset)),
+                                         {"c": CUSTOMER_ID})
+            grouped_first = await time_it(lambda: group_by(0), max(1, args.repeat // 2))
+            grouped_deep = await time_it(lambda: group_by(980), max(1, args.repeat // 2))
+            await connection.commit()
+            print(f"{size:>8,} {threads:>8,} {rate:>9,.0f}  " + "  ".join(cells)
+                  + f"  {grouped_first:>8.1f}/{grouped_deep:<8.1f}")
+            largest = (grouped_first, grouped_deep)
+
+        plan = "\n".join(row[0] for row in (await connection.execute(text(
+            "EXPLAIN SELECT id FROM email_threads WHERE customer_id = :c AND has_unread "
+            "ORDER BY last_message_at DESC, id DESC LIMIT 21"
+        ), {"c": CUSTOMER_ID})).all())
+        await connection.commit()
+        checks["unread page read through idx_email_threads_unread"] = "idx_email_threads_unread" in plan
+        per_filter = len(FILTERS)
+        smallest, biggest = first_pages[:per_filter] + deep_pages[:per_filter], first_pages[-per_filter:] + deep_pages[-per_filter:]
+        checks[f"page latency flat from {sizes[0]:,} to {sizes[-1]:,} emails "
+               f"(worst {max(smallest):.1f}ms -> {max(biggest):.1f}ms)"] = max(biggest) < max(smallest) * 3 + 5
+        checks[f"summary pages faster than GROUP BY at {sizes[-1]:,} emails"] = max(biggest) < min(largest)
+
+        bad, total = await mismatches(connection)
+        checks[f"{total:,} summaries match a recompute after bulk inserts"] = bad == 0
+
+        params = {"c": CUSTOMER_ID}
+        for name, statement in (
+            ("status updates", "UPDATE emails SET status = 'read' WHERE customer_id = :c AND id % 11 = 0"),
+            ("sentiment updates", "UPDATE emails SET sentiment_score = -0.9 WHERE customer_id = :c AND id % 13 = 0"),
+            ("emails moved between threads",
+             "UPDATE emails SET thread_id = CAST(:c AS VARCHAR) || '-MOVED-' || id % 997 WHERE customer_id = :c AND id % 17 = 0"),
+            ("parent links", "UPDATE emails SET parent_id = NULL WHERE customer_id = :c AND id % 19 = 0"),
+            ("deletes", "DELETE FROM emails WHERE customer_id = :c AND id % 23 = 0"),
+        ):
+            started = time.perf_counter()
+            result = await connection.execute(text(statement), params)
+            await connection.commit()
+            elapsed = time.perf_counter() - started
+            bad, total = await mismatches(connection)
+            checks[f"{name}: {result.rowcount:,} rows in {elapsed:.2f}s, {total:,} summaries match"] = bad == 0
+
+        # Late arrivals: older than what their threads already hold
+        await connection.execute(text(INSERT_SQL.replace(
+            "TIMESTAMP '2025-01-01' + g * INTERVAL '1 minute'", "TIMESTAMP '2024-06-01' + g * INTERVAL '1 second'"
+        ).replace("CAST(:c AS VARCHAR) || '-' || g,", "CAST(:c AS VARCHAR) || '-LATE-' || g,")),
+            {"c": CUSTOMER_ID, "parent": parent_id, "lo": 1, "hi": 2000})
+        await connection.commit()
+        bad, total = await mismatches(connection)
+        checks["back-dated arrivals keep the newest message as last"] = bad == 0
+
+        # Concurrent single-row inserts into the same few threads
+        async def writer(worker):
+            # Three threads with one family each (so participants stay under the cap of 50)
+            statement = text(INSERT_SQL.replace("' || g / 4", "' || g % 3"))
+            async with async_engine.connect() as own:
+                for i in range(args.concurrent_rows):
+                    g = 10_000_000 + worker * 100_000 + i
+                    await own.execute(statement, {"c": CUSTOMER_ID, "parent": parent_id, "lo": g, "hi": g + 1})
+                    await own.commit()
+        await asyncio.gather(*(writer(worker) for worker in range(args.writers)))
+        bad, total = await mismatches(connection)
+        checks[f"{args.writers} concurrent writers into shared threads: summaries match"] = bad == 0
+
+        if not args.keep:
+            await cleanup(connection)
+            await connection.commit()
+    await async_engine.dispose()
+
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inbox thread listing benchmark")
+    parser.add_argument("--sizes", default="5000,50000,200000", help="mailbox sizes to measure at, in emails")
+    parser.add_argument("--batch", type=int, default=5000, help="emails per INSERT statement")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--concurrent-rows", type=int, default=50, help="single-row inserts per concurrent writer")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenant in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,118 @@
+# backend/benchmarks/ingest_bench.py
+"""
+Analytics event ingestion benchmark.
+
+  per-event - one INSERT (and commit) per event, the naive write path
+  ingestor  - EventIngestor fed by concurrent producers submitting request-sized
+              batches; sustained events/s from first submit to fully drained,
+              plus how long producers spent blocked on backpressure
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/ingest_bench.py --events 1000000 --producers 16
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from api.core.database import AsyncSessionLocal, async_engine
+from api.modules.analytics.ingest import EventIngestor, event_row
+
+CUSTOMER_ID = "BENCH-INGEST"
+
+
+async def reset_tenant():
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Ingest Benchmark School') "
+            "ON CONFLICT (customer_id) DO NOTHING"
+        ), {"c": CUSTOMER_ID})
+        await db.execute(text("DELETE FROM analytics_events WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+        await db.commit()
+
+
+def make_rows(count, offset=0):
+    received_at = datetime.utcnow()
+    return [
+        event_row(CUSTOMER_ID, SimpleNamespace(
+            parent_id=None, user_id=None, event_name="page_view", event_category="web",
+            event_data={"path": f"/admissions/{i % 50}", "referrer": "search", "seq": i},
+            session_id=f"session-{i // 20}", occurred_at=None,
+        ), received_at)
+        for i in range(offset, offset + count)
+    ]
+
+
+async def bench_per_event(count):
+    rows = make_rows(count)
+    statement = text("""
+        INSERT INTO analytics_events
+            (customer_id, parent_id, user_id, event_name, event_category, event_data, session_id, created_at)
+        VALUES (:c, :p, :u, :n, :cat, CAST(:d AS JSONB), :s, :t)
+    """)
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for row in rows:
+            await db.execute(statement, dict(zip(("c", "p", "u", "n", "cat", "d", "s", "t"), row)))
+            await db.commit()
+    elapsed = time.perf_counter() - started
+    print(f"per-event INSERT: {count:,} events in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+
+async def bench_ingestor(args):
+    ingestor = EventIngestor(capacity=args.capacity, flush_rows=args.flush_rows)
+    ingestor.start()
+    per_producer = args.events // args.producers
+    batches = [make_rows(args.batch, offset=i * args.batch) for i in range(max(1, 200_000 // args.batch))]
+    blocked = 0.0
+
+    async def produce(worker):
+        nonlocal blocked
+        sent = 0
+        while sent < per_producer:
+            rows = batches[(worker + sent // args.batch) % len(batches)][:per_producer - sent]
+            submitted = time.perf_counter()
+            await ingestor.submit(rows, timeout=60)
+            blocked += time.perf_counter() - submitted
+            sent += len(rows)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(produce(worker) for worker in range(args.producers)))
+    accepted_elapsed = time.perf_counter() - started
+    await ingestor.stop(timeout=600)
+    elapsed = time.perf_counter() - started
+
+    stats = ingestor.stats()
+    print(f"ingestor:         {stats['written']:,} events in {elapsed:.2f}s ({stats['written'] / elapsed:,.0f}/s sustained, "
+          f"{stats['flushes']} flushes, avg {stats['written'] / max(stats['flushes'], 1):,.0f} rows)")
+    print(f"                  producers done after {accepted_elapsed:.2f}s, "
+          f"{blocked / args.producers:.2f}s each blocked on backpressure, dropped {stats['dropped']}")
+
+
+async def main(args):
+    await reset_tenant()
+    await bench_per_event(args.per_event)
+    await reset_tenant()
+    await bench_ingestor(args)
+    async with async_engine.connect() as connection:
+        stored = await connection.scalar(
+            text("SELECT count(*) FROM analytics_events WHERE customer_id = :c"), {"c": CUSTOMER_ID}
+        )
+    print(f"rows stored:      {stored:,}")
+    if not args.keep:
+        await reset_tenant()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analytics event ingestion benchmark")
+    parser.add_argument("--events", type=int, default=1_000_000, help="events pushed through the ingestor")
+    parser.add_argument("--per-event", type=int, default=5_000, help="events written one INSERT at a time")
+    parser.add_argument("--producers", type=int, default=16, help="concurrent submitting tasks")
+    parser.add_argument("--batch", type=int, default=100, help="events per submit (request batch)")
+    parser.add_argument("--capacity", type=int, default=100_000)
+    parser.add_argument("--flush-rows", type=int, default=5_000)
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark events in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,297 @@
+# backend/benchmarks/metering_bench.py
+"""
+Usage metering benchmark on GET /api/parents/search.
+
+Seeds a BENCH-METER-000 tenant with a license and --parents parents, then sends
+--requests searches (--concurrency at a time) per round, alternating over --rounds
+rounds between:
+
+  off          - METERING_MODE=off, no license check or count (the baseline)
+  metered      - METERING_MODE=enforce: the cached license checked and the request
+                 counted in memory, merged into current_usage in the background
+
+and one round of the naive alternative:
+
+  per-request  - the license read and current_usage incremented with an UPDATE in
+                 every request (one row per tenant, so concurrent requests queue
+                 on its lock)
+
+Then checks:
+  - metering adds no query to the request
+  - the check and count cost microseconds, under 1% of a search request
+  - metered throughput is within the run-to-run noise of the baseline
+  - every metered request is in current_usage after a merge, and merges from
+    several processes at once add up
+  - limits are enforced: 429 at the API call limit, 403 for a module outside the
+    plan, 402 for a cancelled license
+
+RBAC is off for the run so only metering differs between the modes.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/metering_bench.py --parents 2000 --requests 500 --rounds 4
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import time
+
+import httpx
+from fastapi import Request
+from sqlalchemy import text
+
+from app import app
+from api.core.database import async_engine
+from api.modules.licensing import dependencies
+from api.modules.licensing.cache import license_cache
+from api.modules.licensing.meter import API_CALLS, UsageMeter, usage_meter
+from api.modules.rbac import dependencies as rbac_dependencies
+
+CUSTOMER_ID = "BENCH-METER-000"
+LICENSE_ID = "BENCH-METER-LIC"
+SEARCH = "/api/parents/search"
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# The naive alternative: a read and a read-modify-write of the license row per request
+NAIVE_READ = text("""
+    SELECT status, modules_included, usage_limits, current_usage FROM licenses
+    WHERE customer_id = :c ORDER BY id DESC LIMIT 1
+""")
+NAIVE_INCREMENT = text("""
+    UPDATE licenses SET current_usage = jsonb_set(
+        coalesce(current_usage, '{}'), '{api_calls_this_month}',
+        to_jsonb(coalesce((current_usage ->> 'api_calls_this_month')::bigint, 0) + 1))
+    WHERE customer_id = :c
+""")
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def setup(connection, parents):
+    await cleanup(connection)
+    await connection.execute(text(
+        "INSERT INTO customers (customer_id, name, status) VALUES (:c, 'Metering Bench School', 'active')"
+    ), {"c": CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO licenses (license_id, customer_id, status, plan_id, user_limit, modules_included,
+                              usage_limits, current_usage)
+        VALUES (:l, :c, 'active', 'bench', 10, '["crm", "inbox"]',
+                '{"api_calls_per_month": 1000000000, "emails_per_month": 1000000}', '{}')
+    """), {"l": LICENSE_ID, "c": CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO parents (customer_id, parent_id, name, email, status, stage)
+        SELECT :c, 'BENCH-METER-' || n, 'Meter Parent ' || n, 'meter' || n || '@example.com', 'lead', 'awareness'
+        FROM generate_series(1, :n) n
+    """), {"c": CUSTOMER_ID, "n": parents})
+    await connection.commit()
+
+async def cleanup(connection):
+    for statement in (
+        "DELETE FROM licenses WHERE customer_id = :c",
+        "DELETE FROM parents WHERE customer_id = :c",
+        "DELETE FROM customers WHERE customer_id = :c",
+    ):
+        await connection.execute(text(statement), {"c": CUSTOMER_ID})
+    await connection.commit()
+
+async def license_row(connection, column):
+    value = await connection.scalar(text(f"SELECT {column} FROM licenses WHERE license_id = :l"), {"l": LICENSE_ID})
+    await connection.commit()
+    return value
+
+async def set_license(connection, assignments):
+    await connection.execute(text(f"UPDATE licenses SET {assignments} WHERE license_id = :l"), {"l": LICENSE_ID})
+    await connection.commit()
+    await license_cache.refresh()
+
+def search_dependency(call_name):
+    """The callable of a router-level dependency of the search route, to override it"""
+    for route in app.routes:
+        if getattr(route, "path", None) == SEARCH:
+            for dependant in route.dependant.dependencies:
+                if dependant.call.__qualname__.startswith(call_name):
+                    return dependant.call
+    raise LookupError(call_name)
+
+async def naive_metering(request: Request):
+    async with async_engine.begin() as connection:
+        await connection.execute(NAIVE_READ, {"c": CUSTOMER_ID})
+        await connection.execute(NAIVE_INCREMENT, {"c": CUSTOMER_ID})
+
+async def run(client, requests, concurrency):
+    latencies, queries, statuses = [], [], []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            number = queue.pop()
+            started = time.perf_counter()
+            response = await client.get(SEARCH, params={
+                "customer_id": CUSTOMER_ID, "query": f"Parent {number % 100}", "per_page": 20
+            })
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(int(QUERIES.search(response.headers.get("server-timing", "")).group(1)))
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, percentile(latencies, 50), statistics.median(queries), statuses
+
+def report(label, rates, p50s, queries):
+    print(f"  {label:12s} {statistics.median(rates):7.0f} req/s (rounds {min(rates):.0f}-{max(rates):.0f})  "
+          f"p50 {statistics.median(p50s):6.2f}ms  queries/request {queries:g}")
+
+async def check_cost(calls):
+    """Microseconds per call of the licensed() dependency on a cached tenant"""
+    check = search_dependency("licensed")
+    scope = {
+        "type": "http", "method": "GET", "path": SEARCH, "headers": [],
+        "query_string": f"customer_id={CUSTOMER_ID}&query=x".encode(), "path_params": {},
+    }
+    request = Request(scope)
+    await check(request)
+    started = time.perf_counter()
+    for _ in range(calls):
+        await check(request)
+    return (time.perf_counter() - started) / calls * 1e6
+
+async def main(args):
+    checks = {}
+    rbac_dependencies.RBAC_MODE = "off"
+    transport = httpx.ASGITransport(app=app)
+
+    async with async_engine.connect() as connection, \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await setup(connection, args.parents)
+        try:
+            print(f"{args.requests:,} searches x {args.rounds} rounds over {args.parents} parents, "
+                  f"{args.concurrency} concurrent")
+            # Warm the pool, the license cache and the search plan
+            dependencies.METERING_MODE = "enforce"
+            await run(client, 50, args.concurrency)
+            await usage_meter.flush()
+            start_calls = int(await license_row(connection, f"current_usage ->> '{API_CALLS}'") or 0)
+
+            results = {"off": ([], [], []), "metered": ([], [], [])}
+            all_ok = True
+            for number in range(args.rounds):
+                order = ("off", "metered") if number % 2 == 0 else ("metered", "off")
+                for mode in order:
+                    dependencies.METERING_MODE = "off" if mode == "off" else "enforce"
+                    rate, p50, queries, statuses = await run(client, args.requests, args.concurrency)
+                    results[mode][0].append(rate)
+                    results[mode][1].append(p50)
+                    results[mode][2].append(queries)
+                    all_ok = all_ok and statuses.count(200) == args.requests
+            off_queries = statistics.median(results["off"][2])
+            metered_queries = statistics.median(results["metered"][2])
+            report("off", results["off"][0], results["off"][1], off_queries)
+            report("metered", results["metered"][0], results["metered"][1], metered_queries)
+
+            # The naive alternative, for comparison
+            dependencies.METERING_MODE = "off"
+            app.dependency_overrides[search_dependency("licensed")] = naive_metering
+            try:
+                rate, p50, naive_queries, statuses = await run(client, args.requests, args.concurrency)
+            finally:
+                app.dependency_overrides.clear()
+            report("per-request", [rate], [p50], naive_queries)
+            all_ok = all_ok and statuses.count(200) == args.requests
+
+            dependencies.METERING_MODE = "enforce"
+            cost_us = await check_cost(args.calls)
+            off_rate = statistics.median(results["off"][0])
+            metered_rate = statistics.median(results["metered"][0])
+            overhead = (off_rate - metered_rate) / off_rate * 100
+            noise = (max(results["off"][0]) - min(results["off"][0])) / off_rate * 100
+            request_us = statistics.median(results["off"][1]) * 1000
+            print(f"  license check and count: {cost_us:.2f}µs per request "
+                  f"({cost_us / request_us * 100:.3f}% of a {request_us / 1000:.2f}ms search)")
+            print(f"  throughput overhead {overhead:+.1f}% (baseline rounds vary by {noise:.1f}%)")
+
+            checks["every search answered 200"] = all_ok
+            checks[f"metering adds no query per request ({off_queries:g} -> {metered_queries:g}; "
+                   f"per-request {naive_queries:g})"] = metered_queries == off_queries < naive_queries
+            checks[f"check and count cost {cost_us:.2f}µs, under 1% of a search"] = cost_us < request_us / 100
+            checks[f"metered throughput within noise ({overhead:+.1f}%, noise {max(noise, 3):.1f}%)"] = (
+                overhead <= max(noise, 3)
+            )
+
+            # Every metered request lands in current_usage (the naive round wrote its own,
+            # and the cost measurement's calls were counted too)
+            await usage_meter.flush()
+            metered_requests = args.requests * args.rounds
+            merged_calls = int(await license_row(connection, f"current_usage ->> '{API_CALLS}'"))
+            expected = start_calls + metered_requests + args.requests + args.calls + 1
+            checks[f"current_usage has all {metered_requests:,} metered requests after a merge"] = (
+                merged_calls == expected and usage_meter.stats()["unmerged"] == 0
+            )
+
+            # Several processes merging the same tenant at once
+            meters = [UsageMeter() for _ in range(args.processes)]
+            counted = 0
+            started = time.perf_counter()
+            for _ in range(5):
+                for number, meter in enumerate(meters):
+                    meter.record(CUSTOMER_ID, API_CALLS, 1000 + number)
+                    meter.record(CUSTOMER_ID, "reports_this_month", 1)
+                    counted += 1000 + number
+                await asyncio.gather(*(meter.flush() for meter in meters))
+            merge_ms = (time.perf_counter() - started) * 1000 / 5
+            after_merges = int(await license_row(connection, f"current_usage ->> '{API_CALLS}'"))
+            reports = int(await license_row(connection, "current_usage ->> 'reports_this_month'"))
+            print(f"  {args.processes} concurrent merges: {merge_ms:.1f}ms per round")
+            checks[f"{args.processes} processes merging at once add up"] = (
+                after_merges == merged_calls + counted and reports == 5 * args.processes
+                and all(meter.failures == 0 for meter in meters)
+            )
+
+            # Enforcement against the cached license
+            await set_license(connection, f"usage_limits = jsonb_build_object('api_calls_per_month', {after_merges + 5})")
+            statuses = [(await client.get(SEARCH, params={"customer_id": CUSTOMER_ID})).status_code for _ in range(8)]
+            checks[f"API call limit enforced ({statuses})"] = statuses == [200] * 5 + [429] * 3
+
+            # A new billing period starts the monthly counts again, in reads and in merges
+            await usage_meter.flush()
+            await set_license(connection, "current_period_start = localtimestamp - interval '1 day', "
+                                          "current_period_end = localtimestamp + interval '29 days'")
+            statuses = [(await client.get(SEARCH, params={"customer_id": CUSTOMER_ID})).status_code for _ in range(3)]
+            await usage_meter.flush()
+            period_calls = int(await license_row(connection, f"current_usage ->> '{API_CALLS}'"))
+            period_reports = await license_row(connection, "current_usage ->> 'reports_this_month'")
+            checks[f"new billing period starts usage again ({statuses}, {period_calls} calls)"] = (
+                statuses == [200] * 3 and period_calls == 3 and period_reports is None
+            )
+
+            await set_license(connection, "usage_limits = '{}', modules_included = '[\"inbox\"]'")
+            status = (await client.get(SEARCH, params={"customer_id": CUSTOMER_ID})).status_code
+            checks[f"module outside the plan refused ({status})"] = status == 403
+
+            await set_license(connection, "modules_included = '[\"crm\"]', status = 'canceled'")
+            status = (await client.get(SEARCH, params={"customer_id": CUSTOMER_ID})).status_code
+            checks[f"cancelled license refused ({status})"] = status == 402
+        finally:
+            dependencies.METERING_MODE = "off"
+            await usage_meter.flush()
+            license_cache.invalidate(CUSTOMER_ID)
+            await cleanup(connection)
+
+    failed = False
+    for name, passed in checks.items():
+        print(f"[{'ok' if passed else 'FAIL'}] {name}")
+        failed = failed or not passed
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Usage metering on parent search")
+    parser.add_argument("--parents", type=int, default=2_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=100_000)
+    asyncio.run(main(parser.parse_args()))
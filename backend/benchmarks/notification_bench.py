@@ -0,0 +1,442 @@
+# backend/benchmarks/notification_bench.py
+"""
+Notification benchmark: the bell, the fan-out, the push channel and the sweeps.
+
+Seeds a BENCH-NOTIFY-000 tenant with --users staff users, a backlog of --backlog
+notifications (a quarter unread, --expired of them already expired) and --tasks
+tasks coming due, then measures:
+
+  bell         - --requests GET /api/notifications/unread-count (--concurrency at
+                 a time, rotating over the users) against the naive bell, a
+                 COUNT(*) of the user's unread rows per request
+  fan-out      - --fanouts notifications to every staff user, one INSERT ... SELECT
+                 each, against one INSERT per recipient
+  push         - --streams SSE streams on a real server: delivery latency of a
+                 fan-out from this process (pushed on commit) and of rows inserted
+                 from another connection (picked up by the hub's poll), and the
+                 replay of missed notifications on reconnect with Last-Event-ID
+  purge        - the expired rows deleted in --purge-batch batches
+  reminders    - --sweepers task sweeps at once
+
+Then checks:
+  - the bell costs no query per request once a user is cached (the naive one, one)
+    and answers faster
+  - a bulk fan-out is faster than a row per recipient
+  - every stream gets a local fan-out within 100ms and a cross-process insert
+    within two poll intervals; a reconnect replays exactly what it missed
+  - notification_counts and the hub's counts match COUNT(*) after the fan-outs,
+    reads, cross-process inserts and the purge
+  - the purge deletes every expired row and nothing else
+  - each due task is reminded exactly once however many sweeps run, and again
+    when its due date moves
+
+RBAC is off for the run.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/notification_bench.py --users 200 --backlog 100000 --requests 2000
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import time
+
+import httpx
+import orjson
+import uvicorn
+from fastapi import Depends, Query
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import app
+from api.core.database import AsyncSessionLocal, async_engine, get_async_db
+from api.modules.notifications import service
+from api.modules.notifications.hub import notification_hub
+from api.modules.rbac import dependencies as rbac_dependencies
+
+CUSTOMER_ID = "BENCH-NOTIFY-000"
+USER_PREFIX = "BENCH-NOTIFY-U"
+UNREAD_COUNT = "/api/notifications/unread-count"
+NAIVE_UNREAD_COUNT = "/bench/naive-unread-count"
+STREAM = "/api/notifications/stream"
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+NAIVE_COUNT = text("SELECT count(*) FROM notifications WHERE user_id = :u AND read = FALSE")
+NAIVE_INSERT = text("""
+    INSERT INTO notifications (customer_id, user_id, type, priority, title)
+    VALUES (:c, :u, 'system', 'normal', :title)
+""")
+# Written on another connection, outside the hub: what another worker process does
+REMOTE_INSERT = text("""
+    INSERT INTO notifications (customer_id, user_id, type, title)
+    SELECT :c, user_id, 'system', :title FROM users
+    WHERE user_id = ANY(CAST(:user_ids AS VARCHAR[]))
+""")
+COUNT_MISMATCHES = text("""
+    SELECT u.user_id, coalesce(c.unread, 0) AS kept,
+           (SELECT count(*) FROM notifications n WHERE n.user_id = u.user_id AND NOT coalesce(n.read, FALSE)) AS counted
+    FROM users u
+    LEFT JOIN notification_counts c ON c.user_id = u.user_id
+    WHERE u.customer_id = :c
+""")
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def user_id(number):
+    return f"{USER_PREFIX}{number:04d}"
+
+async def naive_unread_count(
+    user_id: str = Query(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return {"user_id": user_id, "unread": await db.scalar(NAIVE_COUNT, {"u": user_id})}
+
+async def setup(connection, args):
+    await cleanup(connection)
+    await connection.execute(text(
+        "INSERT INTO customers (customer_id, name, status) VALUES (:c, 'Notification Bench School', 'active')"
+    ), {"c": CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO users (user_id, customer_id, email, name, role, status)
+        SELECT :p || lpad(n::text, 4, '0'), :c, 'notify' || n || '@example.com', 'Notify User ' || n, 'staff', 'active'
+        FROM generate_series(1, :n) n
+    """), {"p": USER_PREFIX, "c": CUSTOMER_ID, "n": args.users})
+    await connection.execute(text("""
+        INSERT INTO notifications (customer_id, user_id, type, title, read, created_at, expires_at)
+        SELECT :c, :p || lpad((n % :users + 1)::text, 4, '0'), 'system', 'Backlog ' || n, n % 4 <> 0,
+               localtimestamp - interval '40 days',
+               CASE WHEN n <= :expired THEN localtimestamp - interval '1 day' END
+        FROM generate_series(1, :n) n
+    """), {"c": CUSTOMER_ID, "p": USER_PREFIX, "users": args.users, "n": args.backlog, "expired": args.expired})
+    await connection.commit()
+    await connection.execute(text("ANALYZE notifications"))
+    await connection.commit()
+
+async def seed_tasks(connection, tasks):
+    await connection.execute(text("""
+        INSERT INTO tasks (customer_id, assigned_to, title, priority, status, due_date)
+        SELECT :c, :p || lpad((n % 10 + 1)::text, 4, '0'), 'Bench task ' || n, 'normal', 'pending',
+               localtimestamp + interval '1 hour'
+        FROM generate_series(1, :n) n
+    """), {"c": CUSTOMER_ID, "p": USER_PREFIX, "n": tasks})
+    await connection.commit()
+
+async def cleanup(connection):
+    for statement in (
+        "DELETE FROM notifications WHERE customer_id = :c",
+        "DELETE FROM tasks WHERE customer_id = :c",
+        "DELETE FROM users WHERE customer_id = :c",
+        "DELETE FROM customers WHERE customer_id = :c",
+    ):
+        await connection.execute(text(statement), {"c": CUSTOMER_ID})
+    await connection.commit()
+
+async def scalar(connection, statement, **params):
+    value = await connection.scalar(text(statement), {"c": CUSTOMER_ID, **params})
+    await connection.commit()
+    return value
+
+async def count_mismatches(connection, users):
+    """Users whose notification_counts row or hub count differs from COUNT(*)"""
+    rows = (await connection.execute(COUNT_MISMATCHES, {"c": CUSTOMER_ID})).all()
+    await connection.commit()
+    await notification_hub.poll()
+    wrong = []
+    for row in rows:
+        held = await notification_hub.unread(row.user_id) if row.user_id in users else row.counted
+        if row.kept != row.counted or held != row.counted:
+            wrong.append((row.user_id, row.kept, held, row.counted))
+    return wrong
+
+async def bell(client, path, requests, concurrency, users):
+    latencies, queries, statuses = [], [], []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            number = queue.pop()
+            user = user_id(number % users + 1)
+            started = time.perf_counter()
+            response = await client.get(path, params={"customer_id": CUSTOMER_ID, "user_id": user})
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(int(QUERIES.search(response.headers.get("server-timing", "")).group(1)))
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, percentile(latencies, 50), statistics.mean(queries), statuses
+
+class Stream:
+    """One SSE client: events read in the background with their arrival time"""
+
+    def __init__(self, client, user, last_event_id=None):
+        self.client = client
+        self.user = user
+        self.headers = {"X-User-ID": user}
+        if last_event_id is not None:
+            self.headers["Last-Event-ID"] = str(last_event_id)
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.last_id = last_event_id
+
+    async def open(self):
+        self._context = self.client.stream("GET", STREAM, params={"customer_id": CUSTOMER_ID}, headers=self.headers)
+        self.response = await self._context.__aenter__()
+        self._reader = asyncio.create_task(self._read())
+        return self
+
+    async def _read(self):
+        fields = {}
+        async for line in self.response.aiter_lines():
+            if line.startswith(":"):
+                continue
+            if line:
+                name, _, value = line.partition(":")
+                fields[name] = value[1:] if value.startswith(" ") else value
+                continue
+            if "event" in fields:
+                if "id" in fields:
+                    self.last_id = int(fields["id"])
+                await self.events.put((time.perf_counter(), fields["event"], orjson.loads(fields["data"])))
+            fields = {}
+
+    async def next(self, event, timeout=5.0):
+        """Arrival time and data of the next event of this kind"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            arrived, kind, data = await asyncio.wait_for(self.events.get(), max(deadline - time.perf_counter(), 0))
+            if kind == event:
+                return arrived, data
+
+    async def latest(self, event, timeout=5.0):
+        """The last event of this kind received, waiting for one if none is queued"""
+        arrived, data = await self.next(event, timeout)
+        while not self.events.empty():
+            queued_at, kind, queued = self.events.get_nowait()
+            if kind == event:
+                arrived, data = queued_at, queued
+        return arrived, data
+
+    async def close(self):
+        self._reader.cancel()
+        await asyncio.gather(self._reader, return_exceptions=True)
+        await self._context.__aexit__(None, None, None)
+
+async def push_latencies(streams, started, title):
+    """ms from started until each stream had the notification titled title"""
+    async def one(stream):
+        while True:
+            arrived, data = await stream.next("notification")
+            if data["title"] == title:
+                return (arrived - started) * 1000
+    return await asyncio.gather(*(one(stream) for stream in streams))
+
+async def push(args, connection, checks, cached_users):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    notification_hub.poll_seconds = args.poll_seconds
+    notification_hub.start()
+    limits = httpx.Limits(max_connections=args.streams + 10)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=None, limits=limits) as client:
+            users = [user_id(number + 1) for number in range(args.streams)]
+            cached_users.update(users)
+            streams = [await Stream(client, user).open() for user in users]
+            await asyncio.gather(*(stream.next("unread") for stream in streams))
+
+            # Written and committed by this process: pushed from the commit hook
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                await service.send(db, CUSTOMER_ID, "Local push", roles=["staff"])
+                await db.commit()
+            local = await push_latencies(streams, started, "Local push")
+
+            # Written from another connection: reaches the streams through the poll
+            started = time.perf_counter()
+            await connection.execute(REMOTE_INSERT, {"c": CUSTOMER_ID, "title": "Remote push", "user_ids": users})
+            await connection.commit()
+            remote = await push_latencies(streams, started, "Remote push")
+            _, unread = await streams[0].latest("unread")
+            expected_unread = await scalar(
+                connection, "SELECT unread FROM notification_counts WHERE user_id = :u", u=users[0]
+            )
+            print(f"  push to {args.streams} streams: local p50 {percentile(local, 50):.1f}ms "
+                  f"max {max(local):.1f}ms; cross-process (poll every {args.poll_seconds:g}s) "
+                  f"p50 {percentile(remote, 50):.0f}ms max {max(remote):.0f}ms")
+            checks[f"local fan-out on every stream within 100ms (max {max(local):.1f}ms)"] = max(local) < 100
+            checks[f"cross-process insert on every stream within two polls (max {max(remote):.0f}ms)"] = (
+                max(remote) < args.poll_seconds * 2000
+            )
+            checks[f"streams get the new unread count ({unread['unread']} = {expected_unread})"] = (
+                unread["unread"] == expected_unread
+            )
+
+            # Reconnect after missing some: replayed from Last-Event-ID
+            last_seen = streams[0].last_id
+            await streams[0].close()
+            for number in range(3):
+                await connection.execute(REMOTE_INSERT, {
+                    "c": CUSTOMER_ID, "title": f"Missed {number}", "user_ids": [users[0]]
+                })
+            await connection.commit()
+            streams[0] = await Stream(client, users[0], last_seen).open()
+            replayed = [(await streams[0].next("notification"))[1]["title"] for _ in range(3)]
+            checks[f"reconnect replays what it missed ({replayed})"] = replayed == ["Missed 0", "Missed 1", "Missed 2"]
+
+            for stream in streams:
+                await stream.close()
+            await asyncio.sleep(0.2)
+            checks["closed streams unsubscribed"] = notification_hub.stats()["streams"] == 0
+    finally:
+        await notification_hub.stop()
+        server.should_exit = True
+        await serving
+
+async def main(args):
+    checks = {}
+    rbac_dependencies.RBAC_MODE = "off"
+    app.add_api_route(NAIVE_UNREAD_COUNT, naive_unread_count, methods=["GET"])
+    transport = httpx.ASGITransport(app=app)
+    cached_users = set()
+
+    async with async_engine.connect() as connection, \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await setup(connection, args)
+        try:
+            print(f"{args.users} users, {args.backlog:,} notifications ({args.expired:,} expired), "
+                  f"{args.requests:,} bell requests, {args.concurrency} concurrent")
+
+            # The bell: cached counts against COUNT(*) per request (each warmed first)
+            bell_users = min(args.users, args.requests)
+            cached_users.update(user_id(number + 1) for number in range(bell_users))
+            await bell(client, UNREAD_COUNT, bell_users, args.concurrency, bell_users)
+            await bell(client, NAIVE_UNREAD_COUNT, bell_users, args.concurrency, bell_users)
+            rates = {"cached": [], "naive": []}
+            all_ok = True
+            for number in range(2):
+                order = ("cached", "naive") if number % 2 == 0 else ("naive", "cached")
+                for mode in order:
+                    path = UNREAD_COUNT if mode == "cached" else NAIVE_UNREAD_COUNT
+                    rate, p50, queries, statuses = await bell(client, path, args.requests, args.concurrency, bell_users)
+                    rates[mode].append((rate, p50, queries))
+                    all_ok = all_ok and statuses.count(200) == args.requests
+            for mode, results in rates.items():
+                print(f"  bell {mode:7s} {statistics.median(r[0] for r in results):7.0f} req/s  "
+                      f"p50 {statistics.median(r[1] for r in results):6.2f}ms  "
+                      f"queries/request {statistics.median(r[2] for r in results):g}")
+            checks["every bell request answered 200"] = all_ok
+            cached_rate = statistics.median(r[0] for r in rates["cached"])
+            naive_rate = statistics.median(r[0] for r in rates["naive"])
+            cached_queries = max(r[2] for r in rates["cached"])
+            naive_queries = min(r[2] for r in rates["naive"])
+            checks[f"cached bell makes no query ({cached_queries:g} vs naive {naive_queries:g} per request)"] = (
+                cached_queries == 0 and naive_queries >= 1
+            )
+            checks[f"cached bell faster than COUNT(*) ({cached_rate:.0f} vs {naive_rate:.0f} req/s)"] = (
+                cached_rate > naive_rate
+            )
+
+            # Fan-out: one statement per notification against a row per recipient
+            started = time.perf_counter()
+            for number in range(args.fanouts):
+                async with AsyncSessionLocal() as db:
+                    await service.send(db, CUSTOMER_ID, f"Fan-out {number}", roles=["staff"])
+                    await db.commit()
+            bulk_ms = (time.perf_counter() - started) * 1000 / args.fanouts
+            recipients = [user_id(number + 1) for number in range(args.users)]
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                for recipient in recipients:
+                    await db.execute(NAIVE_INSERT, {"c": CUSTOMER_ID, "u": recipient, "title": "Row by row"})
+                await db.commit()
+            naive_ms = (time.perf_counter() - started) * 1000
+            print(f"  fan-out to {args.users} users: bulk {bulk_ms:.1f}ms "
+                  f"({args.users / bulk_ms * 1000:,.0f} notifications/s), row by row {naive_ms:.1f}ms")
+            checks[f"bulk fan-out faster than a row per recipient ({bulk_ms:.1f} vs {naive_ms:.1f}ms)"] = (
+                bulk_ms < naive_ms
+            )
+
+            # Reads, all and some
+            async with AsyncSessionLocal() as db:
+                for number in range(0, bell_users, 2):
+                    await service.mark_read(db, CUSTOMER_ID, user_id(number + 1))
+                for number in range(1, bell_users, 2):
+                    ids = list((await db.execute(text(
+                        "SELECT id FROM notifications WHERE user_id = :u AND NOT read ORDER BY id LIMIT 3"
+                    ), {"u": user_id(number + 1)})).scalars())
+                    await service.mark_read(db, CUSTOMER_ID, user_id(number + 1), ids)
+                await db.commit()
+
+            await push(args, connection, checks, cached_users)
+
+            wrong = await count_mismatches(connection, cached_users)
+            checks[f"counts match COUNT(*) after fan-outs, reads and pushes ({len(wrong)} wrong)"] = not wrong
+
+            # Purge of the expired backlog
+            before = await scalar(connection, "SELECT count(*) FROM notifications WHERE customer_id = :c")
+            expired = await scalar(connection, "SELECT count(*) FROM notifications WHERE expires_at < localtimestamp")
+            started = time.perf_counter()
+            deleted = await service.purge_expired(batch=args.purge_batch)
+            purge_seconds = time.perf_counter() - started
+            after = await scalar(connection, "SELECT count(*) FROM notifications WHERE customer_id = :c")
+            print(f"  purge: {deleted:,} expired rows in {purge_seconds:.2f}s "
+                  f"({deleted / purge_seconds:,.0f} rows/s, batches of {args.purge_batch:,})")
+            checks[f"purge deleted the {expired:,} expired rows and nothing else"] = (
+                deleted == expired and before - after == args.expired
+            )
+            wrong = await count_mismatches(connection, cached_users)
+            checks[f"counts match COUNT(*) after the purge ({len(wrong)} wrong)"] = not wrong
+
+            # Task reminders: sweeps at once, then again, then after due dates move
+            await service.remind_due_tasks()
+            await seed_tasks(connection, args.tasks)
+            started = time.perf_counter()
+            sent = sum(await asyncio.gather(*(service.remind_due_tasks(batch=100) for _ in range(args.sweepers))))
+            sweep_ms = (time.perf_counter() - started) * 1000
+            reminded = await scalar(
+                connection, "SELECT count(*) FROM notifications WHERE customer_id = :c AND type = 'task_due'"
+            )
+            print(f"  reminders: {args.tasks} tasks, {args.sweepers} sweeps at once in {sweep_ms:.0f}ms")
+            checks[f"{args.sweepers} sweeps at once remind each task once ({sent} sent, {reminded} rows)"] = (
+                sent == reminded == args.tasks
+            )
+            again = await service.remind_due_tasks()
+            await connection.execute(text("""
+                UPDATE tasks SET due_date = due_date + interval '2 hours'
+                WHERE id IN (SELECT id FROM tasks WHERE customer_id = :c ORDER BY id LIMIT 10)
+            """), {"c": CUSTOMER_ID})
+            await connection.commit()
+            moved = await service.remind_due_tasks()
+            checks[f"no repeat reminder ({again}), one more per moved due date ({moved})"] = again == 0 and moved == 10
+            wrong = await count_mismatches(connection, cached_users)
+            checks[f"counts match COUNT(*) after the reminders ({len(wrong)} wrong)"] = not wrong
+        finally:
+            await cleanup(connection)
+
+    failed = False
+    for name, passed in checks.items():
+        print(f"[{'ok' if passed else 'FAIL'}] {name}")
+        failed = failed or not passed
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification fan-out, unread counts, push and purge")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--backlog", type=int, default=100_000)
+    parser.add_argument("--expired", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fanouts", type=int, default=20)
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--poll-seconds", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--purge-batch", type=int, default=5_000)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--sweepers", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
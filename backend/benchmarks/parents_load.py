@@ -0,0 +1,135 @@
+# backend/benchmarks/parents_load.py
+"""
+Load benchmark for the parents API: blocking (sync Session) vs async (AsyncSession).
+
+Drives the real FastAPI app in-process with concurrent clients and reports
+requests per second and tail latency for /api/parents/search and
+/api/parents/{id}. "sync" mode overrides get_async_db with the legacy
+SessionLocal, so every query blocks the event loop exactly as before.
+
+Usage (from backend/, against a loaded database):
+    PYTHONPATH=. python benchmarks/parents_load.py --customer-id SCHOOL-001 --parent-id 1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import app
+from api.core.database import DATABASE_URL, get_async_db
+
+# Bound in main(): one connection per client, like the legacy 20+40 pool at this
+# concurrency. The app's sync engine is sized for scripts only and would leave
+# blocked requests waiting on checkout instead of on their queries.
+BlockingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+class BlockingSession:
+    """Awaitable facade over a sync Session - reproduces the old blocking behaviour"""
+
+    def __init__(self, db):
+        self._db = db
+
+    async def execute(self, *args, **kwargs):
+        return self._db.execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return self._db.scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return self._db.scalars(*args, **kwargs)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        # estimate_row_count wraps its EXPLAIN in a savepoint; without this the
+        # sync run would fall back to an exact count and measure another query
+        with self._db.begin_nested() as savepoint:
+            yield savepoint
+
+
+def get_blocking_db():
+    db = BlockingSessionLocal()
+    try:
+        yield BlockingSession(db)
+    finally:
+        db.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(client, path, params, concurrency, requests):
+    """Fire `requests` GETs with `concurrency` workers and collect latencies"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "errors": errors,
+    }
+
+
+async def main(args):
+    blocking_engine = create_engine(DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    BlockingSessionLocal.configure(bind=blocking_engine)
+    endpoints = [
+        ("/api/parents/search", {"customer_id": args.customer_id, "query": args.query, "per_page": 20}),
+        (f"/api/parents/{args.parent_id}", {"customer_id": args.customer_id}),
+    ]
+
+    print(f"{'mode':<6} {'endpoint':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode in ("sync", "async"):
+        if mode == "sync":
+            app.dependency_overrides[get_async_db] = get_blocking_db
+        else:
+            app.dependency_overrides.pop(get_async_db, None)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path, params in endpoints:
+                # Warm up pools and caches before measuring
+                await run_load(client, path, params, args.concurrency, args.concurrency)
+                result = await run_load(client, path, params, args.concurrency, args.requests)
+                label = path if len(path) <= 28 else path[:25] + "..."
+                print(
+                    f"{mode:<6} {label:<28} {result['rps']:>9.1f} {result['p50']:>9.2f} "
+                    f"{result['p95']:>9.2f} {result['p99']:>9.2f} {result['errors']:>7}"
+                )
+
+    app.dependency_overrides.clear()
+    blocking_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parents API load benchmark")
+    parser.add_argument("--customer-id", default="SCHOOL-001")
+    parser.add_argument("--parent-id", type=int, default=1)
+    parser.add_argument("--query", default="a")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
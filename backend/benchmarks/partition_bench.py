@@ -0,0 +1,181 @@
+# backend/benchmarks/partition_bench.py
+"""
+Monthly partitioning benchmark for the append-only event tables.
+
+Loads the same synthetic analytics_events-shaped rows (two years, appended in
+time order) into
+  before - one heap with btree indexes on customer_id and created_at (the old layout)
+  after  - monthly range partitions via ensure_monthly_partitions, BRIN on created_at
+           and (customer_id, created_at) btree (the new layout)
+then times date-range queries on both, and retention as DELETE vs dropping partitions.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/partition_bench.py --rows 4000000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from api.core.database import async_engine
+
+HEAP, PARTITIONED = "bench_events_heap", "bench_events_part"
+
+COLUMNS = """
+    id SERIAL,
+    customer_id VARCHAR(50),
+    parent_id INTEGER,
+    event_name VARCHAR(100),
+    event_data JSONB DEFAULT '{}',
+    session_id VARCHAR(100),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+"""
+
+# Range queries, run against both layouts. Bounds are bound parameters computed by the
+# caller, as the API does: the planner prunes on them at plan time, whereas
+# LOCALTIMESTAMP arithmetic only prunes at executor start, after costing every partition
+QUERIES = {
+    "tenant week": """
+        SELECT count(*), count(DISTINCT session_id) FROM {table}
+        WHERE customer_id = 'SCHOOL-007' AND created_at >= :week_start AND created_at < :week_end
+    """,
+    "month by event": """
+        SELECT event_name, count(*) FROM {table}
+        WHERE created_at >= :month_start AND created_at < :month_end
+        GROUP BY event_name
+    """,
+    "last 90 days": """
+        SELECT count(*) FROM {table}
+        WHERE created_at >= :quarter_start
+    """,
+    "tenant day, latest": """
+        SELECT id, event_name, created_at FROM {table}
+        WHERE customer_id = 'SCHOOL-003' AND created_at >= :day_start AND created_at < :day_end
+        ORDER BY created_at DESC LIMIT 50
+    """,
+}
+
+
+def query_bounds():
+    now = datetime.now()
+    this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_start = (this_month - timedelta(days=70)).replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=20)
+    return {
+        "week_start": month_start, "week_end": month_start + timedelta(days=7),
+        "month_start": month_start, "month_end": month_end,
+        "quarter_start": now - timedelta(days=90),
+        "day_start": day_start, "day_end": day_start + timedelta(days=1),
+    }
+
+
+async def execute(connection, sql, params=None):
+    return await connection.execute(text(sql), params or {})
+
+
+async def build(connection, rows, months):
+    for table in (HEAP, PARTITIONED):
+        await execute(connection, f"DROP TABLE IF EXISTS {table} CASCADE")
+
+    await execute(connection, f"CREATE TABLE {HEAP} ({COLUMNS}, PRIMARY KEY (id))")
+    await execute(connection, f"CREATE INDEX ON {HEAP} (customer_id)")
+    await execute(connection, f"CREATE INDEX ON {HEAP} (created_at)")
+
+    await execute(connection, f"CREATE TABLE {PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, created_at)) "
+                              "PARTITION BY RANGE (created_at)")
+    await execute(connection, f"CREATE TABLE {PARTITIONED}_default PARTITION OF {PARTITIONED} DEFAULT")
+    await execute(connection, "SELECT ensure_monthly_partitions(:t, :back, 1)", {"t": PARTITIONED, "back": months})
+    await execute(connection, f"CREATE INDEX ON {PARTITIONED} (customer_id, created_at)")
+    await execute(connection, f"CREATE INDEX ON {PARTITIONED} USING BRIN (created_at)")
+
+    # Rows appended in time order over the window, 20 tenants, a handful of event names
+    started = time.perf_counter()
+    await execute(connection, f"""
+        INSERT INTO {HEAP} (customer_id, parent_id, event_name, event_data, session_id, created_at)
+        SELECT 'SCHOOL-' || lpad((g % 20)::text, 3, '0'), g % 50000,
+               (ARRAY['page_view','click','form_start','form_submit','chat_open'])[1 + g % 5],
+               jsonb_build_object('path', '/p/' || (g % 300)),
+               's' || (g / 15),
+               date_trunc('month', LOCALTIMESTAMP) - make_interval(months => :months)
+                   + (g::float / :rows) * (LOCALTIMESTAMP - (date_trunc('month', LOCALTIMESTAMP)
+                   - make_interval(months => :months)))
+        FROM generate_series(1, :rows) AS g
+    """, {"rows": rows, "months": months})
+    await execute(connection, f"INSERT INTO {PARTITIONED} SELECT * FROM {HEAP}")
+    # Vacuum too, so neither side pays for setting hint bits during the timed runs
+    await execute(connection, f"VACUUM ANALYZE {HEAP}")
+    await execute(connection, f"VACUUM ANALYZE {PARTITIONED}")
+    print(f"loaded {rows:,} rows over {months} months into both layouts in {time.perf_counter() - started:.1f}s")
+
+
+async def time_query(connection, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        (await execute(connection, sql, params)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def relations(plan):
+    found = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= relations(child)
+    return found
+
+
+async def scanned_partitions(connection, sql, params):
+    plan = (await execute(connection, "EXPLAIN (FORMAT JSON) " + sql, params)).scalar()
+    return len(relations(plan[0]["Plan"]))
+
+
+async def main(args):
+    async with async_engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await build(connection, args.rows, args.months)
+
+        params = query_bounds()
+        print(f"{'query':<20} {'before (heap)':>14} {'after (partitioned)':>20} {'partitions scanned':>20}")
+        for name, sql in QUERIES.items():
+            before = await time_query(connection, sql.format(table=HEAP), params, args.repeat)
+            after = await time_query(connection, sql.format(table=PARTITIONED), params, args.repeat)
+            scanned = await scanned_partitions(connection, sql.format(table=PARTITIONED), params)
+            print(f"{name:<20} {before:>12.1f}ms {after:>18.1f}ms {scanned:>20}")
+
+        # Retention: the oldest three months
+        cutoff = "date_trunc('month', LOCALTIMESTAMP) - make_interval(months => :keep)"
+        keep = args.months - 3
+        started = time.perf_counter()
+        deleted = (await execute(connection, f"DELETE FROM {HEAP} WHERE created_at < {cutoff}", {"keep": keep})).rowcount
+        delete_elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        dropped = (await execute(connection, "SELECT drop_monthly_partitions(:t, :keep)",
+                                 {"t": PARTITIONED, "keep": keep})).scalars().all()
+        drop_elapsed = time.perf_counter() - started
+        print(f"retention (3 months): DELETE {deleted:,} rows in {delete_elapsed * 1000:.0f}ms "
+              f"vs DROP {len(dropped)} partitions in {drop_elapsed * 1000:.0f}ms")
+        sizes = {
+            HEAP: await connection.scalar(text("SELECT pg_size_pretty(pg_total_relation_size(:t))"), {"t": HEAP}),
+            PARTITIONED: await connection.scalar(text(
+                "SELECT pg_size_pretty(sum(pg_total_relation_size(relid))) FROM pg_partition_tree(:t)"
+            ), {"t": PARTITIONED}),
+        }
+        print(f"size after retention: heap {sizes[HEAP]} (freed space only reusable after vacuum), "
+              f"partitioned {sizes[PARTITIONED]} (returned to the OS)")
+
+        if not args.keep:
+            for table in (HEAP, PARTITIONED):
+                await execute(connection, f"DROP TABLE IF EXISTS {table} CASCADE")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partitioned vs single-heap event table benchmark")
+    parser.add_argument("--rows", type=int, default=4_000_000)
+    parser.add_argument("--months", type=int, default=24, help="months of history")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (median reported)")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tables in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,304 @@
+# backend/benchmarks/rbac_bench.py
+"""
+RBAC benchmark: compiled per-tenant policy against the naive per-request query.
+
+Seeds a BENCH-RBAC-000 tenant with --users users over four roles and a permission
+set with wildcards and conditional rows (which grant nothing until conditions are
+checked against loaded resources), then decides --decisions random (user,
+resource, action) requests two ways:
+
+  naive    - per request: read the user, read the role's permission rows for the
+             resource, decide
+  compiled - the permission cache: one compile per tenant, then dict lookups
+
+and serves a minimal endpoint behind each as a FastAPI dependency (--requests
+requests, --concurrency at a time) to show the per-request cost.
+
+Then checks:
+  - both give the same decision for every request
+  - a compiled decision takes microseconds
+  - a permission row or user role changed in SQL (not through the API) is picked up
+    by the version poll, and only for the tenant that changed
+  - a user of another tenant is denied
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/rbac_bench.py --users 200 --decisions 20000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Request
+from sqlalchemy import text
+
+from api.core.database import async_engine
+from api.modules.rbac import dependencies
+from api.modules.rbac.cache import permission_cache
+from api.modules.rbac.dependencies import authorize
+from api.modules.rbac.policy import ANY, ACTIONS_BY_METHOD
+
+CUSTOMER_ID = "BENCH-RBAC-000"
+OTHER_CUSTOMER_ID = "BENCH-RBAC-001"
+
+ROLES = ["admin", "staff", "viewer", "registrar"]
+RESOURCES = ["parents", "emails", "scoring", "webhooks", "knowledge_base", "analytics"]
+ACTIONS = ["read", "create", "update", "delete"]
+
+# (role, resource, actions, conditions)
+PERMISSIONS = [
+    ("admin", ANY, [ANY], {}),
+    ("staff", "parents", ["read", "create", "update"], {}),
+    ("staff", "emails", ["read", "create", "update"], {}),
+    ("staff", "analytics", ["read"], {"days": {"lte": 90}}),
+    ("viewer", ANY, ["read"], {"status": {"ne": "archived"}}),
+    ("viewer", "webhooks", ["read"], {}),
+    ("registrar", "parents", [ANY], {"stage": {"in": ["offer", "enrolled"]}}),
+    ("registrar", "emails", ["read"], {"assigned_to": "$user_id"}),
+]
+
+NAIVE_USER = text("SELECT role, status FROM users WHERE user_id = :user_id AND customer_id = :customer_id")
+NAIVE_PERMISSIONS = text("""
+    SELECT id, actions, conditions FROM role_permissions
+    WHERE customer_id = :customer_id AND role = :role AND resource IN (:resource, '*')
+""")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def user_id(number):
+    return f"BENCH-RBAC-U{number:04d}"
+
+
+async def setup(connection, users):
+    await cleanup(connection)
+    await connection.execute(text("""
+        INSERT INTO customers (customer_id, name, status)
+        VALUES (:a, 'RBAC Bench School', 'active'), (:b, 'RBAC Bench Other School', 'active')
+    """), {"a": CUSTOMER_ID, "b": OTHER_CUSTOMER_ID})
+    await connection.execute(text("""
+        INSERT INTO users (user_id, customer_id, email, name, role, status)
+        SELECT u.user_id, :c, lower(u.user_id) || '@rbac.bench', u.user_id, u.role, u.status
+        FROM unnest(CAST(:ids AS VARCHAR[]), CAST(:roles AS VARCHAR[]), CAST(:statuses AS VARCHAR[]))
+             AS u(user_id, role, status)
+    """), {
+        "c": CUSTOMER_ID,
+        "ids": [user_id(number) for number in range(users)],
+        "roles": [ROLES[number % len(ROLES)] for number in range(users)],
+        # Every 25th user is suspended
+        "statuses": ["inactive" if number % 25 == 24 else "active" for number in range(users)],
+    })
+    await connection.execute(text("""
+        INSERT INTO users (user_id, customer_id, email, name, role, status)
+        VALUES ('BENCH-RBAC-OTHER', :c, 'other@rbac.bench', 'Other', 'admin', 'active')
+    """), {"c": OTHER_CUSTOMER_ID})
+    for customer_id in (CUSTOMER_ID, OTHER_CUSTOMER_ID):
+        await connection.execute(text("""
+            INSERT INTO role_permissions (customer_id, role, resource, actions, conditions)
+            SELECT :c, p.role, p.resource, p.actions, CAST(p.conditions AS JSONB)
+            FROM jsonb_to_recordset(CAST(:rows AS JSONB))
+                 AS p(role VARCHAR, resource VARCHAR, actions TEXT[], conditions TEXT)
+        """), {"c": customer_id, "rows": orjson.dumps([
+            {"role": role, "resource": resource, "actions": "{" + ",".join(actions) + "}",
+             "conditions": orjson.dumps(conditions).decode()}
+            for role, resource, actions, conditions in PERMISSIONS
+        ]).decode()})
+    await connection.commit()
+
+
+async def cleanup(connection):
+    for statement in (
+        "DELETE FROM role_permissions WHERE customer_id LIKE 'BENCH-RBAC-%'",
+        "DELETE FROM users WHERE customer_id LIKE 'BENCH-RBAC-%'",
+        "DELETE FROM customers WHERE customer_id LIKE 'BENCH-RBAC-%'",
+    ):
+        await connection.execute(text(statement))
+    await connection.commit()
+
+
+async def naive_decide(connection, customer_id, user, resource, action):
+    """What a handler without the cache does: two queries per request"""
+    row = (await connection.execute(NAIVE_USER, {"user_id": user, "customer_id": customer_id})).first()
+    if row is None or (row.status or "active") != "active" or row.role is None:
+        return False
+    for permission in (await connection.execute(
+        NAIVE_PERMISSIONS, {"customer_id": customer_id, "role": row.role, "resource": resource}
+    )).all():
+        if action not in permission.actions and ANY not in permission.actions:
+            continue
+        # Conditional rows grant nothing, as in compile_policy
+        if not permission.conditions:
+            return True
+    return False
+
+
+async def compiled_decide(customer_id, user, resource, action):
+    policy = permission_cache.cached(customer_id) or await permission_cache.load(customer_id)
+    principal = policy.users.get(user)
+    return principal is not None and policy.decide(principal, resource, action).allowed
+
+
+def bench_app():
+    """Two endpoints doing nothing but authorise, one per approach"""
+    app = FastAPI()
+
+    async def naive(request: Request):
+        action = ACTIONS_BY_METHOD[request.method]
+        async with async_engine.connect() as connection:
+            allowed = await naive_decide(
+                connection, request.query_params["customer_id"], request.headers.get("X-User-ID"), "parents", action
+            )
+        if not allowed:
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+    @app.get("/naive", dependencies=[Depends(naive)])
+    async def naive_endpoint():
+        return {"ok": True}
+
+    @app.get("/compiled", dependencies=[Depends(authorize("parents"))])
+    async def compiled_endpoint():
+        return {"ok": True}
+
+    return app
+
+
+async def http_run(client, path, requests, concurrency, users):
+    statuses = []
+    latencies = []
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            number = queue.pop()
+            started = time.perf_counter()
+            response = await client.get(
+                path, params={"customer_id": CUSTOMER_ID},
+                headers={"X-User-ID": user_id(number % users)}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"  {path:10s} {requests / elapsed:8.0f} req/s  p50 {percentile(latencies, 50):6.2f}ms  "
+          f"p95 {percentile(latencies, 95):6.2f}ms  ({statuses.count(200)} allowed, {statuses.count(403)} denied)")
+    return requests / elapsed, statuses
+
+
+async def main(args):
+    dependencies.RBAC_MODE = "enforce"
+    rng = random.Random(7)
+    checks = {}
+
+    async with async_engine.connect() as connection:
+        await setup(connection, args.users)
+        try:
+            requests = [
+                (user_id(rng.randrange(args.users)), rng.choice(RESOURCES), rng.choice(ACTIONS))
+                for _ in range(args.decisions)
+            ]
+
+            started = time.perf_counter()
+            naive = [await naive_decide(connection, CUSTOMER_ID, *request) for request in requests]
+            await connection.commit()
+            naive_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await permission_cache.load(CUSTOMER_ID)
+            compile_ms = (time.perf_counter() - started) * 1000
+            timings = []
+            compiled = []
+            for request in requests:
+                decision_started = time.perf_counter()
+                compiled.append(await compiled_decide(CUSTOMER_ID, *request))
+                timings.append((time.perf_counter() - decision_started) * 1e6)
+            compiled_elapsed = time.perf_counter() - started
+
+            print(f"{args.decisions:,} decisions, {args.users} users, {len(PERMISSIONS)} permission rows, "
+                  f"{sum(naive):,} allowed")
+            print(f"  naive     {naive_elapsed * 1e6 / args.decisions:8.1f}us/decision  ({args.decisions * 2:,} queries)")
+            print(f"  compiled  {compiled_elapsed * 1e6 / args.decisions:8.1f}us/decision  (compile {compile_ms:.1f}ms; "
+                  f"p50 {statistics.median(timings):.1f}us, p99 {percentile(timings, 99):.1f}us)")
+            mismatches = sum(a != b for a, b in zip(naive, compiled))
+            checks[f"compiled decisions match naive ({mismatches} mismatches)"] = mismatches == 0
+            checks[f"compiled decision p99 under 50us ({percentile(timings, 99):.1f}us)"] = percentile(timings, 99) < 50
+
+            print(f"HTTP, {args.requests:,} requests, {args.concurrency} concurrent")
+            transport = httpx.ASGITransport(app=bench_app())
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                naive_rate, naive_statuses = await http_run(client, "/naive", args.requests, args.concurrency, args.users)
+                compiled_rate, compiled_statuses = await http_run(
+                    client, "/compiled", args.requests, args.concurrency, args.users
+                )
+                checks[f"compiled dependency faster over HTTP ({naive_rate:.0f} -> {compiled_rate:.0f} req/s)"] = (
+                    compiled_rate > naive_rate
+                )
+                checks["same allowed/denied counts over HTTP"] = (
+                    sorted(naive_statuses) == sorted(compiled_statuses)
+                )
+
+                # Cross-tenant: a real user, but of another school
+                response = await client.get(
+                    "/compiled", params={"customer_id": CUSTOMER_ID}, headers={"X-User-ID": "BENCH-RBAC-OTHER"}
+                )
+                checks["user of another tenant denied"] = response.status_code == 403
+
+            # Changes made in SQL, as another process or a console would
+            await permission_cache.load(OTHER_CUSTOMER_ID)
+            other_version = permission_cache.cached(OTHER_CUSTOMER_ID).version
+            viewer, registrar = user_id(2), user_id(3)
+            before = (
+                await compiled_decide(CUSTOMER_ID, viewer, "scoring", "read"),
+                await compiled_decide(CUSTOMER_ID, registrar, "scoring", "read"),
+            )
+            await connection.execute(text("""
+                UPDATE role_permissions SET conditions = '{}' WHERE customer_id = :c AND role = 'viewer' AND resource = '*'
+            """), {"c": CUSTOMER_ID})
+            await connection.execute(text("UPDATE users SET role = 'admin' WHERE user_id = :u"), {"u": registrar})
+            await connection.commit()
+            stale_before = (
+                await compiled_decide(CUSTOMER_ID, viewer, "scoring", "read"),
+                await compiled_decide(CUSTOMER_ID, registrar, "scoring", "read"),
+            )
+            started = time.perf_counter()
+            refreshed = await permission_cache.refresh_stale()
+            poll_ms = (time.perf_counter() - started) * 1000
+            after = (
+                await compiled_decide(CUSTOMER_ID, viewer, "scoring", "read"),
+                await compiled_decide(CUSTOMER_ID, registrar, "scoring", "read"),
+            )
+            print(f"SQL change: before {before}, until polled {stale_before}, after {after}; "
+                  f"poll recompiled {refreshed} tenant(s) in {poll_ms:.1f}ms")
+            checks["SQL changes picked up by the version poll"] = (
+                before == (False, False) and stale_before == before and after == (True, True)
+            )
+            checks["only the changed tenant recompiled"] = (
+                refreshed == 1 and permission_cache.cached(OTHER_CUSTOMER_ID).version == other_version
+            )
+            print(f"cache: {permission_cache.stats()}")
+        finally:
+            permission_cache.clear()
+            await cleanup(connection)
+
+    failed = False
+    for name, passed in checks.items():
+        print(f"[{'ok' if passed else 'FAIL'}] {name}")
+        failed = failed or not passed
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RBAC compiled policy vs per-request query")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--decisions", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
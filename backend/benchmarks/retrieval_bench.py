@@ -0,0 +1,272 @@
+# backend/benchmarks/retrieval_bench.py
+"""
+Smart Reply retrieval benchmark: recall and latency of the hashed KB index.
+
+For each --entries size, seeds a BENCH-KB-* tenant with synthetic knowledge_base
+entries (Zipf distributed words, 1-6 paragraphs each) and --mappings url_mappings,
+builds the index from scratch in a temporary KB_INDEX_DIR and runs --queries
+queries. A query is a handful of words from one passage plus noise words:
+  recall@k  - the source passage is among the top k
+  overlap   - share of the top 10 that exact (unhashed) TF-IDF cosine also ranks top 10
+  latency   - search + URL mapping match, in process, p50 / p95 / p99
+Then it retires / edits / adds entries and checks the incremental refresh, and
+reopens the index from disk in a fresh registry.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/retrieval_bench.py --entries 500,2000,8000
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from sqlalchemy import text
+
+from api.core.database import AsyncSessionLocal, async_engine
+from api.modules.smart_reply.retrieval import RetrievalIndex, chunk, features
+
+PREFIX = "BENCH-KB-"
+TENANT = f"{PREFIX}000"
+SYLLABLES = ["ad", "mis", "sion", "term", "fee", "board", "ing", "sch", "ol", "bus", "sport", "art",
+             "lab", "pa", "rent", "eve", "day", "ex", "am", "cur", "ric", "lum", "ho", "use", "trip"]
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def make_corpus(rng, entries, vocabulary):
+    # Zipf-like word frequencies, as in real text
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1) ** 1.05
+    cumulative = np.cumsum(weights / weights.sum())
+    def words(count):
+        return [vocabulary[i] for i in np.searchsorted(cumulative, rng_np.random(count))]
+    rng_np = np.random.default_rng(rng.randint(0, 1 << 30))
+    corpus = []
+    for i in range(entries):
+        paragraphs = [" ".join(words(rng.randint(30, 110))) + "." for _ in range(rng.randint(1, 6))]
+        corpus.append((f"Entry {i} " + " ".join(words(3)), "\n".join(paragraphs), f"category-{i % 12}"))
+    return corpus
+
+
+async def setup(db, corpus, mappings):
+    await cleanup(db)
+    await db.execute(text("INSERT INTO customers (customer_id, name) VALUES (:c, 'Retrieval Benchmark School')"),
+                     {"c": TENANT})
+    await db.execute(text("""
+        INSERT INTO knowledge_base (customer_id, kb_id, title, content, content_type, category, source_url)
+        SELECT :c, CAST(:c AS VARCHAR) || '-' || n, t, body, 'article', cat, 'https://school.example/kb/' || n
+        FROM unnest(CAST(:titles AS TEXT[]), CAST(:bodies AS TEXT[]), CAST(:cats AS TEXT[]))
+             WITH ORDINALITY AS r(t, body, cat, n)
+    """), {"c": TENANT, "titles": [c[0] for c in corpus], "bodies": [c[1] for c in corpus],
+           "cats": [c[2] for c in corpus]})
+    await db.execute(text("""
+        INSERT INTO url_mappings (customer_id, phrase, url, context, priority)
+        SELECT :c, phrase, 'https://school.example/go/' || n, 'bench', (n % 5)::int
+        FROM unnest(CAST(:phrases AS TEXT[])) WITH ORDINALITY AS r(phrase, n)
+    """), {"c": TENANT, "phrases": mappings})
+    await db.commit()
+
+
+async def cleanup(db):
+    for table in ("url_mappings", "knowledge_base", "customers"):
+        await db.execute(text(f"DELETE FROM {table} WHERE customer_id LIKE :prefix"), {"prefix": PREFIX + "%"})
+    await db.commit()
+
+
+def make_queries(rng, passages, vocabulary, count):
+    """(query, passage index) pairs: 6-10 distinct words of the passage plus 3 random words"""
+    queries = []
+    for _ in range(count):
+        target = rng.randrange(len(passages))
+        words = list(dict.fromkeys(passages[target][1].replace(".", "").split()))
+        picked = rng.sample(words, min(len(words), rng.randint(6, 10))) + rng.sample(vocabulary, 3)
+        rng.shuffle(picked)
+        queries.append((" ".join(picked), target))
+    return queries
+
+
+class ExactTfidf:
+    """Unhashed counterpart of the index's scoring, via an inverted index"""
+
+    def __init__(self, passages):
+        self.postings = defaultdict(list)
+        for position, (title, passage) in enumerate(passages):
+            counts = features(f"{title}\n{passage}")
+            weights = {f: 1.0 + math.log(c) for f, c in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for feature, weight in weights.items():
+                self.postings[feature].append((position, weight / norm))
+        self.size = len(passages)
+
+    def top(self, query, k):
+        scores = Counter()
+        for feature, count in features(query).items():
+            postings = self.postings.get(feature, ())
+            idf = math.log((1.0 + self.size) / (1.0 + len(postings))) + 1.0
+            for position, weight in postings:
+                scores[position] += (1.0 + math.log(count)) * idf * weight
+        return [position for position, _ in scores.most_common(k)]
+
+
+def percentile(values, share):
+    return sorted(values)[min(len(values) - 1, int(len(values) * share))]
+
+
+async def build(directory):
+    index = RetrievalIndex(directory=directory, refresh_seconds=3600)
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        stats = await index.refresh(db, TENANT)
+    return index, time.perf_counter() - started, stats
+
+
+def evaluate(index, queries, passage_text, exact):
+    latencies, hits, overlaps = [], Counter(), []
+    for query, target in queries:
+        started = time.perf_counter()
+        result = index.search(TENANT, query, k=10)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = [passage.text for passage in result.passages]
+        for k in (1, 5, 10):
+            hits[k] += passage_text[target] in found[:k]
+        expected = {passage_text[position] for position in exact.top(query, 10)}
+        overlaps.append(len(expected & set(found)) / max(1, len(expected)))
+    n = len(queries)
+    return {k: hits[k] / n for k in (1, 5, 10)}, statistics.mean(overlaps), latencies
+
+
+async def incremental(args, directory, rng, corpus, vocabulary, checks):
+    index, _, _ = await build(directory)
+    async with AsyncSessionLocal() as db:
+        ids = (await db.execute(text(
+            "SELECT id, kb_id FROM knowledge_base WHERE customer_id = :c AND is_current ORDER BY id"
+        ), {"c": TENANT})).all()
+        retired = rng.sample(ids, 30)
+        edited, removed = retired[:20], retired[20:]
+        # New versions of 20 entries with a marker word each, 10 entries retired, 10 brand new
+        await db.execute(text("UPDATE knowledge_base SET is_current = FALSE WHERE id = ANY(CAST(:ids AS INTEGER[]))"),
+                         {"ids": [row.id for row in retired]})
+        markers = {}
+        for number, row in enumerate(edited + [None] * 10):
+            marker = f"zzmarker{number}"
+            kb_id = f"{row.kb_id}-v2" if row else f"{TENANT}-new-{number}"
+            markers[marker] = kb_id
+            await db.execute(text("""
+                INSERT INTO knowledge_base (customer_id, kb_id, title, content, content_type, category, version)
+                VALUES (:c, :kb, :title, :body, 'article', 'category-0', 2)
+            """), {"c": TENANT, "kb": kb_id, "title": f"Updated {number}",
+                   "body": f"{marker} " + " ".join(rng.sample(vocabulary, 60))})
+        # Re-verified but unchanged: updated_at moves, content doesn't
+        await db.execute(text("""
+            UPDATE knowledge_base SET last_verified = LOCALTIMESTAMP
+            WHERE id IN (SELECT id FROM knowledge_base WHERE customer_id = :c AND is_current ORDER BY id LIMIT 50)
+        """), {"c": TENANT})
+        await db.commit()
+
+        started = time.perf_counter()
+        stats = await index.refresh(db, TENANT)
+        refresh_ms = (time.perf_counter() - started) * 1000
+    print(f"incremental refresh (20 edited, 10 retired, 10 new, 50 re-verified): {refresh_ms:.1f}ms, {stats}")
+    checks["incremental refresh vectorises only changed entries"] = (
+        stats["entries_added"] == 30 and stats["entries_removed"] == 30 and stats["passages_added"] == 30
+    )
+    found = [index.search(TENANT, marker, k=1).passages for marker in markers]
+    checks["edited and new entries retrievable"] = all(
+        hits and hits[0].kb_id == kb_id for hits, kb_id in zip(found, markers.values())
+    )
+    retired_kb = {row.kb_id for row in retired}
+    stale = sum(
+        passage.kb_id in retired_kb
+        for title, body, _ in corpus[:300]
+        for passage in index.search(TENANT, f"{title} {body[:200]}", k=10).passages
+    )
+    checks["retired entries never returned"] = stale == 0
+
+    reopened = RetrievalIndex(directory=directory, refresh_seconds=3600)
+    started = time.perf_counter()
+    probe = " ".join(rng.sample(vocabulary, 8))
+    first = reopened.search(TENANT, probe, k=10)
+    reopen_ms = (time.perf_counter() - started) * 1000
+    async with AsyncSessionLocal() as db:
+        again = await reopened.refresh(db, TENANT)
+    print(f"reopen from disk + first search: {reopen_ms:.1f}ms; refresh after reopen: {again}")
+    checks["reopened index matches, nothing re-embedded"] = (
+        [p.text for p in first.passages] == [p.text for p in index.search(TENANT, probe, k=10).passages]
+        and again["passages_added"] == 0
+    )
+
+
+async def run(args, entries, rng, checks, last):
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    corpus = make_corpus(rng, entries, vocabulary)
+    mappings = [" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(args.mappings)]
+    passages = [(title, passage) for title, body, _ in corpus for passage in chunk(body)]
+    queries = make_queries(rng, passages, vocabulary, args.queries)
+    exact = ExactTfidf(passages)
+    passage_text = [passage for _, passage in passages]
+
+    async with AsyncSessionLocal() as db:
+        await setup(db, corpus, mappings)
+    with tempfile.TemporaryDirectory() as directory:
+        index, seconds, _ = await build(directory)
+        recall, overlap, latencies = evaluate(index, queries, passage_text, exact)
+        status = index.status(TENANT)
+        print(f"{entries:>6,} entries / {len(passages):>6,} passages: build {seconds:.2f}s, "
+              f"{status['index_bytes'] / 1e6:.1f}MB | recall@1 {recall[1]:.3f} @5 {recall[5]:.3f} "
+              f"@10 {recall[10]:.3f} | top-10 overlap with exact TF-IDF {overlap:.3f} | search p50 "
+              f"{statistics.median(latencies):.2f}ms p95 {percentile(latencies, 0.95):.2f}ms "
+              f"p99 {percentile(latencies, 0.99):.2f}ms")
+        checks[f"{entries} entries: recall@10 >= 0.95"] = recall[10] >= 0.95
+        checks[f"{entries} entries: same top 10 as exact TF-IDF"] = overlap >= 0.98
+        checks[f"{entries} entries: p95 search < 10ms"] = percentile(latencies, 0.95) < 10
+
+        planted = rng.sample(mappings, 50)
+        matched = sum(
+            any(m.phrase == phrase for m in index.search(TENANT, f"{queries[i][0]} {phrase}", url_limit=10).url_mappings)
+            for i, phrase in enumerate(planted)
+        )
+        checks[f"{entries} entries: URL mappings matched for queries containing their phrase"] = matched == len(planted)
+
+    if last:
+        # The exact baseline holds millions of small objects; drop it so GC doesn't skew the refresh timing
+        del exact
+        with tempfile.TemporaryDirectory() as directory:
+            await incremental(args, directory, rng, corpus, vocabulary, checks)
+
+
+async def main(args):
+    rng = random.Random(7)
+    checks = {}
+    sizes = [int(n) for n in args.entries.split(",")]
+    for number, entries in enumerate(sizes):
+        await run(args, entries, rng, checks, last=number == len(sizes) - 1)
+
+    if not args.keep:
+        async with AsyncSessionLocal() as db:
+            await cleanup(db)
+    await async_engine.dispose()
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Smart Reply retrieval benchmark")
+    parser.add_argument("--entries", default="500,2000,8000", help="comma-separated knowledge_base sizes")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="distinct words in the corpus")
+    parser.add_argument("--mappings", type=int, default=300, help="url_mappings rows")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenant in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,147 @@
+# backend/benchmarks/scoring_bench.py
+"""
+Scoring benchmark on a synthetic tenant.
+
+Generates N parents with emails, journey events, tasks and notes in SQL, then times
+  batch       - recompute_tenant: array_agg fetch, NumPy kernel, one UPDATE per chunk
+  kernel      - compute_scores alone on the fetched arrays
+  incremental - rescore_parents one parent at a time (the per-activity path),
+                sampled and extrapolated to the whole tenant
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/scoring_bench.py --parents 300000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from api.core.database import AsyncSessionLocal
+from api.modules.scoring.engine import compute_scores
+from api.modules.scoring.service import database_now, load_activity, recompute_tenant, rescore_parents
+
+CUSTOMER_ID = "BENCH-SCORING"
+TABLES = ("notes", "tasks", "emails", "journey_events", "children", "parents")
+
+
+async def reset_tenant(db):
+    await db.execute(text(
+        "INSERT INTO customers (customer_id, name) VALUES (:c, 'Scoring Benchmark School') "
+        "ON CONFLICT (customer_id) DO NOTHING"
+    ), {"c": CUSTOMER_ID})
+    for table in TABLES:
+        await db.execute(text(f"DELETE FROM {table} WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+    await db.commit()
+
+
+async def generate_tenant(db, parents, emails, events, tasks, notes):
+    params = {"c": CUSTOMER_ID}
+    await db.execute(text("""
+        INSERT INTO parents (customer_id, parent_id, name, email, stage, status)
+        SELECT CAST(:c AS VARCHAR), 'BENCH-SC-' || g, 'Bench Parent ' || g, 'bench' || g || '@example.com',
+               (ARRAY['awareness','interest','consideration','intent','evaluation','enrolled'])[1 + g % 6],
+               'lead'
+        FROM generate_series(1, :n) AS g
+    """), {**params, "n": parents})
+
+    # Activity spread over the last year, a fixed number per parent on average
+    await db.execute(text("""
+        INSERT INTO emails (customer_id, parent_id, direction, subject, sentiment_score, date_received)
+        SELECT CAST(:c AS VARCHAR), p.id,
+               CASE WHEN random() < 0.5 THEN 'inbound' ELSE 'outbound' END,
+               'Bench email',
+               round((random() * 2 - 1)::numeric, 2),
+               LOCALTIMESTAMP - random() * INTERVAL '365 days'
+        FROM parents p, generate_series(1, :k)
+        WHERE p.customer_id = :c
+    """), {**params, "k": emails})
+    await db.execute(text("""
+        INSERT INTO journey_events (customer_id, parent_id, event_type, title, impact_score, event_date)
+        SELECT CAST(:c AS VARCHAR), p.id, 'engagement', 'Bench event', (random() * 10 - 3)::int,
+               LOCALTIMESTAMP - random() * INTERVAL '365 days'
+        FROM parents p, generate_series(1, :k)
+        WHERE p.customer_id = :c
+    """), {**params, "k": events})
+    await db.execute(text("""
+        INSERT INTO tasks (customer_id, parent_id, title, status, due_date)
+        SELECT CAST(:c AS VARCHAR), p.id, 'Bench task',
+               CASE WHEN random() < 0.6 THEN 'completed' ELSE 'pending' END,
+               LOCALTIMESTAMP + (random() * 60 - 30) * INTERVAL '1 day'
+        FROM parents p, generate_series(1, :k)
+        WHERE p.customer_id = :c
+    """), {**params, "k": tasks})
+    await db.execute(text("""
+        INSERT INTO notes (customer_id, parent_id, content, created_at)
+        SELECT CAST(:c AS VARCHAR), p.id, 'Bench note', LOCALTIMESTAMP - random() * INTERVAL '365 days'
+        FROM parents p, generate_series(1, :k)
+        WHERE p.customer_id = :c
+    """), {**params, "k": notes})
+    await db.commit()
+    await db.execute(text("ANALYZE parents, emails, journey_events, tasks, notes"))
+    await db.commit()
+
+
+async def main(args):
+    async with AsyncSessionLocal() as db:
+        await reset_tenant(db)
+
+        started = time.perf_counter()
+        await generate_tenant(db, args.parents, args.emails, args.events, args.tasks, args.notes)
+        print(f"generated {args.parents} parents in {time.perf_counter() - started:.1f}s")
+
+        # Batch path, end to end (first run writes every row, second only changes)
+        result = await recompute_tenant(db, CUSTOMER_ID)
+        print(f"batch recompute:    {result.parents} parents in {result.elapsed_seconds:.2f}s "
+              f"({result.parents_per_second:,.0f}/s, {result.updated} rows written)")
+        result = await recompute_tenant(db, CUSTOMER_ID)
+        print(f"batch (no changes): {result.parents} parents in {result.elapsed_seconds:.2f}s "
+              f"({result.parents_per_second:,.0f}/s, {result.updated} rows written)")
+
+        # Fetch and kernel in isolation
+        rows = (await db.execute(text(
+            "SELECT id, coalesce(stage, '') FROM parents WHERE customer_id = :c ORDER BY id"
+        ), {"c": CUSTOMER_ID})).all()
+        parent_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        stages = np.array([row[1] for row in rows], dtype=object)
+        as_of = await database_now(db)
+
+        started = time.perf_counter()
+        activity = await load_activity(db, CUSTOMER_ID, lambda column: column.isnot(None))
+        fetch_elapsed = time.perf_counter() - started
+        rows_fetched = sum(len(getattr(activity, field)) for field in
+                           ("email_parent", "event_parent", "task_parent", "note_parent"))
+
+        started = time.perf_counter()
+        compute_scores(parent_ids, stages, activity, as_of)
+        kernel_elapsed = time.perf_counter() - started
+        print(f"array fetch:        {rows_fetched:,} activity rows in {fetch_elapsed:.2f}s")
+        print(f"NumPy kernel:       {len(parent_ids):,} parents in {kernel_elapsed * 1000:.0f}ms")
+        await db.commit()
+
+        # Incremental path, one parent per call
+        sample = random.Random(7).sample(parent_ids.tolist(), min(args.sample, len(parent_ids)))
+        started = time.perf_counter()
+        for parent_id in sample:
+            await rescore_parents(db, CUSTOMER_ID, [parent_id])
+            await db.commit()
+        per_parent = (time.perf_counter() - started) / len(sample)
+        print(f"incremental:        {per_parent * 1000:.2f}ms per parent "
+              f"(whole tenant this way: ~{per_parent * len(parent_ids):.0f}s)")
+
+        if not args.keep:
+            await reset_tenant(db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scoring engine benchmark")
+    parser.add_argument("--parents", type=int, default=300_000)
+    parser.add_argument("--emails", type=int, default=6, help="emails per parent")
+    parser.add_argument("--events", type=int, default=3, help="journey events per parent")
+    parser.add_argument("--tasks", type=int, default=1, help="tasks per parent")
+    parser.add_argument("--notes", type=int, default=1, help="notes per parent")
+    parser.add_argument("--sample", type=int, default=500, help="parents rescored one by one")
+    parser.add_argument("--keep", action="store_true", help="leave the synthetic tenant in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+# backend/benchmarks/search_bench.py
+"""
+Parent search benchmark over a generated large tenant.
+
+Generates a tenant with --parents parents (default 500k, ~1.5 children each),
+then times typical search-box keystrokes against:
+  legacy  - the old OR of four ILIKEs + outer join to children + DISTINCT
+  search  - /api/parents/search text filter (trigram-indexed search document)
+  ranked  - /api/search/parents ranked prefix lookup
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/search_bench.py --parents 500000
+    PYTHONPATH=. python benchmarks/search_bench.py --cleanup
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import select, or_, text
+
+from app import app
+from api.core.database import AsyncSessionLocal
+from api.modules.parents import models
+
+CUSTOMER_ID = "BENCH-SEARCH"
+QUERIES = ["j", "ja", "jam", "james", "smith", "james sm", "7700 9001", "oliv", "@example", "zzzz"]
+
+GENERATE_SQL = """
+INSERT INTO customers (customer_id, name) VALUES (:customer_id, 'Search Benchmark School')
+ON CONFLICT (customer_id) DO NOTHING;
+
+INSERT INTO parents (customer_id, parent_id, name, email, phone, partner_name, status, stage, created_at)
+SELECT :customer_id,
+       'BENCH-' || g,
+       first_names[1 + g % array_length(first_names, 1)] || ' ' || last_names[1 + (g / 7) % array_length(last_names, 1)],
+       lower(first_names[1 + g % array_length(first_names, 1)]) || '.' || g || '@example.com',
+       '+44 7700 ' || lpad((g % 1000000)::text, 6, '0'),
+       CASE WHEN g % 3 = 0 THEN first_names[1 + (g / 3) % array_length(first_names, 1)] || ' ' || last_names[1 + (g / 7) % array_length(last_names, 1)] END,
+       'lead', 'awareness',
+       CURRENT_TIMESTAMP - (g % 730) * INTERVAL '1 day'
+FROM generate_series(1, :parents) AS g,
+     (SELECT ARRAY['James','Olivia','Amelia','Noah','Isla','George','Ava','Leo','Mia','Arthur',
+                   'Freya','Oscar','Lily','Harry','Grace','Jack','Ella','Henry','Emily','Theo'] AS first_names,
+             ARRAY['Smith','Jones','Taylor','Brown','Williams','Wilson','Johnson','Davies','Patel','Robinson',
+                   'Wright','Thompson','Evans','Walker','White','Roberts','Green','Hall','Wood','Jackson'] AS last_names) n;
+
+INSERT INTO children (parent_id, customer_id, name)
+SELECT p.id, p.customer_id, split_part(p.name, ' ', 1) || ' Jr ' || k
+FROM parents p, generate_series(1, 2) AS k
+WHERE p.customer_id = :customer_id AND (k = 1 OR p.id % 2 = 0);
+
+ANALYZE parents;
+ANALYZE children;
+ANALYZE parent_search_documents;
+"""
+
+
+def legacy_search(query):
+    """The pre-search-document filter, kept here for comparison"""
+    search_filter = or_(
+        models.Parent.name.ilike(f'%{query}%'),
+        models.Parent.email.ilike(f'%{query}%'),
+        models.Parent.phone.ilike(f'%{query}%'),
+        models.Parent.partner_name.ilike(f'%{query}%')
+    )
+    return select(models.Parent).where(
+        models.Parent.customer_id == CUSTOMER_ID
+    ).outerjoin(models.Child).where(
+        or_(search_filter, models.Child.name.ilike(f'%{query}%'))
+    ).distinct().order_by(models.Parent.created_at.desc()).limit(20)
+
+
+async def time_it(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+async def main(args):
+    async with AsyncSessionLocal() as db:
+        if args.cleanup:
+            await db.execute(text("DELETE FROM children WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+            await db.execute(text("DELETE FROM parents WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+            await db.commit()
+            print("Benchmark tenant removed")
+            return
+
+        existing = await db.scalar(text("SELECT count(*) FROM parents WHERE customer_id = :c"), {"c": CUSTOMER_ID})
+        if existing < args.parents:
+            print(f"Generating {args.parents} parents for {CUSTOMER_ID}...")
+            started = time.perf_counter()
+            for statement in filter(str.strip, GENERATE_SQL.split(";\n")):
+                await db.execute(text(statement), {"customer_id": CUSTOMER_ID, "parents": args.parents})
+            await db.commit()
+            print(f"Generated in {time.perf_counter() - started:.1f}s")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client, AsyncSessionLocal() as db:
+        print(f"{'query':<12} {'legacy ms':>10} {'search ms':>10} {'ranked ms':>10}   (median of {args.repeat})")
+        for query in QUERIES:
+            async def run_legacy():
+                (await db.scalars(legacy_search(query))).all()
+
+            async def run_search():
+                await client.get("/api/parents/search", params={"customer_id": CUSTOMER_ID, "query": query})
+
+            async def run_ranked():
+                await client.get("/api/search/parents", params={"customer_id": CUSTOMER_ID, "q": query})
+
+            legacy, _ = await time_it(run_legacy, args.repeat)
+            search, _ = await time_it(run_search, args.repeat)
+            ranked, _ = await time_it(run_ranked, args.repeat)
+            print(f"{query:<12} {legacy:>10.1f} {search:>10.1f} {ranked:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parent search benchmark")
+    parser.add_argument("--parents", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cleanup", action="store_true", help="Delete the generated tenant and exit")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,190 @@
+# backend/benchmarks/serialization_bench.py
+"""
+Response serialisation micro-benchmark for the parent read endpoints (no database).
+
+Both paths start from the same query result - the rows as the driver hands them over -
+and end at the response body bytes:
+
+before - ORM objects loaded from whole entity rows (children eager-loaded), validated
+         through the response schemas (EmailStr, enums, from_attributes) by FastAPI,
+         then jsonable_encoder + json.dumps
+after  - result rows of the schema's columns, turned into dicts by rows_to_dicts and
+         written straight out by ORJSONResponse
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/serialization_bench.py
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import inspect
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+from sqlalchemy.orm.attributes import set_committed_value
+
+from api.core.serialization import ORJSONResponse, rows_to_dicts, schema_columns
+from api.modules.parents import models, schemas
+
+NOW = datetime(2026, 1, 1, 9, 30)
+
+
+class Table:
+    """Rows of one model's table as a driver returns them: one tuple per row, every mapped column"""
+
+    def __init__(self, model, rows):
+        self.model = model
+        self.keys = [attr.key for attr in inspect(model).column_attrs]
+        self.rows = [tuple(values.get(key) for key in self.keys) for values in rows]
+
+    def load(self, rows=None):
+        """ORM objects, as a select() of the entity builds them: instance state plus column values"""
+        manager = inspect(self.model).class_manager
+        loaded = []
+        for row in self.rows if rows is None else rows:
+            instance = manager.new_instance()
+            instance.__dict__.update(zip(self.keys, row))
+            loaded.append(instance)
+        return loaded
+
+    def projection(self, schema):
+        """Column names and rows of select(*schema_columns(model, schema)) over the same data"""
+        columns = [column.key for column in schema_columns(self.model, schema)]
+        positions = [self.keys.index(column) for column in columns]
+        return columns, [tuple(row[i] for i in positions) for row in self.rows]
+
+
+def fetch(columns, rows):
+    """Result rows, as execute(...).all() returns them for a column projection"""
+    return IteratorResult(SimpleResultMetaData(columns), iter(rows)).all()
+
+
+def parent_values(i):
+    return dict(
+        id=i, parent_id=f"PARENT-{i:08d}", customer_id="SCHOOL-001",
+        name=f"Parent {i}", email=f"parent{i}@example.com", phone="+44 7700 900123",
+        partner_name=f"Partner {i}", address={"city": "London", "postcode": "N1 1AA"},
+        status="lead", stage="interest", source="website", language="en",
+        lead_score=50, engagement_score=40, risk_score=10, tags=["open-day", "bursary"],
+        custom_fields={"year": 2027}, created_at=NOW, updated_at=NOW,
+        first_contact_date=date(2026, 1, 1), last_contact_date=date(2026, 2, 1),
+    )
+
+
+def child_values(parent_id, k):
+    return dict(
+        id=parent_id * 10 + k, parent_id=parent_id, customer_id="SCHOOL-001", name=f"Child {k}",
+        dob=date(2016, 9, 1), current_year_group="Year 3", target_year_group="Year 4",
+        created_at=NOW, updated_at=NOW,
+    )
+
+
+def detail_tables(parent_id):
+    emails = Table(models.Email, [
+        dict(id=k, parent_id=parent_id, customer_id="SCHOOL-001", subject=f"Re: visit {k}",
+             from_address="school@example.com", direction="outbound", sentiment_score=0.5,
+             sentiment_label="positive", date_received=NOW - timedelta(days=k), status="read")
+        for k in range(10)
+    ])
+    notes = Table(models.Note, [
+        dict(id=k, parent_id=parent_id, customer_id="SCHOOL-001", content="Called about open day " * 5,
+             note_type="general", created_by="USER-001", created_at=NOW)
+        for k in range(5)
+    ])
+    events = Table(models.JourneyEvent, [
+        dict(id=k, parent_id=parent_id, customer_id="SCHOOL-001", event_type="email", event_subtype="sent",
+             title="Prospectus sent", description="Sent prospectus", event_date=NOW, impact_score=3)
+        for k in range(10)
+    ])
+    return emails, notes, events
+
+
+def bench(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(args):
+    parents = Table(models.Parent, [parent_values(i) for i in range(args.parents)])
+    children = Table(models.Child, [child_values(i, k) for i in range(args.parents) for k in range(2)])
+    emails, notes, events = detail_tables(0)
+
+    list_field = create_response_field("list", schemas.ParentListResponse)
+    detail_field = create_response_field("detail", schemas.ParentWithDetails)
+
+    async def run_validated(field, content):
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+    loop = asyncio.new_event_loop()
+
+    def load_parents(parent_rows, child_rows):
+        loaded = parents.load(parent_rows)
+        by_parent = {parent.id: [] for parent in loaded}
+        for child in children.load(child_rows):
+            by_parent[child.parent_id].append(child)
+        for parent in loaded:
+            set_committed_value(parent, "children", by_parent[parent.id])
+        return loaded
+
+    def search_before():
+        response = schemas.ParentListResponse(
+            parents=load_parents(parents.rows, children.rows), total=1000, page=1, per_page=args.parents, pages=10
+        )
+        return loop.run_until_complete(run_validated(list_field, response))
+
+    parent_columns, parent_rows = parents.projection(schemas.Parent)
+
+    def search_after():
+        return ORJSONResponse({
+            "parents": rows_to_dicts(fetch(parent_columns, parent_rows)), "total": 1000, "page": 1,
+            "per_page": args.parents, "pages": 10, "total_is_estimate": True, "next_cursor": None,
+        }).body
+
+    def detail_before():
+        parent, = load_parents(parents.rows[:1], children.rows[:2])
+        parent_dict = parent.__dict__.copy()
+        parent_dict.update(children=parent.children, recent_emails=emails.load(), recent_notes=notes.load(),
+                           journey_events=events.load(), email_count=10, task_count=2)
+        return loop.run_until_complete(run_validated(detail_field, schemas.ParentWithDetails(**parent_dict)))
+
+    # The detail route reads the parent row with its two counts, then each related list
+    detail_columns = parent_columns + ["email_count", "task_count"]
+    detail_rows = [parent_rows[0] + (10, 2)]
+    child_columns, child_rows = children.projection(schemas.Child)
+    related = [
+        ("recent_emails", *emails.projection(schemas.EmailSummary)),
+        ("recent_notes", *notes.projection(schemas.Note)),
+        ("journey_events", *events.projection(schemas.JourneyEventSummary)),
+    ]
+
+    def detail_after():
+        parent_dict = fetch(detail_columns, detail_rows)[0]._asdict()
+        parent_dict["children"] = rows_to_dicts(fetch(child_columns, child_rows[:2]))
+        for name, columns, rows in related:
+            parent_dict[name] = rows_to_dicts(fetch(columns, rows))
+        parent_dict.update(emails_cursor=None, notes_cursor=None, events_cursor=None)
+        return ORJSONResponse(parent_dict).body
+
+    print(f"{'endpoint':<28} {'before us':>11} {'after us':>11} {'speed-up':>9}")
+    for name, before, after in [
+        (f"/api/parents/search ({args.parents})", search_before, search_after),
+        ("/api/parents/{id}", detail_before, detail_after),
+    ]:
+        b = bench(before, args.iterations)
+        a = bench(after, args.iterations)
+        print(f"{name:<28} {b:>11.1f} {a:>11.1f} {b / a:>8.1f}x")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parent response serialisation micro-benchmark")
+    parser.add_argument("--parents", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    main(parser.parse_args())
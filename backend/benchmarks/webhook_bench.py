@@ -0,0 +1,207 @@
+# backend/benchmarks/webhook_bench.py
+"""
+Webhook dispatcher benchmark and end-to-end check against a local stub HTTP server.
+
+Creates T synthetic tenants, each with one webhook on the stub, queues N outbox rows
+per tenant and runs WebhookDispatcher until the outbox is drained. The stub answers
+  /ok     200 after --latency ms
+  /flaky  500 on each delivery's first attempt, then 200 (exercises backoff)
+  /gone   410 (permanent failure, no retry)
+and records per-tenant concurrency, TCP connections and signature checks.
+
+Usage (from backend/):
+    PYTHONPATH=. python benchmarks/webhook_bench.py --tenants 20 --per-tenant 500
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from collections import Counter, defaultdict
+
+# Short retry delays so the flaky endpoint settles within the run
+os.environ.setdefault("WEBHOOK_BACKOFF_BASE_SECONDS", "0.2")
+os.environ.setdefault("WEBHOOK_POLL_SECONDS", "0.1")
+
+from sqlalchemy import text  # noqa: E402
+
+from api.core.database import async_engine  # noqa: E402
+from api.modules.webhooks.dispatcher import WebhookDispatcher  # noqa: E402
+
+PREFIX = "BENCH-WH-"
+SECRET = "bench-secret"
+
+
+class StubServer:
+    """Minimal keep-alive HTTP/1.1 endpoint"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.connections = 0
+        self.requests = Counter()
+        self.bad_signatures = 0
+        self.active = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.seen = set()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                path = request_line.split()[1].decode()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status = await self.respond(path, headers, body)
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: 2\r\n\r\nok".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, path, headers, body):
+        expected = "sha256=" + hmac.new(
+            SECRET.encode(), headers["x-webhook-timestamp"].encode() + b"." + body, hashlib.sha256
+        ).hexdigest()
+        if headers.get("x-webhook-signature") != expected:
+            self.bad_signatures += 1
+
+        tenant = headers["x-webhook-id"]
+        self.active[tenant] += 1
+        self.peak[tenant] = max(self.peak[tenant], self.active[tenant])
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active[tenant] -= 1
+
+        self.requests[path] += 1
+        if path == "/gone":
+            return 410
+        if path == "/flaky":
+            delivery = headers["x-webhook-delivery"]
+            if delivery not in self.seen:
+                self.seen.add(delivery)
+                return 500
+        return 200
+
+
+async def setup(connection, tenants, per_tenant, port):
+    await cleanup(connection)
+    for t in range(tenants):
+        customer = f"{PREFIX}{t:03d}"
+        # Tenant 0 is flaky, tenant 1 is gone, the rest are healthy
+        path = "/flaky" if t == 0 else "/gone" if t == 1 else "/ok"
+        await connection.execute(text(
+            "INSERT INTO customers (customer_id, name) VALUES (:c, 'Webhook Benchmark School')"
+        ), {"c": customer})
+        await connection.execute(text("""
+            INSERT INTO webhook_configs (customer_id, webhook_id, name, url, secret, events, retry_config)
+            VALUES (:c, :c, 'Bench hook', :url, :secret, ARRAY['parent.created'],
+                    '{"max_retries": 3, "backoff_multiplier": 2}')
+        """), {"c": customer, "url": f"http://127.0.0.1:{port}{path}", "secret": SECRET})
+    await connection.execute(text("""
+        INSERT INTO webhook_outbox (customer_id, webhook_id, event_type, payload)
+        SELECT w.customer_id, w.id, 'parent.created', jsonb_build_object('id', g, 'name', 'Bench Parent ' || g)
+        FROM webhook_configs w, generate_series(1, :n) AS g
+        WHERE w.customer_id LIKE :prefix
+    """), {"n": per_tenant, "prefix": PREFIX + "%"})
+
+
+async def cleanup(connection):
+    params = {"prefix": PREFIX + "%"}
+    await connection.execute(text(
+        "DELETE FROM webhook_logs WHERE webhook_id IN (SELECT id FROM webhook_configs WHERE customer_id LIKE :prefix)"
+    ), params)
+    await connection.execute(text("DELETE FROM webhook_outbox WHERE customer_id LIKE :prefix"), params)
+    await connection.execute(text("DELETE FROM webhook_configs WHERE customer_id LIKE :prefix"), params)
+    await connection.execute(text("DELETE FROM customers WHERE customer_id LIKE :prefix"), params)
+
+
+async def outstanding(connection):
+    return await connection.scalar(text(
+        "SELECT count(*) FROM webhook_outbox WHERE customer_id LIKE :prefix AND status IN ('pending', 'delivering')"
+    ), {"prefix": PREFIX + "%"})
+
+
+async def main(args):
+    stub = StubServer(args.latency / 1000)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async with async_engine.begin() as connection:
+        await setup(connection, args.tenants, args.per_tenant, port)
+    total = args.tenants * args.per_tenant
+
+    dispatcher = WebhookDispatcher(
+        max_in_flight=args.in_flight,
+        customer_concurrency=args.customer_concurrency,
+        host_connections=args.host_connections,
+    )
+    started = time.perf_counter()
+    dispatcher.start()
+    async with async_engine.connect() as connection:
+        while await outstanding(connection):
+            await connection.commit()
+            await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - started
+    await dispatcher.stop()
+    server.close()
+
+    async with async_engine.connect() as connection:
+        params = {"prefix": PREFIX + "%"}
+        failed = await connection.scalar(text(
+            "SELECT count(*) FROM webhook_outbox WHERE customer_id LIKE :prefix AND status = 'failed'"), params)
+        logs = await connection.scalar(text(
+            "SELECT count(*) FROM webhook_logs l JOIN webhook_configs w ON w.id = l.webhook_id "
+            "WHERE w.customer_id LIKE :prefix"), params)
+        successes, failures = (await connection.execute(text(
+            "SELECT sum(success_count), sum(failure_count) FROM webhook_configs WHERE customer_id LIKE :prefix"
+        ), params)).one()
+        if not args.keep:
+            await cleanup(connection)
+            await connection.commit()
+
+    stats = dispatcher.stats()
+    attempts = sum(stub.requests.values())
+    print(f"delivered {stats['delivered']:,} of {total:,} events in {elapsed:.2f}s "
+          f"({stats['delivered'] / elapsed:,.0f}/s, {attempts:,} HTTP attempts, {stats['flushes']} write-back flushes)")
+    print(f"stub: {dict(stub.requests)}, {stub.connections} TCP connections, "
+          f"peak per-tenant concurrency {max(stub.peak.values())} (cap {args.customer_concurrency})")
+
+    checks = {
+        "every healthy and flaky delivery succeeded": stats["delivered"] == total - args.per_tenant,
+        "410 endpoint dead-lettered without retries": failed == args.per_tenant and stub.requests["/gone"] == args.per_tenant,
+        "flaky endpoint retried exactly once each": stub.requests["/flaky"] == 2 * args.per_tenant,
+        "per-tenant concurrency cap held": max(stub.peak.values()) <= args.customer_concurrency,
+        # httpx may recycle a keep-alive connection after an error status, so check reuse, not a hard count
+        "connections pooled per host": stub.connections <= max(args.host_connections, attempts // 10),
+        "signatures valid": stub.bad_signatures == 0,
+        "one log row per attempt": logs == attempts,
+        "counters match attempts": (successes, failures) == (stats["delivered"], attempts - stats["delivered"]),
+    }
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Webhook dispatcher benchmark against a local stub server")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--per-tenant", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=20, help="stub response time in ms")
+    parser.add_argument("--in-flight", type=int, default=200)
+    parser.add_argument("--customer-concurrency", type=int, default=4)
+    parser.add_argument("--host-connections", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark tenants in place")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,22 @@
+# backend/tests/conftest.py
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Type
+
+import pytest
+
+from stub_server import start_server
+
+@pytest.fixture
+def http_server() -> Callable[[Type[BaseHTTPRequestHandler]], str]:
+    """Start in-process HTTP servers for a test; returns a function giving each one's base URL"""
+    servers = []
+
+    def start(handler: Type[BaseHTTPRequestHandler]) -> str:
+        server = start_server(handler)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,17 @@
+# backend/tests/stub_server.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Type
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Base for stub handlers: no request logging on stderr"""
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(handler: Type[BaseHTTPRequestHandler]) -> ThreadingHTTPServer:
+    """An HTTP server on a free local port, serving from a daemon thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,169 @@
+# backend/tests/test_crawler.py
+"""Crawls of a temporary directory served by http.server; no database involved."""
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+
+import pytest
+
+from api.modules.knowledge.crawler import Crawler, Known, parse_page
+from stub_server import QuietHandler
+
+class StaticFiles(QuietHandler, SimpleHTTPRequestHandler):
+    pass
+
+class OffSite(QuietHandler):
+    """Another host: the crawler must never request anything from it"""
+    requested = []
+
+    def do_GET(self):
+        OffSite.requested.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+@pytest.fixture
+def site(http_server, tmp_path):
+    """Start a static-file server; returns (base URL, function writing a file under its root)"""
+    def write(name, content):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    return http_server(partial(StaticFiles, directory=str(tmp_path))), write
+
+@pytest.fixture
+def off_site(http_server):
+    OffSite.requested = []
+    return http_server(OffSite)
+
+async def crawl(start_url, **kwargs):
+    pages = {}
+
+    async def sink(page):
+        pages[page.url] = page
+
+    outcomes = await Crawler(start_url, **kwargs).run(sink)
+    return pages, outcomes
+
+async def test_follows_links_across_the_site(site):
+    base, write = site
+    write("index.html", '<a href="/about.html">About</a> <a href="news/">News</a>')
+    write("about.html", '<title>About</title><a href="contact.html">Contact</a>')
+    write("news/index.html", '<a href="2024.html">2024</a> <a href="../about.html">About</a>')
+    write("news/2024.html", "<p>Term dates</p>")
+    write("contact.html", "<p>Office hours</p>")
+
+    pages, outcomes = await crawl(base + "/")
+
+    assert set(pages) == {
+        f"{base}/", f"{base}/about.html", f"{base}/news/", f"{base}/news/2024.html", f"{base}/contact.html"
+    }
+    assert outcomes == {"changed": 5}
+    assert pages[f"{base}/news/"].links == (f"{base}/news/2024.html", f"{base}/about.html")
+
+async def test_max_depth_and_max_pages(site):
+    base, write = site
+    for n in range(5):
+        write(f"page{n}.html", f'<p>Page {n}</p><a href="page{n + 1}.html">next</a>')
+
+    pages, _ = await crawl(base + "/page0.html", max_depth=2)
+    assert set(pages) == {f"{base}/page0.html", f"{base}/page1.html", f"{base}/page2.html"}
+
+    pages, _ = await crawl(base + "/page0.html", max_pages=4)
+    assert len(pages) == 4
+
+async def test_stays_on_the_start_site(site, off_site):
+    base, write = site
+    write("index.html", f'<a href="{off_site}/elsewhere.html">Elsewhere</a> <a href="/local.html">Local</a>')
+    write("local.html", f'<a href="{off_site}/">Home of someone else</a> <a href="mailto:office@example.com">Mail</a>')
+
+    pages, _ = await crawl(base + "/")
+
+    assert set(pages) == {f"{base}/", f"{base}/local.html"}
+    # Links are recorded but never fetched
+    assert pages[f"{base}/"].links[0] == f"{off_site}/elsewhere.html"
+    assert OffSite.requested == []
+
+async def test_each_url_is_fetched_once(site):
+    base, write = site
+    write("index.html", """
+        <a href="/a.html">A</a> <a href="a.html#top">A again</a> <a href="HTTP://127.0.0.1:%s/a.html">A, shouting</a>
+        <a href="b.html">B</a>
+    """ % base.rsplit(":", 1)[1])
+    write("a.html", '<p>A</p><a href="b.html">B</a> <a href="/">Home</a>')
+    write("b.html", '<p>B</p><a href="a.html">A</a> <a href="/index.html">Home</a>')
+
+    pages, outcomes = await crawl(base + "/")
+
+    assert set(pages) == {f"{base}/", f"{base}/a.html", f"{base}/b.html", f"{base}/index.html"}
+    assert pages[f"{base}/"].links == (f"{base}/a.html", f"{base}/b.html")
+    # /index.html is / under another URL
+    assert pages[f"{base}/index.html"].outcome == "duplicate"
+    assert outcomes == {"changed": 3, "duplicate": 1}
+
+async def test_content_extraction(site):
+    base, write = site
+    write("index.html", """<!DOCTYPE html>
+        <html>
+          <head><title> Admissions &amp; Fees </title><style>p { color: red }</style></head>
+          <body>
+            <script>var tracking = "ignore me";</script>
+            <h1>Admissions</h1>
+            <p>Applications \t open in September.</p>
+            <ul><li>Year 7</li><li>Year 12</li></ul>
+            <noscript>Enable JavaScript</noscript>
+          </body>
+        </html>
+    """)
+    write("fees.txt", "  Fees are due termly.  \n")
+    write("prospectus.pdf", "%PDF-1.4")
+
+    pages, _ = await crawl(base + "/")
+    page = pages[f"{base}/"]
+    assert page.outcome == "changed"
+    assert page.title == "Admissions & Fees"
+    assert page.content == "Admissions\nApplications open in September.\nYear 7\nYear 12"
+    assert page.content_hash and page.last_modified
+
+    pages, _ = await crawl(base + "/fees.txt")
+    assert pages[f"{base}/fees.txt"].content == "Fees are due termly."
+
+    pages, _ = await crawl(base + "/prospectus.pdf")
+    assert pages[f"{base}/prospectus.pdf"].outcome == "skipped"
+
+async def test_known_pages_are_fetched_conditionally(site):
+    base, write = site
+    write("index.html", '<p>Welcome</p><a href="new.html">New</a>')
+    write("new.html", "<p>New page</p>")
+    first, _ = await crawl(base + "/")
+    home = first[f"{base}/"]
+
+    known = {home.url: Known(last_modified=home.last_modified, content_hash=home.content_hash, links=home.links)}
+    pages, outcomes = await crawl(base + "/", known=known)
+
+    # 304, yet its stored links still lead to the rest of the site
+    assert pages[home.url].outcome == "not_modified"
+    assert pages[home.url].content_hash == home.content_hash
+    assert outcomes == {"not_modified": 1, "changed": 1}
+
+async def test_missing_pages_fail_and_robots_txt_is_obeyed(site):
+    base, write = site
+    write("robots.txt", "User-agent: *\nDisallow: /private/\n")
+    write("index.html", '<a href="/missing.html">Missing</a> <a href="/private/staff.html">Staff</a>')
+    write("private/staff.html", "<p>Staff only</p>")
+
+    pages, outcomes = await crawl(base + "/")
+
+    assert pages[f"{base}/missing.html"].error == "HTTP 404"
+    assert pages[f"{base}/private/staff.html"].outcome == "skipped"
+    assert outcomes == {"changed": 1, "failed": 1, "skipped": 1}
+
+def test_parse_page_resolves_and_dedupes_links():
+    title, text, links = parse_page(
+        '<title>T</title><a href="a">1</a><a href="./a#x">2</a><a href="javascript:void(0)">3</a><a href="//other.org/b">4</a>',
+        "https://school.example/dir/page.html"
+    )
+    assert title == "T"
+    assert text == "1234"
+    assert links == ("https://school.example/dir/a", "https://other.org/b")
@@ -0,0 +1,98 @@
+# backend/tests/test_form_intake.py
+"""process_batch failure handling, with the claim and the batch itself stubbed out; no database involved."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+
+from api.modules.forms import intake
+from api.modules.forms.intake import BatchResult, is_transient, process_batch
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(f"SQLSTATE {pgcode}")
+        self.pgcode = pgcode
+
+def db_error(pgcode, cls=DBAPIError):
+    return cls("INSERT INTO parents ...", {}, PgError(pgcode))
+
+class RecordingSession:
+    """Records what process_batch does with its session"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, statement, params=None):
+        self.calls.append(("execute", statement, params))
+
+    async def commit(self):
+        self.calls.append(("commit",))
+
+    async def rollback(self):
+        self.calls.append(("rollback",))
+
+    def settled(self):
+        return [call[2] for call in self.calls if call[0] == "execute" and call[1] is intake.SETTLE_SUBMISSIONS]
+
+def submission(id):
+    return SimpleNamespace(id=id, age_seconds=2.5)
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Pending submissions 1-3; batches fail with whatever error is set for any of their ids"""
+    state = SimpleNamespace(pending={1, 2, 3}, errors={})
+
+    async def claim(db, limit, ids):
+        return [submission(i) for i in sorted(state.pending) if ids is None or i in ids][:limit]
+
+    async def process(db, rows):
+        for row in rows:
+            if row.id in state.errors:
+                raise state.errors[row.id]
+        return BatchResult(claimed=len(rows), created=len(rows), lag_seconds=2.5)
+
+    monkeypatch.setattr(intake, "_claim", claim)
+    monkeypatch.setattr(intake, "_process", process)
+    return state
+
+@pytest.mark.parametrize("error", [
+    OperationalError("SELECT 1", {}, Exception("server closed the connection unexpectedly")),
+    db_error("40001"),
+    db_error("40P01"),
+    db_error("08006"),
+    db_error("57P01"),
+])
+def test_transient_errors(error):
+    assert is_transient(error)
+
+@pytest.mark.parametrize("error", [
+    db_error("23505", IntegrityError),
+    db_error("22001"),
+    ValueError("bad form"),
+])
+def test_data_errors_are_not_transient(error):
+    assert not is_transient(error)
+
+async def test_bad_row_alone_is_marked_failed(queue):
+    queue.errors = {2: db_error("22001")}
+    db = RecordingSession()
+
+    result = await process_batch(db, 10)
+
+    assert (result.claimed, result.created, result.failed) == (3, 2, 1)
+    (settled,) = db.settled()
+    assert settled["ids"] == [2]
+    assert settled["statuses"] == ["failed"]
+    assert settled["errors"][0].startswith("Processing failed: ")
+
+@pytest.mark.parametrize("error", [db_error("40001"), OperationalError("SELECT 1", {}, Exception("connection lost"))])
+async def test_transient_error_leaves_the_batch_pending(queue, error):
+    queue.errors = {2: error}
+    db = RecordingSession()
+
+    with pytest.raises(DBAPIError):
+        await process_batch(db, 10)
+
+    # Rolled back, so the claim is released; nothing marked failed
+    assert db.calls == [("rollback",)]
+    assert db.settled() == []
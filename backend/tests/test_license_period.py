@@ -0,0 +1,45 @@
+# backend/tests/test_license_period.py
+"""Usage counters starting again with a new billing period; no database involved."""
+from types import SimpleNamespace
+
+from api.modules.licensing.cache import LicenseSnapshot
+from api.modules.licensing.dependencies import over_limit
+from api.modules.licensing.meter import API_CALLS, EMAILS
+
+def license_row(current_usage, usage_period="2024-02-01 00:00:00"):
+    return SimpleNamespace(
+        customer_id="SCHOOL-001", license_id="LIC-001", status="active", plan_id="growth",
+        modules_included=None, usage_limits={"api_calls_per_month": 1000, "emails_per_month": 50},
+        current_usage=current_usage, user_limit=None, current_users=3, trial_ends_at=None,
+        usage_period=usage_period,
+    )
+
+def test_usage_of_the_current_period_counts():
+    snapshot = LicenseSnapshot.from_row(license_row(
+        {"usage_period": "2024-02-01 00:00:00", API_CALLS: 1000, EMAILS: 12, "storage_mb": 40}
+    ))
+
+    assert snapshot.usage == {API_CALLS: 1000, EMAILS: 12, "storage_mb": 40}
+    assert over_limit(snapshot, API_CALLS) == "api_calls_per_month limit of 1000 reached"
+    assert over_limit(snapshot, EMAILS) is None
+
+def test_period_rollover_starts_monthly_counts_again():
+    # Counted in January; the license is now read in February's period
+    snapshot = LicenseSnapshot.from_row(license_row(
+        {"usage_period": "2024-01-01 00:00:00", API_CALLS: 1000, EMAILS: 50, "storage_mb": 40}
+    ))
+
+    assert snapshot.usage == {"storage_mb": 40}
+    assert over_limit(snapshot, API_CALLS) is None
+    assert over_limit(snapshot, EMAILS) is None
+
+def test_usage_without_a_period_belongs_to_none():
+    # Written before periods were recorded: as if from an earlier period
+    snapshot = LicenseSnapshot.from_row(license_row({API_CALLS: 5000}))
+
+    assert snapshot.usage == {}
+    assert over_limit(snapshot, API_CALLS) is None
+
+def test_unusable_usage_document():
+    assert LicenseSnapshot.from_row(license_row(None)).usage == {}
+    assert LicenseSnapshot.from_row(license_row([1, 2])).usage == {}
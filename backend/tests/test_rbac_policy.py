@@ -0,0 +1,41 @@
+# backend/tests/test_rbac_policy.py
+"""Policy compilation from plain rows; no database involved."""
+import logging
+from types import SimpleNamespace
+
+from api.modules.rbac.policy import Principal, compile_policy
+
+def permission(id, role, resource, actions, conditions=None):
+    return SimpleNamespace(id=id, role=role, resource=resource, actions=actions, conditions=conditions)
+
+USERS = [
+    SimpleNamespace(user_id="USER-001", role="admissions", status="active"),
+    SimpleNamespace(user_id="USER-002", role="admissions", status="inactive"),
+    SimpleNamespace(user_id="USER-003", role=None, status="active"),
+]
+
+def test_grants_exact_before_wildcards():
+    policy = compile_policy("SCHOOL-001", 1, [
+        permission(1, "admissions", "*", ["read"]),
+        permission(2, "admissions", "parents", ["read", "update"]),
+    ], USERS)
+    user = policy.users["USER-001"]
+
+    assert policy.decide(user, "parents", "read").permission_id == 2
+    assert policy.decide(user, "notes", "read").permission_id == 1
+    assert not policy.decide(user, "notes", "delete").allowed
+    assert not policy.decide(policy.users["USER-002"], "parents", "read").allowed
+    assert not policy.decide(policy.users["USER-003"], "parents", "read").allowed
+
+def test_conditional_rows_grant_nothing_and_are_logged_once(caplog):
+    rows = [permission(7, "admissions", "parents", ["read"], {"status": "active"})]
+    user = Principal("USER-001", "SCHOOL-LOG", "admissions", True)
+
+    with caplog.at_level(logging.WARNING, logger="api.rbac"):
+        for _ in range(3):
+            policy = compile_policy("SCHOOL-LOG", 4, rows, USERS)
+            assert not policy.decide(user, "parents", "read").allowed
+        assert len(caplog.records) == 1
+        # A new permission version reports it again
+        compile_policy("SCHOOL-LOG", 5, rows, USERS)
+        assert len(caplog.records) == 2
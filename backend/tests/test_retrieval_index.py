@@ -0,0 +1,78 @@
+# backend/tests/test_retrieval_index.py
+"""Tenant indexes in a temporary directory; no database involved."""
+import os
+
+import orjson
+
+from api.modules.smart_reply import retrieval
+from api.modules.smart_reply.retrieval import RetrievalIndex, TenantIndex
+
+PAGES = {
+    1: ("Term dates", "The autumn term starts on 4 September.\\nHalf term is the last week of October."),
+    2: ("School fees", "Fees are due termly in advance. Sibling discounts apply to the second child."),
+    3: ("Uniform", "The uniform shop is open on Tuesdays. Blazers carry the school crest."),
+}
+
+def rows(pages, version="v1"):
+    return {row_id: version for row_id in pages}, [
+        (row_id, version, f"KB-{row_id}", title, content, f"https://school.example/{row_id}", "general")
+        for row_id, (title, content) in pages.items()
+    ]
+
+def texts(index, query):
+    return [passage.text for passage in index.search(query)]
+
+def test_passage_texts_live_in_segment_files(tmp_path):
+    index = TenantIndex(str(tmp_path))
+    index.apply(*rows(PAGES))
+
+    assert texts(index, "sibling discount") == [PAGES[2][1]]
+    with open(tmp_path / "index.json", "rb") as handle:
+        meta = orjson.loads(handle.read())
+    assert "texts" not in meta and "entry_ids" not in meta
+    assert PAGES[2][1].encode() not in (tmp_path / "index.json").read_bytes()
+
+    reopened = TenantIndex(str(tmp_path))
+    assert reopened.reload_if_changed()
+    assert texts(reopened, "sibling discount") == [PAGES[2][1]]
+    assert reopened.state.entry_ids.tolist() == index.state.entry_ids.tolist()
+
+def test_texts_follow_edits_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "KB_INDEX_MAX_SEGMENTS", 2)
+    index = TenantIndex(str(tmp_path))
+    index.apply(*rows(PAGES))
+
+    pages = dict(PAGES)
+    compactions = 0
+    for version in range(2, 6):
+        pages[3] = ("Uniform", f"Uniform shop version {version}: open on Thursdays for blazers.")
+        pages[3 + version] = (f"News {version}", f"Sports day number {version} is in the summer term.")
+        compactions += index.apply(*rows(pages, f"v{version}"))["compacted"]
+
+    # Merged passages keep their texts; only the latest uniform page is live
+    assert compactions
+    assert index.state.live == len(pages)
+    assert texts(index, "uniform shop thursdays") == [pages[3][1]]
+    assert texts(index, "sibling discount") == [PAGES[2][1]]
+    segment_files = {f"segment-{segment.id}.{array}.npy"
+                     for segment in index.state.segments for array in retrieval.SEGMENT_ARRAYS}
+    assert segment_files <= set(os.listdir(tmp_path))
+
+    reopened = TenantIndex(str(tmp_path))
+    reopened.reload_if_changed()
+    assert texts(reopened, "sports day number 5")[0] == pages[8][1]
+    assert texts(reopened, "uniform shop thursdays") == [pages[3][1]]
+
+def test_registry_holds_at_most_max_tenants(tmp_path):
+    registry = RetrievalIndex(str(tmp_path), max_tenants=2)
+    first = registry.tenant("SCHOOL-001")
+    registry.tenant("SCHOOL-002")
+    registry._checked["SCHOOL-001"] = 0.0
+    # Used again, so SCHOOL-002 is the least recently used
+    assert registry.tenant("SCHOOL-001") is first
+    registry.tenant("SCHOOL-003")
+
+    assert list(registry._tenants) == ["SCHOOL-001", "SCHOOL-003"]
+    registry.tenant("SCHOOL-004")
+    assert list(registry._tenants) == ["SCHOOL-003", "SCHOOL-004"]
+    assert registry._checked == {}
@@ -0,0 +1,91 @@
+# backend/tests/test_snapshot_cache.py
+"""The per-tenant stats snapshot cache; no database involved."""
+import asyncio
+
+from api.modules.parents.cache import SnapshotCache
+
+def counter():
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        return len(calls)
+
+    return compute, calls
+
+async def test_snapshot_is_reused_until_invalidated():
+    cache = SnapshotCache()
+    compute, calls = counter()
+
+    assert await cache.get("SCHOOL-001", compute) == 1
+    assert await cache.get("SCHOOL-001", compute) == 1
+    cache.invalidate("SCHOOL-001")
+    assert await cache.get("SCHOOL-001", compute) == 2
+    assert len(calls) == 2
+
+async def test_concurrent_requests_rebuild_once_and_leave_no_lock():
+    cache = SnapshotCache()
+    started = asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        started.set()
+        await asyncio.sleep(0.01)
+        return "stats"
+
+    results = await asyncio.gather(*(cache.get("SCHOOL-001", compute) for _ in range(10)))
+
+    assert results == ["stats"] * 10
+    assert len(calls) == 1
+    assert cache._locks == {}
+
+async def test_write_during_rebuild_is_not_overwritten():
+    cache = SnapshotCache()
+    release = asyncio.Event()
+
+    async def stale():
+        await release.wait()
+        return "before the write"
+
+    rebuild = asyncio.create_task(cache.get("SCHOOL-001", stale))
+    await asyncio.sleep(0)
+    cache.invalidate("SCHOOL-001")
+    release.set()
+    assert await rebuild == "before the write"
+
+    async def fresh():
+        return "after the write"
+
+    assert await cache.get("SCHOOL-001", fresh) == "after the write"
+
+async def test_tenants_are_bounded():
+    cache = SnapshotCache(max_tenants=3)
+    compute, _ = counter()
+
+    for n in range(10):
+        await cache.get(f"SCHOOL-{n}", compute)
+        cache.invalidate(f"OTHER-{n}")
+
+    assert list(cache._snapshots) == ["SCHOOL-7", "SCHOOL-8", "SCHOOL-9"]
+    assert len(cache._invalidated) == 3
+
+async def test_forgotten_invalidation_still_blocks_a_stale_rebuild():
+    cache = SnapshotCache(max_tenants=2)
+    release = asyncio.Event()
+
+    async def stale():
+        await release.wait()
+        return "before the write"
+
+    rebuild = asyncio.create_task(cache.get("SCHOOL-001", stale))
+    await asyncio.sleep(0)
+    cache.invalidate("SCHOOL-001")
+    # Enough other writes that SCHOOL-001's invalidation is evicted
+    for n in range(5):
+        cache.invalidate(f"OTHER-{n}")
+    assert "SCHOOL-001" not in cache._invalidated
+    release.set()
+    await rebuild
+
+    assert "SCHOOL-001" not in cache._snapshots
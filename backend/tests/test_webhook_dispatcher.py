@@ -0,0 +1,304 @@
+# backend/tests/test_webhook_dispatcher.py
+"""Delivery attempts against a local stub endpoint; no database involved."""
+import asyncio
+import hashlib
+import hmac
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from api.modules.webhooks import dispatcher
+from api.modules.webhooks.dispatcher import WebhookDispatcher, retry_delay, sign
+from stub_server import QuietHandler
+
+# path -> (status, extra headers) answered by the stub
+RESPONSES = {
+    "/ok": (200, {}),
+    "/accepted": (202, {}),
+    "/error": (500, {}),
+    "/bad-gateway": (502, {}),
+    "/unavailable": (503, {"Retry-After": "300"}),
+    "/busy": (429, {"Retry-After": "120"}),
+    "/bad-request": (400, {}),
+    "/not-found": (404, {}),
+    "/gone": (410, {}),
+}
+
+class StubEndpoint(QuietHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        StubEndpoint.received.append((self.path, dict(self.headers), body))
+        status, headers = RESPONSES.get(self.path, (404, {}))
+        reply = f"status {status}".encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+@pytest.fixture
+def endpoint(http_server):
+    StubEndpoint.received = []
+    return http_server(StubEndpoint)
+
+@pytest.fixture
+async def webhooks():
+    instance = WebhookDispatcher()
+    yield instance
+    # Never started, so stop() has nothing to drain: just close the pools
+    for client in instance._clients.values():
+        await client.aclose()
+
+class RecordingEngine:
+    """Stands in for async_engine: records (statement, params) per transaction instead of running them"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.transactions = []
+
+    def begin(self):
+        engine = self
+
+        class Transaction:
+            async def __aenter__(self):
+                engine.transactions.append([])
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, statement, params):
+                if engine.fail:
+                    raise RuntimeError("connection lost")
+                engine.transactions[-1].append((statement, params))
+
+        return Transaction()
+
+@pytest.fixture
+def engine(monkeypatch):
+    recording = RecordingEngine()
+    monkeypatch.setattr(dispatcher, "async_engine", recording)
+    return recording
+
+def outbox_row(url, attempts=1, secret=None, active=True, headers=None, retry_config=None,
+               id=41, webhook_id=7, customer_id="SCHOOL-001"):
+    return SimpleNamespace(
+        id=id,
+        webhook_id=webhook_id,
+        customer_id=customer_id,
+        endpoint_id="WH-7",
+        event_type="parent.created",
+        created_at=datetime(2024, 1, 20, 10, 30),
+        payload={"parent_id": "PARENT-001"},
+        retry_config=retry_config,
+        attempts=attempts,
+        active=active,
+        url=url,
+        headers=headers,
+        secret=secret,
+    )
+
+async def deliver(webhooks, *rows):
+    """Deliver rows the way the claim loop does: take their tenant slots, then run them together"""
+    for row in rows:
+        webhooks._take_slot(row.customer_id)
+    await asyncio.gather(*(webhooks._deliver(row) for row in rows))
+
+@pytest.mark.parametrize("path,status", [("/ok", 200), ("/accepted", 202)])
+async def test_2xx_is_delivered(webhooks, endpoint, path, status):
+    outcome = await webhooks._attempt(outbox_row(endpoint + path, headers={"X-Tenant": "st-marys"}))
+
+    assert outcome.status == "delivered"
+    assert outcome.delay == 0
+    assert outcome.response_status == status
+    assert outcome.error is None
+    (received_path, headers, body), = StubEndpoint.received
+    assert received_path == path
+    assert headers["Content-Type"] == "application/json"
+    assert headers["X-Webhook-Event"] == "parent.created"
+    assert headers["X-Webhook-Delivery"] == "41"
+    assert headers["X-Tenant"] == "st-marys"
+    assert orjson.loads(body) == {
+        "id": 41, "event": "parent.created", "created_at": "2024-01-20T10:30:00", "data": {"parent_id": "PARENT-001"}
+    }
+    assert outcome.body == body.decode()
+
+@pytest.mark.parametrize("path,status", [("/error", 500), ("/bad-gateway", 502)])
+async def test_5xx_is_retried_with_backoff(webhooks, endpoint, path, status):
+    outcome = await webhooks._attempt(outbox_row(endpoint + path, attempts=2))
+
+    assert outcome.status == "pending"
+    assert outcome.response_status == status
+    assert outcome.error == f"HTTP {status}"
+    # Second attempt: a step of base * 2, half of it jittered
+    step = dispatcher.WEBHOOK_BACKOFF_BASE_SECONDS * 2
+    assert step / 2 <= outcome.delay <= step
+
+@pytest.mark.parametrize("path,status,retry_after", [("/busy", 429, 120), ("/unavailable", 503, 300)])
+async def test_retry_after_is_honoured(webhooks, endpoint, path, status, retry_after):
+    outcome = await webhooks._attempt(outbox_row(endpoint + path))
+
+    assert outcome.status == "pending"
+    assert outcome.response_status == status
+    assert outcome.delay >= retry_after
+
+async def test_retryable_status_fails_once_retries_are_used_up(webhooks, endpoint):
+    outcome = await webhooks._attempt(
+        outbox_row(endpoint + "/error", attempts=3, retry_config={"max_retries": 2, "backoff_multiplier": 2})
+    )
+
+    assert outcome.status == "failed"
+    assert outcome.response_status == 500
+
+@pytest.mark.parametrize("path,status", [("/bad-request", 400), ("/not-found", 404), ("/gone", 410)])
+async def test_4xx_is_not_retried(webhooks, endpoint, path, status):
+    outcome = await webhooks._attempt(outbox_row(endpoint + path))
+
+    assert outcome.status == "failed"
+    assert outcome.delay == 0
+    assert outcome.response_status == status
+    assert outcome.response_body == f"status {status}"
+    assert outcome.error == f"HTTP {status}"
+
+async def test_unreachable_endpoint_is_retried(webhooks):
+    # Nothing listens on port 1
+    outcome = await webhooks._attempt(outbox_row("http://127.0.0.1:1/ok"))
+
+    assert outcome.status == "pending"
+    assert outcome.response_status is None
+    assert outcome.error
+
+async def test_inactive_webhook_is_not_sent(webhooks, endpoint):
+    outcome = await webhooks._attempt(outbox_row(endpoint + "/ok", active=False))
+
+    assert outcome.status == "failed"
+    assert StubEndpoint.received == []
+
+async def test_signature_header(webhooks, endpoint):
+    await webhooks._attempt(outbox_row(endpoint + "/ok", secret="whsec-test"))
+
+    (_, headers, body), = StubEndpoint.received
+    timestamp = headers["X-Webhook-Timestamp"]
+    expected = hmac.new(b"whsec-test", timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    assert headers["X-Webhook-Signature"] == f"sha256={expected}"
+    assert headers["X-Webhook-Signature"] == sign("whsec-test", timestamp, body)
+
+async def test_no_signature_without_secret(webhooks, endpoint):
+    await webhooks._attempt(outbox_row(endpoint + "/ok"))
+
+    (_, headers, _), = StubEndpoint.received
+    assert "X-Webhook-Signature" not in headers
+
+def test_sign():
+    assert sign(None, "1700000000", b"{}") is None
+    assert sign("", "1700000000", b"{}") is None
+    digest = hmac.new(b"secret", b"1700000000.{}", hashlib.sha256).hexdigest()
+    assert sign("secret", "1700000000", b"{}") == f"sha256={digest}"
+    assert sign("secret", "1700000001", b"{}") != sign("secret", "1700000000", b"{}")
+
+def test_retry_delay_grows_with_jitter():
+    base = dispatcher.WEBHOOK_BACKOFF_BASE_SECONDS
+    for attempts in (1, 2, 3, 4):
+        step = base * 3 ** (attempts - 1)
+        delays = [retry_delay(attempts, {"backoff_multiplier": 3}) for _ in range(200)]
+        assert all(step / 2 <= delay <= step for delay in delays)
+        # Jittered, so deliveries that failed together spread out
+        assert len(set(delays)) > 1
+
+def test_retry_delay_defaults_and_cap():
+    base = dispatcher.WEBHOOK_BACKOFF_BASE_SECONDS
+    assert base / 2 <= retry_delay(1, None) <= base
+    assert retry_delay(50, {"backoff_multiplier": 10}) <= dispatcher.WEBHOOK_BACKOFF_MAX_SECONDS
+
+def test_retry_delay_respects_retry_after_up_to_the_cap():
+    assert retry_delay(1, None, retry_after=90) >= 90
+    assert retry_delay(1, None, retry_after=10 ** 9) == dispatcher.WEBHOOK_BACKOFF_MAX_SECONDS
+
+def test_claim_leaves_room_only_for_free_tenant_slots(webhooks):
+    webhooks.customer_concurrency = 3
+    for customer in ["SCHOOL-001"] * 3 + ["SCHOOL-002"] + [None] * 2:
+        webhooks._take_slot(customer)
+
+    params = webhooks._claim_params(50)
+    assert params["busy"] == ["SCHOOL-001"]
+    assert dict(zip(params["in_flight_customers"], params["in_flight_counts"])) == {
+        "SCHOOL-001": 3, "SCHOOL-002": 1, "": 2
+    }
+    assert params["per_customer"] == 3
+    assert (params["limit"], params["scan"]) == (50, 200)
+
+    # Finished tenants drop out instead of lingering at zero
+    webhooks._release_slot("SCHOOL-002")
+    webhooks._release_slot("SCHOOL-001")
+    params = webhooks._claim_params(50)
+    assert params["busy"] == []
+    assert dict(zip(params["in_flight_customers"], params["in_flight_counts"])) == {"SCHOOL-001": 2, "": 2}
+
+async def test_deliveries_release_their_slot(webhooks, endpoint):
+    rows = [outbox_row(endpoint + "/ok", id=n) for n in range(3)] + [outbox_row("http://127.0.0.1:1/ok", id=9)]
+    await deliver(webhooks, *rows)
+
+    assert webhooks._in_flight == {}
+    assert (webhooks.delivered, webhooks.retried, webhooks.failed) == (3, 1, 0)
+
+async def test_outcomes_are_settled_in_one_batched_transaction(webhooks, endpoint, engine):
+    rows = [
+        outbox_row(endpoint + "/ok", id=1, webhook_id=7),
+        outbox_row(endpoint + "/accepted", id=2, webhook_id=7),
+        outbox_row(endpoint + "/error", id=3, webhook_id=7, attempts=2),
+        outbox_row(endpoint + "/gone", id=4, webhook_id=8, customer_id="SCHOOL-002"),
+    ]
+    await deliver(webhooks, *rows)
+    assert len(StubEndpoint.received) == 4
+    assert engine.transactions == []
+
+    assert await webhooks.flush() == 4
+
+    (transaction,) = engine.transactions
+    statements = [statement for statement, _ in transaction]
+    assert statements == [
+        dispatcher.SETTLE_DELIVERED, dispatcher.SETTLE_RESCHEDULED, dispatcher.INSERT_LOGS, dispatcher.UPDATE_COUNTERS
+    ]
+    delivered, rescheduled, logs, counters = (params for _, params in transaction)
+    assert sorted(delivered["ids"]) == [1, 2]
+    retry = dict(zip(rescheduled["ids"], zip(rescheduled["statuses"], rescheduled["errors"])))
+    assert retry == {3: ("pending", "HTTP 500"), 4: ("failed", "HTTP 410")}
+    # One log row per attempt, retry_count counting earlier attempts
+    assert sorted(zip(logs["request_ids"], logs["statuses"], logs["retries"])) == [
+        ("1", 200, 0), ("2", 202, 0), ("3", 500, 1), ("4", 410, 0)
+    ]
+    assert dict(zip(counters["ids"], zip(counters["succeeded"], counters["failed"]))) == {7: (2, 1), 8: (0, 1)}
+    assert webhooks.stats()["unflushed"] == 0
+
+    # Nothing buffered, nothing written
+    assert await webhooks.flush() == 0
+    assert len(engine.transactions) == 1
+
+async def test_only_deliveries_skip_the_reschedule(webhooks, endpoint, engine):
+    await deliver(webhooks, outbox_row(endpoint + "/ok"))
+    await webhooks.flush()
+
+    (transaction,) = engine.transactions
+    assert [statement for statement, _ in transaction] == [
+        dispatcher.SETTLE_DELIVERED, dispatcher.INSERT_LOGS, dispatcher.UPDATE_COUNTERS
+    ]
+
+async def test_failed_flush_keeps_outcomes_for_the_next_one(webhooks, endpoint, engine):
+    await deliver(webhooks, outbox_row(endpoint + "/ok", id=1))
+    engine.fail = True
+    with pytest.raises(RuntimeError):
+        await webhooks.flush()
+    # Outcomes that arrived meanwhile queue behind the kept ones
+    await deliver(webhooks, outbox_row(endpoint + "/ok", id=2))
+    assert [o.outbox_id for o in webhooks._outcomes] == [1, 2]
+
+    engine.fail = False
+    assert await webhooks.flush() == 2
+    statement, params = engine.transactions[-1][0]
+    assert statement is dispatcher.SETTLE_DELIVERED
+    assert params["ids"] == [1, 2]